@@ -1,21 +1,32 @@
+import time
+MULAI_RERUN = time.perf_counter()
+
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
 import pandas as pd
-import time
-from datetime import datetime
-import random
-import json
 import os
-import hashlib
-import pickle
-
-# Optional: Firebase admin for realtime DB polling
-try:
-    import firebase_admin
-    from firebase_admin import credentials, db
-except Exception:
-    firebase_admin = None
+import atexit
+from dateutil import tz
+
+from smartfarm.analitik import FLAG_DIAM, FLAG_LONJAKAN, FLAG_LUAR_RENTANG
+from smartfarm.armada import KAPASITAS_PERANGKAT, MAKS_WORKER, PollerArmada, urai_perangkat
+from smartfarm.cache import CacheHasil, kunci_konten
+from smartfarm.config import CSS_FILE, KB_FILE, MASTER_FILE, KonfigurasiLive
+from smartfarm.fuzzy import (
+    defuzzifikasi_centroid, fuzzifikasi_input, inferensi_mamdani_baru,
+    x_irigasi, x_pestisida, x_pupuk,
+)
+from smartfarm.diagnosis import diagnosa_top_k, hitung_diagnosa_cf
+from smartfarm.downsample import MAKS_TITIK, lttb_gabungan
+from smartfarm.grafik import PelukisFuzzy
+from smartfarm.history import KAPASITAS_DEFAULT
+from smartfarm.koneksi import init_firebase, referensi
+from smartfarm.lut import muat_atau_bangun
+from smartfarm.metrik import METRIK, PencatatMetrik, layani_metrik
+from smartfarm.models import FITUR_AI, KELAS_AI, PenilaiNB, muat_model
+from smartfarm.sources import PollerSensor, SumberFirebase, SumberHTTP, sesi_http
+from smartfarm.store import DEVICE_DEFAULT, PenyimpanBacaan
+from smartfarm.stream import StreamSensor
 
 # ==================== PAGE CONFIG ====================
 st.set_page_config(
@@ -28,123 +39,138 @@ st.set_page_config(
 # ==================== LOAD AI MODELS (NAIVE BAYES & SCALER) ====================
 @st.cache_resource
 def load_ai_models():
-    model = None
-    scaler = None
     try:
-        # Load Model Naive Bayes
-        model_path = os.path.join(os.path.dirname(__file__), "model_naivebayes.pkl")
-        if os.path.exists(model_path):
-            with open(model_path, 'rb') as f:
-                model = pickle.load(f)
-
-        # Load Scaler
-        scaler_path = os.path.join(os.path.dirname(__file__), "scaler.pkl")
-        if os.path.exists(scaler_path):
-            with open(scaler_path, 'rb') as f:
-                scaler = pickle.load(f)
-                
-        return model, scaler
+        return muat_model()
     except Exception as e:
         st.error(f"Error loading AI Models: {e}")
         return None, None
 
 ai_model, ai_scaler = load_ai_models()
 
+# Scaler + Naive Bayes dilipat menjadi satu matriks bobot (skor batch tanpa jalur sklearn)
+@st.cache_resource
+def load_ai_scorer():
+    model, scaler = load_ai_models()
+    return PenilaiNB(model, scaler) if model is not None and scaler is not None else None
+
+ai_scorer = load_ai_scorer()
+
 # Mapping Hasil Prediksi
-AI_CLASSES = {
-    0: "Sehat",
-    1: "Kurang Hara", 
-    2: "Tanah Masam", 
-    3: "Kering"
-}
-
-# ==================== KNOWLEDGE BASE & MASTER DATA ====================
-KNOWLEDGE_BASE = []
-MASTER_DATA = {}
-
-# Load external knowledge base
-KB_FILE = os.path.join(os.path.dirname(__file__), "knowledge_base.json")
-try:
-    if os.path.exists(KB_FILE):
-        with open(KB_FILE, "r", encoding="utf-8") as _f:
-            _kb = json.load(_f)
-            if isinstance(_kb, list): KNOWLEDGE_BASE = _kb
-except:
-    pass
-
-# Load master data definitions
-MASTER_FILE = os.path.join(os.path.dirname(__file__), "master_data.json")
-try:
-    if os.path.exists(MASTER_FILE):
-        with open(MASTER_FILE, 'r', encoding='utf-8') as mf:
-            MASTER_DATA = json.load(mf).get('definitions', {})
-except:
-    pass
+AI_CLASSES = KELAS_AI
+
+# ==================== KNOWLEDGE BASE, MASTER DATA & CSS ====================
+# Dikompilasi sekali per proses (IndeksRule, IndeksMaster, CSS ringkas). Setiap
+# rerun hanya mengecek mtime file; bila isi file berubah, konfigurasi dibangun
+# ulang tanpa restart server, jadi pakar bisa menyunting rule secara langsung.
+@st.cache_resource
+def load_config():
+    return KonfigurasiLive(KB_FILE, MASTER_FILE, CSS_FILE)
+
+CONFIG = load_config().ambil()
+MASTER_INDEX = CONFIG.master_index
 
 def get_label_from_master(sensor, value):
-    defs = MASTER_DATA.get(sensor)
-    if not defs: return None
-    for d in defs:
-        op = d.get('operator')
-        if op == '<' and value < d.get('value'): return d.get('label')
-        elif op == '>' and value > d.get('value'): return d.get('label')
-        elif op == 'range' and d.get('min') <= value <= d.get('max'): return d.get('label')
-        elif 'value' in d and value == d.get('value'): return d.get('label')
-    return None
-
-# ==================== FIREBASE CONNECTION ====================
-def init_firebase():
-    if not firebase_admin._apps:
+    return MASTER_INDEX.get_label(sensor, value)
+
+# Satu sumber sensor per proses: semua sesi membaca snapshot yang sama, jadi
+# /Monitoring tidak lagi dibaca ulang pada setiap rerun setiap sesi.
+# SMARTFARM_INGEST: 'poll' (baca berkala) atau 'stream' (listener RTDB, event per field)
+INGEST_MODE = os.environ.get('SMARTFARM_INGEST', 'poll')
+POLL_INTERVAL = float(os.environ.get('SMARTFARM_POLL_INTERVAL', '3'))
+# Kapasitas ring buffer riwayat (titik); memori = 80 byte x titik, dipakai bersama semua sesi
+HISTORY_CAPACITY = int(os.environ.get('SMARTFARM_HISTORY_CAPACITY', str(KAPASITAS_DEFAULT)))
+# Banyak lahan: SMARTFARM_DEVICES='sawah1=/devices/sawah1/Monitoring, sawah2=/devices/sawah2/Monitoring'
+# (kosong = satu perangkat di /Monitoring). Semua perangkat di-poll paralel per siklus.
+DEVICES = urai_perangkat(os.environ.get('SMARTFARM_DEVICES', ''))
+# Opsional: baca node lewat REST (<url><path>.json) dengan pool koneksi bersama, bukan firebase_admin
+DEVICE_URL = os.environ.get('SMARTFARM_DEVICE_URL', '')
+POLL_WORKERS = int(os.environ.get('SMARTFARM_POLL_WORKERS', str(MAKS_WORKER)))
+DEVICE_HISTORY_CAPACITY = int(os.environ.get('SMARTFARM_DEVICE_HISTORY_CAPACITY', str(KAPASITAS_PERANGKAT)))
+FEED_CAPACITY = DEVICE_HISTORY_CAPACITY if DEVICES else HISTORY_CAPACITY
+CHART_WINDOWS = [n for n in (20, 100, 500, 2000, 10000, 50000) if n < FEED_CAPACITY] + [FEED_CAPACITY]
+CHART_RANGES = {"Realtime": None, "6 Jam": 6 * 3600, "24 Jam": 86400, "7 Hari": 7 * 86400,
+                "30 Hari": 30 * 86400, "1 Tahun": 365 * 86400}
+# Penyimpanan permanen bacaan (SQLite WAL); kosongkan SMARTFARM_STORE untuk menonaktifkan
+STORE_PATH = os.environ.get('SMARTFARM_STORE', os.path.join(os.path.dirname(__file__), "smartfarm_history.db"))
+RETENTION_DAYS = float(os.environ.get('SMARTFARM_RETENTION_DAYS', '180'))
+# Rollup (grafik rentang panjang) disimpan lebih lama dari data mentah, agar rentang "1 Tahun" tetap terisi
+ROLLUP_RETENTION_DAYS = float(os.environ.get('SMARTFARM_ROLLUP_RETENTION_DAYS', '730'))
+
+# Metrik tahap & penghitung kegagalan (smartfarm.metrik): endpoint teks Prometheus
+# di SMARTFARM_METRICS_PORT dan/atau satu baris JSON per interval ke SMARTFARM_METRICS_LOG
+METRICS_PORT = int(os.environ.get('SMARTFARM_METRICS_PORT', '0'))
+METRICS_LOG = os.environ.get('SMARTFARM_METRICS_LOG', '')
+METRICS_LOG_INTERVAL = float(os.environ.get('SMARTFARM_METRICS_LOG_INTERVAL', '60'))
+
+@st.cache_resource
+def load_store():
+    if not STORE_PATH: return None
+    store = PenyimpanBacaan(STORE_PATH, retensi_detik=RETENTION_DAYS * 86400 if RETENTION_DAYS > 0 else None,
+                            retensi_rollup_detik=ROLLUP_RETENTION_DAYS * 86400 if ROLLUP_RETENTION_DAYS > 0 else None)
+    atexit.register(store.close)
+    return store
+
+@st.cache_resource
+def load_sensor_feed():
+    store = load_store()
+    if DEVICES:
+        workers = min(POLL_WORKERS, len(DEVICES))
+        if DEVICE_URL:
+            sesi = sesi_http(workers)
+            sumber = {nama: SumberHTTP(DEVICE_URL.rstrip('/') + '/' + path.strip('/') + '.json', sesi)
+                      for nama, path in DEVICES.items()}
+        else:
+            sumber = {nama: SumberFirebase(init_firebase, path) for nama, path in DEVICES.items()}
+        return PollerArmada(sumber, interval=POLL_INTERVAL, workers=workers,
+                            kapasitas=DEVICE_HISTORY_CAPACITY, penyimpan=store).start()
+    if INGEST_MODE == 'stream' and init_firebase():
         try:
-            cred_path = "firebase_credentials.json"
-            if not os.path.exists(cred_path):
-                cred_path = os.path.join(os.path.dirname(__file__), "firebase_credentials.json")
-            
-            if os.path.exists(cred_path):
-                cred = credentials.Certificate(cred_path)
-                firebase_admin.initialize_app(cred, {
-                    'databaseURL': 'https://matkul-9f44d-default-rtdb.asia-southeast1.firebasedatabase.app/'
-                })
-                return True
-            else:
-                return False
-        except Exception:
-            return False
-    return True
-
-def get_data_from_firebase(is_connected):
-    if is_connected:
+            return StreamSensor(referensi('/Monitoring'), kapasitas=HISTORY_CAPACITY, penyimpan=store).start()
+        except Exception as e:
+            # listener gagal dibuka: kembali ke polling
+            METRIK.tambah('stream_gagal', alasan=type(e).__name__)
+    return PollerSensor(SumberFirebase(init_firebase), interval=POLL_INTERVAL,
+                        kapasitas=HISTORY_CAPACITY, penyimpan=store).start()
+
+# Hasil per bacaan (label & probabilitas Naive Bayes, label master data) di-cache
+# berdasarkan isi bacaan: tick yang nilainya sama, sesi lain, atau bacaan duplikat
+# tidak menjalankan model lagi. Sidik konfigurasi ikut di kunci, jadi suntingan
+# master data langsung berlaku.
+RESULT_CACHE_SIZE = int(os.environ.get('SMARTFARM_RESULT_CACHE_SIZE', '1024'))
+RESULT_CACHE_TTL = float(os.environ.get('SMARTFARM_RESULT_CACHE_TTL', '600'))
+KOLOM_ANALISIS = ('ph', 'air_temp', 'soil_moisture', 'tds', 'rainfall')
+
+@st.cache_resource
+def load_result_cache():
+    return CacheHasil(maks_entri=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+
+@st.cache_resource
+def load_metrik():
+    """Daftarkan pengumpul gauge (cache, penyimpanan) dan mulai ekspor; sekali per proses."""
+    def pengumpul():
+        for nama, cache in (('hasil', load_result_cache()), ('grafik_fuzzy', load_fuzzy_plotter()[1])):
+            stat = cache.statistik()
+            for k in ('hit', 'miss', 'entri'): yield f'cache_{k}', {'cache': nama}, stat[k]
+        store = load_store()
+        if store is not None:
+            yield 'store_ditulis', {}, store.ditulis
+            yield 'store_gagal', {}, store.gagal
+            yield 'store_duplikat', {}, store.duplikat
+    METRIK.daftar_pengumpul(pengumpul)
+    server = pencatat = None
+    if METRICS_PORT:
         try:
-            ref = db.reference('/Monitoring')
-            data = ref.get()
-            
-            if data:
-                return {
-                    'ph': float(data.get('pH') or data.get('ph') or 7.0),
-                    'tds': int(data.get('TDS') or data.get('tds') or 0),
-                    'soil_moisture': int(data.get('SoilMoisture') or data.get('soil_moisture') or data.get('soil') or 0),
-                    'water_temp': float(data.get('WaterTemp') or data.get('suhu_air') or 0),
-                    'air_temp': float(data.get('AirTemp') or data.get('suhu_udara') or 0),
-                    'air_humidity': int(data.get('Humidity') or data.get('humidity') or data.get('kelembaban_udara') or 0),
-                    'rainfall': int(data.get('Rainfall') or data.get('rainfall') or data.get('curah_hujan') or 0),
-                    'timestamp': datetime.now().strftime("%H:%M:%S"),
-                    'date': datetime.now().strftime("%d-%m-%Y")
-                }
-        except:
-            pass
-
-    # Dummy Data Generator (Offline Mode)
-    return {
-        'ph': round(random.uniform(5.5, 8.5), 2),
-        'tds': int(random.uniform(300, 2500)),
-        'soil_moisture': int(random.uniform(10, 100)),
-        'water_temp': round(random.uniform(22, 35), 1),
-        'air_temp': round(random.uniform(24, 38), 1),
-        'air_humidity': int(random.uniform(40, 95)),
-        'rainfall': int(random.choice([0, 100])),
-        'timestamp': datetime.now().strftime("%H:%M:%S"),
-        'date': datetime.now().strftime("%d-%m-%Y")
-    }
+            server = layani_metrik(METRIK, port=METRICS_PORT)
+        except OSError:
+            METRIK.tambah('endpoint_metrik_gagal')
+    if METRICS_LOG:
+        pencatat = PencatatMetrik(METRICS_LOG, METRIK, METRICS_LOG_INTERVAL).start()
+        atexit.register(pencatat.tulis)
+    return server, pencatat
+
+def feed_snapshot(lahan):
+    feed = load_sensor_feed()
+    return feed.snapshot(lahan) if DEVICES else feed.snapshot()
 
 # ==================== HELPER: SAFE VALUE FOR WIDGETS ====================
 def safe_val(val, min_v, max_v):
@@ -154,265 +180,78 @@ def safe_val(val, min_v, max_v):
     return val
 
 # ==================== CUSTOM CSS ====================
-st.markdown("""
-<style>
-    .stApp {
-        background: linear-gradient(135deg, #0c4a6e, #1e293b, #0f172a);
-        color: #e2e8f0;
-        font-family: 'Segoe UI', system-ui, sans-serif;
-    }
-    .section-header {
-        display: flex; align-items: center; gap: 10px;
-        font-size: 1.5rem; font-weight: 700; margin: 1.5rem 0 1rem;
-        color: #94a3b8;
-    }
-    .section-header .icon {
-        display: inline-flex; justify-content: center; align-items: center;
-        width: 36px; height: 36px; border-radius: 50%;
-        background: rgba(56, 189, 248, 0.15);
-        color: #60a5fa;
-        font-size: 1.1rem;
-    }
-    .sensor-card {
-        background: rgba(30, 41, 59, 0.6);
-        border-radius: 16px; padding: 20px;
-        box-shadow: 0 4px 12px rgba(0,0,0,0.2);
-        border: 1px solid rgba(56, 189, 248, 0.2);
-        transition: all 0.3s ease;
-    }
-    .sensor-card:hover {
-        transform: translateY(-3px);
-        box-shadow: 0 6px 16px rgba(0,0,0,0.3), 0 0 0 2px rgba(34, 197, 94, 0.3);
-    }
-    .sensor-title {
-        font-size: 0.85rem; font-weight: 600; color: #94a3b8; text-transform: uppercase;
-        margin-bottom: 6px;
-    }
-    .sensor-value {
-        font-size: 2.1rem; font-weight: 800;
-        background: linear-gradient(90deg, #38bdf8, #818cf8);
-        -webkit-background-clip: text; background-clip: text; color: transparent;
-    }
-    .sensor-unit { font-size: 1.2rem; color: #cbd5e1; margin-left: 4px; }
-    .sensor-label { font-size: 0.9rem; font-weight: 600; color: #60a5fa; margin-top: 4px; }
-    .sensor-label.bad { color: #f87171; }
-    .sensor-label.good { color: #4ade80; }
-    .sensor-label.warn { color: #fbbf24; }
-
-    /* AI Prediction Card (Realtime) */
-    .ai-realtime-card {
-        background: linear-gradient(135deg, #2e1065, #4c1d95);
-        border-left: 6px solid #d8b4fe;
-        padding: 25px;
-        border-radius: 16px;
-        margin-bottom: 25px;
-        box-shadow: 0 10px 25px rgba(0,0,0,0.4);
-        display: flex; align-items: center; justify-content: space-between;
-    }
-    .ai-realtime-title { color: #e9d5ff; font-weight: bold; font-size: 1.1rem; margin-bottom: 5px; }
-    .ai-realtime-result { font-size: 2.5rem; color: #ffffff; font-weight: 900; text-shadow: 0 2px 4px rgba(0,0,0,0.3); }
-    .ai-realtime-sub { color: #c084fc; font-size: 0.9rem; }
-
-    .terminal-box {
-        background-color: #0c0c0c; color: #e0e0e0; padding: 24px;
-        border-radius: 12px; border: 1px solid #334155;
-        font-family: 'JetBrains Mono', monospace; white-space: pre-wrap;
-    }
-    .terminal-box .hl-key { color: #60a5fa; font-weight: bold; }
-    .terminal-box .hl-val { color: #34d399; }
-    .terminal-box .hl-warn { color: #fbbf24; }
-    div.stButton > button {
-        background: linear-gradient(90deg, #10b981, #059669); color: white;
-        font-weight: 700; padding: 12px 20px; border-radius: 12px; width: 100%; border: none;
-    }
-    .streamlit-expanderHeader { background: rgba(30, 41, 59, 0.7) !important; color: #cbd5e1 !important; }
-    
-    /* STATUS BADGE */
-    .status-online { color: #4ade80; font-weight: bold; padding: 2px 8px; border: 1px solid #4ade80; border-radius: 4px; }
-    .status-offline { color: #f87171; font-weight: bold; padding: 2px 8px; border: 1px solid #f87171; border-radius: 4px; }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(CONFIG.css, unsafe_allow_html=True)
 
 # ==================== FUZZY LOGIC FUNCTIONS ====================
-def trimf(x, abc):
-    a, b, c = abc; y = np.zeros_like(x)
-    mask_left = (x > a) & (x <= b); mask_right = (x > b) & (x < c)
-    if b != a: y[mask_left] = (x[mask_left] - a) / (b - a)
-    if c != b: y[mask_right] = (c - x[mask_right]) / (c - b)
-    y[x == b] = 1.0
-    return y
-
-def trapmf(x, abcd):
-    a, b, c, d = abcd; y = np.zeros_like(x)
-    mask_left = (x > a) & (x < b); mask_right = (x > c) & (x < d)
-    if b != a: y[mask_left] = (x[mask_left] - a) / (b - a)
-    y[(x >= b) & (x <= c)] = 1.0
-    if d != c: y[mask_right] = (d - x[mask_right]) / (d - c)
-    return y
-
-def defuzzifikasi_centroid(x, mfx):
-    num = np.sum(x * mfx); den = np.sum(mfx)
-    return num / den if den != 0 else 0
-
-x_irigasi = np.linspace(0, 3000, 1000)
-irigasi_sedikit = trapmf(x_irigasi, [0, 0, 1000, 1200])
-irigasi_cukup   = trimf(x_irigasi, [1000, 1600, 2200])
-irigasi_banyak  = trapmf(x_irigasi, [2000, 2500, 3000, 3000])
-
-x_pestisida = np.linspace(0, 100, 500)
-pestisida_kurang   = trimf(x_pestisida, [0, 15, 30])
-pestisida_optimal  = trimf(x_pestisida, [25, 45, 65])
-pestisida_berlebih = trapmf(x_pestisida, [55, 75, 100, 100])
-
-x_pupuk = np.linspace(0, 100, 500)
-pupuk_stop = trapmf(x_pupuk, [0, 0, 10, 25])
-pupuk_sedikit = trimf(x_pupuk, [15, 35, 55])
-pupuk_penuh = trimf(x_pupuk, [45, 62.5, 80])
-
-def fuzzifikasi_input(tds, ph, hum, hujan):
-    mu = {}
-    if tds <= 400: mu['tds_kurang'] = 1.0
-    elif 400 < tds < 500: mu['tds_kurang'] = (500 - tds) / 100.0
-    else: mu['tds_kurang'] = 0.0
-    if 400 <= tds <= 500: mu['tds_ideal'] = (tds - 400) / 100.0
-    elif 500 < tds <= 1900: mu['tds_ideal'] = 1.0
-    elif 1900 < tds < 2100: mu['tds_ideal'] = (2100 - tds) / 200.0
-    else: mu['tds_ideal'] = 0.0
-    if tds <= 1900: mu['tds_lebih'] = 0.0
-    elif 1900 < tds < 2100: mu['tds_lebih'] = (tds - 1900) / 200.0
-    else: mu['tds_lebih'] = 1.0
-
-    if ph <= 6.0: mu['ph_masam'] = 1.0
-    elif 6.0 < ph < 7.0: mu['ph_masam'] = (7.0 - ph) / 1.0
-    else: mu['ph_masam'] = 0.0
-    if 6.0 <= ph <= 7.0: mu['ph_netral'] = (ph - 6.0) / 1.0
-    elif 7.0 < ph <= 8.0: mu['ph_netral'] = 1.0
-    elif 8.0 < ph < 9.0: mu['ph_netral'] = (9.0 - ph) / 1.0
-    else: mu['ph_netral'] = 0.0
-    if ph <= 8.0: mu['ph_basa'] = 0.0
-    elif 8.0 < ph < 9.0: mu['ph_basa'] = (ph - 8.0) / 1.0
-    else: mu['ph_basa'] = 1.0
-
-    if hum <= 28: mu['hum_kering'] = 1.0
-    elif 28 < hum < 38: mu['hum_kering'] = (38 - hum) / 10.0
-    else: mu['hum_kering'] = 0.0
-    if 28 <= hum <= 38: mu['hum_opt'] = (hum - 28) / 10.0
-    elif 38 < hum <= 85: mu['hum_opt'] = 1.0
-    elif 85 < hum < 95: mu['hum_opt'] = (95 - hum) / 10.0
-    else: mu['hum_opt'] = 0.0
-    if hum <= 85: mu['hum_basah'] = 0.0
-    elif 85 < hum < 95: mu['hum_basah'] = (hum - 85) / 10.0
-    else: mu['hum_basah'] = 1.0
-
-    if hujan < 0.5: mu['hujan_cerah'] = 1.0; mu['hujan_turun'] = 0.0
-    else: mu['hujan_cerah'] = 0.0; mu['hujan_turun'] = 1.0
-    return mu
-
-def inferensi_mamdani_baru(mu):
-    tds_k, tds_i, tds_l = mu['tds_kurang'], mu['tds_ideal'], mu['tds_lebih']
-    hum_k, hum_o, hum_b = mu['hum_kering'], mu['hum_opt'], mu['hum_basah']
-    ph_m, ph_n, ph_b    = mu['ph_masam'], mu['ph_netral'], mu['ph_basa']
-    hujan_c, hujan_t    = mu['hujan_cerah'], mu['hujan_turun']
-
-    rules_irigasi, rules_pupuk, rules_pesti = [], [], []
-
-    rules_irigasi.append(np.fmin(hum_k, irigasi_banyak))
-    kondisi_air_berlebih = np.fmax(hum_b, hujan_t)
-    rules_irigasi.append(np.fmin(kondisi_air_berlebih, irigasi_sedikit))
-    rules_irigasi.append(np.fmin(np.fmin(hum_o, hujan_c), irigasi_cukup))
-
-    rules_pupuk.append(np.fmin(hum_k, pupuk_stop))
-    rules_pupuk.append(np.fmin(ph_m, pupuk_stop))
-    rules_pupuk.append(np.fmin(tds_l, pupuk_stop))
-    syarat_pupuk_hujan = np.fmin(hujan_t, np.fmin(tds_k, ph_n))
-    rules_pupuk.append(np.fmin(syarat_pupuk_hujan, pupuk_penuh))
-    syarat_pupuk_std = np.fmin(hum_o, np.fmin(ph_n, tds_k))
-    rules_pupuk.append(np.fmin(syarat_pupuk_std, pupuk_penuh))
-    syarat_pupuk_mnt = np.fmin(hum_o, np.fmin(ph_n, tds_i))
-    rules_pupuk.append(np.fmin(syarat_pupuk_mnt, pupuk_sedikit))
-
-    rules_pesti.append(np.fmin(ph_m, pestisida_berlebih))
-    rules_pesti.append(np.fmin(kondisi_air_berlebih, pestisida_berlebih))
-    rules_pesti.append(np.fmin(np.fmin(hum_k, hujan_c), pestisida_kurang))
-    rules_pesti.append(np.fmin(hum_o, pestisida_optimal))
-
-    agg_irigasi = np.zeros_like(x_irigasi)
-    for r in rules_irigasi: agg_irigasi = np.fmax(agg_irigasi, r)
-    agg_pupuk = np.zeros_like(x_pupuk)
-    for r in rules_pupuk: agg_pupuk = np.fmax(agg_pupuk, r)
-    agg_pesti = np.zeros_like(x_pestisida)
-    for r in rules_pesti: agg_pesti = np.fmax(agg_pesti, r)
-
-    return agg_irigasi, agg_pupuk, agg_pesti
-
-def hitung_diagnosa_cf(mu, rules_db):
-    mapping = {
-        "ph": {"masam": "ph_masam", "netral": "ph_netral", "basa": "ph_basa"},
-        "tds": {"kurang": "tds_kurang", "ideal": "tds_ideal", "berlebih": "tds_lebih"},
-        "kelembaban": {"kering": "hum_kering", "lembab": "hum_opt", "basah": "hum_basah"},
-        "curah_hujan": {"cerah": "hujan_cerah", "hujan": "hujan_turun"}
-    }
-    best_rule = None; max_belief = -1.0 
-    for rule in rules_db:
-        try:
-            conds = rule['conditions']
-            val_ph   = mu.get(mapping["ph"].get(conds["ph"]), 0.0)
-            val_tds  = mu.get(mapping["tds"].get(conds["tds"]), 0.0)
-            val_hum  = mu.get(mapping["kelembaban"].get(conds["kelembaban"]), 0.0)
-            val_rain = mu.get(mapping["curah_hujan"].get(conds["curah_hujan"]), 0.0)
-            fire_strength = min(val_ph, val_tds, val_hum, val_rain)
-            rule_cf_val = rule.get('results', {}).get('cf', 0.0) 
-            current_score = fire_strength * rule_cf_val
-            if current_score > max_belief:
-                max_belief = current_score; best_rule = rule
-        except Exception: continue
-    if best_rule is None and rules_db: best_rule = rules_db[0]
-    elif best_rule is None: best_rule = {"id": "ERR", "description": "Error", "results": {"status_t": "Error", "air_r": "-", "pupuk_q": "-", "pestisida_s": "-", "action_steps": [], "cf": 0}}
-    return best_rule, max_belief * 100
+# Mode inferensi form sistem pakar: 'langsung' (Mamdani penuh) atau 'tabel' (tabel prakomputasi)
+INFERENCE_MODE = os.environ.get('SMARTFARM_INFERENCE', 'langsung')
+LUT_FILE = os.path.join(os.path.dirname(__file__), "inference_lut.npz")
+
+# Mode refresh otomatis: 'fragment' (default; hanya panel live yang dijalankan ulang, butuh
+# st.fragment dari Streamlit di requirements.txt, atau st.experimental_fragment >= 1.33)
+# atau 'rerun' (sleep lalu rerun seluruh skrip).
+REFRESH_MODE = os.environ.get('SMARTFARM_REFRESH', 'fragment')
+FRAGMENT = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+
+# Grafik fuzzy: latar himpunan output dirender sekali per proses, setiap hasil hanya
+# menggambar agregasi + centroid di atasnya. PNG di-cache per input inferensi (LRU).
+FUZZY_PLOT_CACHE_SIZE = int(os.environ.get('SMARTFARM_FUZZY_PLOT_CACHE', '64'))
+
+@st.cache_resource
+def load_fuzzy_plotter():
+    return PelukisFuzzy(), CacheHasil(maks_entri=FUZZY_PLOT_CACHE_SIZE, ttl=None)
+
+def fuzzy_png(res_data):
+    pelukis, cache = load_fuzzy_plotter()
+    def gambar():
+        if 'agg_ir' not in res_data:
+            res_data['agg_ir'], res_data['agg_pp'], res_data['agg_pt'] = inferensi_mamdani_baru(res_data['mu'])
+        return pelukis.png(res_data)
+    kunci = kunci_konten(res_data['inputs'], res_data['val_ir'], res_data['val_pp'], res_data['val_pt'])
+    return cache.ambil_atau_hitung(kunci, gambar)
+
+@st.cache_resource
+def load_tabel_inferensi():
+    # Isi tabel hanya bergantung pada fuzzy_rules.json (dimuat sekali per proses);
+    # muat_atau_bangun membangun ulang file bila sidiknya berubah
+    return muat_atau_bangun(LUT_FILE)
 
 # ==================== MAIN APP ====================
 
-# 1. Fetch data Realtime
-is_firebase_ok = init_firebase()
-d = get_data_from_firebase(is_firebase_ok)
-
-# 2. DEVICE STATUS LOGIC (ONLINE/OFFLINE based on Value Changes)
-# Kunci sensor untuk dipantau perubahannya (exclude timestamp)
-sensor_keys = ['ph', 'tds', 'soil_moisture', 'water_temp', 'air_temp', 'air_humidity', 'rainfall']
-current_values = {k: d[k] for k in sensor_keys}
-
-# Inisialisasi State Status
-if 'device_status' not in st.session_state:
-    st.session_state['device_status'] = 'OFFLINE' # Mulai dari Offline
-    st.session_state['last_sensor_values'] = current_values
-    st.session_state['last_change_time'] = time.time()
-
-# Cek Perubahan
-if current_values != st.session_state['last_sensor_values']:
-    # Jika ada perubahan nilai sensor
-    st.session_state['device_status'] = 'ONLINE'
-    st.session_state['last_sensor_values'] = current_values
-    st.session_state['last_change_time'] = time.time()
-else:
-    # Jika nilai SAMA (tidak berubah), cek durasi
-    elapsed_time = time.time() - st.session_state['last_change_time']
-    if elapsed_time > 20: # Timeout 20 detik
-        st.session_state['device_status'] = 'OFFLINE'
-
-# --- Inisialisasi DataFrame untuk Grafik ---
-if 'history_df' not in st.session_state:
-    st.session_state['history_df'] = pd.DataFrame(columns=['Waktu', 'pH', 'TDS', 'Kelembaban', 'Suhu'])
-
-# Update DataFrame History (Hanya simpan jika Online atau data baru masuk)
-new_row = {
-    'Waktu': d['timestamp'],
-    'pH': d['ph'],
-    'TDS': d['tds'],
-    'Kelembaban': d['soil_moisture'],
-    'Suhu': d['water_temp']
-}
-# Tambah data baru & batasi 20 baris terakhir
-st.session_state['history_df'] = pd.concat([st.session_state['history_df'], pd.DataFrame([new_row])], ignore_index=True).tail(20)
+# 1. Data realtime dari poller/listener bersama (tidak memblokir)
+# Lahan terpilih (selectbox di sidebar, key='lahan'); satu perangkat = DEVICE_DEFAULT
+lahan = st.session_state.get('lahan') if DEVICES else DEVICE_DEFAULT
+if DEVICES and lahan not in DEVICES: lahan = next(iter(DEVICES))
+snap = feed_snapshot(lahan)
+d = snap.data
+load_metrik()
+
+# 2. DEVICE STATUS (poll: nilai berubah dalam 20 detik; stream: event datang dalam 20 detik)
+st.session_state['device_status'] = snap.status
+
+# --- Grafik: ring buffer bersama (realtime) atau rollup penyimpanan (rentang panjang) ---
+# Seri di-downsample LTTB sebelum dikirim ke browser: maksimal MAKS_TITIK titik per grafik.
+CHART_COLUMNS = {'ph': 'pH', 'tds': 'TDS', 'soil_moisture': 'Kelembaban', 'water_temp': 'Suhu'}
+
+def waktu_lokal(waktu):
+    # Detik epoch -> jam dinding zona lokal server (zona yang sama dengan stempel ESP32 saat di-parse),
+    # tanpa info zona supaya grafik menampilkannya apa adanya, bukan sebagai UTC
+    return pd.to_datetime(waktu, unit='s', utc=True).tz_convert(tz.tzlocal()).tz_localize(None)
+
+def chart_frame(waktu, kolom):
+    # Dua grafik dari satu DataFrame, masing-masing dua seri
+    waktu, kolom = lttb_gabungan(waktu, {k: kolom[k] for k in CHART_COLUMNS}, 2 * MAKS_TITIK)
+    return pd.DataFrame({label: kolom[k] for k, label in CHART_COLUMNS.items()},
+                        index=waktu_lokal(waktu).rename('Waktu'))
+
+def history_frame(riwayat, n):
+    return chart_frame(*riwayat.jendela(n))
+
+@st.cache_data(ttl=30, show_spinner=False)
+def store_frame(_store, durasi, lahan=DEVICE_DEFAULT):
+    akhir = time.time()
+    waktu, kolom, _ = _store.seri(akhir - durasi, akhir, device=lahan, kolom=tuple(CHART_COLUMNS))
+    return chart_frame(waktu, kolom)
 
 
 # Sidebar
@@ -421,6 +260,9 @@ with st.sidebar:
     st.markdown("<h2 style='color: #60a5fa; margin: 0;'>Smart Nutrition Monitoring</h2>", unsafe_allow_html=True)
     st.markdown("<p style='color: #94a3b8; margin-top: -8px;'>IoT Expert Dashboard</p>", unsafe_allow_html=True)
     st.markdown("---")
+
+    if DEVICES:
+        st.selectbox("🌾 Lahan", list(DEVICES), key='lahan')
     
     # STATUS INDICATOR
     status_color = "status-online" if st.session_state['device_status'] == 'ONLINE' else "status-offline"
@@ -436,7 +278,19 @@ with st.sidebar:
 
     use_auto_refresh = st.checkbox("🔄 Auto-Refresh Sensor", value=True)
     refresh_interval = st.slider("Interval (detik)", 2, 10, 3, help="Kecepatan update data sensor")
+    chart_range = st.selectbox("Rentang Grafik", list(CHART_RANGES) if load_store() else ["Realtime"],
+                               help="Rentang panjang dibaca dari rollup menit/jam/hari di penyimpanan")
+    chart_window = st.select_slider("Jendela Grafik (titik)", options=CHART_WINDOWS,
+                                    value=CHART_WINDOWS[min(1, len(CHART_WINDOWS) - 1)],
+                                    help="Jumlah titik riwayat terakhir yang digambar")
     
+    show_metrics = st.checkbox("📊 Metrik Tahap", value=False, help="Latensi p50/p95 tiap tahap dan penghitung kegagalan di proses ini")
+    cache_stat = load_result_cache().statistik()
+    st.caption(f"Cache hasil AI/label: {cache_stat['hit']} hit / {cache_stat['miss']} miss ({cache_stat['entri']} entri)")
+    if DEVICES:
+        siklus = load_sensor_feed().statistik()
+        st.caption(f"Siklus poll: {siklus.perangkat} perangkat dalam {siklus.durasi * 1000:.0f} ms ({siklus.workers} worker)")
+
     st.markdown("---")
     st.caption("© 2025 Smart Nutrition Monitoring")
 
@@ -448,23 +302,75 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# 3. PROSES AI OTOMATIS
-ai_status_label = "Model Not Loaded"
-ai_input_info = ""
-
-if ai_model and ai_scaler:
-    try:
-        # FIX: MAPPING INPUT AI YANG BENAR [pH, Temp Udara, Kelembaban Tanah, TDS]
-        features = np.array([[d['ph'], d['air_temp'], d['soil_moisture'], d['tds']]])
-        scaled_features = ai_scaler.transform(features)
-        prediction = ai_model.predict(scaled_features)[0]
-        ai_status_label = AI_CLASSES.get(prediction, f"Unknown ({prediction})")
-        ai_input_info = f"pH:{d['ph']} | Suhu:{d['air_temp']}°C | Tanah:{d['soil_moisture']}% | TDS:{d['tds']}"
-    except Exception as e:
-        ai_status_label = "Prediction Error"
-
-# 4. TAMPILKAN CARD AI
-st.markdown(f"""
+# ==================== PANEL LIVE (AI, GRID SENSOR, GRAFIK) ====================
+def get_status_class(value, sensor):
+    # Kelas status sudah dihitung per label saat master data dikompilasi
+    return MASTER_INDEX.status_class(sensor, value)
+
+def durasi_singkat(detik):
+    if detik < 120: return f"{detik:.0f} dtk"
+    if detik < 7200: return f"{detik / 60:.0f} mnt"
+    return f"{detik / 3600:.1f} jam"
+
+def sensor_health(analitik, kanal):
+    """Baris statistik bergulir + flag anomali (diam/luar rentang/lonjakan) untuk kartu sensor."""
+    s = analitik.kanal.get(kanal) if analitik is not None else None
+    if s is None: return ""
+    judul = (f"EWMA {s.rata:.2f} ± {s.std:.2f} | min/max {s.minimum:g}/{s.maksimum:g} | "
+             f"z {s.z:+.1f} | berubah {durasi_singkat(s.diam)} lalu")
+    flag = []
+    if s.flag & FLAG_DIAM: flag.append(f"Diam {durasi_singkat(s.diam)}")
+    if s.flag & FLAG_LUAR_RENTANG: flag.append("Luar rentang")
+    if s.flag & FLAG_LONJAKAN: flag.append(f"Lonjakan z {s.z:+.1f}")
+    if flag: return f'<div class="sensor-flag" title="{judul}">⚠️ {" · ".join(flag)}</div>'
+    return f'<div class="sensor-stat" title="{judul}">{s.minimum:g} – {s.maksimum:g}</div>'
+
+def hitung_analisis(d):
+    ai_status_label, ai_proba = "Model Not Loaded", {}
+    if ai_scorer is not None:
+        try:
+            # FIX: MAPPING INPUT AI YANG BENAR [pH, Temp Udara, Kelembaban Tanah, TDS]
+            features = np.array([[d[k] for k in FITUR_AI]])
+            # Probabilitas keempat kelas; kelas dengan probabilitas tertinggi = hasil predict
+            with METRIK.waktu('ai_prediksi'):
+                ai_proba = {k: float(v[0]) for k, v in ai_scorer.probabilitas(features).items()}
+            ai_status_label = max(ai_proba, key=ai_proba.get)
+        except Exception as e:
+            METRIK.tambah('ai_gagal', alasan=type(e).__name__)
+            ai_status_label = "Prediction Error"
+    labels = {}
+    for sensor, key in (('ph', 'ph'), ('tds', 'tds'), ('kelembaban', 'soil_moisture')):
+        labels[sensor] = (get_label_from_master(sensor, d[key]) or 'Normal', get_status_class(d[key], sensor))
+    rain_val = d['rainfall']
+    labels['curah_hujan'] = (get_label_from_master('curah_hujan', rain_val) or ('Hujan' if rain_val > 0 else 'Cerah'),
+                             "good" if rain_val == 0 else "warn")
+    return {'ai_status': ai_status_label, 'ai_proba': ai_proba, 'labels': labels}
+
+def analisis_bacaan(d):
+    kunci = kunci_konten(CONFIG.sidik, [d[k] for k in KOLOM_ANALISIS])
+    # Prediksi yang gagal tidak di-cache: bacaan yang sama dicoba lagi pada tick berikutnya
+    return load_result_cache().ambil_atau_hitung(kunci, lambda: hitung_analisis(d),
+                                                 layak=lambda h: h['ai_status'] != "Prediction Error")
+
+def panel_live(chart_range, chart_window, lahan):
+    """Bagian dashboard yang mengikuti data sensor; dijalankan ulang tiap interval refresh."""
+    with METRIK.waktu('render_panel_live'):
+        _panel_live(chart_range, chart_window, lahan)
+
+def _panel_live(chart_range, chart_window, lahan):
+    snap = feed_snapshot(lahan)
+    d = snap.data
+    st.session_state['device_status'] = snap.status
+
+    # 3. PROSES AI OTOMATIS (hasil di-cache per isi bacaan)
+    hasil = analisis_bacaan(d)
+    ai_status_label = hasil['ai_status']
+    ai_input_info = ""
+    if hasil['ai_proba']:
+        ai_input_info = f"pH:{d['ph']} | Suhu:{d['air_temp']}°C | Tanah:{d['soil_moisture']}% | TDS:{d['tds']} | Keyakinan: {max(hasil['ai_proba'].values()):.0%}"
+
+    # 4. TAMPILKAN CARD AI
+    st.markdown(f"""
 <div class="ai-realtime-card">
     <div>
         <div class="ai-realtime-title">🤖 Status Kesehatan Tanah</div>
@@ -475,50 +381,65 @@ st.markdown(f"""
 </div>
 """, unsafe_allow_html=True)
 
-# 5. TAMPILKAN GRID SENSOR
-st.markdown('<div class="section-header"><span class="icon">📡</span> <span>Monitoring Lahan</span></div>', unsafe_allow_html=True)
-
-col1, col2, col3, col4 = st.columns(4)
-
-def get_status_class(value, sensor):
-    label = get_label_from_master(sensor, value)
-    if not label: return ""
-    if "aman" in label.lower() or "ideal" in label.lower() or "optimal" in label.lower(): return "good"
-    elif "tinggi" in label.lower() or "berlebih" in label.lower() or "basah" in label.lower(): return "warn"
-    else: return "bad"
-
-with col1:
-    label = get_label_from_master('ph', d['ph']) or 'Normal'
-    st.markdown(f"""<div class="sensor-card"><div class="sensor-title">🧪 pH</div><div><span class="sensor-value">{d['ph']}</span><span class="sensor-unit">pH</span></div><div class="sensor-label {get_status_class(d['ph'], 'ph')}">{label}</div></div>""", unsafe_allow_html=True)
-with col2:
-    label = get_label_from_master('tds', d['tds']) or 'Normal'
-    st.markdown(f"""<div class="sensor-card"><div class="sensor-title">🧪 Nutrisi (TDS)</div><div><span class="sensor-value">{d['tds']}</span><span class="sensor-unit">ppm</span></div><div class="sensor-label {get_status_class(d['tds'], 'tds')}">{label}</div></div>""", unsafe_allow_html=True)
-with col3:
-    label = get_label_from_master('kelembaban', d['soil_moisture']) or 'Normal'
-    st.markdown(f"""<div class="sensor-card"><div class="sensor-title">🌱 Kelembaban Tanah</div><div><span class="sensor-value">{d['soil_moisture']}</span><span class="sensor-unit">%</span></div><div class="sensor-label {get_status_class(d['soil_moisture'], 'kelembaban')}">{label}</div></div>""", unsafe_allow_html=True)
-with col4:
-    rain_val = d['rainfall']
-    rain_label = get_label_from_master('curah_hujan', rain_val) or ('Hujan' if rain_val > 0 else 'Cerah')
-    status = "good" if rain_val == 0 else "warn"
-    st.markdown(f"""<div class="sensor-card"><div class="sensor-title">🌧️ Curah Hujan</div><div><span class="sensor-value">{rain_val}</span><span class="sensor-unit">mm</span></div><div class="sensor-label {status}">{rain_label}</div></div>""", unsafe_allow_html=True)
-
-col5, col6, col7, col8 = st.columns(4)
-with col5: st.markdown(f"""<div class="sensor-card"><div class="sensor-title">💧 Suhu Air</div><div><span class="sensor-value">{d['water_temp']}</span><span class="sensor-unit">°C</span></div></div>""", unsafe_allow_html=True)
-with col6: st.markdown(f"""<div class="sensor-card"><div class="sensor-title">🌬️ Suhu Udara</div><div><span class="sensor-value">{d['air_temp']}</span><span class="sensor-unit">°C</span></div></div>""", unsafe_allow_html=True)
-with col7: st.markdown(f"""<div class="sensor-card"><div class="sensor-title">🌧️ Kelembaban Udara</div><div><span class="sensor-value">{d['air_humidity']}</span><span class="sensor-unit">%</span></div></div>""", unsafe_allow_html=True)
-with col8: st.markdown(f"""<div class="sensor-card"><div class="sensor-title">🕒 Terakhir Update</div><div><span class="sensor-value">{d['timestamp']}</span></div><div style="font-size: 0.85rem; color: #94a3b8; margin-top: 4px;">{d['date']}</div></div>""", unsafe_allow_html=True)
-
-# 6. GRAFIK (LIVE CHART)
-st.markdown('<div class="section-header"><span class="icon">📈</span> <span>Grafik Realtime</span></div>', unsafe_allow_html=True)
-chart_col1, chart_col2 = st.columns(2)
-
-with chart_col1:
-    st.caption("Tren pH & Nutrisi (TDS)")
-    st.line_chart(st.session_state['history_df'][['pH', 'TDS']])
-
-with chart_col2:
-    st.caption("Tren Kelembaban Tanah & Suhu Air")
-    st.line_chart(st.session_state['history_df'][['Kelembaban', 'Suhu']])
+    # 5. TAMPILKAN GRID SENSOR
+    # Status perangkat ikut di panel live: di mode fragment sidebar tidak diperbarui tiap interval
+    status_color = "status-online" if snap.status == 'ONLINE' else "status-offline"
+    judul = f"Monitoring Lahan {lahan}" if DEVICES else "Monitoring Lahan"
+    # Semua kanal beku pada perangkat yang masih ONLINE = sensor macet (bukan satu probe, bukan
+    # perangkat mati); flag per kanal ada di kartu
+    beku = ' <span class="status-offline" style="font-size: 0.8rem;">SENSOR BEKU</span>' if snap.status == 'ONLINE' and snap.analitik is not None and snap.analitik.semua_diam else ''
+    st.markdown(f'<div class="section-header"><span class="icon">📡</span> <span>{judul}</span> <span class="{status_color}" style="font-size: 0.8rem;">{snap.status}</span>{beku}</div>', unsafe_allow_html=True)
+    sa = snap.analitik
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        label, status = hasil['labels']['ph']
+        st.markdown(f"""<div class="sensor-card"><div class="sensor-title">🧪 pH</div><div><span class="sensor-value">{d['ph']}</span><span class="sensor-unit">pH</span></div><div class="sensor-label {status}">{label}</div>{sensor_health(sa, 'ph')}</div>""", unsafe_allow_html=True)
+    with col2:
+        label, status = hasil['labels']['tds']
+        st.markdown(f"""<div class="sensor-card"><div class="sensor-title">🧪 Nutrisi (TDS)</div><div><span class="sensor-value">{d['tds']}</span><span class="sensor-unit">ppm</span></div><div class="sensor-label {status}">{label}</div>{sensor_health(sa, 'tds')}</div>""", unsafe_allow_html=True)
+    with col3:
+        label, status = hasil['labels']['kelembaban']
+        st.markdown(f"""<div class="sensor-card"><div class="sensor-title">🌱 Kelembaban Tanah</div><div><span class="sensor-value">{d['soil_moisture']}</span><span class="sensor-unit">%</span></div><div class="sensor-label {status}">{label}</div>{sensor_health(sa, 'soil_moisture')}</div>""", unsafe_allow_html=True)
+    with col4:
+        rain_val = d['rainfall']
+        rain_label, status = hasil['labels']['curah_hujan']
+        st.markdown(f"""<div class="sensor-card"><div class="sensor-title">🌧️ Curah Hujan</div><div><span class="sensor-value">{rain_val}</span><span class="sensor-unit">mm</span></div><div class="sensor-label {status}">{rain_label}</div>{sensor_health(sa, 'rainfall')}</div>""", unsafe_allow_html=True)
+
+    col5, col6, col7, col8 = st.columns(4)
+    with col5: st.markdown(f"""<div class="sensor-card"><div class="sensor-title">💧 Suhu Air</div><div><span class="sensor-value">{d['water_temp']}</span><span class="sensor-unit">°C</span></div>{sensor_health(sa, 'water_temp')}</div>""", unsafe_allow_html=True)
+    with col6: st.markdown(f"""<div class="sensor-card"><div class="sensor-title">🌬️ Suhu Udara</div><div><span class="sensor-value">{d['air_temp']}</span><span class="sensor-unit">°C</span></div>{sensor_health(sa, 'air_temp')}</div>""", unsafe_allow_html=True)
+    with col7: st.markdown(f"""<div class="sensor-card"><div class="sensor-title">🌧️ Kelembaban Udara</div><div><span class="sensor-value">{d['air_humidity']}</span><span class="sensor-unit">%</span></div>{sensor_health(sa, 'air_humidity')}</div>""", unsafe_allow_html=True)
+    with col8: st.markdown(f"""<div class="sensor-card"><div class="sensor-title">🕒 Terakhir Update</div><div><span class="sensor-value">{d['timestamp']}</span></div><div style="font-size: 0.85rem; color: #94a3b8; margin-top: 4px;">{d['date']}</div></div>""", unsafe_allow_html=True)
+
+    # Ikhtisar semua lahan (mode banyak perangkat)
+    if DEVICES:
+        ringkasan = pd.DataFrame(load_sensor_feed().ringkasan())
+        online = int((ringkasan['Status'] == 'ONLINE').sum())
+        st.markdown(f'<div class="section-header"><span class="icon">🗺️</span> <span>Ringkasan Lahan</span> <span style="font-size: 0.8rem; color: #94a3b8;">{online}/{len(ringkasan)} online</span></div>', unsafe_allow_html=True)
+        st.dataframe(ringkasan, hide_index=True, use_container_width=True, height=min(400, 38 + 35 * len(ringkasan)))
+
+    # 6. GRAFIK (LIVE CHART)
+    st.markdown('<div class="section-header"><span class="icon">📈</span> <span>Grafik Realtime</span></div>', unsafe_allow_html=True)
+    chart_col1, chart_col2 = st.columns(2)
+    if CHART_RANGES.get(chart_range): history_df = store_frame(load_store(), CHART_RANGES[chart_range], lahan)
+    else: history_df = history_frame(snap.riwayat, chart_window)
+
+    with chart_col1:
+        st.caption("Tren pH & Nutrisi (TDS)")
+        st.line_chart(history_df[['pH', 'TDS']])
+
+    with chart_col2:
+        st.caption("Tren Kelembaban Tanah & Suhu Air")
+        st.line_chart(history_df[['Kelembaban', 'Suhu']])
+
+# Mode 'fragment': hanya panel_live yang dijalankan ulang tiap interval (sidebar,
+# CSS, dan form sistem pakar tidak ikut); form dihitung ulang hanya saat disubmit.
+LIVE_FRAGMENT = REFRESH_MODE == 'fragment' and FRAGMENT is not None
+if LIVE_FRAGMENT:
+    panel_live = FRAGMENT(run_every=refresh_interval if use_auto_refresh else None)(panel_live)
+panel_live(chart_range, chart_window, lahan)
 
 st.markdown('<div class="custom-divider"></div>', unsafe_allow_html=True)
 
@@ -540,16 +461,28 @@ with input_col:
 with output_col:
     if submitted:
         mu = fuzzifikasi_input(in_tds, in_ph, in_soil, in_rain)
-        agg_ir, agg_pp, agg_pt = inferensi_mamdani_baru(mu)
-        val_ir = defuzzifikasi_centroid(x_irigasi, agg_ir)
-        val_pp = defuzzifikasi_centroid(x_pupuk, agg_pp)
-        val_pt = defuzzifikasi_centroid(x_pestisida, agg_pt)
-        rule_cf, val_cf = hitung_diagnosa_cf(mu, KNOWLEDGE_BASE)
+        if INFERENCE_MODE == 'tabel':
+            # Dosis dari tabel prakomputasi; agregat untuk grafik dihitung saat digambar
+            with METRIK.waktu('tabel_inferensi'):
+                val_ir, val_pp, val_pt = load_tabel_inferensi().cari(float(in_tds), float(in_ph), float(in_soil), float(in_rain))
+            agg = {}
+        else:
+            with METRIK.waktu('mamdani'):
+                agg_ir, agg_pp, agg_pt = inferensi_mamdani_baru(mu)
+            with METRIK.waktu('centroid'):
+                val_ir = defuzzifikasi_centroid(x_irigasi, agg_ir)
+                val_pp = defuzzifikasi_centroid(x_pupuk, agg_pp)
+                val_pt = defuzzifikasi_centroid(x_pestisida, agg_pt)
+            agg = {'agg_ir': agg_ir, 'agg_pp': agg_pp, 'agg_pt': agg_pt}
+        # Diagnosa selalu eksak dari mu (kedua mode), sehingga rule, keyakinan, dan alternatif konsisten
+        with METRIK.waktu('diagnosa_cf'):
+            rule_cf, val_cf = hitung_diagnosa_cf(mu, CONFIG.kb_index)
         
         st.session_state['calc_result'] = {
             'mu': mu, 'val_ir': val_ir, 'val_pp': val_pp, 'val_pt': val_pt,
-            'agg_ir': agg_ir, 'agg_pp': agg_pp, 'agg_pt': agg_pt,
+            **agg,
             'rule_cf': rule_cf, 'val_cf': val_cf,
+            'alternatif': diagnosa_top_k(mu, CONFIG.kb_index, 3)[1:],
             'inputs': {'tds': in_tds, 'ph': in_ph, 'soil': in_soil, 'rain': in_rain}
         }
 
@@ -559,6 +492,7 @@ with output_col:
         rule = res_data['rule_cf']
         res = rule['results']
         cf_pct = res_data['val_cf']
+        alt_txt = "; ".join(f"{r['id']} {r['description']} ({v:.1f}%)" for r, v in res_data.get('alternatif', []) if v > 0) or "-"
         steps_txt = "\n".join([f"• {step}" for step in res['action_steps']]) or "  • Tidak ada langkah spesifik."
 
         output_text = f"""<span class="hl-key">OUTPUT FUZZY (SIMULASI):</span>
@@ -569,6 +503,7 @@ with output_col:
 <span class="hl-key">DIAGNOSA PAKAR:</span>
   Kondisi    : <span class="hl-val">{rule['description']}</span>
   Keyakinan  : <span class="{'hl-warn' if cf_pct < 70 else 'hl-val'}">{cf_pct:.1f}%</span>
+  Alternatif : {alt_txt}
   Status     : <span class="{'hl-alert' if 'buruk' in res['status_t'].lower() else 'hl-val'}">{res['status_t']}</span>
 
 <span class="hl-key">REKOMENDASI:</span>
@@ -582,25 +517,24 @@ with output_col:
         st.markdown(f'<div class="terminal-box">{output_text}</div>', unsafe_allow_html=True)
         
         with st.expander("📊 Grafik Fuzzy"):
-            fig, ax = plt.subplots(1, 3, figsize=(15, 4), constrained_layout=True)
-            ax[0].plot(x_irigasi, irigasi_sedikit, 'r--', alpha=0.7); ax[0].plot(x_irigasi, irigasi_cukup, 'g--', alpha=0.7); ax[0].plot(x_irigasi, irigasi_banyak, 'b--', alpha=0.7)
-            ax[0].fill_between(x_irigasi, res_data['agg_ir'], color='#3b82f6', alpha=0.3)
-            ax[0].axvline(res_data['val_ir'], color='k', linewidth=2)
-            ax[0].set_title("Volume Irigasi")
-            ax[1].plot(x_pupuk, pupuk_stop, 'r--', alpha=0.7); ax[1].plot(x_pupuk, pupuk_sedikit, 'g--', alpha=0.7); ax[1].plot(x_pupuk, pupuk_penuh, 'b--', alpha=0.7)
-            ax[1].fill_between(x_pupuk, res_data['agg_pp'], color='#10b981', alpha=0.3)
-            ax[1].axvline(res_data['val_pp'], color='k', linewidth=2)
-            ax[1].set_title("Dosis Pupuk")
-            ax[2].plot(x_pestisida, pestisida_kurang, 'r--', alpha=0.7); ax[2].plot(x_pestisida, pestisida_optimal, 'g--', alpha=0.7); ax[2].plot(x_pestisida, pestisida_berlebih, 'b--', alpha=0.7)
-            ax[2].fill_between(x_pestisida, res_data['agg_pt'], color='#ef4444', alpha=0.3)
-            ax[2].axvline(res_data['val_pt'], color='k', linewidth=2)
-            ax[2].set_title("Dosis Pestisida")
-            st.pyplot(fig)
+            st.image(fuzzy_png(res_data), use_column_width=True)
     else:
         st.info("Klik tombol **Analisis Masalah** untuk melihat detail dosis & rekomendasi.")
 
-# Auto-refresh
-if use_auto_refresh:
+# Lama satu rerun (tanpa jeda auto-refresh); panel metrik menampilkan rerun-rerun sebelumnya
+METRIK.catat('rerun', time.perf_counter() - MULAI_RERUN)
+if show_metrics:
+    with st.sidebar:
+        tahap = METRIK.tahap()
+        if tahap:
+            st.dataframe(pd.DataFrame([{'Tahap': k, 'n': v['n'], 'p50 ms': v['p50'] * 1000, 'p95 ms': v['p95'] * 1000}
+                                       for k, v in sorted(tahap.items())]).round(2),
+                         hide_index=True, use_container_width=True)
+        gagal = METRIK.semua_penghitung()
+        st.caption(" · ".join(f"{k}: {n}" for k, n in sorted(gagal.items())) or "Belum ada kegagalan / data cadangan")
+
+# Auto-refresh (mode 'rerun', atau Streamlit tanpa fragment): seluruh skrip dijalankan ulang
+if use_auto_refresh and not LIVE_FRAGMENT:
     with st.spinner("🔄 Memperbarui data sensor..."):
         time.sleep(refresh_interval)
     st.rerun()
\ No newline at end of file
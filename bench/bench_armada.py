@@ -0,0 +1,191 @@
+"""Demo + benchmark poll banyak perangkat (smartfarm.armada.PollerArmada) terhadap backend palsu lokal.
+
+Backend HTTP palsu berjalan di proses terpisah dan meniru REST Realtime
+Database: GET /devices/<id>/Monitoring.json mengembalikan node berformat
+sendDataToFirebase setelah jeda latensi jaringan. Perangkat yang namanya
+berawalan 'mati' selalu membalas 503. Dicatat lama satu siklus poll untuk
+jumlah perangkat yang bertambah, dibandingkan dengan poll berurutan, serta
+jumlah koneksi TCP yang dibuka (pool keep-alive dipakai ulang).
+
+Jalankan dari root repo:  python bench/bench_armada.py [latensi_ms] [maks_perangkat]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import json
+import multiprocessing as mp
+import os
+import random
+import statistics
+import sys
+import socket
+import tempfile
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.armada import MAKS_WORKER, PollerArmada, urai_perangkat  # noqa: E402
+from smartfarm.metrik import METRIK  # noqa: E402
+from smartfarm.sources import SumberHTTP, sesi_http  # noqa: E402
+from smartfarm.store import PenyimpanBacaan  # noqa: E402
+
+
+# ==================== BACKEND PALSU ====================
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'     # keep-alive, seperti Firebase
+    latensi = 0.05
+
+    def setup(self):
+        super().setup()
+        # Header dan body ditulis terpisah: tanpa NODELAY, Nagle + delayed ACK menambah ~40 ms
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.koneksi.value += 1
+
+    def do_GET(self):
+        time.sleep(self.latensi * random.uniform(0.8, 1.2))
+        bagian = [p for p in self.path.split('?')[0].split('/') if p]
+        if self.path == '/_koneksi':
+            isi, kode = json.dumps(self.server.koneksi.value), 200
+        elif len(bagian) == 3 and bagian[0] == 'devices' and not bagian[1].startswith('mati'):
+            isi, kode = json.dumps({
+                'pH': round(random.uniform(5.5, 8.5), 2), 'TDS': random.randint(300, 2500),
+                'SoilMoisture': random.randint(10, 100), 'WaterTemp': round(random.uniform(22, 35), 1),
+                'AirTemp': round(random.uniform(24, 38), 1), 'Humidity': random.randint(40, 95),
+                'Rainfall': random.choice([0, 100]),
+            }), 200
+        else:
+            isi, kode = 'null', 503
+        body = isi.encode()
+        self.send_response(kode)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _layani(port, latensi, siap):
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 1024
+    _Handler.latensi = latensi
+    server = Server(('127.0.0.1', port), _Handler)
+    server.koneksi = mp.Value('i', 0, lock=False)
+    siap.set()
+    server.serve_forever()
+
+
+def jalankan_backend(latensi):
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    siap = mp.Event()
+    proses = mp.Process(target=_layani, args=(port, latensi, siap), daemon=True)
+    proses.start()
+    siap.wait(10)
+    return proses, f'http://127.0.0.1:{port}'
+
+
+# ==================== BENCHMARK ====================
+def armada(url, nama, workers=None, penyimpan=None):
+    workers = min(workers or MAKS_WORKER, len(nama))
+    sesi = sesi_http(workers)
+    sumber = {n: SumberHTTP(f'{url}/devices/{n}/Monitoring.json', sesi) for n in nama}
+    return PollerArmada(sumber, interval=3600, workers=workers, penyimpan=penyimpan)
+
+
+def koneksi(url):
+    return json.loads(urllib.request.urlopen(url + '/_koneksi').read())
+
+
+def lama_siklus(poller, ulang=3):
+    return statistics.median(poller.poll_sekali() for _ in range(ulang))
+
+
+def main():
+    latensi = (float(sys.argv[1]) if len(sys.argv) > 1 else 50) / 1000
+    maks = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    cek(urai_perangkat('a=/devices/a/Monitoring, /devices/sawah2/Monitoring')
+        == {'a': '/devices/a/Monitoring', 'sawah2': '/devices/sawah2/Monitoring'}, "urai SMARTFARM_DEVICES")
+
+    proses, url = jalankan_backend(latensi)
+    try:
+        # State per perangkat: status, riwayat, penyimpanan, perangkat mati
+        with tempfile.TemporaryDirectory() as tmp:
+            store = PenyimpanBacaan(os.path.join(tmp, 'armada.db'))
+            p = armada(url, ['sawah1', 'sawah2', 'mati1'], penyimpan=store)
+            for _ in range(2): p.poll_sekali()
+            s1, s3 = p.snapshot('sawah1'), p.snapshot('mati1')
+            cek(s1.status == 'ONLINE' and s1.sumber == 'sumber' and len(s1.riwayat) == 3,
+                "perangkat hidup ONLINE dengan riwayat sendiri")
+            cek(s3.sumber == 'cadangan' and p._poller['mati1'].sumber.gagal == 3,
+                "perangkat yang gagal dihitung dan tidak mengganggu perangkat lain")
+            cek(s1.data != p.snapshot('sawah2').data, "nilai tiap perangkat terpisah")
+            store.flush()
+            cek(store.jumlah('sawah1') == 3 and store.jumlah('sawah2') == 3 and store.jumlah('mati1') == 0,
+                "bacaan tersimpan per perangkat (data cadangan tidak disimpan)")
+            cek([b['Lahan'] for b in p.ringkasan()] == ['sawah1', 'sawah2', 'mati1'], "tabel ikhtisar per perangkat")
+            p.stop()
+            store.close()
+
+        # Exception tak terduga di satu siklus: dihitung, thread siklus tetap berjalan
+        p = armada(url, ['sawah1', 'sawah2'])
+        p.interval = 0.01
+        asli, sisa = p._poller['sawah1'].poll_sekali, [2]
+
+        def poll_rusak():
+            if sisa[0]:
+                sisa[0] -= 1
+                raise ValueError("penyimpan rusak")
+            return asli()
+        p._poller['sawah1'].poll_sekali = poll_rusak
+        sebelum, siklus_awal = METRIK.penghitung('armada_gagal', alasan='ValueError'), p.siklus
+        p.start()
+        batas = time.time() + 5
+        while p.siklus < siklus_awal + 3 and time.time() < batas: time.sleep(0.01)
+        hidup = p.berjalan
+        p.stop(timeout=2)
+        cek(hidup and p.gagal == 2 and p.siklus >= siklus_awal + 3
+            and METRIK.penghitung('armada_gagal', alasan='ValueError') - sebelum == 2,
+            "exception di siklus dihitung armada_gagal, loop tetap berjalan")
+        cek(not p.berjalan, "stop() tetap menghentikan thread siklus")
+
+        # Lama siklus vs jumlah perangkat
+        print(f"\nlatensi backend {latensi * 1000:.0f} ms per permintaan")
+        print(f"{'perangkat':>9} {'worker':>6} {'siklus (ms)':>12} {'koneksi baru':>13}")
+        hasil = {}
+        for n in sorted({n for n in (10, 25, 50, 100, 200, 400) if n < maks} | {maks}):
+            sebelum = koneksi(url)
+            p = armada(url, [f'sawah{i}' for i in range(n)])
+            dt = lama_siklus(p)
+            baru = koneksi(url) - sebelum - 1      # -1: permintaan /_koneksi itu sendiri
+            print(f"{n:9d} {p.workers:6d} {dt * 1000:12.0f} {baru:13d}")
+            hasil[n] = (dt, p.workers, baru)
+            p.stop()
+
+        p = armada(url, [f'sawah{i}' for i in range(10)], workers=1)
+        dt_urut = lama_siklus(p, 2)
+        p.stop()
+        print(f"poll berurutan 10 perangkat (1 worker): {dt_urut * 1000:.0f} ms "
+              f"-> {maks} perangkat berurutan ~{dt_urut / 10 * maks:.1f} s")
+
+        besar = max(hasil)
+        cek(hasil[besar][0] < 3.0, f"siklus {besar} perangkat < interval default 3 s")
+        cek(hasil[besar][0] < dt_urut / 10 * besar / 5, f"siklus {besar} perangkat jauh lebih cepat dari poll berurutan")
+        cek(hasil[besar][2] <= hasil[besar][1] + 2, "koneksi keep-alive dipakai ulang (koneksi baru <= jumlah worker)")
+        per_gelombang = hasil[besar][0] / -(-besar // hasil[besar][1])
+        cek(per_gelombang < 3 * latensi, "lama siklus ~ latensi x ceil(perangkat / worker)")
+    finally:
+        proses.terminate()
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
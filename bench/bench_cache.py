@@ -0,0 +1,100 @@
+"""Benchmark dan pemeriksaan cache hasil per bacaan (smartfarm.cache.CacheHasil).
+
+Memeriksa perilaku LRU (batas ukuran), TTL, kunci berbasis isi, dan hasil
+gagal yang tidak disimpan, lalu
+memutar jejak tick dashboard: beberapa penonton merefresh tiap 3 detik,
+sementara nilai sensor hanya berubah tiap beberapa tick. Setiap tick
+menghitung label + probabilitas Naive Bayes dan label master data, seperti
+panel live app.py, dengan dan tanpa cache.
+
+Jalankan dari root repo:  python bench/bench_cache.py [penonton] [tick]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.cache import CacheHasil, kunci_konten  # noqa: E402
+from smartfarm.config import KonfigurasiLive  # noqa: E402
+from smartfarm.models import FITUR_AI, muat_model, probabilitas_status  # noqa: E402
+
+warnings.filterwarnings('ignore')   # InconsistentVersionWarning sklearn saat unpickle model
+
+KOLOM = ('ph', 'air_temp', 'soil_moisture', 'tds', 'rainfall')
+
+
+def main():
+    penonton = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    tick = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    # Perilaku dasar
+    jam = [0.0]
+    c = CacheHasil(maks_entri=2, ttl=10, jam=lambda: jam[0])
+    c.simpan('a', 1); c.simpan('b', 2); c.ambil('a'); c.simpan('c', 3)
+    cek(c.ambil('b') is None and c.ambil('a') == 1 and c.dibuang == 1, "LRU membuang entri yang paling lama tidak dipakai")
+    jam[0] = 11
+    cek(c.ambil('a') is None and c.kedaluwarsa == 1, "entri lewat TTL dianggap miss")
+    cek(kunci_konten('x', [6.5, 30.0]) == kunci_konten('x', [6.5, 30.0])
+        and kunci_konten('x', [6.5, 30.0]) != kunci_konten('x', [6.5, 30.000001]), "kunci mengikuti isi bacaan persis")
+    hitungan = [0]
+
+    def prediksi_gagal():
+        hitungan[0] += 1
+        return {'ai_status': "Prediction Error"}
+    for _ in range(3):
+        c.ambil_atau_hitung('gagal', prediksi_gagal, layak=lambda h: h['ai_status'] != "Prediction Error")
+    cek(hitungan[0] == 3 and c.ambil('gagal') is None, "prediksi gagal tidak di-cache (dihitung ulang tiap tick)")
+
+    konfigurasi = KonfigurasiLive().ambil()
+    master = konfigurasi.master_index
+    model, scaler = muat_model()
+    if model is None or scaler is None:
+        print("model_naivebayes.pkl / scaler.pkl tidak ada: benchmark model dilewati")
+        return 1 if gagal else 0
+
+    def hitung(d):
+        proba = {k: float(v[0]) for k, v in probabilitas_status(model, scaler, np.array([[d[k] for k in FITUR_AI]])).items()}
+        labels = {s: (master.get_label(s, d[k]), master.status_class(s, d[k]))
+                  for s, k in (('ph', 'ph'), ('tds', 'tds'), ('kelembaban', 'soil_moisture'), ('curah_hujan', 'rainfall'))}
+        return {'ai_status': max(proba, key=proba.get), 'ai_proba': proba, 'labels': labels}
+
+    # Jejak: nilai sensor berganti tiap 5 tick; setiap tick semua penonton merefresh
+    rng = np.random.default_rng(3)
+    bacaan = [{'ph': round(rng.uniform(4, 9), 2), 'air_temp': round(rng.uniform(22, 36), 1),
+               'soil_moisture': int(rng.uniform(10, 90)), 'tds': int(rng.uniform(200, 2500)),
+               'rainfall': int(rng.choice([0, 100]))} for _ in range(tick // 5 + 1)]
+    jejak = [bacaan[t // 5] for t in range(tick) for _ in range(penonton)]
+
+    t = time.perf_counter()
+    tanpa = [hitung(d) for d in jejak]
+    dt_tanpa = time.perf_counter() - t
+
+    cache = CacheHasil()
+    t = time.perf_counter()
+    dengan = [cache.ambil_atau_hitung(kunci_konten(konfigurasi.sidik, [d[k] for k in KOLOM]), lambda: hitung(d))
+              for d in jejak]
+    dt_dengan = time.perf_counter() - t
+    st = cache.statistik()
+
+    n = len(jejak)
+    print(f"\n{penonton} penonton x {tick} tick = {n} evaluasi, {len({kunci_konten(d) for d in jejak})} bacaan unik")
+    print(f"tanpa cache : {dt_tanpa * 1000:8.1f} ms ({dt_tanpa / n * 1e6:6.1f} µs/tick)")
+    print(f"dengan cache: {dt_dengan * 1000:8.1f} ms ({dt_dengan / n * 1e6:6.1f} µs/tick), "
+          f"hit {st['hit']} / miss {st['miss']} (rasio {st['rasio_hit']:.1%})")
+    cek(all(a == b for a, b in zip(tanpa, dengan)), "hasil dengan cache sama dengan tanpa cache")
+    cek(st['miss'] == len({kunci_konten(d) for d in jejak}), "model hanya dijalankan sekali per bacaan unik")
+    cek(dt_dengan < dt_tanpa, "cache mengurangi waktu total")
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Perbandingan defuzzifikasi centroid: sampling semesta vs analitik (eksak).
+
+Jalankan dari root repo:  python bench/bench_defuzz.py [N]
+Keluar dengan status 1 jika selisih kedua mode melebihi satu langkah grid semesta;
+pemeriksaan ketepatan yang lengkap ada di bench/check_defuzz.py.
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.fuzzy import (  # noqa: E402
+    SEMESTA_OUTPUT, bobot_himpunan, centroid_eksak, defuzzifikasi_centroid,
+    fuzzifikasi_input, inferensi_batch, inferensi_mamdani_baru,
+)
+
+
+def bacaan_acak(n, seed=42):
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(0, 3000, n), rng.uniform(4, 10, n),
+            rng.uniform(0, 100, n), rng.integers(0, 2, n).astype(float))
+
+
+def skalar_sampled(tds, ph, hum, hujan):
+    mu = fuzzifikasi_input(tds, ph, hum, hujan)
+    agg_ir, agg_pp, agg_pt = inferensi_mamdani_baru(mu)
+    return (defuzzifikasi_centroid(SEMESTA_OUTPUT['irigasi'], agg_ir),
+            defuzzifikasi_centroid(SEMESTA_OUTPUT['pupuk'], agg_pp),
+            defuzzifikasi_centroid(SEMESTA_OUTPUT['pestisida'], agg_pt))
+
+
+def skalar_eksak(tds, ph, hum, hujan):
+    w = bobot_himpunan(fuzzifikasi_input(tds, ph, hum, hujan))
+    return tuple(centroid_eksak(nama, w[nama]) for nama in ('irigasi', 'pupuk', 'pestisida'))
+
+
+def main(n=20000):
+    data = bacaan_acak(n)
+    sampled = inferensi_batch(*data, metode='sampled')
+    eksak = inferensi_batch(*data, metode='exact')
+
+    gagal = False
+    print(f"Selisih sampled vs exact (N={n})")
+    for kunci, nama in (('val_ir', 'irigasi'), ('val_pp', 'pupuk'), ('val_pt', 'pestisida')):
+        x = SEMESTA_OUTPUT[nama]; langkah = x[1] - x[0]
+        diff = np.abs(sampled[kunci] - eksak[kunci])
+        print(f"  {nama:<10} maks={diff.max():.4f}  rata2={diff.mean():.4f}  langkah grid={langkah:.4f}")
+        gagal |= bool(diff.max() > langkah)
+
+    satu = tuple(float(a[0]) for a in data)
+    ulang = 2000
+    t_ss = min(timeit.repeat(lambda: skalar_sampled(*satu), number=ulang, repeat=5)) / ulang
+    t_se = min(timeit.repeat(lambda: skalar_eksak(*satu), number=ulang, repeat=5)) / ulang
+    t_bs = min(timeit.repeat(lambda: inferensi_batch(*data, metode='sampled'), number=1, repeat=3)) / n
+    t_be = min(timeit.repeat(lambda: inferensi_batch(*data, metode='exact'), number=1, repeat=3)) / n
+    print("Waktu per inferensi")
+    print(f"  skalar sampled : {t_ss * 1e6:9.2f} us")
+    print(f"  skalar exact   : {t_se * 1e6:9.2f} us  ({t_ss / t_se:.1f}x)")
+    print(f"  batch sampled  : {t_bs * 1e6:9.2f} us  ({t_ss / t_bs:.1f}x)")
+    print(f"  batch exact    : {t_be * 1e6:9.2f} us  ({t_ss / t_be:.1f}x)")
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
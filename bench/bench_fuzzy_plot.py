@@ -0,0 +1,128 @@
+"""Benchmark render grafik fuzzy: pyplot penuh per rerun vs PelukisFuzzy (latar statis + blitting).
+
+Jalur lama meniru app.py sebelumnya: plt.subplots tiga panel digambar ulang
+setiap rerun lalu di-savefig oleh st.pyplot (dpi 200, bbox tight), figure
+tidak pernah ditutup. Jalur baru menggambar latar himpunan output sekali,
+hanya melukis agregasi + centroid per hasil, dan PNG-nya di-cache per input
+inferensi (LRU). Dicatat waktu per render dan RSS selama rangkaian render.
+
+Jalankan dari root repo:  python bench/bench_fuzzy_plot.py [render]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.cache import CacheHasil, kunci_konten  # noqa: E402
+from smartfarm.fuzzy import (  # noqa: E402
+    HIMPUNAN_OUTPUT, SEMESTA_OUTPUT, defuzzifikasi_centroid, fuzzifikasi_input,
+    inferensi_mamdani_baru, keanggotaan,
+)
+from smartfarm.grafik import PANEL_FUZZY, PelukisFuzzy, plot_fuzzy  # noqa: E402
+
+
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+
+
+def hasil_acak(rng):
+    inputs = [round(rng.uniform(0, 3000)), round(rng.uniform(4, 10), 1), round(rng.uniform(0, 100)), int(rng.integers(0, 2))]
+    res = {'inputs': inputs, 'mu': fuzzifikasi_input(*inputs)}
+    res['agg_ir'], res['agg_pp'], res['agg_pt'] = inferensi_mamdani_baru(res['mu'])
+    for nama, agg, val, _, _ in PANEL_FUZZY:
+        res[val] = defuzzifikasi_centroid(SEMESTA_OUTPUT[nama], res[agg])
+    return res
+
+
+def render_lama(res_data):
+    """Salinan jalur app.py sebelumnya (pyplot + st.pyplot)."""
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(1, 3, figsize=(15, 4))
+    for a, (nama, agg, val, warna, judul) in zip(ax, PANEL_FUZZY):
+        x = SEMESTA_OUTPUT[nama]
+        for (_, titik), gaya in zip(HIMPUNAN_OUTPUT[nama], ('r--', 'g--', 'b--')):
+            a.plot(x, keanggotaan(x, titik), gaya, alpha=0.7)
+        a.fill_between(x, res_data[agg], color=warna, alpha=0.3)
+        a.axvline(res_data[val], color='k', linewidth=2)
+        a.set_title(judul)
+    plt.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=200, bbox_inches='tight')
+    return buf.getvalue()
+
+
+def seri(fn, data):
+    rss0 = rss_mb()
+    t = time.perf_counter()
+    for res in data: fn(res)
+    return (time.perf_counter() - t) / len(data), rss_mb() - rss0
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    import matplotlib
+    matplotlib.use('Agg')
+    matplotlib.rcParams['figure.max_open_warning'] = 0   # jalur lama sengaja tidak menutup figure
+    rng = np.random.default_rng(11)
+    data = [hasil_acak(rng) for _ in range(n)]
+
+    # Paritas piksel dengan figure yang digambar penuh pada dpi yang sama
+    pelukis = PelukisFuzzy()
+    t = time.perf_counter(); pelukis.rgba(data[0]); siap = time.perf_counter() - t
+    artis_awal = sum(len(a.get_children()) for a in pelukis._ax)
+    for res in data[:5]:
+        fig = plot_fuzzy(res)
+        fig.set_dpi(pelukis.dpi)
+        fig.canvas.draw()
+        penuh = np.asarray(fig.canvas.buffer_rgba()).astype(int)
+        blit = pelukis.rgba(res).astype(int)
+        if penuh.shape != blit.shape: break
+        beda = np.abs(penuh - blit)
+    cek(penuh.shape == blit.shape, f"ukuran gambar sama dengan render penuh {blit.shape[1]}x{blit.shape[0]}")
+    if penuh.shape == blit.shape:
+        print(f"beda piksel rata-rata {beda.mean():.2f}/255, piksel berbeda >32: {(beda.max(axis=2) > 32).mean():.2%}")
+        cek(beda.mean() < 2 and (beda.max(axis=2) > 32).mean() < 0.02, "hasil blitting setara render penuh")
+
+    # Jalur lama: figure pyplot baru setiap rerun, tidak pernah ditutup
+    dt_lama, rss_lama = seri(render_lama, data)
+    import matplotlib.pyplot as plt
+    terbuka = len(plt.get_fignums())
+    plt.close('all')
+
+    # Jalur baru: render tanpa cache (semua miss), lalu cache seperti app.py
+    dt_baru, rss_baru = seri(pelukis.png, data)
+    cache = CacheHasil(maks_entri=64, ttl=None)
+
+    def lewat_cache(res):
+        kunci = kunci_konten(res['inputs'], res['val_ir'], res['val_pp'], res['val_pt'])
+        return cache.ambil_atau_hitung(kunci, lambda: pelukis.png(res))
+    jejak = [data[i % 16] for i in range(n)]      # rerun berulang pada hasil yang sama
+    dt_cache, rss_cache = seri(lewat_cache, jejak)
+    st = cache.statistik()
+
+    print(f"\n{n} render, latar disiapkan sekali dalam {siap * 1000:.0f} ms")
+    print(f"pyplot penuh (lama)    : {dt_lama * 1000:7.1f} ms/render, RSS +{rss_lama:6.1f} MB, {terbuka} figure terbuka")
+    print(f"PelukisFuzzy (miss)    : {dt_baru * 1000:7.1f} ms/render, RSS +{rss_baru:6.1f} MB")
+    print(f"PelukisFuzzy + cache   : {dt_cache * 1000:7.2f} ms/render, RSS +{rss_cache:6.1f} MB, "
+          f"hit {st['hit']} / miss {st['miss']}")
+    cek(sum(len(a.get_children()) for a in pelukis._ax) == artis_awal, "jumlah artist tetap setelah semua render")
+    cek(pelukis.jumlah_render == n + 6 + st['miss'], "satu render per hasil yang belum di-cache")
+    cek(dt_baru < dt_lama / 3, "render latar statis jauh lebih cepat dari pyplot penuh")
+    cek(rss_baru < max(5.0, rss_lama / 10), "RSS jalur baru tidak tumbuh seiring jumlah render")
+    cek(st['miss'] == 16 and len(cache) <= 64, "cache PNG berbatas dan menahan hasil berulang")
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""Uji beban lokal layanan inferensi HTTP (smartfarm.layanan).
+
+Menjalankan `python -m smartfarm.layanan` sebagai proses terpisah, lalu:
+- memeriksa hasil /analisis sama dengan replay (skor_chunk) untuk batch yang
+  sama, bacaan tunggal = baris batch, NDJSON = array JSON, batch NDJSON besar
+  yang dipecah ke beberapa worker tetap berurutan, dan kode error 400/404/405;
+- mengukur permintaan/detik dan latensi p50/p95/p99 bacaan tunggal pada
+  beberapa tingkat konkurensi (klien keep-alive di proses terpisah);
+- mengukur bacaan/detik untuk batch JSON dan NDJSON.
+
+Jalankan dari root repo:  python bench/bench_layanan.py [detik_per_tingkat] [workers]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from smartfarm.layanan import BARIS_PER_TUGAS  # noqa: E402
+from smartfarm.replay import skor_chunk  # noqa: E402
+
+warnings.filterwarnings('ignore')   # InconsistentVersionWarning sklearn saat unpickle model
+
+KONKURENSI = (1, 4, 16, 64)
+UKURAN_BATCH = (100, 1000, 10000)
+
+
+def bacaan_sintetis(n, seed=7):
+    rng = np.random.default_rng(seed)
+    return [{'id': i, 'ph': round(rng.uniform(3.5, 9.5), 2), 'tds': round(rng.uniform(100, 3000)),
+             'soil_moisture': round(rng.uniform(5, 95), 1), 'air_temp': round(rng.uniform(20, 38), 1),
+             'rainfall': round(rng.uniform(0, 20), 1) if rng.random() < 0.3 else 0.0} for i in range(n)]
+
+
+def jalankan_layanan(workers):
+    env = dict(os.environ, PYTHONWARNINGS='ignore')
+    argumen = [sys.executable, '-m', 'smartfarm.layanan', '--port', '0']
+    if workers is not None: argumen += ['--workers', str(workers)]
+    proses = subprocess.Popen(argumen, cwd=ROOT, env=env, stderr=subprocess.PIPE, text=True)
+    for baris in proses.stderr:
+        if baris.startswith('melayani di http://'):
+            alamat, _, port = baris.split('http://')[1].split()[0].rpartition(':')
+            return proses, (alamat, int(port)), int(baris.split('(')[1].split()[0])
+    raise RuntimeError("layanan gagal start")
+
+
+def minta(koneksi, path, body, jenis='application/json'):
+    koneksi.request('POST', path, body, {'Content-Type': jenis})
+    r = koneksi.getresponse()
+    return r.status, r.read()
+
+
+def _klien(alamat, path, bodies, thread, durasi):
+    """Satu proses klien: `thread` koneksi keep-alive mengirim bergiliran selama `durasi` detik."""
+    latensi, gagal = [], [0]
+    lock = threading.Lock()
+    batas = time.perf_counter() + durasi
+
+    def kerja(mulai):
+        k = http.client.HTTPConnection(*alamat, timeout=30)
+        lokal, i = [], mulai
+        while time.perf_counter() < batas:
+            t = time.perf_counter()
+            try:
+                status, _ = minta(k, path, bodies[i % len(bodies)])
+                if status != 200: raise RuntimeError(status)
+                lokal.append(time.perf_counter() - t)
+            except Exception:
+                with lock: gagal[0] += 1
+                k.close(); k = http.client.HTTPConnection(*alamat, timeout=30)
+            i += 1
+        k.close()
+        with lock: latensi.extend(lokal)
+
+    semua = [threading.Thread(target=kerja, args=(j * 7919,)) for j in range(thread)]
+    for t in semua: t.start()
+    for t in semua: t.join()
+    return latensi, gagal[0]
+
+
+def beban(alamat, path, bodies, konkurensi, durasi):
+    """(permintaan/detik, latensi ms p50/p95/p99, jumlah gagal) pada satu tingkat konkurensi."""
+    proses = min(konkurensi, os.cpu_count() or 1)
+    bagi = [konkurensi // proses + (i < konkurensi % proses) for i in range(proses)]
+    with ProcessPoolExecutor(proses) as pool:
+        hasil = list(pool.map(_klien, [alamat] * proses, [path] * proses, [bodies] * proses, bagi,
+                              [durasi] * proses))
+    latensi = np.array([x for lat, _ in hasil for x in lat]) * 1000
+    gagal = sum(g for _, g in hasil)
+    if not latensi.size: return 0.0, (float('nan'),) * 3, gagal
+    return latensi.size / durasi, tuple(np.percentile(latensi, (50, 95, 99))), gagal
+
+
+def main():
+    durasi = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    proses, alamat, n_worker = jalankan_layanan(workers)
+    try:
+        k = http.client.HTTPConnection(*alamat, timeout=60)
+        # --- Ketepatan ---
+        data = bacaan_sintetis(2000)
+        data[5]['tds'] = None; data[6]['ph'] = 'rusak'
+        status, isi = minta(k, '/analisis', json.dumps(data))
+        hasil = pd.DataFrame(json.loads(isi))
+        acuan = skor_chunk(pd.DataFrame(data))
+        sama = status == 200 and len(hasil) == len(acuan)
+        for kol in ('val_ir', 'val_pp', 'val_pt', 'keyakinan'):
+            sama = sama and np.allclose(hasil[kol].astype(float), acuan[kol], equal_nan=True)
+        for kol in ('ai_status', 'rule_id', 'status_tanaman', 'label_ph', 'label_tds', 'label_kelembaban',
+                    'label_curah_hujan'):
+            sama = sama and hasil[kol].where(hasil[kol].notna(), None).tolist() == acuan[kol].where(acuan[kol].notna(), None).tolist()
+        cek(sama, "batch /analisis = replay.skor_chunk (dosis, diagnosa, status AI, label)")
+        cek(hasil['val_ir'].isna()[[5, 6]].all() and hasil['id'].tolist() == list(range(2000)),
+            "bacaan tidak lengkap tanpa dosis; field id disalin berurutan")
+        status, isi = minta(k, '/analisis', json.dumps(data[10]))
+        tunggal = json.loads(isi)
+        cek(status == 200 and isinstance(tunggal, dict) and tunggal['val_ir'] == hasil['val_ir'][10]
+            and tunggal['rule_id'] == hasil['rule_id'][10], "bacaan tunggal = baris yang sama di batch")
+        ndjson = '\n'.join(json.dumps(r) for r in data[:100])
+        status, isi = minta(k, '/dosis', ndjson, 'application/x-ndjson')
+        baris = [json.loads(b) for b in isi.splitlines()]
+        _, isi = minta(k, '/dosis', json.dumps(data[:100]))
+        cek(status == 200 and baris == json.loads(isi) and set(baris[0]) == {'val_ir', 'val_pp', 'val_pt', 'id'},
+            "NDJSON = array JSON; /dosis hanya berisi dosis")
+        besar = bacaan_sintetis(3 * BARIS_PER_TUGAS + 17, seed=8)
+        status, isi = minta(k, '/status?format=ndjson', '\n'.join(json.dumps(r) for r in besar))
+        cek(status == 200 and [json.loads(b)['id'] for b in isi.splitlines()] == list(range(len(besar))),
+            f"NDJSON {len(besar)} baris dipecah ke worker, hasil tetap berurutan")
+        kode = [minta(k, '/dosis', '{rusak')[0], minta(k, '/dosis', '[1, 2]')[0], minta(k, '/tidak-ada', '{}')[0]]
+        k.request('GET', '/dosis'); r = k.getresponse(); r.read(); kode.append(r.status)
+        k.request('GET', '/sehat'); r = k.getresponse(); sehat = json.loads(r.read())
+        cek(kode == [400, 400, 404, 405] and sehat['status'] == 'ok', "JSON rusak 400, endpoint salah 404/405, /sehat ok")
+        k.close()
+
+        # --- Beban: bacaan tunggal ---
+        bodies = [json.dumps(r) for r in bacaan_sintetis(512, seed=9)]
+        print(f"\nlayanan {n_worker} worker, {os.cpu_count()} core; bacaan tunggal POST /analisis, {durasi:g} s per tingkat")
+        print(f"{'konkurensi':>10} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'gagal':>6}")
+        total_gagal = 0
+        for c in KONKURENSI:
+            rps, (p50, p95, p99), g = beban(alamat, '/analisis', bodies, c, durasi)
+            total_gagal += g
+            print(f"{c:>10} {rps:>9.0f} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f} {g:>6}")
+        cek(total_gagal == 0, "tidak ada permintaan gagal di semua tingkat konkurensi")
+
+        # --- Beban: batch ---
+        paralel = max(1, n_worker)
+        print(f"\nbatch POST /analisis, konkurensi {paralel}")
+        print(f"{'ukuran':>8} {'format':>7} {'req/s':>8} {'bacaan/s':>10} {'p50 ms':>8} {'p95 ms':>8}")
+        for n in UKURAN_BATCH:
+            data = bacaan_sintetis(n, seed=n)
+            for fmt, body, path in (('json', json.dumps(data), '/analisis'),
+                                    ('ndjson', '\n'.join(json.dumps(r) for r in data), '/analisis?format=ndjson')):
+                rps, (p50, p95, _), g = beban(alamat, path, [body], paralel, durasi)
+                total_gagal += g
+                print(f"{n:>8} {fmt:>7} {rps:>8.1f} {rps * n:>10,.0f} {p50:>8.1f} {p95:>8.1f}")
+        cek(total_gagal == 0, "batch tanpa permintaan gagal")
+    finally:
+        proses.terminate()
+        proses.wait(30)
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
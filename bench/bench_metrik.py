@@ -0,0 +1,217 @@
+"""Benchmark dan pemeriksaan metrik tahap & penghitung (smartfarm.metrik).
+
+Memeriksa:
+- persentil sama dengan numpy.percentile, penghitung aman dipakai banyak thread;
+- kegagalan yang dulu ditelan (sumber error, status HTTP bukan 200, data
+  kosong/rusak -> data cadangan) kini terhitung;
+- teks Prometheus bisa diurai baris per baris, endpoint /metrics dan
+  /metrics.json melayani, log JSON berkala tertulis;
+- biaya per operasi (aktif dan SMARTFARM_METRICS=0), jumlah operasi per rerun
+  app.py, dan overhead = operasi x biaya dibanding lama rerun (harus < 1%);
+- A/B rerun penuh app.py (AppTest) dengan metrik mati vs hidup, bergantian.
+
+Jalankan dari root repo:  python bench/bench_metrik.py [rerun]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.metrik import METRIK, Metrik, PencatatMetrik, layani_metrik  # noqa: E402
+from smartfarm.sources import PollerSensor, SumberHTTP, SumberPalsu  # noqa: E402
+
+warnings.filterwarnings('ignore')   # InconsistentVersionWarning sklearn saat unpickle model
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# nama{label="..."} nilai  (format eksposisi teks 0.0.4, tanpa stempel waktu)
+BARIS_PROM = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\[\\"n])*",?)*\})? \S+$')
+OPERASI = 100000
+
+
+class _Respons:
+    status = 503
+    data = b''
+
+
+class _SesiGagal:
+    """Pool palsu: setiap GET mengembalikan 503."""
+
+    def request(self, *args, **kwargs):
+        return _Respons()
+
+
+class _SumberError:
+    def ambil(self):
+        raise ConnectionError("putus")
+
+
+def biaya_per_operasi(metrik):
+    """(tambah, blok with waktu()) detik per operasi, sampel terbaik dari 5."""
+    def tambah():
+        for _ in range(OPERASI): metrik.tambah('x')
+
+    def waktu():
+        for _ in range(OPERASI):
+            with metrik.waktu('y'): pass
+
+    hasil = []
+    for fn in (tambah, waktu):
+        terbaik = float('inf')
+        for _ in range(5):
+            t = time.perf_counter(); fn()
+            terbaik = min(terbaik, (time.perf_counter() - t) / OPERASI)
+        hasil.append(terbaik)
+    return tuple(hasil)
+
+
+def jumlah_operasi(metrik):
+    tahap = sum(v['n'] for v in metrik.tahap().values())
+    return tahap + sum(metrik.semua_penghitung().values())
+
+
+def rerun_app():
+    """(fungsi satu rerun penuh app.py, AppTest) atau None bila streamlit tidak ada."""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return None
+    sumber = open(os.path.join(ROOT, 'app.py'), encoding='utf-8').read()
+    sumber = sumber.replace('"🔄 Auto-Refresh Sensor", value=True', '"🔄 Auto-Refresh Sensor", value=False')
+    at = AppTest.from_string(sumber, default_timeout=120)
+    at.run()
+    at.radio[0].set_value(at.radio[0].options[0])
+    at.button[0].click(); at.run()
+    if at.exception: raise RuntimeError(at.exception)
+
+    def jalan():
+        # radio Cuaca tidak bisa dibaca ulang oleh AppTest tanpa diset; form disubmit
+        # tiap rerun supaya tahap mamdani/centroid/diagnosa ikut terukur
+        at.radio[0].set_value(at.radio[0].options[0])
+        at.button[0].click(); at.run()
+    return jalan, at
+
+
+def main():
+    n_rerun = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    # --- Perilaku dasar ---
+    m = Metrik(sampel=1000)
+    data = np.random.default_rng(5).lognormal(-6, 1, 1000)
+    for x in data: m.catat('t', float(x))
+    s = m.tahap()['t']
+    cek(all(abs(s[f'p{q}'] - np.percentile(data, q)) < 1e-12 for q in (50, 95, 99)) and s['n'] == 1000,
+        "persentil p50/p95/p99 = numpy.percentile")
+    m.reset()
+    thread = [threading.Thread(target=lambda: [m.tambah('n', alasan='a') for _ in range(20000)]) for _ in range(4)]
+    for t in thread: t.start()
+    for t in thread: t.join()
+    cek(m.penghitung('n', alasan='a') == 80000, "penghitung dari 4 thread tidak kehilangan tambahan")
+    mati = Metrik(aktif=False)
+    mati.tambah('x')
+    with mati.waktu('y'): pass
+    cek(mati.semua_penghitung() == {} and mati.tahap() == {}, "Metrik(aktif=False) tidak mencatat apa pun")
+
+    # --- Kegagalan yang dulu ditelan ---
+    METRIK.reset()
+    PollerSensor(SumberPalsu([None]), interval=3600)
+    PollerSensor(SumberPalsu([{'pH': 'bukan angka'}]), interval=3600)
+    PollerSensor(_SumberError(), interval=3600)
+    http = SumberHTTP('http://contoh.invalid/Monitoring.json', sesi=_SesiGagal())
+    http.ambil()
+    cek(METRIK.penghitung('cadangan', alasan='kosong') == 2 and METRIK.penghitung('cadangan', alasan='format') == 1,
+        "data cadangan terhitung per alasan (kosong/format)")
+    cek(METRIK.penghitung('poll_gagal', alasan='ConnectionError') == 1, "sumber yang melempar exception terhitung poll_gagal")
+    cek(METRIK.penghitung('sumber_gagal', sumber='http', alasan='http_503') == 1 and http.gagal == 1,
+        "status HTTP bukan 200 terhitung sumber_gagal")
+    cek(METRIK.tahap()['poll']['n'] == 3, "setiap poll tercatat sebagai tahap 'poll'")
+
+    # --- Ekspor ---
+    METRIK.catat('mamdani', 0.004, mode='langsung')
+    METRIK.daftar_pengumpul(lambda: [('cache_hit', {'cache': 'hasil'}, 7)])
+    METRIK.tambah('sumber_gagal', sumber='C:\\data "lahan"\nB', alasan='format')
+    teks = METRIK.teks_prometheus()
+    baris = [b for b in teks.splitlines() if b and not b.startswith('#')]
+    cek(all(BARIS_PROM.match(b) for b in baris) and all(np.isfinite(float(b.rsplit(' ', 1)[1])) or 'quantile' in b
+                                                       for b in baris),
+        f"teks Prometheus terurai ({len(baris)} sampel)")
+    cek('smartfarm_cadangan_total{alasan="kosong"} 2' in teks and 'smartfarm_cache_hit{cache="hasil"} 7' in teks
+        and 'smartfarm_mamdani_detik{mode="langsung",quantile="0.95"}' in teks,
+        "penghitung, gauge pengumpul, dan summary tahap ada di teks")
+    cek('smartfarm_sumber_gagal_total{alasan="format",sumber="C:\\\\data \\"lahan\\"\\nB"} 1' in teks,
+        "nilai label di-escape (\\\\, \\\" dan \\n) sesuai format teks Prometheus")
+    server = layani_metrik(METRIK, port=0)
+    try:
+        url = f'http://127.0.0.1:{server.server_address[1]}'
+        with urllib.request.urlopen(url + '/metrics', timeout=5) as r:
+            cek(r.status == 200 and r.read().decode() == METRIK.teks_prometheus(), "GET /metrics melayani teks Prometheus")
+        with urllib.request.urlopen(url + '/metrics.json', timeout=5) as r:
+            isi = json.loads(r.read())
+        cek(isi['penghitung'].get('poll_gagal{alasan="ConnectionError"}') == 1 and 'poll' in isi['tahap'],
+            "GET /metrics.json melayani ringkasan JSON")
+    finally:
+        server.shutdown()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'metrik.jsonl')
+        p = PencatatMetrik(path, METRIK, interval=0.05).start()
+        time.sleep(0.3); p.stop()
+        with open(path, encoding='utf-8') as f: log = [json.loads(b) for b in f]
+        cek(len(log) >= 2 and log[-1]['penghitung']['cadangan{alasan="kosong"}'] == 2, f"log JSON berkala ({len(log)} baris)")
+
+    # --- Overhead ---
+    tambah_on, waktu_on = biaya_per_operasi(Metrik())
+    tambah_off, waktu_off = biaya_per_operasi(Metrik(aktif=False))
+    print(f"\nbiaya per operasi: tambah {tambah_on * 1e6:.2f} µs, with waktu() {waktu_on * 1e6:.2f} µs "
+          f"(SMARTFARM_METRICS=0: {tambah_off * 1e6:.2f} / {waktu_off * 1e6:.2f} µs)")
+    cek(max(tambah_on, waktu_on) < 10e-6, "satu operasi metrik < 10 µs")
+
+    rerun = rerun_app()
+    if rerun is None:
+        print("streamlit tidak terpasang: pengukuran rerun dilewati")
+        return 1 if gagal else 0
+    jalan, at = rerun
+    METRIK.reset()
+    jalan()
+    ops0 = jumlah_operasi(METRIK)
+    for _ in range(n_rerun): jalan()
+    ops = (jumlah_operasi(METRIK) - ops0) / n_rerun
+    s = METRIK.tahap()
+    lama_rerun = s['rerun']['p50']
+    overhead = ops * waktu_on / lama_rerun
+    print(f"rerun app.py: p50 {lama_rerun * 1000:.1f} ms, p95 {s['rerun']['p95'] * 1000:.1f} ms; "
+          f"{ops:.1f} operasi metrik per rerun -> {ops * waktu_on * 1e6:.1f} µs ({overhead:.3%})")
+    for nama in sorted(s):
+        print(f"  {nama:<22} n={s[nama]['n']:<5} p50 {s[nama]['p50'] * 1000:8.3f} ms  p95 {s[nama]['p95'] * 1000:8.3f} ms")
+    cek(overhead < 0.01, "overhead metrik < 1% waktu rerun")
+
+    # A/B: lama rerun dengan metrik mati vs hidup, urutan ABBA supaya drift mesin dan
+    # efek urutan terbagi rata. Selisih ini didominasi derau; angka yang diperiksa di atas.
+    durasi = {False: [], True: []}
+    for i in range(4 * ((n_rerun + 1) // 2)):
+        aktif = i % 4 in (1, 2)
+        METRIK.aktif = aktif
+        t = time.perf_counter(); jalan(); durasi[aktif].append(time.perf_counter() - t)
+    METRIK.aktif = True
+    off, on = statistics.median(durasi[False]), statistics.median(durasi[True])
+    print(f"A/B rerun (AppTest, median {len(durasi[True])}x): mati {off * 1000:.1f} ms, hidup {on * 1000:.1f} ms "
+          f"({(on - off) / off:+.2%}, derau pengukuran termasuk)")
+    cek(not at.exception, "app.py berjalan tanpa exception dengan metrik aktif")
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Benchmark skor Naive Bayes terfusi (smartfarm.models.PenilaiNB) vs jalur sklearn.
+
+Memeriksa paritas dengan model_naivebayes.pkl + scaler.pkl (probabilitas,
+log-probabilitas, dan kelas) pada sampel acak di rentang sensor serta di luar
+rentang, lalu mengukur latensi per baris (1 x 4, seperti setiap rerun
+dashboard) dan throughput batch.
+
+Jalankan dari root repo:  python bench/bench_nb.py [baris_batch]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.models import KELAS_AI, PenilaiNB, muat_model  # noqa: E402
+
+warnings.filterwarnings('ignore')   # InconsistentVersionWarning sklearn saat unpickle model
+
+
+def fitur_acak(n, rng, lebar=1.0):
+    """[pH, suhu udara, kelembaban tanah, TDS]; lebar > 1 melebar ke luar rentang sensor."""
+    return np.column_stack([
+        rng.uniform(7 - 4 * lebar, 7 + 4 * lebar, n), rng.uniform(28 - 14 * lebar, 28 + 14 * lebar, n),
+        rng.uniform(50 - 50 * lebar, 50 + 50 * lebar, n), rng.uniform(1500 - 1500 * lebar, 1500 + 1500 * lebar, n),
+    ])
+
+
+def per_panggil(fn, ulang):
+    t = time.perf_counter()
+    for _ in range(ulang): fn()
+    return (time.perf_counter() - t) / ulang
+
+
+def main():
+    n_batch = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    model, scaler = muat_model()
+    if model is None or scaler is None:
+        print("model_naivebayes.pkl / scaler.pkl tidak ada")
+        return 1
+    penilai = PenilaiNB(model, scaler)
+    cek(penilai.terfusi, "model GaussianNB dilipat ke matriks bobot")
+    cek(penilai.label == [KELAS_AI[k] for k in sorted(KELAS_AI)], "empat kelas AI_CLASSES berurutan")
+
+    rng = np.random.default_rng(5)
+    for nama, X in (("rentang sensor", fitur_acak(100_000, rng)), ("3x di luar rentang", fitur_acak(100_000, rng, 3))):
+        Xs = scaler.transform(X)
+        d_proba = np.abs(penilai.predict_proba(X) - model.predict_proba(Xs)).max()
+        d_log = np.abs(penilai.log_posterior(X) - model.predict_log_proba(Xs))
+        d_log_rel = (d_log / np.maximum(1.0, np.abs(model.predict_log_proba(Xs)))).max()
+        sama = (penilai.predict(X) == model.predict(Xs)).mean()
+        print(f"{nama}: beda proba maks {d_proba:.1e}, beda log-proba relatif maks {d_log_rel:.1e}, kelas sama {sama:.4%}")
+        cek(d_proba < 1e-9 and d_log_rel < 1e-9 and sama == 1.0, f"paritas dengan model pickle ({nama})")
+    X = fitur_acak(10, rng); X[3, 2] = np.nan
+    cek(np.isnan(penilai.predict_proba(X)[3]).all() and penilai.status(X)[3] is None
+        and penilai.predict(X)[3] == -1, "baris dengan NaN tidak diprediksi")
+
+    # Latensi satu baris (jalur dashboard per rerun)
+    x1 = fitur_acak(1, rng)
+    lama = per_panggil(lambda: model.predict(scaler.transform(x1)), 2000)
+    lama_proba = per_panggil(lambda: model.predict_proba(scaler.transform(x1)), 2000)
+    baru = per_panggil(lambda: penilai.predict_proba(x1), 20000)
+    print(f"\nlatensi 1 baris: sklearn transform+predict {lama * 1e6:.1f} µs, transform+predict_proba "
+          f"{lama_proba * 1e6:.1f} µs, terfusi predict_proba {baru * 1e6:.1f} µs ({lama_proba / baru:.0f}x)")
+    cek(baru < lama, "skor terfusi per baris lebih cepat dari sklearn")
+
+    # Throughput batch
+    X = fitur_acak(n_batch, rng)
+    t = time.perf_counter(); model.predict_proba(scaler.transform(X)); dt_lama = time.perf_counter() - t
+    t = time.perf_counter(); penilai.predict_proba(X); dt_baru = time.perf_counter() - t
+    print(f"batch {n_batch} baris: sklearn {n_batch / dt_lama / 1e6:.2f} juta baris/s, "
+          f"terfusi {n_batch / dt_baru / 1e6:.2f} juta baris/s ({dt_lama / dt_baru:.1f}x)")
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Benchmark CPU server per penonton: rerun penuh vs fragment panel live.
+
+Dashboard dijalankan lewat streamlit.testing (AppTest) dengan auto-refresh
+mati, dan waktu CPU proses diukur per run:
+- rerun penuh: seluruh app.py setelah form sistem pakar pernah disubmit
+  (hasil + grafik fuzzy ikut digambar ulang tiap tick, seperti mode 'rerun');
+- tick fragment: run ber-fragment_id yang sama dengan yang dikirim browser
+  tiap run_every, jadi yang diukur adalah jalur st.fragment sesungguhnya.
+  AppTest belum bisa memicu fragment, sehingga LocalScriptRunner ditambal:
+  penyimpanan fragment dipakai bersama antar run dan RerunData membawa
+  fragment_id_queue.
+Dari situ dihitung jumlah penonton yang sanggup dilayani satu core pada
+interval refresh tertentu. Mode 'rerun' juga menahan satu thread skrip per
+penonton selama time.sleep; mode fragment tidak.
+
+Butuh Streamlit dengan st.fragment (versi di requirements.txt).
+Jalankan dari root repo:  python bench/bench_refresh.py [interval_detik] [ulang]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import os
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('SMARTFARM_STORE', '')       # tanpa file penyimpanan
+os.environ['SMARTFARM_REFRESH'] = 'fragment'
+warnings.filterwarnings('ignore')
+
+import streamlit as st  # noqa: E402
+from streamlit.runtime.fragment import MemoryFragmentStorage  # noqa: E402
+from streamlit.runtime.scriptrunner import RerunData  # noqa: E402
+from streamlit.testing.v1 import AppTest, local_script_runner  # noqa: E402
+from streamlit.testing.v1.element_tree import parse_tree_from_messages  # noqa: E402
+
+FRAGMENT = MemoryFragmentStorage()
+ANTRE_FRAGMENT = []        # kosong = rerun penuh, berisi id = tick fragment
+
+
+def tambal_runner():
+    awal = local_script_runner.LocalScriptRunner.__init__
+
+    def init(self, *args, **kwargs):
+        awal(self, *args, **kwargs)
+        self._fragment_storage = FRAGMENT
+
+    def run(self, widget_state=None, query_params=None, timeout=3, page_hash=""):
+        self.request_rerun(RerunData(widget_states=widget_state, page_script_hash=page_hash,
+                                     fragment_id_queue=list(ANTRE_FRAGMENT)))
+        if not self._script_thread: self.start()
+        local_script_runner.require_widgets_deltas(self, timeout)
+        return parse_tree_from_messages(self.forward_msgs())
+
+    local_script_runner.LocalScriptRunner.__init__ = init
+    local_script_runner.LocalScriptRunner.run = run
+
+
+def cpu_per_run(at, ulang, submit):
+    t = time.process_time()
+    for _ in range(ulang):
+        # radio Cuaca (opsi 0/1) tidak bisa dibaca ulang oleh AppTest tanpa diset
+        if submit: at.radio[0].set_value(at.radio[0].options[0])
+        at.run()
+    return (time.process_time() - t) / ulang
+
+
+def main():
+    interval = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    ulang = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    if getattr(st, 'fragment', None) is None and getattr(st, 'experimental_fragment', None) is None:
+        cek(False, f"Streamlit {st.__version__} punya st.fragment (pasang versi requirements.txt)")
+        return 1
+    tambal_runner()
+    sumber = open(os.path.join(ROOT, 'app.py'), encoding='utf-8').read()
+    sumber = sumber.replace('"🔄 Auto-Refresh Sensor", value=True', '"🔄 Auto-Refresh Sensor", value=False')
+    at = AppTest.from_string(sumber, default_timeout=120)
+    at.run()
+    at.radio[0].set_value(at.radio[0].options[0])
+    at.button[0].click(); at.run()
+    cek(not at.exception, "app.py berjalan tanpa exception")
+    cek(len(FRAGMENT._fragments) == 1, "panel live terdaftar sebagai satu fragment (mode 'fragment' aktif)")
+    n_penuh = len(at.main.children)
+
+    penuh = cpu_per_run(at, ulang, submit=True)
+    ANTRE_FRAGMENT[:] = list(FRAGMENT._fragments)
+    fragment = cpu_per_run(at, ulang, submit=False)
+    cek(not at.exception and 0 < len(at.main.children) < n_penuh, "tick fragment hanya menggambar ulang panel live")
+
+    print(f"CPU per tick (interval {interval:g} s, rata-rata {ulang} run, Streamlit {st.__version__}):")
+    print(f"  rerun penuh      : {penuh * 1000:7.1f} ms  -> {interval / penuh:6.0f} penonton/core, "
+          f"1 thread skrip tertahan per penonton")
+    print(f"  fragment (live)  : {fragment * 1000:7.1f} ms  -> {interval / fragment:6.0f} penonton/core, "
+          f"tanpa thread tertahan")
+    print(f"  penghematan      : {penuh / fragment:.1f}x CPU per tick")
+    cek(fragment < penuh, "tick fragment lebih murah dari rerun penuh")
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
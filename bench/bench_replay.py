@@ -0,0 +1,120 @@
+"""Benchmark replay / backfill headless (smartfarm.replay).
+
+Membuat CSV sintetis, memeriksa hasil replay sama dengan jalur skalar dashboard
+(prediksi AI, Mamdani, diagnosa CF, label master data) pada sampel baris,
+memastikan streamlit dan firebase_admin tidak ikut diimpor, lalu mengukur
+baris/s untuk 1..N worker (N = jumlah core, bisa diganti lewat argumen).
+
+Jalankan dari root repo:  python bench/bench_replay.py [baris] [maks_worker]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import warnings
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from smartfarm.config import muat_knowledge_base, muat_master_data  # noqa: E402
+from smartfarm.diagnosis import hitung_diagnosa_cf  # noqa: E402
+from smartfarm.fuzzy import (  # noqa: E402
+    defuzzifikasi_centroid, fuzzifikasi_input, inferensi_mamdani_baru, x_irigasi, x_pupuk, x_pestisida,
+)
+from smartfarm.labels import IndeksMaster  # noqa: E402
+from smartfarm.models import label_kelas, muat_model  # noqa: E402
+from smartfarm.replay import jalankan  # noqa: E402
+
+warnings.filterwarnings('ignore')   # InconsistentVersionWarning sklearn saat unpickle model
+
+
+def data_sintetis(n, rng):
+    """Bacaan dengan nama field Firebase, seperti hasil ekspor RTDB."""
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2025-01-01', periods=n, freq='s').strftime('%Y-%m-%d %H:%M:%S'),
+        'pH': rng.uniform(3.5, 9.5, n).round(2),
+        'TDS': rng.uniform(100, 3000, n).round(0),
+        'SoilMoisture': rng.uniform(5, 95, n).round(1),
+        'WaterTemp': rng.uniform(20, 35, n).round(1),
+        'AirTemp': rng.uniform(20, 38, n).round(1),
+        'Humidity': rng.uniform(40, 95, n).round(1),
+        'Rainfall': np.where(rng.random(n) < 0.3, rng.uniform(0, 20, n), 0).round(1),
+    })
+
+
+def skalar(baris, kb, master, model, scaler):
+    """Satu baris lewat jalur yang sama dengan app.py."""
+    mu = fuzzifikasi_input(baris.TDS, baris.pH, baris.SoilMoisture, 1 if baris.Rainfall > 0 else 0)
+    out_ir, out_pp, out_pt = inferensi_mamdani_baru(mu)
+    rule, belief = hitung_diagnosa_cf(mu, kb)
+    ai = None
+    if model is not None and scaler is not None:
+        ai = label_kelas(model.predict(scaler.transform([[baris.pH, baris.AirTemp, baris.SoilMoisture, baris.TDS]]))[0])
+    return {
+        'val_ir': defuzzifikasi_centroid(x_irigasi, out_ir),
+        'val_pp': defuzzifikasi_centroid(x_pupuk, out_pp),
+        'val_pt': defuzzifikasi_centroid(x_pestisida, out_pt),
+        'rule_id': rule['id'], 'keyakinan': belief, 'ai_status': ai,
+        'label_ph': master.get_label('ph', baris.pH) or 'Normal',
+        'label_curah_hujan': master.get_label('curah_hujan', baris.Rainfall) or ('Hujan' if baris.Rainfall > 0 else 'Cerah'),
+    }
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    maks = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    rng = np.random.default_rng(11)
+    with tempfile.TemporaryDirectory() as tmp:
+        masukan = os.path.join(tmp, 'riwayat.csv')
+        df = data_sintetis(n, rng)
+        df.iloc[5, df.columns.get_loc('TDS')] = np.nan      # baris tidak lengkap tetap ikut, tanpa skor
+        df.to_csv(masukan, index=False)
+
+        # Paritas dengan jalur skalar dashboard (juga lewat Parquet agar writer teruji)
+        keluaran = os.path.join(tmp, 'hasil.parquet')
+        jalankan([masukan], keluaran, workers=1, ukuran_chunk=20_000)
+        hasil = pd.read_parquet(keluaran)
+        cek(len(hasil) == n, f"jumlah baris hasil = {n}")
+        cek(np.isnan(hasil['val_ir'].iloc[5]) and hasil['rule_id'].iloc[5] is None,
+            "baris dengan TDS kosong tidak diberi dosis/diagnosa")
+        kb, master = muat_knowledge_base(), IndeksMaster(muat_master_data())
+        model, scaler = muat_model()
+        sampel = [i for i in rng.choice(n, 200, replace=False) if i != 5]
+        beda = []
+        for i in sampel:
+            ref = skalar(df.iloc[i], kb, master, model, scaler)
+            r = hasil.iloc[i]
+            for k, v in ref.items():
+                sama = np.isclose(r[k], v) if isinstance(v, float) else r[k] == v
+                if not sama: beda.append((i, k, r[k], v))
+        cek(not beda, f"paritas dengan jalur skalar pada {len(sampel)} baris" + (f" (beda: {beda[:3]})" if beda else ""))
+
+        # Tidak mengimpor streamlit / firebase_admin
+        kode = ("import sys, smartfarm.replay; "
+                "print(','.join(m for m in ('streamlit', 'firebase_admin') if m in sys.modules))")
+        impor = subprocess.run([sys.executable, '-c', kode], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        cek(impor == '', "smartfarm.replay tidak mengimpor streamlit/firebase_admin" + (f" ({impor})" if impor else ""))
+
+        # Throughput per jumlah worker
+        print(f"\n{'worker':>6} | {'detik':>7} | {'baris/s':>10} | {'skala':>5}")
+        dasar = None
+        for w in range(1, maks + 1):
+            r = jalankan([masukan], os.path.join(tmp, f'hasil_{w}.csv'), workers=w, ukuran_chunk=20_000)
+            dasar = dasar or r['baris_per_detik']
+            print(f"{w:>6} | {r['detik']:>7.2f} | {r['baris_per_detik']:>10,.0f} | {r['baris_per_detik'] / dasar:>5.2f}")
+        cek(len(pd.read_csv(os.path.join(tmp, f'hasil_{maks}.csv'))) == n, "hasil CSV multi-worker lengkap dan berurutan")
+
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
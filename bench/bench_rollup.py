@@ -0,0 +1,154 @@
+"""Benchmark grafik rentang panjang: data mentah vs rollup + LTTB.
+
+Mengisi database sementara dengan data 1 Hz selama beberapa hari, lalu untuk
+beberapa rentang membandingkan waktu query dan ukuran payload grafik
+(DataFrame yang dikirim ke st.line_chart, diserialisasi Arrow) antara membaca
+data mentah dan jalur grafik dashboard (rollup terpilih + LTTB).
+Juga memeriksa rollup inkremental = rollup hasil hitung ulang dari data mentah,
+termasuk setelah tulisan ulang (device, ts) yang sama, serta retensi data mentah
+(rollup tidak disentuh) dan retensi rollup yang terpisah.
+
+Jalankan dari root repo:  python bench/bench_rollup.py [hari]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.downsample import MAKS_TITIK, lttb_gabungan  # noqa: E402
+from smartfarm.history import KOLOM_SENSOR  # noqa: E402
+from smartfarm.store import KOLOM_ROLLUP, RESOLUSI_ROLLUP, PenyimpanBacaan  # noqa: E402
+
+T0 = 1_760_000_000.0
+
+
+def payload(ts, kolom):
+    """Ukuran byte DataFrame grafik bila diserialisasi Arrow (seperti st.line_chart)."""
+    df = pd.DataFrame(kolom, index=pd.to_datetime(ts, unit='s'))
+    try:
+        import pyarrow as pa
+        tabel = pa.Table.from_pandas(df)
+        buf = io.BytesIO()
+        with pa.ipc.new_stream(buf, tabel.schema) as w: w.write_table(tabel)
+        return buf.tell()
+    except ImportError:
+        return len(df.to_json())
+
+
+def sinyal(ts, rng):
+    """Pola harian + derau + beberapa lonjakan singkat (yang harus tetap terlihat)."""
+    hari = np.sin(2 * np.pi * (ts - T0) / 86400)
+    kolom = {
+        'ph': 6.8 + 0.4 * hari + rng.normal(0, 0.05, ts.size),
+        'tds': 1200 + 300 * hari + rng.normal(0, 20, ts.size),
+        'soil_moisture': 50 + 15 * hari + rng.normal(0, 2, ts.size),
+        'water_temp': 27 + 3 * hari + rng.normal(0, 0.2, ts.size),
+    }
+    lonjakan = rng.choice(ts.size, 5, replace=False)
+    kolom['tds'][lonjakan] += 2500
+    for k in KOLOM_SENSOR:
+        if k not in kolom: kolom[k] = np.zeros(ts.size)
+    return kolom
+
+
+def sama_dengan_hitung_ulang(st):
+    """Rollup saat ini == hasil bangun_ulang_rollup() dari data mentah (rollup diganti hasil hitung ulang)."""
+    inkremental = {r: st.rollup(resolusi=r) for r in RESOLUSI_ROLLUP}
+    st.bangun_ulang_rollup()
+    return all(np.array_equal(inkremental[r][0], st.rollup(resolusi=r)[0])
+               and all(np.allclose(v, st.rollup(resolusi=r)[1][k], equal_nan=True)
+                       for k, v in inkremental[r][1].items())
+               for r in RESOLUSI_ROLLUP)
+
+
+def main():
+    hari = float(sys.argv[1]) if len(sys.argv) > 1 else 14
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    rng = np.random.default_rng(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        st = PenyimpanBacaan(os.path.join(tmp, 'rollup.db'), batch_size=4096)
+        ts = T0 + np.arange(int(hari * 86400), dtype=float)
+        kolom = sinyal(ts, rng)
+        t = time.perf_counter()
+        for i in range(0, ts.size, 86400):
+            st.tambah_banyak(ts[i:i + 86400], {k: v[i:i + 86400] for k, v in kolom.items()})
+        print(f"isi {ts.size} baris (mentah + rollup) dalam {time.perf_counter() - t:.1f} s")
+
+        cek(sama_dengan_hitung_ulang(st), "rollup inkremental sama dengan hitung ulang dari data mentah")
+        w_hari, r_hari = st.rollup(resolusi=86400)
+        hari_pertama = ts < w_hari[0] + 86400
+        cek(np.isclose(r_hari['tds_max'][0], kolom['tds'][hari_pertama].max())
+            and np.isclose(r_hari['ph_mean'][0], kolom['ph'][hari_pertama].mean()), "min/max/mean rollup harian benar")
+
+        # Tulisan ulang (device, ts) yang sudah ada -- mis. bacaan terakhir yang diterbitkan
+        # lagi saat listener restart -- diabaikan dan tidak dihitung dua kali di rollup
+        n_awal = st.jumlah(); asli = st.rentang(ts[100], ts[100])[1]['tds'][0]
+        for i in (100, 100, 5000, ts.size - 1):
+            st.tambah(ts[i], {k: v[i] + 999 for k, v in kolom.items()})
+        st.tambah_banyak(ts[200:260], {k: v[200:260] + 1 for k, v in kolom.items()})
+        st.tambah_banyak(np.concatenate([ts[-1:] + 1, ts[-1:] + 1]), {'tds': np.array([1.0, 2.0])})
+        cek(st.jumlah() == n_awal + 1 and st.duplikat == 65 and st.rentang(ts[100], ts[100])[1]['tds'][0] == asli,
+            "tulisan ulang diabaikan: baris mentah tetap, duplikat dihitung")
+        cek(sama_dengan_hitung_ulang(st), "rollup tidak menghitung tulisan ulang dua kali")
+
+        akhir = ts[-1]
+        print(f"\n{'rentang':>8} | {'mentah: ms':>10} {'titik':>9} {'payload':>10} | "
+              f"{'grafik: ms':>10} {'res':>5} {'titik':>6} {'payload':>9}")
+        for label, durasi in (('1 jam', 3600), ('6 jam', 6 * 3600), ('1 hari', 86400),
+                              ('7 hari', 7 * 86400), (f'{hari:g} hari', hari * 86400)):
+            mulai = akhir - durasi
+            t = time.perf_counter()
+            w_m, k_m = st.rentang(mulai, akhir, kolom=KOLOM_ROLLUP)
+            dt_m = time.perf_counter() - t
+            t = time.perf_counter()
+            w_s, k_s, res = st.seri(mulai, akhir)
+            w_g, k_g = lttb_gabungan(w_s, k_s, MAKS_TITIK)
+            dt_g = time.perf_counter() - t
+            b_m, b_g = payload(w_m, k_m), payload(w_g, k_g)
+            print(f"{label:>8} | {dt_m * 1000:>10.1f} {w_m.size:>9} {b_m / 1024:>8.0f}KB | "
+                  f"{dt_g * 1000:>10.1f} {res if res else 'raw':>5} {w_g.size:>6} {b_g / 1024:>7.0f}KB")
+            cek(w_g.size <= MAKS_TITIK, f"{label}: titik grafik <= {MAKS_TITIK}")
+            if res == 0:
+                # Dari data mentah, LTTB harus mempertahankan lonjakan (nilai ekstrem)
+                cek(np.isclose(k_g['tds'].max(), k_m['tds'].max()), f"{label}: puncak TDS tetap terlihat")
+
+        # Retensi data mentah tidak menyentuh rollup (grafik rentang panjang melewati umur data mentah);
+        # retensi rollup terpisah hanya menghapus ember yang seluruhnya sebelum batasnya
+        sebelum = {r: st.rollup(resolusi=r) for r in RESOLUSI_ROLLUP}
+        batas = T0 + 1.5 * 86400 + 17.25
+        st.hapus_sebelum(batas)
+        cek(st.rentang()[0][0] >= batas and all(
+            np.array_equal(sebelum[r][0], st.rollup(resolusi=r)[0]) for r in RESOLUSI_ROLLUP),
+            "retensi data mentah menghapus baris mentah saja, rollup utuh")
+        st.hapus_rollup_sebelum(batas)
+        utuh = True
+        for r in RESOLUSI_ROLLUP:
+            w, isi = st.rollup(resolusi=r)
+            sisa = sebelum[r][0] >= batas // r * r
+            utuh &= (w[0] == batas // r * r and np.array_equal(w, sebelum[r][0][sisa])
+                     and np.array_equal(isi['tds_max'], sebelum[r][1]['tds_max'][sisa]))
+        cek(utuh, "retensi rollup menghapus ember sebelum batas, ember yang memuat batas dipertahankan")
+        sekarang = ts[-1]
+        st.retensi_detik, st.retensi_rollup_detik = (sekarang - batas) / 4, (sekarang - batas) * 3 / 4
+        st.terapkan_retensi(sekarang)
+        awal_menit = st.rollup(resolusi=60)[0][0]
+        cek(st.rentang()[0][0] >= sekarang - st.retensi_detik
+            and sekarang - st.retensi_rollup_detik - 60 < awal_menit < sekarang - st.retensi_detik,
+            "terapkan_retensi memakai umur data mentah dan umur rollup masing-masing")
+
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
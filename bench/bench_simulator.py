@@ -0,0 +1,301 @@
+"""Simulator ESP32 (smartfarm.simulator) + uji beban ingest dan dashboard pada RTDB lokal.
+
+Bagian pertama memeriksa simulator:
+- Layout node /Monitoring sama dengan firmware.
+- Nilai berkorelasi waktu, tidak seperti data_dummy.
+- Ada siklus harian, kejadian hujan, serta gangguan sensor macet, gagal
+  tulis dan perangkat mati.
+
+Bagian kedua memutar N perangkat pada laju tertentu ke RTDBLokal.
+Datanya di-ingest dengan 'stream' (StreamSensor per perangkat, listener) atau
+'poll' (PollerArmada), sementara satu penonton me-refresh dashboard (kartu AI,
+label, grafik LTTB, tabel ringkasan lahan). Dilaporkan:
+- lag ingest: dari ESP32 menutup siklus sampai bacaan terbit di snapshot;
+- latensi ujung-ke-ujung: sampai bacaan itu tampil di render dashboard;
+- CPU dashboard (ingest + render) dalam % satu core;
+- laju kirim yang tercapai.
+
+Jalankan dari root repo:
+    python bench/bench_simulator.py [--perangkat 1,10,50,100] [--laju 0.5,2] [--durasi 4] [--refresh 1]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.armada import PollerArmada, baris_ringkasan  # noqa: E402
+from smartfarm.config import KonfigurasiLive  # noqa: E402
+from smartfarm.downsample import lttb_gabungan  # noqa: E402
+from smartfarm.models import FITUR_AI, muat_penilai  # noqa: E402
+from smartfarm.rtdb_lokal import RTDBLokal  # noqa: E402
+from smartfarm.simulator import ArmadaSimulasi, ESP32Simulasi  # noqa: E402
+from smartfarm.sources import SumberFirebase, data_dummy, normalisasi_data  # noqa: E402
+from smartfarm.stream import FIELD_SENSOR, StreamSensor  # noqa: E402
+
+warnings.filterwarnings('ignore')   # InconsistentVersionWarning sklearn saat unpickle model
+
+SIKLUS_HARI = int(86400 / 2)        # siklus ESP32 per hari (periode 2 s)
+
+
+def autokorelasi(v):
+    v = np.asarray(v, dtype=float)
+    return float(np.corrcoef(v[:-1], v[1:])[0, 1])
+
+
+def run_datar(v, minimal):
+    """Jumlah deret nilai identik beruntun sepanjang >= minimal (sensor macet)."""
+    v = np.asarray(v, dtype=float)
+    batas = np.flatnonzero(np.diff(v) != 0)
+    panjang = np.diff(np.concatenate(([-1], batas, [len(v) - 1])))
+    return int((panjang >= minimal).sum())
+
+
+# ==================== CEK SIMULATOR ====================
+def cek_simulator(cek):
+    rtdb = RTDBLokal()
+    esp = ESP32Simulasi('/devices/a/Monitoring', seed=1, gangguan=False)
+    ts = esp.kirim(rtdb)
+    node = rtdb.reference('/devices/a/Monitoring').get()
+    cek(set(node) == set(FIELD_SENSOR) | {f + '_Time' for f in FIELD_SENSOR} | {'timestamp'}
+        and all(node[f + '_Time'] == ts for f in FIELD_SENSOR) and node['timestamp'] == ts,
+        "node berisi 7 field + <field>_Time + timestamp seperti firmware")
+    d = normalisasi_data(node)
+    cek(isinstance(node['SoilMoisture'], int) and isinstance(node['Rainfall'], int) and 5 < d['ph'] < 9,
+        "tipe nilai mengikuti setFloat/setInt firmware dan terbaca normalisasi_data")
+
+    # Tiga hari satu perangkat tanpa gangguan
+    baris = [esp.langkah() for _ in range(3 * SIKLUS_HARI)]
+    kol = {f: np.array([b[1][f] for b in baris], dtype=float) for f in FIELD_SENSOR}
+    dummy = np.array([data_dummy()['ph'] for _ in range(2000)])
+    ac = {f: autokorelasi(kol[f]) for f in ('pH', 'TDS', 'SoilMoisture', 'AirTemp')}
+    print("      autokorelasi lag-1: " + ", ".join(f"{f} {v:.3f}" for f, v in ac.items())
+          + f"; data_dummy pH {autokorelasi(dummy):.3f}")
+    cek(min(ac.values()) > 0.95 and abs(autokorelasi(dummy)) < 0.1, "nilai berkorelasi waktu (data_dummy tidak)")
+    jam = np.array([int(b[0][11:13]) for b in baris])
+    siang, malam = kol['AirTemp'][jam == 15].mean(), kol['AirTemp'][jam == 4].mean()
+    cek(siang - malam > 5, f"siklus suhu harian (15:00 {siang:.1f}°C vs 04:00 {malam:.1f}°C)")
+
+    # Banyak perangkat dengan gangguan: hujan, sensor macet, gagal tulis, mati
+    armada = ArmadaSimulasi(RTDBLokal(), 20, seed=7)
+    hujan = macet = 0
+    for p in armada.perangkat.values():
+        deret = [b for b in (p.langkah() for _ in range(SIKLUS_HARI)) if b is not None]
+        r = np.array([b[1]['Rainfall'] for b in deret])
+        hujan += int(((r[1:] > 20) & (r[:-1] <= 20)).sum())
+        macet += sum(run_datar([b[1][f] for b in deret], 600) for f in ('pH', 'TDS', 'AirTemp', 'WaterTemp'))
+    st = armada.statistik()
+    gagal, mati = sum(p.gagal_tulis for p in armada.perangkat.values()), sum(p.siklus_mati for p in armada.perangkat.values())
+    print(f"      20 perangkat x 1 hari: {hujan} kejadian hujan, {macet} sensor datar >= 20 menit, "
+          f"{gagal} field gagal tulis, {mati} siklus perangkat mati")
+    cek(hujan > 0 and macet > 0 and gagal > 0 and mati > 0 and st['perangkat'] == 20,
+        "kejadian hujan dan ketiga jenis gangguan muncul")
+
+    # Field yang gagal ditulis terdeteksi basi oleh StreamSensor
+    rtdb = RTDBLokal()
+    esp = ESP32Simulasi('/Monitoring', seed=3)
+    esp.kirim(rtdb)
+    stream = StreamSensor(rtdb.reference('/Monitoring'), kapasitas=100).start()
+    basi = 0
+    for _ in range(3000):
+        if esp.kirim(rtdb) is not None and stream.field_basi: basi += 1
+    stream.stop()
+    cek(basi > 0 and stream.snapshot().seq > 2000, f"StreamSensor menandai field basi ({basi} siklus)")
+
+
+# ==================== UJI BEBAN ====================
+class StreamTercatat(StreamSensor):
+    """StreamSensor yang mencatat seq -> ts bacaan, lag ingest, dan CPU callback."""
+
+    def __init__(self, nama, ref, catatan, **kw):
+        self.nama, self.catatan = nama, catatan
+        self.ts_seq = {}
+        self.cpu = 0.0
+        super().__init__(ref, **kw)
+
+    def _on_event(self, event):
+        t0 = time.thread_time()
+        super()._on_event(event)
+        self.cpu += time.thread_time() - t0
+
+    def _terbitkan(self, ts, tiba):
+        super()._terbitkan(ts, tiba)
+        self.ts_seq[self._snapshot.seq] = ts
+        self.catatan.ingest(self.nama, ts)
+
+
+class SumberTercatat(SumberFirebase):
+    """SumberFirebase ke RTDBLokal yang mencatat ts per poll (seq PollerSensor = poll ke-n)."""
+
+    def __init__(self, nama, path, db, catatan):
+        super().__init__(lambda: True, path, db)
+        self.nama, self.catatan = nama, catatan
+        self.ts_seq = {}
+        self._n = 0
+        self._ts = None
+
+    def ambil(self):
+        node = super().ambil()
+        self._n += 1
+        ts = (node or {}).get('timestamp')
+        self.ts_seq[self._n] = ts
+        if ts is not None and ts != self._ts:
+            self._ts = ts
+            self.catatan.ingest(self.nama, ts)
+        return node
+
+
+class Catatan:
+    """Waktu kirim per (perangkat, ts) dan sampel latensi."""
+
+    def __init__(self):
+        self.kirim = {}
+        self.masuk = set()
+        self.lag_ingest = []
+        self.e2e = []
+
+    def tutup(self, esp, ts):
+        self.kirim[(esp.nama, ts)] = time.perf_counter()
+
+    def ingest(self, nama, ts):
+        t = self.kirim.get((nama, ts))
+        if t is not None:
+            self.lag_ingest.append(time.perf_counter() - t)
+            self.masuk.add((nama, ts))
+
+    def tampil(self, nama, ts):
+        t = self.kirim.get((nama, ts))
+        if t is not None: self.e2e.append(time.perf_counter() - t)
+
+
+def uji(mode, n, laju, durasi, refresh, interval_poll, penilai, master):
+    rtdb = RTDBLokal()
+    catatan = Catatan()
+    armada = ArmadaSimulasi(rtdb, n, laju, gangguan=False, sebelum_tutup=catatan.tutup)
+    armada.siklus_sekali()
+    catatan.kirim.clear()
+
+    if mode == 'stream':
+        konsumen = {nama: StreamTercatat(nama, rtdb.reference(esp.path), catatan, kapasitas=4800).start()
+                    for nama, esp in armada.perangkat.items()}
+        snapshot = lambda nama: konsumen[nama].snapshot()           # noqa: E731
+        ts_seq = {nama: k.ts_seq for nama, k in konsumen.items()}
+    else:
+        sumber = {nama: SumberTercatat(nama, esp.path, rtdb, catatan) for nama, esp in armada.perangkat.items()}
+        konsumen = PollerArmada(sumber, interval=interval_poll)
+        konsumen.start()
+        snapshot = konsumen.snapshot
+        ts_seq = {nama: s.ts_seq for nama, s in sumber.items()}
+
+    pilih = next(iter(armada.perangkat))
+    berhenti = threading.Event()
+    render = [0, 0.0]
+
+    def penonton():
+        tampil = {}
+        while not berhenti.wait(refresh):
+            t0 = time.thread_time()
+            snap = snapshot(pilih)
+            d = snap.data
+            penilai.probabilitas(np.array([[d[k] for k in FITUR_AI]]))
+            for s, k in (('ph', 'ph'), ('tds', 'tds'), ('kelembaban', 'soil_moisture')):
+                master.get_label(s, d[k]), master.status_class(s, d[k])
+            waktu, kolom = snap.riwayat.jendela(500)
+            lttb_gabungan(waktu, {k: kolom[k] for k in ('ph', 'tds', 'soil_moisture', 'water_temp')}, 400)
+            for nama in armada.perangkat:
+                s = snapshot(nama)
+                baris_ringkasan(nama, s)
+                ts = ts_seq[nama].get(s.seq)
+                if ts is not None and tampil.get(nama) != ts:
+                    tampil[nama] = ts
+                    catatan.tampil(nama, ts)
+            render[0] += 1
+            render[1] += time.thread_time() - t0
+
+    th = threading.Thread(target=penonton, name='bench-penonton', daemon=True)
+    cpu0 = time.process_time()
+    mulai = time.perf_counter()
+    armada.start(); th.start()
+    time.sleep(durasi)
+    armada.stop()
+    dt = time.perf_counter() - mulai
+    st = armada.statistik()
+    # Beri waktu konsumen dan penonton mengejar siklus terakhir sebelum dihitung
+    time.sleep(max(interval_poll if mode == 'poll' else 0.0, refresh) + 0.2)
+    berhenti.set(); th.join()
+    cpu_total = time.process_time() - cpu0
+    dt_total = time.perf_counter() - mulai
+    # Stream: callback listener berjalan di thread penulis simulator, jadi dikurangkan dari CPU simulator
+    cpu_ingest = sum(k.cpu for k in konsumen.values()) if mode == 'stream' else konsumen.statistik().cpu
+    cpu_sim = max(0.0, st['cpu'] - (cpu_ingest if mode == 'stream' else 0.0))
+    # Jadwal kirim: fase perangkat ke-i = i/n periode
+    jadwal = sum(int((dt - i / n / laju) * laju) + 1 for i in range(n))
+    if mode == 'stream':
+        for k in konsumen.values(): k.stop()
+    else:
+        konsumen.stop()
+    pct = lambda v, q: float(np.percentile(v, q)) * 1000 if v else float('nan')   # noqa: E731
+    return {
+        'mode': mode, 'n': n, 'laju': laju, 'tercapai': st['terkirim'] / jadwal,
+        'hilang': 1 - len(catatan.masuk) / max(1, len(catatan.kirim)),
+        'lag_p50': pct(catatan.lag_ingest, 50), 'lag_p95': pct(catatan.lag_ingest, 95),
+        'e2e_p50': pct(catatan.e2e, 50), 'e2e_p95': pct(catatan.e2e, 95),
+        'cpu_ingest': cpu_ingest / dt_total, 'cpu_render': render[1] / dt_total, 'cpu_sim': cpu_sim / dt,
+        'cpu_total': cpu_total / dt_total, 'render_ms': render[1] / max(1, render[0]) * 1000,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--perangkat', default='1,10,50,100', help="daftar jumlah perangkat")
+    ap.add_argument('--laju', default='0.5,2', help="daftar siklus kirim per detik per perangkat")
+    ap.add_argument('--mode', default='stream,poll')
+    ap.add_argument('--durasi', type=float, default=4.0, help="detik per konfigurasi")
+    ap.add_argument('--refresh', type=float, default=1.0, help="interval refresh penonton (detik)")
+    ap.add_argument('--interval-poll', type=float, default=1.0)
+    ap.add_argument('--tanpa-cek', action='store_true', help="lewati pemeriksaan simulator")
+    args = ap.parse_args()
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    if not args.tanpa_cek: cek_simulator(cek)
+
+    penilai = muat_penilai()
+    if penilai is None:
+        print("model_naivebayes.pkl / scaler.pkl tidak ada")
+        return 1
+    master = KonfigurasiLive().ambil().master_index
+    print(f"\n{'mode':6} {'prgkt':>5} {'laju/s':>6} {'tercapai':>8} {'hilang':>6} {'lag p50':>8} {'lag p95':>8} "
+          f"{'e2e p50':>8} {'e2e p95':>8} {'CPU ingest':>10} {'render':>7} {'render ms':>9} {'CPU sim':>7} {'proses':>6}")
+    hasil = []
+    for mode in args.mode.split(','):
+        for n in (int(v) for v in args.perangkat.split(',')):
+            for laju in (float(v) for v in args.laju.split(',')):
+                h = uji(mode, n, laju, args.durasi, args.refresh, args.interval_poll, penilai, master)
+                hasil.append(h)
+                print(f"{mode:6} {n:5d} {laju:6.1f} {h['tercapai']:8.0%} {h['hilang']:6.0%} {h['lag_p50']:6.1f}ms {h['lag_p95']:6.1f}ms "
+                      f"{h['e2e_p50']:6.0f}ms {h['e2e_p95']:6.0f}ms {h['cpu_ingest']:10.1%} {h['cpu_render']:7.1%} "
+                      f"{h['render_ms']:9.2f} {h['cpu_sim']:7.1%} {h['cpu_total']:6.0%}")
+    print("lag/e2e dalam ms sejak ESP32 menulis 'timestamp'; hilang = siklus yang tidak pernah ter-ingest; "
+          "CPU dalam % satu core, proses total termasuk simulator")
+
+    kecil = [h for h in hasil if h['n'] == min(x['n'] for x in hasil) and h['laju'] == min(x['laju'] for x in hasil)]
+    for h in kecil:
+        batas_lag = 0.05 if h['mode'] == 'stream' else args.interval_poll + 0.2
+        cek(h['tercapai'] > 0.8 and h['lag_p95'] / 1000 < batas_lag,
+            f"{h['mode']}: laju tercapai dan lag ingest p95 < {batas_lag * 1000:.0f} ms pada beban terkecil")
+        cek(h['e2e_p95'] / 1000 < batas_lag + args.refresh + 0.2,
+            f"{h['mode']}: latensi ujung-ke-ujung p95 < lag + interval refresh")
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Benchmark dan cek PenyimpanBacaan (SQLite WAL).
+
+Mengisi database sementara dengan data 1 Hz dari beberapa perangkat secara
+bertahap, dan setelah tiap tahap mengukur latensi query "1 jam terakhir" dan
+"1 hari terakhir". Latensi seharusnya tetap datar walau total baris tumbuh.
+Lalu memeriksa retensi, kompaksi dan pemuatan ulang riwayat poller.
+
+Jalankan dari root repo:  python bench/bench_store.py [hari_per_tahap] [jumlah_device]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.history import KOLOM_SENSOR  # noqa: E402
+from smartfarm.sources import PollerSensor, SumberPalsu  # noqa: E402
+from smartfarm.store import PenyimpanBacaan  # noqa: E402
+
+T0 = 1_760_000_000.0
+
+
+def data_hari(hari_ke, n_hari, rng):
+    ts = T0 + hari_ke * 86400 + np.arange(int(n_hari * 86400), dtype=float)
+    return ts, {k: rng.normal(50, 10, ts.size) for k in KOLOM_SENSOR}
+
+
+def ukur(fungsi, ulang=20):
+    t0 = time.perf_counter()
+    for _ in range(ulang): hasil = fungsi()
+    return (time.perf_counter() - t0) / ulang * 1000, hasil
+
+
+def main():
+    hari = float(sys.argv[1]) if len(sys.argv) > 1 else 2
+    n_device = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    rng = np.random.default_rng(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        st = PenyimpanBacaan(path)
+        mode = st._baca().execute("PRAGMA journal_mode").fetchone()[0]
+        cek(mode == 'wal', "journal_mode WAL")
+
+        print(f"{'tahap':>5} {'baris total':>12} {'tulis/s':>10} {'1 jam (ms)':>11} {'1 hari (ms)':>12}")
+        latensi = []
+        for tahap in range(4):
+            t_tulis = 0.0; n_tulis = 0
+            for d in range(n_device):
+                ts, kolom = data_hari(tahap * hari, hari, rng)
+                t = time.perf_counter()
+                st.tambah_banyak(ts, kolom, device=f'esp32-{d}')
+                t_tulis += time.perf_counter() - t; n_tulis += ts.size
+            akhir = T0 + (tahap + 1) * hari * 86400 - 1
+            jam, (w, _) = ukur(lambda: st.rentang(akhir - 3600, akhir, device='esp32-0'))
+            sehari, _ = ukur(lambda: st.rentang(akhir - 86400, akhir, device='esp32-0'), ulang=3)
+            latensi.append(jam)
+            print(f"{tahap:>5} {st.jumlah():>12} {n_tulis / t_tulis:>10.0f} {jam:>11.2f} {sehari:>12.1f}")
+            cek(w.size == 3601, f"tahap {tahap}: query 1 jam mengembalikan 3601 baris")
+        cek(latensi[-1] < latensi[0] * 3 + 1, "latensi query 1 jam tidak tumbuh linear dengan ukuran data")
+
+        # Tulis satuan per batch
+        st2 = PenyimpanBacaan(os.path.join(tmp, 'satuan.db'), batch_size=64, flush_interval=3600)
+        for i in range(100): st2.tambah(T0 + i, {'ph': 7.0, 'tds': i})
+        cek(st2.jumlah() == 64, "tambah() di-commit per batch")
+        st2.flush()
+        w, kolom = st2.rentang(T0 + 10, T0 + 19)
+        cek(st2.jumlah() == 100 and kolom['tds'].tolist() == list(range(10, 20))
+            and np.isnan(kolom['rainfall']).all(), "flush() dan query rentang")
+        w, kolom = st2.terakhir(batas=5)
+        cek(kolom['tds'].tolist() == [95, 96, 97, 98, 99], "terakhir(batas) mengambil baris terbaru")
+
+        # Retensi + kompaksi
+        ukuran = os.path.getsize(path)
+        batas = T0 + 3 * hari * 86400
+        t = time.perf_counter()
+        dihapus = st.hapus_sebelum(batas)
+        dt = time.perf_counter() - t
+        st.kompaksi()
+        w, _ = st.rentang(device='esp32-1')
+        cek(dihapus > 0 and w.min() >= batas, f"retensi menghapus {dihapus} baris dalam {dt:.2f} s")
+        print(f"      ukuran file {ukuran / 1e6:.1f} MB -> {os.path.getsize(path) / 1e6:.1f} MB setelah kompaksi")
+        cek(os.path.getsize(path) < ukuran, "kompaksi mengecilkan file")
+
+        # Poller memuat riwayat dari penyimpanan saat start
+        st3 = PenyimpanBacaan(os.path.join(tmp, 'poller.db'), batch_size=1)
+        sumber = SumberPalsu([{'pH': 6.5, 'TDS': 900 + i, 'SoilMoisture': 40} for i in range(5)])
+        poller = PollerSensor(sumber, interval=60, penyimpan=st3)
+        for _ in range(4):
+            time.sleep(0.005)   # ts berbeda per poll (resolusi milidetik)
+            poller.poll_sekali()
+        poller2 = PollerSensor(SumberPalsu([None]), interval=60, penyimpan=st3)
+        cek(poller2.snapshot().riwayat.jendela(6)[1]['tds'][:5].tolist() == [900, 901, 902, 903, 904],
+            "riwayat dimuat ulang dari penyimpanan; data cadangan tidak disimpan")
+        cek(st3.jumlah() == 5, "hanya data sumber asli yang disimpan")
+        for s in (st, st2, st3): s.close()
+
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""Suite benchmark jalur panas dengan baseline yang bisa dibaca mesin.
+
+Setiap kasus diukur pada ukuran satu bacaan dan ukuran batch dengan input
+acak ber-seed tetap (sama di setiap run):
+- trimf / trapmf (array 1 titik dan array batch);
+- fuzzifikasi_input (skalar) dan fuzzifikasi_batch;
+- inferensi_mamdani_baru (skalar) dan inferensi_batch (Mamdani + centroid);
+- defuzzifikasi_centroid (tiga output satu bacaan) dan centroid batch;
+- hitung_diagnosa_cf (skalar) dan diagnosa_batch;
+- get_label_from_master (IndeksMaster.get_label, semua sensor satu bacaan)
+  dan IndeksMaster.label_array;
+- scaler + Naive Bayes (PenilaiNB.probabilitas, 1 baris dan batch);
+- ujung-ke-ujung: satu rerun penuh app.py lewat streamlit.testing (AppTest)
+  setelah form sistem pakar disubmit, auto-refresh mati.
+
+Waktu per panggilan diambil dari beberapa sampel (gc dimatikan, jumlah
+panggilan per sampel dikalibrasi); yang dibandingkan adalah sampel terbaik,
+median ikut dicatat. Hasil disimpan sebagai JSON (bench/baseline.json):
+
+    python bench/bench_suite.py --simpan          # tulis/perbarui baseline
+    python bench/bench_suite.py                   # bandingkan dengan baseline
+    python bench/bench_suite.py --filter diagnosa --ambang 0.5 --json hasil.json
+
+Keluar dengan status 1 jika ada kasus yang lebih lambat dari baseline
+melewati ambang (default 25%). Baseline bergantung pada mesin; sidik mesin
+ikut dicatat dan perbedaannya diperingatkan.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import warnings
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('SMARTFARM_STORE', '')       # rerun e2e tanpa file penyimpanan
+warnings.filterwarnings('ignore')                   # InconsistentVersionWarning sklearn saat unpickle model
+
+from smartfarm.config import muat_knowledge_base, muat_master_data  # noqa: E402
+from smartfarm.diagnosis import diagnosa_batch, hitung_diagnosa_cf  # noqa: E402
+from smartfarm.fuzzy import (  # noqa: E402
+    _centroid_sampled, bobot_himpunan, defuzzifikasi_centroid, fuzzifikasi_batch, fuzzifikasi_input,
+    inferensi_batch, inferensi_mamdani_baru, trapmf, trimf, x_irigasi, x_pestisida, x_pupuk,
+)
+from smartfarm.labels import IndeksMaster  # noqa: E402
+from smartfarm.models import muat_penilai  # noqa: E402
+
+BASELINE = os.path.join(ROOT, 'bench', 'baseline.json')
+SEED = 2026
+BATCH = 10_000
+SAMPEL = 7
+MIN_SAMPEL = 0.02          # detik minimum per sampel (kalibrasi jumlah panggilan)
+AMBANG = 0.25
+VERSI = 1
+
+
+# ==================== INPUT BER-SEED ====================
+def bacaan(n, rng):
+    """Kolom sensor acak di rentang sensor: tds, ph, kelembaban, hujan, suhu udara."""
+    return {
+        'tds': rng.uniform(0, 3000, n), 'ph': rng.uniform(3, 11, n), 'hum': rng.uniform(0, 100, n),
+        'hujan': rng.choice([0.0, 100.0], n), 'air_temp': rng.uniform(14, 42, n),
+    }
+
+
+def kasus(n_batch):
+    """List (nama, ukuran, fungsi tanpa argumen). Setiap kasus menyiapkan inputnya dari SEED."""
+    rng = np.random.default_rng(SEED)
+    b1, bn = bacaan(1, rng), bacaan(n_batch, rng)
+    t1 = tuple(float(b1[k][0]) for k in ('tds', 'ph', 'hum', 'hujan'))
+    tn = tuple(bn[k] for k in ('tds', 'ph', 'hum', 'hujan'))
+    mu1 = fuzzifikasi_input(*t1)
+    agg1 = inferensi_mamdani_baru(mu1)
+    mun = fuzzifikasi_batch(*tn)
+    bobot = bobot_himpunan(mun)
+    kb = muat_knowledge_base()
+    master = IndeksMaster(muat_master_data())
+    label1 = {'ph': t1[1], 'tds': t1[0], 'kelembaban': t1[2], 'curah_hujan': t1[3]}
+    labeln = {'ph': bn['ph'], 'tds': bn['tds'], 'kelembaban': bn['hum'], 'curah_hujan': bn['hujan']}
+    x1 = np.array([0.5]); xn = rng.uniform(0, 3000, n_batch)
+
+    daftar = [
+        ('trimf', 1, lambda: trimf(x1, [0, 0.5, 1])),
+        ('trimf', n_batch, lambda: trimf(xn, [1000, 1600, 2200])),
+        ('trapmf', 1, lambda: trapmf(x1, [0, 0.2, 0.8, 1])),
+        ('trapmf', n_batch, lambda: trapmf(xn, [0, 0, 1000, 1200])),
+        ('fuzzifikasi_input', 1, lambda: fuzzifikasi_input(*t1)),
+        ('fuzzifikasi_input', n_batch, lambda: fuzzifikasi_batch(*tn)),
+        ('inferensi_mamdani_baru', 1, lambda: inferensi_mamdani_baru(mu1)),
+        ('inferensi_mamdani_baru', n_batch, lambda: inferensi_batch(*tn)),
+        ('defuzzifikasi_centroid', 1, lambda: (defuzzifikasi_centroid(x_irigasi, agg1[0]),
+                                               defuzzifikasi_centroid(x_pupuk, agg1[1]),
+                                               defuzzifikasi_centroid(x_pestisida, agg1[2]))),
+        ('defuzzifikasi_centroid', n_batch, lambda: [_centroid_sampled(nama, bobot[nama][s:s + 1024])
+                                                     for nama in ('irigasi', 'pupuk', 'pestisida')
+                                                     for s in range(0, n_batch, 1024)]),
+        ('hitung_diagnosa_cf', 1, lambda: hitung_diagnosa_cf(mu1, kb)),
+        ('hitung_diagnosa_cf', n_batch, lambda: diagnosa_batch(mun, kb)),
+        ('get_label_from_master', 1, lambda: [master.get_label(s, v) for s, v in label1.items()]),
+        ('get_label_from_master', n_batch, lambda: [master.label_array(s, v) for s, v in labeln.items()]),
+    ]
+    penilai = muat_penilai()
+    if penilai is not None:
+        f1 = np.array([[t1[1], float(b1['air_temp'][0]), t1[2], t1[0]]])
+        fn = np.column_stack([bn['ph'], bn['air_temp'], bn['hum'], bn['tds']])
+        daftar += [('nb_predict', 1, lambda: penilai.probabilitas(f1)),
+                   ('nb_predict', n_batch, lambda: penilai.probabilitas(fn))]
+    return daftar
+
+
+# ==================== RERUN UJUNG-KE-UJUNG ====================
+def rerun_app():
+    """Fungsi satu rerun penuh app.py (AppTest, form sudah disubmit); None bila streamlit tidak ada."""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return None
+    sumber = open(os.path.join(ROOT, 'app.py'), encoding='utf-8').read()
+    sumber = sumber.replace('"🔄 Auto-Refresh Sensor", value=True', '"🔄 Auto-Refresh Sensor", value=False')
+    at = AppTest.from_string(sumber, default_timeout=120)
+    at.run()
+    at.radio[0].set_value(at.radio[0].options[0])
+    at.button[0].click(); at.run()
+    if at.exception: raise RuntimeError(at.exception)
+
+    def jalan():
+        # radio Cuaca tidak bisa dibaca ulang oleh AppTest tanpa diset
+        at.radio[0].set_value(at.radio[0].options[0])
+        at.run()
+    return jalan
+
+
+# ==================== PENGUKURAN ====================
+def ukur(fn, sampel=SAMPEL, min_waktu=MIN_SAMPEL):
+    """(terbaik, median) detik per panggilan; jumlah panggilan per sampel dikalibrasi."""
+    fn()                                   # pemanasan (cache, kompilasi indeks)
+    ulang = 1
+    while True:
+        t = time.perf_counter()
+        for _ in range(ulang): fn()
+        dt = time.perf_counter() - t
+        if dt >= min_waktu: break
+        ulang = max(ulang * 2, int(ulang * min_waktu / max(dt, 1e-9) * 1.2))
+    hasil = []
+    gc_aktif = gc.isenabled(); gc.disable()
+    try:
+        for _ in range(sampel):
+            t = time.perf_counter()
+            for _ in range(ulang): fn()
+            hasil.append((time.perf_counter() - t) / ulang)
+    finally:
+        if gc_aktif: gc.enable()
+    return min(hasil), statistics.median(hasil)
+
+
+def sidik_mesin():
+    import numpy
+    return {'python': platform.python_version(), 'numpy': numpy.__version__, 'platform': platform.platform(),
+            'prosesor': platform.processor() or platform.machine(), 'cpu': os.cpu_count()}
+
+
+def bandingkan(hasil, baseline, ambang):
+    """List (kunci, rasio terbaik baru/baseline, regresi?) untuk kasus yang ada di keduanya."""
+    lama = baseline.get('hasil', {})
+    return [(k, v['terbaik_us'] / lama[k]['terbaik_us'], v['terbaik_us'] > lama[k]['terbaik_us'] * (1 + ambang))
+            for k, v in hasil.items() if k in lama and lama[k]['terbaik_us'] > 0]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--simpan', action='store_true', help='tulis hasil sebagai baseline baru')
+    ap.add_argument('--baseline', default=BASELINE)
+    ap.add_argument('--ambang', type=float, default=AMBANG, help='regresi relatif yang ditoleransi (0.25 = 25%%)')
+    ap.add_argument('--batch', type=int, default=BATCH, help='ukuran batch')
+    ap.add_argument('--filter', default='', help='hanya kasus yang namanya memuat teks ini')
+    ap.add_argument('--tanpa-e2e', action='store_true', help='lewati rerun app.py')
+    ap.add_argument('--json', help='tulis hasil run ini ke file JSON')
+    args = ap.parse_args()
+
+    daftar = [k for k in kasus(args.batch) if args.filter in k[0]]
+    if not args.tanpa_e2e and args.filter in 'e2e_rerun':
+        jalan = rerun_app()
+        if jalan is None: print("streamlit tidak terpasang: rerun ujung-ke-ujung dilewati")
+        else: daftar.append(('e2e_rerun', 1, jalan))
+
+    hasil = {}
+    print(f"{'kasus':<32} {'terbaik':>11} {'median':>11} {'per item':>11}")
+    for nama, n, fn in daftar:
+        terbaik, median = ukur(fn)
+        kunci = f"{nama}/{n}"
+        hasil[kunci] = {'ukuran': n, 'terbaik_us': round(terbaik * 1e6, 3), 'median_us': round(median * 1e6, 3),
+                        'per_item_us': round(terbaik * 1e6 / n, 4)}
+        print(f"{kunci:<32} {terbaik * 1e6:9.1f}µs {median * 1e6:9.1f}µs {terbaik * 1e6 / n:9.3f}µs")
+
+    laporan = {'versi': VERSI, 'seed': SEED, 'mesin': sidik_mesin(), 'waktu': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'hasil': hasil}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f: json.dump(laporan, f, indent=2)
+
+    if args.simpan:
+        # Kasus yang tidak diukur kali ini (--filter / --tanpa-e2e) tetap dipertahankan
+        lama = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f: lama = json.load(f).get('hasil', {})
+        laporan['hasil'] = {**lama, **hasil}
+        with open(args.baseline, 'w', encoding='utf-8') as f: json.dump(laporan, f, indent=2, sort_keys=True)
+        print(f"\nbaseline ditulis: {os.path.relpath(args.baseline, ROOT)} ({len(laporan['hasil'])} kasus)")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nbaseline {os.path.relpath(args.baseline, ROOT)} belum ada; jalankan dengan --simpan")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f: baseline = json.load(f)
+    if baseline.get('versi') != VERSI or baseline.get('seed') != SEED:
+        print("\nbaseline dibuat dengan versi suite/seed lain; jalankan ulang dengan --simpan")
+        return 1
+    if baseline.get('mesin') != laporan['mesin']:
+        print(f"\nPERINGATAN: baseline dari mesin lain ({baseline.get('mesin')}); perbandingan kurang berarti")
+    print(f"\nbanding baseline ({baseline.get('waktu')}), ambang +{args.ambang:.0%}:")
+    regresi = []
+    for kunci, rasio, lambat in bandingkan(hasil, baseline, args.ambang):
+        print(f"{'GAGAL' if lambat else 'OK   '} {kunci:<32} {rasio:6.2f}x baseline")
+        if lambat: regresi.append(kunci)
+    baru = [k for k in hasil if k not in baseline.get('hasil', {})]
+    if baru: print(f"tanpa baseline: {', '.join(baru)}")
+    return 1 if regresi else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Cek analitik streaming per bacaan (smartfarm.analitik) dan flag anomali.
+
+Memeriksa:
+- rata-rata EWMA sama dengan pandas ewm(adjust=False), min/max jendela sama
+  dengan rolling min/max brute force, dan kode flag bolak-balik lewat float32;
+- satu probe beku hanya menandai kanalnya, perangkat beku menandai semua kanal;
+- poll ulang node yang sama tidak mengulang flag, perangkat mati bukan beku;
+- pada data simulator (smartfarm.simulator, 10 perangkat x 1 hari): sensor
+  macet terdeteksi, flag palsu pada data bersih jarang, lonjakan yang
+  disuntikkan terdeteksi, nilai di luar rentang ukur ditandai;
+- flag ikut tercatat di riwayat (RingBuffer) dan penyimpanan, termasuk
+  database lama tanpa kolom anomali;
+- biaya per bacaan.
+
+Jalankan dari root repo:  python bench/check_analitik.py [perangkat] [jam]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.analitik import (  # noqa: E402
+    BATAS_DIAM, FLAG_DIAM, FLAG_LONJAKAN, FLAG_LUAR_RENTANG, AnalitikSensor, StatistikKanal,
+    gabung_flag, urai_flag,
+)
+from smartfarm.history import KOLOM_ANOMALI, KOLOM_SENSOR, RingBuffer  # noqa: E402
+from smartfarm.simulator import ESP32Simulasi  # noqa: E402
+from smartfarm.sources import PollerSensor, SumberPalsu, normalisasi_data  # noqa: E402
+from smartfarm.store import PenyimpanBacaan  # noqa: E402
+from smartfarm.stream import FIELD_SENSOR  # noqa: E402
+
+# Nama field firmware -> kanal dashboard
+KANAL = dict(zip(FIELD_SENSOR, ('ph', 'tds', 'water_temp', 'air_temp', 'air_humidity', 'soil_moisture', 'rainfall')))
+
+
+def jalankan_simulasi(n, jam, gangguan, suntik=0.0, seed=1):
+    """Umpankan n perangkat simulasi ke AnalitikSensor. Mengembalikan hitungan deteksi."""
+    rng = random.Random(seed)
+    hasil = {'bacaan': 0, 'macet': 0, 'macet_terdeteksi': 0, 'diam_palsu': 0, 'lonjakan_palsu': 0,
+             'suntik': 0, 'suntik_terdeteksi': 0, 'bersih': 0}
+    lonjakan = {'ph': 0.6, 'tds': 400.0, 'water_temp': 3.0}
+    for i in range(n):
+        esp = ESP32Simulasi(seed=seed * 1000 + i, gangguan=gangguan)
+        an = AnalitikSensor()
+        awal_macet = {}
+        for _ in range(int(jam * 3600 / esp.periode)):
+            langkah = esp.langkah()
+            if langkah is None: continue
+            ts, nilai, _ = langkah
+            t = esp.waktu.timestamp()
+            d = normalisasi_data(nilai)
+            disuntik = None
+            if suntik and rng.random() < suntik and an.jumlah > 50:
+                disuntik = rng.choice(list(lonjakan))
+                d[disuntik] += lonjakan[disuntik] * rng.choice((-1, 1))
+            h = an.perbarui(t, d, ts)
+            flag = urai_flag(h.anomali)
+            hasil['bacaan'] += 1
+            macet = {KANAL[f] for f in esp.macet}
+            for k in macet: awal_macet.setdefault(k, t)
+            for k in list(awal_macet):
+                if k not in macet: del awal_macet[k]
+            for k in KOLOM_SENSOR:
+                f = flag.get(k, 0)
+                if k in macet:
+                    # Episode macet yang sudah melewati batas diam kanal (+ satu periode) harus ditandai
+                    if BATAS_DIAM[k] is not None and t - awal_macet[k] > BATAS_DIAM[k] + esp.periode:
+                        hasil['macet'] += 1
+                        hasil['macet_terdeteksi'] += bool(f & FLAG_DIAM)
+                    continue
+                hasil['bersih'] += 1
+                hasil['diam_palsu'] += bool(f & FLAG_DIAM)
+                if k != disuntik: hasil['lonjakan_palsu'] += bool(f & FLAG_LONJAKAN)
+            if disuntik and disuntik not in macet:
+                hasil['suntik'] += 1
+                hasil['suntik_terdeteksi'] += bool(flag.get(disuntik, 0) & FLAG_LONJAKAN)
+    return hasil
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    jam = float(sys.argv[2]) if len(sys.argv) > 2 else 24
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    # --- State bergulir vs acuan ---
+    rng = np.random.default_rng(3)
+    x = np.cumsum(rng.normal(0, 1, 2000)) + rng.normal(0, 0.5, 2000)
+    st = StatistikKanal(jendela=60)
+    rata, mn, mx = [], [], []
+    for i, v in enumerate(x):
+        st.perbarui(float(i), float(v))
+        s = st.status(float(i), 0)
+        rata.append(s.rata); mn.append(s.minimum); mx.append(s.maksimum)
+    seri = pd.Series(x)
+    cek(np.allclose(rata, seri.ewm(alpha=st.alpha, adjust=False).mean()), "rata-rata EWMA = pandas ewm(adjust=False)")
+    cek(np.array_equal(mn, seri.rolling(60, min_periods=1).min()) and np.array_equal(mx, seri.rolling(60, min_periods=1).max()),
+        "min/max jendela = rolling min/max 60 bacaan")
+    cek(len(st._min) <= 60 and len(st._maks) <= 60, "deque min/max tidak tumbuh melewati jendela")
+    semua = {k: FLAG_DIAM | FLAG_LUAR_RENTANG | FLAG_LONJAKAN for k in KOLOM_SENSOR}
+    kode = gabung_flag(semua)
+    cek(urai_flag(float(np.float32(kode))) == semua and urai_flag(float('nan')) == {} and urai_flag(0) == {},
+        "kode flag bolak-balik lewat float32 (kolom riwayat)")
+
+    # --- Probe beku vs perangkat beku ---
+    an = AnalitikSensor()
+    dasar = {'ph': 6.5, 'tds': 900.0, 'soil_moisture': 60, 'water_temp': 26.0, 'air_temp': 28.0,
+             'air_humidity': 80, 'rainfall': 0}
+    for i in range(200):
+        d = {k: v + (0 if k in ('ph', 'rainfall') else (i % 7) * 0.1) for k, v in dasar.items()}
+        h = an.perbarui(i * 2.0, d, stempel=i)
+    cek(set(urai_flag(h.anomali)) == {'ph'} and urai_flag(h.anomali)['ph'] == FLAG_DIAM and not h.semua_diam,
+        "satu probe beku: hanya kanal pH ber-flag diam, perangkat tidak beku")
+    for i in range(200, 300): h = an.perbarui(i * 2.0, d, stempel=i)
+    cek(h.semua_diam, "perangkat beku (semua kanal sama, stempel tetap maju) ditandai semua_diam")
+    h = an.perbarui(700.0, {**d, 'ph': 15.2}, stempel=350)
+    cek(urai_flag(h.anomali).get('ph', 0) & FLAG_LUAR_RENTANG, "pH 15.2 ditandai luar rentang")
+    jumlah = an.jumlah
+    h = an.perbarui(703.0, {**d, 'ph': 15.2}, stempel=350)
+    cek(not urai_flag(h.anomali).get('ph', 0) & (FLAG_LUAR_RENTANG | FLAG_LONJAKAN) and an.jumlah == jumlah,
+        "poll ulang node yang sama tidak melaporkan ulang flag luar rentang/lonjakan")
+
+    # Perangkat mati: poll ulang node yang sama (stempel tidak maju, atau tanpa stempel) bukan sensor beku
+    mati, tanpa = AnalitikSensor(), AnalitikSensor()
+    for i in range(100):
+        d = {k: v + (i % 7) * 0.1 for k, v in dasar.items()}
+        mati.perbarui(i * 2.0, d, stempel=i); tanpa.perbarui(i * 2.0, d)
+    for i in range(100, 300):
+        h = mati.perbarui(i * 2.0, d, stempel=99); h2 = tanpa.perbarui(i * 2.0, d)
+    cek(not h.semua_diam and not h2.semua_diam and urai_flag(h.anomali).get('ph', 0) & FLAG_DIAM,
+        "perangkat yang berhenti menulis tidak ditandai semua_diam (kanal tetap ber-flag diam)")
+
+    # --- Data simulator ---
+    t = time.perf_counter()
+    bersih = jalankan_simulasi(n, jam, gangguan=False, suntik=0.002)
+    kotor = jalankan_simulasi(n, jam, gangguan=True)
+    dt = time.perf_counter() - t
+    per_bacaan = dt / (bersih['bacaan'] + kotor['bacaan'])
+    print(f"\nsimulasi {n} perangkat x {jam:g} jam ({bersih['bacaan'] + kotor['bacaan']} bacaan)")
+    p_diam = bersih['diam_palsu'] / bersih['bersih']
+    p_lonjak = bersih['lonjakan_palsu'] / bersih['bersih']
+    p_suntik = bersih['suntik_terdeteksi'] / max(1, bersih['suntik'])
+    p_macet = kotor['macet_terdeteksi'] / max(1, kotor['macet'])
+    print(f"  data bersih: diam palsu {p_diam:.3%}, lonjakan palsu {p_lonjak:.3%} per kanal-bacaan")
+    print(f"  lonjakan disuntikkan: {bersih['suntik_terdeteksi']}/{bersih['suntik']} terdeteksi ({p_suntik:.1%})")
+    print(f"  sensor macet (melewati batas diam): {p_macet:.1%} kanal-bacaan ber-flag diam ({kotor['macet']} kanal-bacaan)")
+    cek(p_diam < 0.005 and p_lonjak < 0.005, "flag palsu < 0,5% pada data bersih")
+    cek(bersih['suntik'] > 50 and p_suntik > 0.9, "lonjakan yang disuntikkan terdeteksi > 90%")
+    cek(kotor['macet'] > 0 and p_macet > 0.99, "sensor macet simulator terdeteksi")
+
+    # --- Tercatat di riwayat & penyimpanan ---
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'lama.db')
+        lama = sqlite3.connect(path)
+        lama.execute(f"CREATE TABLE bacaan (device TEXT NOT NULL, ts INTEGER NOT NULL, "
+                     f"{', '.join(k + ' REAL' for k in KOLOM_SENSOR)}, PRIMARY KEY (device, ts)) WITHOUT ROWID")
+        lama.execute(f"INSERT INTO bacaan VALUES ('default', 1000, {', '.join('1' for _ in KOLOM_SENSOR)})")
+        lama.commit(); lama.close()
+        store = PenyimpanBacaan(path)
+        bacaan = [{'pH': 6.5, 'TDS': 900 + i, 'SoilMoisture': 60 + i % 3, 'WaterTemp': 26, 'AirTemp': 28,
+                   'Humidity': 80 + i % 2, 'Rainfall': 0} for i in range(30)] + [{'pH': 15.5, 'TDS': 931}]
+        p = PollerSensor(SumberPalsu(bacaan), interval=3600, penyimpan=store)
+        for _ in range(len(bacaan) - 1):
+            # ts penyimpanan beresolusi milidetik dan (device, ts) yang sama hanya disimpan sekali
+            p.poll_sekali(); time.sleep(0.002)
+        snap = p.snapshot()
+        cek(snap.analitik is not None and urai_flag(snap.data[KOLOM_ANOMALI]).get('ph', 0) & FLAG_LUAR_RENTANG,
+            "snapshot poller membawa hasil analitik dan flag")
+        _, kolom = snap.riwayat.jendela(1)
+        cek(urai_flag(float(kolom[KOLOM_ANOMALI][-1])).get('ph', 0) & FLAG_LUAR_RENTANG, "flag tercatat di ring buffer")
+        store.flush()
+        _, isi = store.terakhir(batas=2)
+        cek(np.isnan(store.rentang(0, 1.5)[1][KOLOM_ANOMALI]).all()
+            and urai_flag(isi[KOLOM_ANOMALI][-1]).get('ph', 0) & FLAG_LUAR_RENTANG,
+            "database lama dimigrasi: kolom anomali ditambahkan dan terisi")
+        p.stop(); store.close()
+    cek(RingBuffer(4).kolom[-1] == KOLOM_ANOMALI, "kolom anomali ada di riwayat default")
+
+    print(f"\nbiaya analitik + simulasi per bacaan: {per_bacaan * 1e6:.1f} µs")
+    an = AnalitikSensor(); d = dict(dasar)
+    mulai = time.perf_counter()
+    for i in range(20000):
+        d['tds'] = 900.0 + i % 50; d['ph'] = 6.5 + (i % 13) * 0.01
+        an.perbarui(i * 2.0, d)
+    biaya = (time.perf_counter() - mulai) / 20000
+    print(f"biaya AnalitikSensor.perbarui per bacaan (7 kanal): {biaya * 1e6:.1f} µs")
+    cek(biaya < 200e-6, "analitik per bacaan < 200 µs")
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""Cek spesifikasi rule Mamdani deklaratif (fuzzy_rules.json, smartfarm.aturan).
+
+Memeriksa:
+- fuzzifikasi, bobot himpunan, dan agregat Mamdani dari spesifikasi sama
+  persis (bitwise) dengan implementasi hard-coded lama (disalin di bawah),
+  baik jalur skalar di grid yang memuat semua titik patah maupun jalur batch
+  pada bacaan acak, termasuk bacaan NaN;
+- term berupa list (OR dalam satu variabel) sama dengan rule yang dipecah;
+- spesifikasi rusak (variabel/term/output/himpunan tidak dikenal, bentuk
+  salah, term wajib hilang) ditolak dengan ValueError;
+- bobot hasil kompilasi sama dengan evaluasi rule satu per satu pada
+  spesifikasi acak, dan waktu evaluasi terhadap jumlah rule (11 .. 10000).
+
+Jalankan dari root repo:  python bench/check_aturan.py [N]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import copy
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm import fuzzy  # noqa: E402
+from smartfarm.aturan import SistemFuzzy  # noqa: E402
+from smartfarm.diagnosis import KUNCI_MU  # noqa: E402
+
+JUMLAH_RULE = (100, 1000, 10000)
+KOLOM = ('irigasi', 'pupuk', 'pestisida')
+
+# ==================== IMPLEMENTASI LAMA (ACUAN) ====================
+# Salinan fuzzifikasi_input, inferensi_mamdani_baru, fuzzifikasi_batch, dan
+# bobot_himpunan sebelum rule dipindah ke fuzzy_rules.json.
+irigasi_sedikit = fuzzy.trapmf(fuzzy.x_irigasi, [0, 0, 1000, 1200])
+irigasi_cukup = fuzzy.trimf(fuzzy.x_irigasi, [1000, 1600, 2200])
+irigasi_banyak = fuzzy.trapmf(fuzzy.x_irigasi, [2000, 2500, 3000, 3000])
+pestisida_kurang = fuzzy.trimf(fuzzy.x_pestisida, [0, 15, 30])
+pestisida_optimal = fuzzy.trimf(fuzzy.x_pestisida, [25, 45, 65])
+pestisida_berlebih = fuzzy.trapmf(fuzzy.x_pestisida, [55, 75, 100, 100])
+pupuk_stop = fuzzy.trapmf(fuzzy.x_pupuk, [0, 0, 10, 25])
+pupuk_sedikit = fuzzy.trimf(fuzzy.x_pupuk, [15, 35, 55])
+pupuk_penuh = fuzzy.trimf(fuzzy.x_pupuk, [45, 62.5, 80])
+
+
+def fuzzifikasi_lama(tds, ph, hum, hujan):
+    mu = {}
+    if tds <= 400: mu['tds_kurang'] = 1.0
+    elif 400 < tds < 500: mu['tds_kurang'] = (500 - tds) / 100.0
+    else: mu['tds_kurang'] = 0.0
+    if 400 <= tds <= 500: mu['tds_ideal'] = (tds - 400) / 100.0
+    elif 500 < tds <= 1900: mu['tds_ideal'] = 1.0
+    elif 1900 < tds < 2100: mu['tds_ideal'] = (2100 - tds) / 200.0
+    else: mu['tds_ideal'] = 0.0
+    if tds <= 1900: mu['tds_lebih'] = 0.0
+    elif 1900 < tds < 2100: mu['tds_lebih'] = (tds - 1900) / 200.0
+    else: mu['tds_lebih'] = 1.0
+
+    if ph <= 6.0: mu['ph_masam'] = 1.0
+    elif 6.0 < ph < 7.0: mu['ph_masam'] = (7.0 - ph) / 1.0
+    else: mu['ph_masam'] = 0.0
+    if 6.0 <= ph <= 7.0: mu['ph_netral'] = (ph - 6.0) / 1.0
+    elif 7.0 < ph <= 8.0: mu['ph_netral'] = 1.0
+    elif 8.0 < ph < 9.0: mu['ph_netral'] = (9.0 - ph) / 1.0
+    else: mu['ph_netral'] = 0.0
+    if ph <= 8.0: mu['ph_basa'] = 0.0
+    elif 8.0 < ph < 9.0: mu['ph_basa'] = (ph - 8.0) / 1.0
+    else: mu['ph_basa'] = 1.0
+
+    if hum <= 28: mu['hum_kering'] = 1.0
+    elif 28 < hum < 38: mu['hum_kering'] = (38 - hum) / 10.0
+    else: mu['hum_kering'] = 0.0
+    if 28 <= hum <= 38: mu['hum_opt'] = (hum - 28) / 10.0
+    elif 38 < hum <= 85: mu['hum_opt'] = 1.0
+    elif 85 < hum < 95: mu['hum_opt'] = (95 - hum) / 10.0
+    else: mu['hum_opt'] = 0.0
+    if hum <= 85: mu['hum_basah'] = 0.0
+    elif 85 < hum < 95: mu['hum_basah'] = (hum - 85) / 10.0
+    else: mu['hum_basah'] = 1.0
+
+    if hujan < 0.5: mu['hujan_cerah'] = 1.0; mu['hujan_turun'] = 0.0
+    else: mu['hujan_cerah'] = 0.0; mu['hujan_turun'] = 1.0
+    return mu
+
+
+def mamdani_lama(mu):
+    tds_k, tds_i, tds_l = mu['tds_kurang'], mu['tds_ideal'], mu['tds_lebih']
+    hum_k, hum_o, hum_b = mu['hum_kering'], mu['hum_opt'], mu['hum_basah']
+    ph_m, ph_n = mu['ph_masam'], mu['ph_netral']
+    hujan_c, hujan_t = mu['hujan_cerah'], mu['hujan_turun']
+    rules_irigasi, rules_pupuk, rules_pesti = [], [], []
+    rules_irigasi.append(np.fmin(hum_k, irigasi_banyak))
+    kondisi_air_berlebih = np.fmax(hum_b, hujan_t)
+    rules_irigasi.append(np.fmin(kondisi_air_berlebih, irigasi_sedikit))
+    rules_irigasi.append(np.fmin(np.fmin(hum_o, hujan_c), irigasi_cukup))
+    rules_pupuk.append(np.fmin(hum_k, pupuk_stop))
+    rules_pupuk.append(np.fmin(ph_m, pupuk_stop))
+    rules_pupuk.append(np.fmin(tds_l, pupuk_stop))
+    rules_pupuk.append(np.fmin(np.fmin(hujan_t, np.fmin(tds_k, ph_n)), pupuk_penuh))
+    rules_pupuk.append(np.fmin(np.fmin(hum_o, np.fmin(ph_n, tds_k)), pupuk_penuh))
+    rules_pupuk.append(np.fmin(np.fmin(hum_o, np.fmin(ph_n, tds_i)), pupuk_sedikit))
+    rules_pesti.append(np.fmin(ph_m, pestisida_berlebih))
+    rules_pesti.append(np.fmin(kondisi_air_berlebih, pestisida_berlebih))
+    rules_pesti.append(np.fmin(np.fmin(hum_k, hujan_c), pestisida_kurang))
+    rules_pesti.append(np.fmin(hum_o, pestisida_optimal))
+    hasil = []
+    for x, rules in ((fuzzy.x_irigasi, rules_irigasi), (fuzzy.x_pupuk, rules_pupuk), (fuzzy.x_pestisida, rules_pesti)):
+        agg = np.zeros_like(x)
+        for r in rules: agg = np.fmax(agg, r)
+        hasil.append(agg)
+    return tuple(hasil)
+
+
+def fuzzifikasi_batch_lama(tds, ph, hum, hujan):
+    mu = {}
+    mu['tds_kurang'] = np.clip((500 - tds) / 100.0, 0.0, 1.0)
+    mu['tds_ideal'] = np.clip(np.minimum((tds - 400) / 100.0, (2100 - tds) / 200.0), 0.0, 1.0)
+    mu['tds_lebih'] = np.clip((tds - 1900) / 200.0, 0.0, 1.0)
+    mu['ph_masam'] = np.clip((7.0 - ph) / 1.0, 0.0, 1.0)
+    mu['ph_netral'] = np.clip(np.minimum((ph - 6.0) / 1.0, (9.0 - ph) / 1.0), 0.0, 1.0)
+    mu['ph_basa'] = np.clip((ph - 8.0) / 1.0, 0.0, 1.0)
+    mu['hum_kering'] = np.clip((38 - hum) / 10.0, 0.0, 1.0)
+    mu['hum_opt'] = np.clip(np.minimum((hum - 28) / 10.0, (95 - hum) / 10.0), 0.0, 1.0)
+    mu['hum_basah'] = np.clip((hum - 85) / 10.0, 0.0, 1.0)
+    mu['hujan_cerah'] = (hujan < 0.5).astype(float)
+    mu['hujan_turun'] = 1.0 - mu['hujan_cerah']
+    return mu
+
+
+def bobot_lama(mu):
+    vektor = isinstance(mu['hum_opt'], np.ndarray)
+    fmin, fmax = (np.fmin, np.fmax) if vektor else (min, max)
+    tds_k, tds_i, tds_l = mu['tds_kurang'], mu['tds_ideal'], mu['tds_lebih']
+    hum_k, hum_o, hum_b = mu['hum_kering'], mu['hum_opt'], mu['hum_basah']
+    ph_m, ph_n = mu['ph_masam'], mu['ph_netral']
+    hujan_c, hujan_t = mu['hujan_cerah'], mu['hujan_turun']
+    air_berlebih = fmax(hum_b, hujan_t)
+    pupuk_penuh_w = fmax(fmin(hujan_t, fmin(tds_k, ph_n)), fmin(hum_o, fmin(ph_n, tds_k)))
+    bobot = {
+        'irigasi': (air_berlebih, fmin(hum_o, hujan_c), hum_k),
+        'pupuk': (fmax(fmax(hum_k, ph_m), tds_l), fmin(hum_o, fmin(ph_n, tds_i)), pupuk_penuh_w),
+        'pestisida': (fmin(hum_k, hujan_c), hum_o, fmax(ph_m, air_berlebih)),
+    }
+    if vektor: bobot = {k: np.stack(v, axis=-1) for k, v in bobot.items()}
+    return bobot
+
+
+# ==================== EVALUASI RULE SATU PER SATU (PEMBANDING) ====================
+def bobot_per_rule(sistem, mu):
+    """Bobot himpunan dengan perulangan Python per rule: operasi NumPy ~ jumlah rule."""
+    n = mu[sistem.kunci[0]].shape[0]
+    bobot = {nama: np.zeros((n, len(sets))) for nama, sets in sistem.himpunan_output.items()}
+    urutan = {nama: {s: k for k, (s, _) in enumerate(sets)} for nama, sets in sistem.himpunan_output.items()}
+    for _, kolom, konsekuen in sistem.rules:
+        kuat = mu[sistem.kunci[kolom[0]]]
+        for j in kolom[1:]: kuat = np.fmin(kuat, mu[sistem.kunci[j]])
+        for nama, s in konsekuen:
+            k = urutan[nama][s]
+            bobot[nama][:, k] = np.fmax(bobot[nama][:, k], kuat)
+    return bobot
+
+
+def spek_acak(spek, n_rule, seed):
+    """Salinan spesifikasi dengan n_rule rule acak (1-3 antesenden, 1-2 konsekuen)."""
+    rng = np.random.default_rng(seed)
+    spek = copy.deepcopy(spek)
+    var = list(spek['input']); out = list(spek['output'])
+    rules = []
+    for i in range(n_rule):
+        jika = {v: str(rng.choice(list(spek['input'][v]))) for v in rng.choice(var, rng.integers(1, 4), replace=False)}
+        maka = {o: str(rng.choice(list(spek['output'][o]['himpunan']))) for o in rng.choice(out, rng.integers(1, 3), replace=False)}
+        rules.append({'id': f"A{i}", 'jika': jika, 'maka': maka})
+    spek['rules'] = rules
+    return spek
+
+
+def terbaik(fn, ulang=3):
+    t_min = float('inf')
+    for _ in range(ulang):
+        t = time.perf_counter(); fn(); t_min = min(t_min, time.perf_counter() - t)
+    return t_min
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    # --- Paritas dengan implementasi lama ---
+    grid = [(t, p, h, r) for t in (0, 350, 400, 450, 500, 1000, 1900, 2000, 2100, 2500)
+            for p in (4.0, 6.0, 6.4, 7.0, 7.5, 8.0, 8.3, 9.0, 10.0)
+            for h in (10, 28, 31.5, 38, 60, 85, 90.25, 95, 99) for r in (0.0, 0.49, 0.5, 3.0)]
+    mu_sama = bobot_sama = agg_sama = True
+    for bacaan in grid:
+        mu, acuan = fuzzy.fuzzifikasi_input(*bacaan), fuzzifikasi_lama(*bacaan)
+        mu_sama &= list(mu.items()) == list(acuan.items())
+        bobot_sama &= fuzzy.bobot_himpunan(mu) == bobot_lama(acuan)
+        agg_sama &= all(np.array_equal(a, b) for a, b in zip(fuzzy.inferensi_mamdani_baru(mu), mamdani_lama(acuan)))
+    cek(mu_sama, f"fuzzifikasi_input = lama, urutan kunci sama ({len(grid)} titik grid termasuk titik patah)")
+    cek(bobot_sama, "bobot_himpunan skalar = lama")
+    cek(agg_sama, "agregat inferensi_mamdani_baru = lama (bitwise)")
+
+    rng = np.random.default_rng(3)
+    data = (rng.uniform(0, 3000, n), rng.uniform(3, 11, n), rng.uniform(0, 100, n),
+            np.where(rng.random(n) < 0.3, rng.uniform(0, 2, n), 0.0))
+    mu, acuan = fuzzy.fuzzifikasi_batch(*data), fuzzifikasi_batch_lama(*data)
+    cek(list(mu) == list(acuan) and all(np.array_equal(mu[k], acuan[k]) for k in acuan),
+        f"fuzzifikasi_batch = lama (N={n})")
+    bobot, bobot_acuan = fuzzy.bobot_himpunan(mu), bobot_lama(acuan)
+    cek(all(np.array_equal(bobot[k], bobot_acuan[k]) for k in KOLOM), "bobot_himpunan batch = lama")
+    satu = fuzzy.inferensi_batch(*(d[:200] for d in data))
+    skalar = [tuple(fuzzy.defuzzifikasi_centroid(fuzzy.SEMESTA_OUTPUT[nama], agg)
+                    for nama, agg in zip(KOLOM, mamdani_lama(fuzzifikasi_lama(*(float(d[i]) for d in data)))))
+              for i in range(200)]
+    cek(np.allclose(np.stack([satu['val_ir'], satu['val_pp'], satu['val_pt']], axis=1), skalar, rtol=0, atol=1e-9),
+        "inferensi_batch = centroid jalur skalar lama")
+
+    # NaN (sensor tidak terbaca): jalur lama jatuh ke cabang else tiap variabel
+    nan = float('nan')
+    bacaan_nan = [b for b in grid[::97] for i in range(4) for b in [b[:i] + (nan,) + b[i + 1:]]] + [(nan,) * 4]
+    cek(all(list(fuzzy.fuzzifikasi_input(*b).items()) == list(fuzzifikasi_lama(*b).items()) for b in bacaan_nan),
+        f"fuzzifikasi_input dengan NaN = lama ({len(bacaan_nan)} bacaan, mis. TDS kurang=0 ideal=0 lebih=1)")
+    kolom_nan = tuple(np.array([b[i] for b in bacaan_nan], dtype=float) for i in range(4))
+    mu_nan = fuzzy.fuzzifikasi_batch(*kolom_nan)
+    cek(all(np.array_equal(mu_nan[k], [fuzzifikasi_lama(*b)[k] for b in bacaan_nan]) for k in mu_nan),
+        "fuzzifikasi_batch dengan NaN = lama per bacaan")
+    satu = fuzzy.inferensi_batch(*kolom_nan)
+    skalar = [tuple(fuzzy.defuzzifikasi_centroid(fuzzy.SEMESTA_OUTPUT[nama], agg)
+                    for nama, agg in zip(KOLOM, mamdani_lama(fuzzifikasi_lama(*b)))) for b in bacaan_nan]
+    cek(np.allclose(np.stack([satu['val_ir'], satu['val_pp'], satu['val_pt']], axis=1), skalar, rtol=0, atol=1e-9),
+        "inferensi_batch dengan NaN = centroid jalur skalar lama")
+
+    # --- OR dalam satu variabel ---
+    spek = fuzzy.SISTEM.spek
+    atau, pecah = copy.deepcopy(spek), copy.deepcopy(spek)
+    maka = {'irigasi': 'sedikit', 'pestisida': 'berlebih'}
+    atau['rules'].append({'id': 'X1', 'jika': {'hum': ['kering', 'basah'], 'ph': ['masam', 'basa']}, 'maka': maka})
+    pecah['rules'] += [{'id': 'X1', 'jika': {'hum': h, 'ph': p}, 'maka': maka}
+                       for h in ('kering', 'basah') for p in ('masam', 'basa')]
+    b_atau, b_pecah = SistemFuzzy(atau).bobot(mu), SistemFuzzy(pecah).bobot(mu)
+    cek(len(SistemFuzzy(atau).rules) == len(pecah['rules'])
+        and all(np.array_equal(b_atau[k], b_pecah[k]) for k in KOLOM),
+        "term list (OR) dipecah jadi rule AND dengan bobot setara")
+
+    # --- Validasi spesifikasi ---
+    def rusak(ubah):
+        s = copy.deepcopy(spek); ubah(s)
+        try:
+            SistemFuzzy(s, kunci_wajib=KUNCI_MU, output_wajib=KOLOM)
+        except ValueError:
+            return True
+        return False
+
+    kasus = {
+        'variabel tidak dikenal': lambda s: s['rules'][0]['jika'].update(suhu='panas'),
+        'term tidak dikenal': lambda s: s['rules'][0]['jika'].update(hum='lembek'),
+        'output tidak dikenal': lambda s: s['rules'][0]['maka'].update(kapur='banyak'),
+        'himpunan tidak dikenal': lambda s: s['rules'][0]['maka'].update(irigasi='deras'),
+        'titik menurun': lambda s: s['input']['tds'].update(ideal=[500, 400, 1900, 2100]),
+        'bahu null tidak berpasangan': lambda s: s['input']['tds'].update(kurang=[None, 300, 400, 500]),
+        'sisi crisp salah': lambda s: s['input']['hujan'].update(turun={'ambang': 0.5, 'sisi': 'kiri'}),
+        'term wajib hilang': lambda s: s['input']['ph'].pop('basa'),
+        'rule tanpa maka': lambda s: s['rules'][0].pop('maka'),
+        'semesta rusak': lambda s: s['output']['pupuk'].update(semesta=[100, 0, 500]),
+    }
+    ditolak = [nama for nama, ubah in kasus.items() if rusak(ubah)]
+    cek(len(ditolak) == len(kasus), f"spesifikasi rusak ditolak ValueError ({len(ditolak)}/{len(kasus)}: "
+        f"{', '.join(sorted(set(kasus) - set(ditolak))) or 'semua'})")
+    cek(not rusak(lambda s: json.loads(json.dumps(s))), "spesifikasi bolak-balik JSON tetap valid")
+
+    # --- Skala jumlah rule ---
+    # Satu bacaan: biaya didominasi overhead per operasi NumPy, di sini bentuk matriks
+    # (jumlah operasi tetap) dibandingkan dengan evaluasi per rule (operasi ~ jumlah rule).
+    # N besar: keduanya dibatasi bandwidth memori, biaya per bacaan x rule kira-kira tetap.
+    mu1 = {k: v[:1] for k, v in mu.items()}
+    print(f"\nbobot himpunan vs jumlah rule (terbaik dari 3; matriks = SistemFuzzy.bobot, loop = per rule)")
+    print(f"{'rule':>7} {'kompilasi ms':>13} {'N=1 matriks us':>15} {'loop us':>10} "
+          f"{f'N={n} matriks ms':>19} {'loop ms':>9} {'ns/bacaan/rule':>15}")
+    for n_rule in (len(fuzzy.SISTEM.rules),) + JUMLAH_RULE:
+        s = spek if n_rule == len(fuzzy.SISTEM.rules) else spek_acak(spek, n_rule, seed=n_rule)
+        t = time.perf_counter(); sistem = SistemFuzzy(s); t_kompilasi = time.perf_counter() - t
+        r = len(sistem.rules)
+        t1_matriks = terbaik(lambda: [sistem.bobot(mu1) for _ in range(20)]) / 20
+        t1_loop = terbaik(lambda: [bobot_per_rule(sistem, mu1) for _ in range(20)]) / 20
+        t_matriks = terbaik(lambda: sistem.bobot(mu))
+        t_loop = terbaik(lambda: bobot_per_rule(sistem, mu), ulang=1 if r > 1000 else 3)
+        print(f"{r:>7} {t_kompilasi * 1000:>13.1f} {t1_matriks * 1e6:>15.1f} {t1_loop * 1e6:>10.1f} "
+              f"{t_matriks * 1000:>19.1f} {t_loop * 1000:>9.1f} {t_matriks / n / r * 1e9:>15.2f}")
+        b, b_loop = sistem.bobot(mu), bobot_per_rule(sistem, mu)
+        cek(all(np.array_equal(b[k], b_loop[k]) for k in KOLOM), f"{r} rule: bobot matriks = evaluasi per rule")
+        skalar = sistem.bobot({k: float(v[0]) for k, v in mu.items()})
+        cek(all(skalar[k] == tuple(b[k][0]) for k in KOLOM), f"{r} rule: bobot satu bacaan (mu skalar) = baris matriks")
+        if r > len(fuzzy.SISTEM.rules):
+            cek(t1_matriks < t1_loop, f"{r} rule: satu bacaan lebih cepat dengan bentuk matriks")
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
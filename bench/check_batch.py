@@ -0,0 +1,100 @@
+"""Cek paritas jalur batch (inferensi_batch / inferensi_frame) dengan jalur skalar.
+
+Acuan: fuzzifikasi_input + inferensi_mamdani_baru + defuzzifikasi_centroid per
+bacaan, persis seperti yang dipanggil app.py. Memeriksa:
+- derajat keanggotaan dan dosis sama persis pada grid yang memuat semua titik
+  patah input dan pada bacaan acak;
+- hasil tidak bergantung pada chunk_size (1, batas potongan persis, N-1, N+1,
+  dan potongan yang menyisakan sebagian);
+- input skalar, N=0, dan inferensi_frame (indeks DataFrame dipertahankan).
+
+Jalankan dari root repo:  python bench/check_batch.py [N]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import itertools
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.fuzzy import (  # noqa: E402
+    AMBANG_HUJAN, CHUNK_SIZE, SEMESTA_OUTPUT, TITIK_INPUT, defuzzifikasi_centroid,
+    fuzzifikasi_input, inferensi_batch, inferensi_frame, inferensi_mamdani_baru,
+)
+
+KOLOM = (('val_ir', 'irigasi'), ('val_pp', 'pupuk'), ('val_pt', 'pestisida'))
+
+
+def skalar(tds, ph, hum, hujan):
+    mu = fuzzifikasi_input(tds, ph, hum, hujan)
+    agg = inferensi_mamdani_baru(mu)
+    hasil = {k: defuzzifikasi_centroid(SEMESTA_OUTPUT[nama], a) for (k, nama), a in zip(KOLOM, agg)}
+    hasil.update(mu)
+    return hasil
+
+
+def acuan(data):
+    baris = [skalar(*(float(a[i]) for a in data)) for i in range(len(data[0]))]
+    return {k: np.array([b[k] for b in baris], dtype=float) for k in baris[0]}
+
+
+def titik_grid(var):
+    # Titik patah, titik tengahnya, dan sedikit di luar tiap ujung
+    t = sorted({float(x) for interval in TITIK_INPUT[var] for x in interval})
+    tengah = [(a + b) / 2 for a, b in zip(t, t[1:])]
+    return sorted(set(t + tengah + [t[0] - 1, t[-1] + 1, np.nextafter(t[0], -np.inf), np.nextafter(t[-1], np.inf)]))
+
+
+def bacaan_acak(n, seed=7):
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(0, 3000, n), rng.uniform(4, 10, n),
+            rng.uniform(0, 100, n), rng.integers(0, 2, n).astype(float))
+
+
+def sama(a, b):
+    return all(np.array_equal(a[k], b[k]) for k in b)
+
+
+def main(n=5000):
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    hujan = (0.0, np.nextafter(AMBANG_HUJAN, 0), AMBANG_HUJAN, 1.0)
+    grid = [np.array(v, dtype=float) for v in zip(*itertools.product(
+        titik_grid('tds'), titik_grid('ph'), titik_grid('hum'), hujan))]
+    ref = acuan(grid)
+    cek(sama(inferensi_batch(*grid), ref), f"grid titik patah ({grid[0].size} bacaan) sama dengan jalur skalar")
+
+    data = bacaan_acak(n)
+    ref = acuan(data)
+    cek(sama(inferensi_batch(*data), ref), f"bacaan acak (N={n}) sama dengan jalur skalar")
+
+    ukuran = sorted({1, 7, CHUNK_SIZE, n // 3, n - 1, n, n + 1, 2 * n})
+    beda = [c for c in ukuran if not sama(inferensi_batch(*data, chunk_size=c), ref)]
+    cek(not beda, f"hasil tidak bergantung chunk_size {ukuran}" + (f" (beda: {beda})" if beda else ""))
+    pas = [a[:2 * CHUNK_SIZE] for a in data]
+    cek(sama(inferensi_batch(*pas), {k: v[:2 * CHUNK_SIZE] for k, v in ref.items()}),
+        "N kelipatan tepat CHUNK_SIZE")
+
+    satu = inferensi_batch(1200.0, 6.5, 33.0, 1.0)
+    ref1 = skalar(1200.0, 6.5, 33.0, 1.0)
+    cek(all(satu[k].shape == (1,) and satu[k][0] == ref1[k] for k in ref1), "input skalar -> array panjang 1")
+    kosong = inferensi_batch(*(np.empty(0),) * 4)
+    cek(all(kosong[k].shape == (0,) for k, _ in KOLOM), "N=0 menghasilkan array kosong")
+
+    df = pd.DataFrame({'tds': data[0], 'ph': data[1], 'humidity': data[2], 'rain': data[3]},
+                      index=pd.RangeIndex(100, 100 + n, name='baris'))
+    hasil = inferensi_frame(df, chunk_size=333)
+    cek(hasil.index.equals(df.index) and all(np.array_equal(hasil[k].to_numpy(), ref[k]) for k, _ in KOLOM),
+        "inferensi_frame mempertahankan indeks dan sama dengan jalur skalar")
+
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,106 @@
+"""Pemeriksaan konfigurasi terkompilasi dengan hot reload (smartfarm.config.KonfigurasiLive).
+
+Membandingkan biaya per rerun cara lama (baca + parse JSON, kompilasi
+IndeksRule dan IndeksMaster setiap rerun) dengan ambil() yang hanya
+mengecek mtime, lalu memeriksa perilaku hot reload pada salinan file di
+direktori sementara: touch tanpa perubahan isi, suntingan rule, JSON rusak
+saat disunting, suntingan master data, dan suntingan CSS.
+
+Jalankan dari root repo:  python bench/check_config.py
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.config import (  # noqa: E402
+    CSS_FILE, KB_FILE, MASTER_FILE, KonfigurasiLive, muat_knowledge_base, muat_master_data,
+)
+from smartfarm.diagnosis import IndeksRule  # noqa: E402
+from smartfarm.labels import IndeksMaster  # noqa: E402
+
+ULANG = 200
+
+
+def waktu_per_panggil(fn, ulang=ULANG):
+    t = time.perf_counter()
+    for _ in range(ulang): fn()
+    return (time.perf_counter() - t) / ulang
+
+
+def tulis(path, isi, maju=1):
+    """Tulis file dan majukan mtime (mtime sistem file bisa kasar)."""
+    with open(path, 'w', encoding='utf-8') as f: f.write(isi)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + maju * 1_000_000_000))
+
+
+def main():
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    # Biaya per rerun
+    def cara_lama():
+        kb = muat_knowledge_base(KB_FILE)
+        IndeksRule(kb)
+        IndeksMaster(muat_master_data(MASTER_FILE))
+        with open(CSS_FILE, encoding='utf-8') as f: f.read()
+    live = KonfigurasiLive()
+    lama, baru = waktu_per_panggil(cara_lama), waktu_per_panggil(live.ambil)
+    print(f"per rerun: parse + kompilasi {lama * 1e6:.0f} µs, ambil() {baru * 1e6:.1f} µs ({lama / baru:.0f}x)")
+    cek(baru < lama / 10, "ambil() jauh lebih murah daripada parse + kompilasi per rerun")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        kb_path, master_path, css_path = (os.path.join(tmp, os.path.basename(p)) for p in (KB_FILE, MASTER_FILE, CSS_FILE))
+        for asal, tujuan in ((KB_FILE, kb_path), (MASTER_FILE, master_path), (CSS_FILE, css_path)):
+            shutil.copy(asal, tujuan)
+        live = KonfigurasiLive(kb_path, master_path, css_path)
+        k1 = live.ambil()
+        cek(k1 is live.ambil(), "tanpa perubahan file, objek konfigurasi yang sama dipakai ulang")
+        cek(k1.css.startswith('<style>') and '/*' not in k1.css, "CSS diringkas dan dibungkus <style>")
+
+        # touch tanpa perubahan isi: mtime berubah, hash sama -> tidak dikompilasi ulang
+        st = os.stat(kb_path)
+        os.utime(kb_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        cek(live.ambil() is k1, "touch tanpa perubahan isi tidak memicu kompilasi ulang")
+
+        # Suntingan rule: satu rule dibuang
+        kb = json.loads(open(kb_path, encoding='utf-8').read())
+        tulis(kb_path, json.dumps(kb[:-1]), maju=2)
+        k2 = live.ambil()
+        cek(k2.versi == k1.versi + 1 and len(k2.kb) == len(k1.kb) - 1 and len(k2.kb_index) == len(k2.kb),
+            "suntingan knowledge_base.json langsung terkompilasi ulang")
+        cek(k2.master_index is k1.master_index, "master data yang tidak berubah tidak dikompilasi ulang")
+
+        # JSON rusak (editor baru menyimpan sebagian): versi valid terakhir tetap dipakai
+        tulis(kb_path, json.dumps(kb)[:100], maju=3)
+        k3 = live.ambil(); live.ambil()
+        cek(k3 is k2 and live.gagal == 1 and live.galat is not None,
+            "JSON rusak tidak menggantikan konfigurasi valid dan dihitung sekali")
+        tulis(kb_path, json.dumps(kb), maju=4)
+        k4 = live.ambil()
+        cek(len(k4.kb) == len(kb) and k4.versi == k2.versi + 1, "setelah diperbaiki, rule terbaru dipakai")
+
+        # Master data dan CSS
+        master = json.loads(open(master_path, encoding='utf-8').read())
+        sensor = next(iter(master['definitions']))
+        master['definitions'][sensor] = []
+        tulis(master_path, json.dumps(master), maju=5)
+        k5 = live.ambil()
+        cek(k5.master[sensor] == [] and k5.kb_index is k4.kb_index, "suntingan master_data.json terkompilasi ulang")
+        tulis(css_path, ".sensor-card { color: red; }", maju=6)
+        cek(live.ambil().css == "<style>.sensor-card{color:red;}</style>", "suntingan style.css langsung dipakai")
+        cek(len({k1.sidik, k2.sidik, k4.sidik, k5.sidik}) == 4, "sidik berubah mengikuti isi konfigurasi")
+
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
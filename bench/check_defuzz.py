@@ -0,0 +1,94 @@
+"""Cek ketepatan centroid eksak (centroid_eksak, inferensi_batch metode='exact').
+
+Memeriksa:
+- selisih sampled vs exact per output tidak melebihi satu langkah grid
+  semesta, pada bacaan acak, grid titik patah input, dan bobot himpunan acak
+  (termasuk bobot kembar dan himpunan nonaktif);
+- jalur skalar (tuple bobot) sama dengan jalur batch;
+- kasus yang diketahui jawabannya: semua bobot nol -> 0, satu himpunan
+  simetris penuh -> titik puncaknya, bobot tak-nol pada himpunan bahu.
+
+Waktu per inferensi ada di bench/bench_defuzz.py.
+
+Jalankan dari root repo:  python bench/check_defuzz.py [N]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import itertools
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.fuzzy import (  # noqa: E402
+    HIMPUNAN_OUTPUT, OUTPUT, SEMESTA_OUTPUT, TITIK_INPUT, centroid_eksak, defuzzifikasi_centroid,
+    inferensi_batch, keanggotaan,
+)
+
+KOLOM = dict(zip(OUTPUT, ('val_ir', 'val_pp', 'val_pt')))
+
+
+def langkah(nama):
+    x = SEMESTA_OUTPUT[nama]
+    return float(x[1] - x[0])
+
+
+def sampled(nama, w):
+    # Acuan sampling: agregat max-min di semesta rapat lalu centroid diskret
+    x = SEMESTA_OUTPUT[nama]
+    agg = np.zeros_like(x)
+    for wk, (_, titik) in zip(w, HIMPUNAN_OUTPUT[nama]): np.fmax(agg, np.fmin(wk, keanggotaan(x, titik)), out=agg)
+    return defuzzifikasi_centroid(x, agg)
+
+
+def bobot_acak(n, seed=3):
+    rng = np.random.default_rng(seed)
+    w = rng.uniform(0, 1, (n, 3)) * (rng.uniform(0, 1, (n, 3)) > 0.3)
+    w[::5, 1] = w[::5, 0]                        # bobot kembar
+    w[::11] = np.round(w[::11], 1)               # level tepat di 0.1, 0.2, ...
+    w[::13, :] = 0.0; w[::13, 2] = 1.0           # satu himpunan penuh
+    return w
+
+
+def main(n=20000):
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    rng = np.random.default_rng(42)
+    data = (rng.uniform(0, 3000, n), rng.uniform(4, 10, n), rng.uniform(0, 100, n), rng.integers(0, 2, n).astype(float))
+    patah = [sorted({float(x) for iv in TITIK_INPUT[v] for x in iv} | {0.0, 1e4}) for v in ('tds', 'ph', 'hum')]
+    grid = [np.array(v, dtype=float) for v in zip(*itertools.product(*patah, (0.0, 1.0)))]
+    for label, bacaan in ((f"bacaan acak N={n}", data), (f"grid titik patah N={grid[0].size}", grid)):
+        s = inferensi_batch(*bacaan, metode='sampled'); e = inferensi_batch(*bacaan, metode='exact')
+        for nama in OUTPUT:
+            diff = np.abs(s[KOLOM[nama]] - e[KOLOM[nama]]).max()
+            cek(diff <= langkah(nama), f"{label}: {nama} sampled vs exact maks {diff:.4f} <= langkah grid {langkah(nama):.4f}")
+
+    w_semua = bobot_acak(2000)
+    for nama in OUTPUT:
+        e = centroid_eksak(nama, w_semua)
+        s = np.array([sampled(nama, w) for w in w_semua])
+        diff = np.abs(s - e).max()
+        cek(diff <= langkah(nama), f"bobot acak: {nama} sampled vs exact maks {diff:.4f} <= {langkah(nama):.4f}")
+        skalar = np.array([centroid_eksak(nama, tuple(w)) for w in w_semua.tolist()])
+        cek(np.allclose(skalar, e, rtol=0, atol=1e-9), f"bobot acak: {nama} jalur skalar sama dengan batch")
+
+    for nama in OUTPUT:
+        cek(centroid_eksak(nama, (0.0, 0.0, 0.0)) == 0.0 and centroid_eksak(nama, np.zeros((2, 3))).tolist() == [0.0, 0.0],
+            f"{nama}: semua bobot nol -> 0")
+        for k, (s, titik) in enumerate(HIMPUNAN_OUTPUT[nama]):
+            w = [0.0] * 3; w[k] = 1.0
+            c = centroid_eksak(nama, tuple(w))
+            if len(titik) == 3 and titik[1] - titik[0] == titik[2] - titik[1]:
+                cek(abs(c - titik[1]) < 1e-9, f"{nama}.{s} penuh -> puncak {titik[1]} (dapat {c:.6f})")
+            else:
+                cek(abs(c - sampled(nama, w)) <= langkah(nama), f"{nama}.{s} penuh dekat sampled ({c:.4f})")
+
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
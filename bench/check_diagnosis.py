@@ -0,0 +1,169 @@
+"""Cek paritas diagnosa CF terkompilasi (smartfarm.diagnosis) dengan perulangan rule lama.
+
+Acuan: hitung_diagnosa_cf sebelum knowledge base dikompilasi (disalin di
+bawah): perulangan per rule, skor = min(derajat 4 kondisi) x cf, rule pertama
+menang bila skor sama, rule rusak dilewati, dan fallback rules_db[0] dengan
+keyakinan -100 bila tidak ada skor > -1. Memeriksa hitung_diagnosa_cf
+(terbaik_satu), diagnosa_batch (terbaik, termasuk melewati batas CHUNK_RULE),
+top_k / diagnosa_top_k (urutan menurun, skor sama urut rule) pada:
+- knowledge_base.json dengan bacaan acak dan grid titik patah (banyak skor kembar);
+- knowledge base acak berisi rule rusak (kunci hilang, term tidak dikenal,
+  cf bukan angka/None, bukan dict), cf negatif, dan rule duplikat;
+- knowledge base kosong, semua rule rusak, dan semua cf negatif (fallback -100);
+- IndeksRule yang sudah dikompilasi diterima langsung tanpa kompilasi ulang.
+
+Jalankan dari root repo:  python bench/check_diagnosis.py [N]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import copy
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.config import muat_knowledge_base  # noqa: E402
+from smartfarm.diagnosis import (  # noqa: E402
+    CHUNK_RULE, KUNCI_MU, MAPPING_KONDISI, RULE_ERROR, IndeksRule, diagnosa_batch, diagnosa_top_k, hitung_diagnosa_cf,
+    kompilasi_rule,
+)
+from smartfarm.fuzzy import TITIK_INPUT, fuzzifikasi_input  # noqa: E402
+
+
+# ==================== IMPLEMENTASI LAMA (ACUAN) ====================
+def diagnosa_lama(mu, rules_db):
+    mapping = {
+        "ph": {"masam": "ph_masam", "netral": "ph_netral", "basa": "ph_basa"},
+        "tds": {"kurang": "tds_kurang", "ideal": "tds_ideal", "berlebih": "tds_lebih"},
+        "kelembaban": {"kering": "hum_kering", "lembab": "hum_opt", "basah": "hum_basah"},
+        "curah_hujan": {"cerah": "hujan_cerah", "hujan": "hujan_turun"}
+    }
+    best_rule = None; max_belief = -1.0
+    for rule in rules_db:
+        try:
+            conds = rule['conditions']
+            val_ph   = mu.get(mapping["ph"].get(conds["ph"]), 0.0)
+            val_tds  = mu.get(mapping["tds"].get(conds["tds"]), 0.0)
+            val_hum  = mu.get(mapping["kelembaban"].get(conds["kelembaban"]), 0.0)
+            val_rain = mu.get(mapping["curah_hujan"].get(conds["curah_hujan"]), 0.0)
+            fire_strength = min(val_ph, val_tds, val_hum, val_rain)
+            rule_cf_val = rule.get('results', {}).get('cf', 0.0)
+            current_score = fire_strength * rule_cf_val
+            if current_score > max_belief:
+                max_belief = current_score; best_rule = rule
+        except Exception: continue
+    if best_rule is None and rules_db: best_rule = rules_db[0]
+    elif best_rule is None: best_rule = RULE_ERROR
+    return best_rule, max_belief * 100
+
+
+def skor_lama(mu, rules_db):
+    """(posisi rule, skor %) semua rule valid dengan rumus perulangan lama, urut rules_db."""
+    hasil = []
+    for i, rule in enumerate(rules_db):
+        try:
+            conds = rule['conditions']
+            kuat = min(mu.get(MAPPING_KONDISI[v].get(conds[v]), 0.0) for v in MAPPING_KONDISI)
+            hasil.append((i, kuat * rule.get('results', {}).get('cf', 0.0) * 100))
+        except Exception: continue
+    return hasil
+
+
+def top_k_lama(mu, rules_db, k):
+    urut = sorted(skor_lama(mu, rules_db), key=lambda p: -p[1])    # sorted() stabil: skor sama urut rule
+    return urut[:k]
+
+
+# ==================== DATA UJI ====================
+def mu_acak(rng, n):
+    # Setengah dari bacaan acak, setengah dari titik patah (derajat 0/1/0.5 -> banyak skor kembar)
+    patah = {v: sorted({float(x) for iv in TITIK_INPUT[v] for x in iv}) for v in TITIK_INPUT}
+    daftar = []
+    for i in range(n):
+        if i % 2:
+            t, p, h = (float(rng.choice(patah[v] + [(patah[v][0] + patah[v][1]) / 2])) for v in ('tds', 'ph', 'hum'))
+        else:
+            t, p, h = rng.uniform(0, 3000), rng.uniform(4, 10), rng.uniform(0, 100)
+        daftar.append(fuzzifikasi_input(t, p, h, float(rng.integers(0, 2))))
+    return daftar
+
+
+def kb_acak(rng, kb, n):
+    """Knowledge base acak dari rule asli: cf diacak/dibulatkan, disisipi rule rusak dan duplikat."""
+    hasil = []
+    for _ in range(n):
+        rule = copy.deepcopy(kb[int(rng.integers(len(kb)))])
+        rule['results']['cf'] = float(rng.choice([0.5, 0.8, 1.0, -0.3, rng.uniform(-1, 1)]))
+        rusak = int(rng.integers(12))
+        if rusak == 0: del rule['conditions'][str(rng.choice(list(MAPPING_KONDISI)))]
+        elif rusak == 1: rule['conditions']['tds'] = 'tidak_dikenal'
+        elif rusak == 2: rule['results']['cf'] = 'tinggi'
+        elif rusak == 3: rule['results']['cf'] = None
+        elif rusak == 4: del rule['results']['cf']
+        elif rusak == 5: del rule['results']
+        elif rusak == 6: rule = None
+        elif rusak == 7: rule['conditions']['ph'] = ['masam']
+        elif rusak == 8 and hasil: rule = copy.deepcopy(hasil[-1])
+        hasil.append(rule)
+    return hasil
+
+
+def main(n=3000):
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    rng = np.random.default_rng(5)
+    kb = muat_knowledge_base()
+    semua_mu = mu_acak(rng, n)
+    kbs = [('knowledge_base.json', kb)]
+    kbs += [(f'kb acak #{i}', kb_acak(rng, kb, int(rng.integers(1, 80)))) for i in range(12)]
+    kbs += [('kb kosong', []), ('kb semua rusak', [None, {'conditions': {}}, {'results': {'cf': 1}}]),
+            ('kb semua cf negatif', [dict(copy.deepcopy(r), results=dict(r['results'], cf=-1.0)) for r in kb[:5]]),
+            ('kb cf -2 (skor <= -1)', [dict(copy.deepcopy(r), results=dict(r['results'], cf=-2.0)) for r in kb[:5]])]
+
+    batch_mu = {k: np.array([m[k] for m in semua_mu]) for k in KUNCI_MU}
+    cek(n > CHUNK_RULE, f"N={n} melewati batas potongan CHUNK_RULE={CHUNK_RULE}")
+    for label, rules in kbs:
+        acuan = [diagnosa_lama(m, rules) for m in semua_mu]
+        baru = [hitung_diagnosa_cf(m, rules) for m in semua_mu]
+        cek(all(a[0] is b[0] and a[1] == b[1] for a, b in zip(acuan, baru)),
+            f"{label}: hitung_diagnosa_cf sama dengan perulangan lama (rule & keyakinan)")
+
+        posisi = {id(r): i for i, r in reversed(list(enumerate(rules)))}
+        idx_ref = np.array([posisi.get(id(r), -1) for r, _ in acuan])
+        bel_ref = np.array([b for _, b in acuan])
+        idx, bel = diagnosa_batch(batch_mu, rules)
+        cek(np.array_equal(idx, idx_ref) and np.array_equal(bel, bel_ref), f"{label}: diagnosa_batch sama per bacaan")
+
+        k = 4
+        idx_k, bel_k = kompilasi_rule(rules).top_k(batch_mu, k)
+        cocok = True
+        for i, m in enumerate(semua_mu):
+            ref = top_k_lama(m, rules, k)
+            cocok &= list(idx_k[i, :len(ref)]) == [p for p, _ in ref] and np.allclose(bel_k[i, :len(ref)], [s for _, s in ref], rtol=0, atol=1e-12)
+            cocok &= bool((idx_k[i, len(ref):] == -1).all() and np.isnan(bel_k[i, len(ref):]).all())
+        cek(cocok, f"{label}: top_k urut menurun, skor sama urut rule, kolom sisa -1/NaN")
+
+        # Diagnosa utama = alternatif pertama (app.py menampilkan top_k[1:] sebagai alternatif)
+        konsisten = all(not t or t[0][0] is b[0] for m, b in zip(semua_mu[:300], baru)
+                        for t in [diagnosa_top_k(m, rules, 3)] if b[1] > -100)
+        cek(konsisten, f"{label}: diagnosa_top_k[0] sama dengan hitung_diagnosa_cf")
+
+    # IndeksRule yang sudah dikompilasi (Konfigurasi.kb_index di app.py) dipakai apa adanya:
+    # hasil sama dan cache satu slot kompilasi_rule tidak tersentuh
+    indeks = IndeksRule(kb)
+    sama = all(hitung_diagnosa_cf(m, indeks) == hitung_diagnosa_cf(m, kb)
+               and diagnosa_top_k(m, indeks, 3) == diagnosa_top_k(m, kb, 3) for m in semua_mu[:300])
+    cek(sama and kompilasi_rule(indeks) is indeks, "IndeksRule terkompilasi dipakai langsung, hasil sama dengan list rule")
+    lain = kb[:5]; slot = kompilasi_rule(lain)
+    for m in semua_mu[:10]: hitung_diagnosa_cf(m, indeks); diagnosa_top_k(m, indeks, 3)
+    cek(kompilasi_rule(lain) is slot, "IndeksRule tidak menggeser cache satu slot kompilasi_rule")
+
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000))
@@ -0,0 +1,113 @@
+"""Cek dan benchmark RingBuffer riwayat sensor.
+
+Memeriksa isi jendela setelah buffer berputar, view tanpa salin, jendela penuh
+(n = kapasitas) yang tetap monoton saat append bersamaan, memori sesuai
+rumus perkiraan_nbytes, dan tidak ada alokasi baru saat append. Lalu
+membandingkan biaya per tick dengan cara lama (pd.concat + tail).
+
+Jalankan dari root repo:  python bench/check_history.py [kapasitas]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import warnings
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.history import KOLOM_SENSOR, RingBuffer, perkiraan_nbytes  # noqa: E402
+
+
+def baris(i):
+    return {k: float(i * 10 + j) for j, k in enumerate(KOLOM_SENSOR)}
+
+
+def main():
+    kapasitas = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    # Isi jendela sama dengan deque acuan, termasuk setelah berputar
+    rb = RingBuffer(7); acuan = deque(maxlen=7)
+    cocok = True
+    for i in range(40):
+        rb.append(i, baris(i)); acuan.append(i)
+        for n in (None, 0, 1, 3, 7, 100):
+            w, kolom = rb.jendela(n)
+            harap = list(acuan)[-n:] if n else ([] if n == 0 else list(acuan))
+            cocok &= w.tolist() == harap and kolom['tds'].tolist() == [i_ * 10 + 1 for i_ in harap]
+    cek(cocok and len(rb) == 7 and rb.total == 40, "jendela sama dengan deque acuan setelah berputar")
+    cek(rb.terakhir()['waktu'] == 39.0 and rb.terakhir()['ph'] == 390.0, "terakhir() berisi baris terbaru")
+
+    # View tanpa salin, read-only
+    w, kolom = rb.jendela(5)
+    cek(np.shares_memory(kolom['ph'], rb._data['ph']) and not kolom['ph'].flags.writeable, "jendela berupa view read-only")
+
+    # Jendela penuh (n = kapasitas, seperti pilihan jendela grafik terbesar) tetap utuh dan
+    # waktunya naik monoton saat append berikutnya terjadi sebelum view selesai dipakai
+    rb = RingBuffer(7)
+    for i in range(10): rb.append(i, baris(i))
+    w, kolom = rb.jendela(7)
+    salinan = w.copy()
+    rb.append(10, baris(10))
+    cek(np.array_equal(w, salinan) and (np.diff(w) > 0).all() and kolom['ph'][0] == 30.0,
+        "jendela penuh tidak tertimpa oleh append berikutnya")
+    rb = RingBuffer(1000); henti = threading.Event()
+    for i in range(1000): rb.append(float(i), baris(i))
+
+    def penulis():
+        i = 1000
+        while not henti.is_set():
+            rb.append(float(i), baris(i)); i += 1
+            time.sleep(0.0005)
+    t = threading.Thread(target=penulis); t.start()
+    monoton = True
+    for _ in range(2000):
+        w, _ = rb.jendela(rb.kapasitas)
+        monoton &= bool((np.diff(w) > 0).all())
+    henti.set(); t.join()
+    cek(monoton, "jendela penuh monoton saat poller menulis bersamaan")
+
+    # Memori sesuai dokumentasi dan tidak bertambah saat append
+    tracemalloc.start()
+    rb = RingBuffer(kapasitas)
+    dialokasi = tracemalloc.get_traced_memory()[0]
+    cek(rb.nbytes == perkiraan_nbytes(kapasitas) and dialokasi >= rb.nbytes,
+        f"memori {rb.nbytes / 1e6:.1f} MB untuk {kapasitas} titik (= perkiraan_nbytes)")
+    d = baris(1)
+    sebelum = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    for i in range(100_000): rb.append(float(i), d)
+    dt_append = (time.perf_counter() - t0) / 100_000
+    tambahan = tracemalloc.get_traced_memory()[0] - sebelum
+    tracemalloc.stop()
+    cek(tambahan < 64 * 1024, f"append tidak menambah memori ({tambahan} byte setelah 100000 append)")
+
+    # Biaya per tick: cara lama vs ring buffer
+    warnings.simplefilter('ignore', FutureWarning)
+    df = pd.DataFrame(columns=['Waktu', 'pH', 'TDS', 'Kelembaban', 'Suhu'])
+    t0 = time.perf_counter()
+    for i in range(500):
+        row = {'Waktu': str(i), 'pH': 7.0, 'TDS': 1000, 'Kelembaban': 50, 'Suhu': 25.0}
+        df = pd.concat([df, pd.DataFrame([row])], ignore_index=True).tail(20)
+    dt_concat = (time.perf_counter() - t0) / 500
+    t0 = time.perf_counter()
+    for i in range(500): rb.jendela(10_000)
+    dt_jendela = (time.perf_counter() - t0) / 500
+    print(f"      append ring buffer      : {dt_append * 1e6:8.2f} us/tick")
+    print(f"      jendela 10000 titik     : {dt_jendela * 1e6:8.2f} us (view)")
+    print(f"      pd.concat + tail(20) lama: {dt_concat * 1e6:8.2f} us/tick")
+
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
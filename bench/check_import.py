@@ -0,0 +1,91 @@
+"""Pemeriksaan regresi waktu impor paket smartfarm.
+
+Setiap pemeriksaan berjalan di interpreter baru (subprocess):
+- `import smartfarm` tidak mengimpor apa pun selain stdlib (bahkan NumPy tidak);
+- setiap submodul inti hanya menarik NumPy: streamlit, pandas, matplotlib,
+  firebase_admin, sklearn, dan pyarrow tidak boleh ikut termuat;
+- waktu impor seluruh submodul inti di atas NumPy (terbaik dari beberapa kali)
+  tetap di bawah anggaran (default 50 ms);
+- matplotlib dan firebase_admin baru dimuat saat fungsi yang memakainya dipanggil.
+
+Jalankan dari root repo:  python bench/check_import.py [anggaran_ms]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODUL_INTI = ('config', 'aturan', 'fuzzy', 'diagnosis', 'labels', 'models', 'history', 'downsample',
+              'lut', 'sources', 'stream', 'store', 'koneksi', 'grafik', 'rtdb_lokal', 'cache',
+              'armada', 'analitik', 'metrik', 'layanan')
+BERAT = ('streamlit', 'pandas', 'matplotlib', 'firebase_admin', 'sklearn', 'pyarrow')
+ULANG = 5
+
+
+def jalankan(kode):
+    """Jalankan kode di interpreter baru; kode mencetak satu baris JSON."""
+    hasil = subprocess.run([sys.executable, '-c', kode], cwd=ROOT, capture_output=True, text=True)
+    if hasil.returncode != 0: raise RuntimeError(hasil.stderr)
+    return json.loads(hasil.stdout.strip().splitlines()[-1])
+
+
+def main():
+    anggaran = float(sys.argv[1]) if len(sys.argv) > 1 else 50.0
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    muat = jalankan("import sys, json, smartfarm; "
+                    "print(json.dumps([m for m in ('numpy',) + %r if m in sys.modules]))" % (BERAT,))
+    cek(muat == [], "import smartfarm tidak memuat numpy/modul berat" + (f" ({muat})" if muat else ""))
+
+    for m in MODUL_INTI:
+        muat = jalankan(f"import sys, json, smartfarm.{m}; "
+                        f"print(json.dumps([x for x in {BERAT!r} if x in sys.modules]))")
+        cek(muat == [], f"smartfarm.{m} hanya menarik NumPy" + (f" (ikut: {muat})" if muat else ""))
+
+    impor_semua = "; ".join(f"import smartfarm.{m}" for m in MODUL_INTI)
+    waktu = []
+    for _ in range(ULANG):
+        waktu.append(jalankan(
+            "import json, time, numpy\n"
+            "t = time.perf_counter()\n"
+            f"{impor_semua}\n"
+            "u = time.perf_counter()\n"
+            "print(json.dumps((u - t) * 1000))"))
+    numpy_ms = jalankan("import json, time; t = time.perf_counter(); import numpy; "
+                        "print(json.dumps((time.perf_counter() - t) * 1000))")
+    print(f"impor numpy: {numpy_ms:.1f} ms; submodul inti di atas numpy: "
+          f"terbaik {min(waktu):.1f} ms, median {sorted(waktu)[ULANG // 2]:.1f} ms")
+    cek(min(waktu) < anggaran, f"impor submodul inti < {anggaran:g} ms")
+
+    # Modul berat dimuat malas: baru saat dipakai
+    muat = jalankan(
+        "import sys, json\n"
+        "from smartfarm import plot_fuzzy, inferensi_mamdani_baru, fuzzifikasi_input, defuzzifikasi_centroid\n"
+        "from smartfarm.fuzzy import x_irigasi, x_pupuk, x_pestisida\n"
+        "sebelum = 'matplotlib' in sys.modules\n"
+        "mu = fuzzifikasi_input(1200, 6.5, 50, 0)\n"
+        "ir, pp, pt = inferensi_mamdani_baru(mu)\n"
+        "plot_fuzzy({'agg_ir': ir, 'agg_pp': pp, 'agg_pt': pt, 'val_ir': defuzzifikasi_centroid(x_irigasi, ir),\n"
+        "            'val_pp': defuzzifikasi_centroid(x_pupuk, pp), 'val_pt': defuzzifikasi_centroid(x_pestisida, pt)})\n"
+        "print(json.dumps([sebelum, 'matplotlib' in sys.modules]))")
+    cek(muat == [False, True], "matplotlib baru dimuat saat plot_fuzzy dipanggil")
+    muat = jalankan(
+        "import sys, json\n"
+        "from smartfarm.koneksi import init_firebase\n"
+        "sebelum = 'firebase_admin' in sys.modules\n"
+        "init_firebase('tidak_ada.json')\n"
+        "print(json.dumps([sebelum, 'firebase_admin' in sys.modules]))")
+    cek(not muat[0], "firebase_admin tidak dimuat sebelum init_firebase dipanggil")
+
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Cek paritas IndeksMaster (smartfarm.labels) dengan pencarian label linear lama.
+
+Acuan: get_label_from_master dan get_status_class dari app.py sebelum master
+data dikompilasi (disalin di bawah). Memeriksa get_label / status_class
+(bisect) dan label_array / status_class_array (searchsorted) pada:
+- master_data.json dan definisi sintetis: range tumpang tindih (definisi
+  pertama menang), kesamaan nilai, batas < dan > yang sama, nilai bulat;
+- titik batas persis, tetangga float terdekat (nextafter), titik tengah, jauh
+  di luar rentang, +-inf, NaN, dan sensor/definisi kosong;
+- input Series (indeks dan nama dipertahankan), ndarray, dan list.
+
+Jalankan dari root repo:  python bench/check_labels.py
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.config import muat_master_data  # noqa: E402
+from smartfarm.labels import IndeksMaster  # noqa: E402
+
+
+# ==================== IMPLEMENTASI LAMA (ACUAN) ====================
+def get_label_from_master(master_data, sensor, value):
+    defs = master_data.get(sensor)
+    if not defs: return None
+    for d in defs:
+        op = d.get('operator')
+        if op == '<' and value < d.get('value'): return d.get('label')
+        elif op == '>' and value > d.get('value'): return d.get('label')
+        elif op == 'range' and d.get('min') <= value <= d.get('max'): return d.get('label')
+        elif 'value' in d and value == d.get('value'): return d.get('label')
+    return None
+
+
+def get_status_class(master_data, value, sensor):
+    label = get_label_from_master(master_data, sensor, value)
+    if not label: return ""
+    if "aman" in label.lower() or "ideal" in label.lower() or "optimal" in label.lower(): return "good"
+    elif "tinggi" in label.lower() or "berlebih" in label.lower() or "basah" in label.lower(): return "warn"
+    else: return "bad"
+
+
+# Definisi sintetis untuk kasus yang tidak ada di master_data.json
+SINTETIS = {
+    'tumpang': [{'label': 'rendah', 'operator': 'range', 'min': 0, 'max': 10},
+                {'label': 'aman', 'operator': 'range', 'min': 5, 'max': 20},
+                {'label': 'tinggi', 'operator': '>', 'value': 15},
+                {'label': 'negatif', 'operator': '<', 'value': 0}],
+    'celah': [{'label': 'kurang', 'operator': '<', 'value': 3},
+              {'label': 'berlebih', 'operator': '>', 'value': 7},
+              {'label': 'pas', 'value': 5}],
+    'sama_batas': [{'label': 'bawah', 'operator': '<', 'value': 1.5},
+                   {'label': 'atas', 'operator': '>', 'value': 1.5}],
+    'titik': [{'label': 'nol', 'value': 0}, {'label': 'optimal', 'value': 2.25}, {'label': 'satu', 'value': 1}],
+    'tanpa_label': [{'operator': 'range', 'min': 1, 'max': 2}, {'label': 'basah', 'operator': '>', 'value': 2}],
+    'kosong': [],
+}
+
+
+def nilai_uji(defs):
+    titik = sorted({float(d[k]) for d in defs for k in ('value', 'min', 'max') if k in d})
+    nilai = [-1e9, 1e9, np.inf, -np.inf, np.nan, 0.0, -0.0]
+    for t in titik: nilai += [t, np.nextafter(t, -np.inf), np.nextafter(t, np.inf), t - 0.5, t + 0.5, int(t)]
+    nilai += [(a + b) / 2 for a, b in zip(titik, titik[1:])]
+    return nilai
+
+
+def main():
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    master = dict(muat_master_data(), **SINTETIS)
+    indeks = IndeksMaster(master)
+    rng = np.random.default_rng(9)
+    for sensor in list(master) + ['tidak_ada']:
+        defs = master.get(sensor) or []
+        nilai = nilai_uji(defs) + list(rng.uniform(-50, 3000, 200)) + list(rng.integers(-5, 30, 50))
+        label_ref = [get_label_from_master(master, sensor, v) for v in nilai]
+        kelas_ref = [get_status_class(master, v, sensor) for v in nilai]
+        cek([indeks.get_label(sensor, v) for v in nilai] == label_ref, f"{sensor}: get_label sama dengan pencarian linear")
+        cek([indeks.status_class(sensor, v) for v in nilai] == kelas_ref, f"{sensor}: status_class sama dengan get_status_class")
+
+        arr = np.array(nilai, dtype=float)
+        cek(list(indeks.label_array(sensor, arr)) == label_ref and list(indeks.status_class_array(sensor, arr)) == kelas_ref,
+            f"{sensor}: label_array / status_class_array (ndarray) sama per elemen")
+        cek(list(indeks.label_array(sensor, nilai)) == label_ref, f"{sensor}: label_array menerima list")
+        seri = pd.Series(arr, index=pd.Index(np.arange(arr.size)[::-1] * 3, name='baris'), name=sensor)
+        lab, kel = indeks.label_array(sensor, seri), indeks.status_class_array(sensor, seri)
+        cek(isinstance(lab, pd.Series) and lab.index.equals(seri.index) and lab.name == sensor
+            and lab.tolist() == label_ref and isinstance(kel, pd.Series) and kel.index.equals(seri.index)
+            and kel.tolist() == kelas_ref, f"{sensor}: input Series -> Series dengan indeks & nama sama")
+        dua_d = arr[:(arr.size // 2) * 2].reshape(2, -1)
+        cek(indeks.label_array(sensor, dua_d).shape == dua_d.shape, f"{sensor}: bentuk array dipertahankan")
+
+    kosong = IndeksMaster({})
+    cek(kosong.get_label('ph', 7.0) is None and kosong.status_class('ph', 7.0) == ""
+        and list(kosong.label_array('ph', [1.0, 2.0])) == [None, None], "master kosong -> None / ''")
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Cek ketepatan tabel inferensi prakomputasi (smartfarm.lut) terhadap inferensi_batch.
+
+Tabel hanya menjawab dosis; diagnosa CF di dashboard selalu dihitung eksak dari
+mu. Memeriksa:
+- di titik grid, dosis tabel sama dengan inferensi_batch (presisi float32);
+- galat interpolasi multilinear dibatasi BATAS (per output, satuan output) pada
+  bacaan acak di seluruh rentang form dan pada grid rapat di sekitar semua
+  interval transisi (kasus terburuk: ketiga input sedang bertransisi);
+- galat besar hanya muncul saat agregat hampir kosong (bobot himpunan terbesar
+  < AKTIF): centroidnya bergantung pada rasio bobot-bobot kecil, sehingga
+  tidak bisa diinterpolasi; pada bacaan acak persentil 99,9 tetap dibatasi;
+- simpan/muat .npz bolak-balik dan sidik jari berubah bila grid berubah.
+
+Jalankan dari root repo:  python bench/check_lut.py [N]
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm import fuzzy  # noqa: E402
+from smartfarm.lut import RENTANG_INPUT, RESOLUSI, TabelInferensi, muat_atau_bangun, sidik_jari  # noqa: E402
+
+KOLOM = (('val_ir', 'irigasi'), ('val_pp', 'pupuk'), ('val_pt', 'pestisida'))
+# Galat maksimum interpolasi (RESOLUSI=21) saat bobot himpunan terbesar >= AKTIF,
+# juga batas persentil 99,9 semua bacaan acak
+AKTIF = 0.2
+BATAS = {'irigasi': 2.0, 'pupuk': 4.0, 'pestisida': 1.0}
+TITIK_PER_INTERVAL = 30
+
+
+def sekitar_transisi(var):
+    # Grid rapat di tiap interval transisi, melebar 10% ke kedua sisi
+    return np.concatenate([np.linspace(a - 0.1 * (b - a), b + 0.1 * (b - a), TITIK_PER_INTERVAL)
+                           for a, b in fuzzy.TITIK_INPUT[var]])
+
+
+def main(n=200000):
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    t0 = time.perf_counter()
+    tabel = TabelInferensi.bangun()
+    print(f"      tabel RESOLUSI={RESOLUSI}: {tabel.dosis.shape}, {tabel.dosis.nbytes / 1e6:.1f} MB, "
+          f"dibangun {time.perf_counter() - t0:.1f} s")
+
+    hujan, tds, ph, hum = (g.ravel() for g in np.meshgrid([0.0, 1.0], *tabel.sumbu, indexing='ij'))
+    eksak = fuzzy.inferensi_batch(tds, ph, hum, hujan)
+    tab = tabel.batch(tds, ph, hum, hujan)
+    for k, nama in KOLOM:
+        ada = ~np.isnan(tabel.dosis[..., KOLOM.index((k, nama))].ravel())
+        cek(np.allclose(tab[k][ada], eksak[k][ada], rtol=1e-6, atol=1e-4), f"titik grid: {nama} sama dengan inferensi_batch")
+
+    rng = np.random.default_rng(11)
+    acak = [rng.uniform(*RENTANG_INPUT[v], n) for v in ('tds', 'ph', 'hum')] + [rng.integers(0, 2, n).astype(float)]
+    transisi = [g.ravel() for g in np.meshgrid(*(sekitar_transisi(v) for v in ('tds', 'ph', 'hum')),
+                                               [0.0, 1.0], indexing='ij')]
+    for label, data, semua in ((f"acak N={n}", acak, True), (f"transisi N={transisi[0].size}", transisi, False)):
+        eksak = fuzzy.inferensi_batch(*data)
+        bobot = fuzzy.bobot_himpunan(eksak)
+        for mode in ('interp', 'nearest'):
+            tab = tabel.batch(*data, mode=mode)
+            for k, nama in KOLOM:
+                galat = np.abs(tab[k] - eksak[k])
+                aktif = bobot[nama].max(axis=1) >= AKTIF
+                maks_aktif, p999, maks = galat[aktif].max(), np.percentile(galat, 99.9), galat.max()
+                teks = (f"{label} {mode:<7} {nama:<9}: maks {maks_aktif:.3f} (bobot >= {AKTIF}), "
+                        f"p99.9 {p999:.3f}, maks semua {maks:.3f}")
+                if mode == 'interp':
+                    cek(maks_aktif <= BATAS[nama] and (p999 <= BATAS[nama] or not semua), teks + f", batas {BATAS[nama]}")
+                else:
+                    print("      " + teks)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'lut.npz')
+        tabel.simpan(path)
+        muat = TabelInferensi.muat(path)
+        cek(muat.sidik == tabel.sidik and np.array_equal(muat.dosis, tabel.dosis, equal_nan=True)
+            and all(np.array_equal(a, b) for a, b in zip(muat.sumbu, tabel.sumbu)), "simpan/muat .npz bolak-balik")
+        cek(muat_atau_bangun(path).sidik == tabel.sidik and os.path.getsize(path) > 0, "muat_atau_bangun memakai file yang sidiknya cocok")
+    cek(sidik_jari(RESOLUSI + 1) != sidik_jari() and sidik_jari(metode='exact') != sidik_jari(),
+        "sidik jari berubah bila resolusi/metode berubah")
+    cek(tabel.cari(1200.0, 6.5, 55.0, 0.0) == tuple(float(v[0]) for v in tabel.batch(1200.0, 6.5, 55.0, 0.0).values()),
+        "cari() sama dengan batch()")
+
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000))
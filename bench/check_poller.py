@@ -0,0 +1,65 @@
+"""Cek poller sensor bersama memakai SumberPalsu (tanpa Firebase/Streamlit).
+
+Jalankan dari root repo:  python bench/check_poller.py
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.sources import PollerSensor, SumberPalsu  # noqa: E402
+
+
+def mentah(i):
+    return {'pH': 6.0 + i * 0.1, 'TDS': 800 + i, 'SoilMoisture': 40, 'WaterTemp': 25.5,
+            'AirTemp': 30.1, 'Humidity': 70, 'Rainfall': 0}
+
+
+def main():
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    # Urutan data, riwayat terbatas, dan status perangkat
+    sumber = SumberPalsu([mentah(i) for i in range(30)])
+    poller = PollerSensor(sumber, interval=60, kapasitas=5, timeout=20)
+    cek(poller.snapshot().status == 'OFFLINE', "status awal OFFLINE")
+    for _ in range(9): poller.poll_sekali()
+    snap = poller.snapshot()
+    cek(snap.seq == 10 and snap.data['tds'] == 809, "seq dan data terbaru")
+    cek(snap.riwayat.jendela()[1]['tds'].tolist() == [805, 806, 807, 808, 809], "riwayat dibatasi kapasitas")
+    cek(snap.status == 'ONLINE' and snap.sumber == 'sumber', "ONLINE saat nilai berubah")
+
+    # Nilai tidak berubah melewati timeout -> OFFLINE
+    diam = PollerSensor(SumberPalsu([mentah(0)]), interval=60, timeout=0.05)
+    diam.poll_sekali(); time.sleep(0.1); diam.poll_sekali()
+    cek(diam.snapshot().status == 'OFFLINE', "OFFLINE bila nilai tidak berubah")
+
+    # Sumber gagal -> data cadangan
+    rusak = PollerSensor(SumberPalsu([None]), interval=60)
+    cek(rusak.snapshot().sumber == 'cadangan', "data cadangan saat sumber gagal")
+
+    # Thread latar + banyak pembaca bersamaan
+    poller = PollerSensor(SumberPalsu(lambda: mentah(int(time.time() * 1000) % 50)), interval=0.01).start()
+    baca = []
+    def pembaca():
+        for _ in range(2000): baca.append(poller.snapshot().seq)
+    threads = [threading.Thread(target=pembaca) for _ in range(8)]
+    t0 = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    dt = time.perf_counter() - t0
+    time.sleep(0.1)
+    poller.stop(1.0)
+    cek(not poller.berjalan and poller.snapshot().seq > 1, "thread poller berjalan lalu berhenti")
+    print(f"      {len(baca)} pembacaan snapshot dalam {dt * 1000:.1f} ms")
+
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
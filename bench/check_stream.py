@@ -0,0 +1,118 @@
+"""Cek ingest streaming memakai RTDBLokal (tanpa Firebase/Streamlit).
+
+Mensimulasikan urutan tulis ESP32 (nilai, <field>_Time, lalu timestamp global)
+dan memastikan bacaan yang diterbitkan tidak pernah mencampur dua siklus.
+
+Jalankan dari root repo:  python bench/check_stream.py
+Keluar dengan status 1 jika ada pemeriksaan yang gagal.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smartfarm.rtdb_lokal import RTDBLokal  # noqa: E402
+from smartfarm.sources import PollerSensor  # noqa: E402
+from smartfarm.store import PenyimpanBacaan  # noqa: E402
+from smartfarm.stream import FIELD_SENSOR, StreamSensor  # noqa: E402
+
+
+def kirim_esp32(rtdb, siklus, global_ts=True, lewati=()):
+    """Urutan tulis sendDataToFirebase() di ESP32_Firebase.ino."""
+    ts = f"2026-01-01 10:00:{siklus:02d}"
+    for i, f in enumerate(FIELD_SENSOR):
+        if f in lewati: continue
+        rtdb.reference(f'/Monitoring/{f}').set(siklus * 10 + i)
+        rtdb.reference(f'/Monitoring/{f}_Time').set(ts)
+    if global_ts: rtdb.reference('/Monitoring/timestamp').set(ts)
+    return ts
+
+
+class RefBaca:
+    """Referensi /Monitoring untuk PollerSensor (sumber dengan ambil())."""
+
+    def __init__(self, rtdb): self.rtdb = rtdb
+    def ambil(self): return self.rtdb.reference('/Monitoring').get()
+
+
+def main():
+    gagal = []
+
+    def cek(kondisi, pesan):
+        print(("OK   " if kondisi else "GAGAL") + " " + pesan)
+        if not kondisi: gagal.append(pesan)
+
+    rtdb = RTDBLokal()
+    kirim_esp32(rtdb, 0)
+    stream = StreamSensor(rtdb.reference('/Monitoring'), timeout=0.2)
+    stream.start()
+    snap = stream.snapshot()
+    cek(snap.seq == 1 and snap.data['tds'] == 1 and snap.status == 'OFFLINE',
+        "put awal menerbitkan isi node, status tetap OFFLINE")
+
+    for s in range(1, 6): kirim_esp32(rtdb, s)
+    snap = stream.snapshot()
+    cek(snap.seq == 6 and snap.status == 'ONLINE', "satu bacaan per siklus, ONLINE saat event datang")
+    kolom = snap.riwayat.jendela()[1]
+    koheren = all(len({int(kolom[k][i]) // 10 for k in ('tds', 'soil_moisture', 'water_temp', 'air_humidity')}) == 1
+                  for i in range(len(snap.riwayat)))
+    cek(koheren, "tidak ada bacaan campuran dua siklus")
+    cek(snap.data['timestamp'] == '10:00:05' and snap.data['date'] == '01-01-2026', "waktu bacaan dari stempel ESP32")
+    cek(len(snap.riwayat) == 6, "riwayat bertambah per bacaan")
+
+    # Firmware tanpa timestamp global: batas siklus dari <field>_Time
+    kirim_esp32(rtdb, 6, global_ts=False)
+    cek(stream.snapshot().seq == 6, "timestamp global lama menahan siklus yang belum ditutup")
+    rtdb.reference('/Monitoring/timestamp').delete()
+    kirim_esp32(rtdb, 7, global_ts=False)
+    cek(stream.snapshot().seq == 8 and stream.snapshot().data['tds'] == 71, "siklus selesai saat semua _Time sama")
+
+    # Field yang gagal ditulis ditandai basi
+    kirim_esp32(rtdb, 8, lewati=('Rainfall',))
+    cek(stream.field_basi == ('Rainfall',), "field basi terdeteksi")
+
+    # Event berhenti -> OFFLINE
+    time.sleep(0.3)
+    cek(stream.snapshot().status == 'OFFLINE', "OFFLINE bila tidak ada event melewati timeout")
+    stream.stop()
+    n = stream.jumlah_event
+    kirim_esp32(rtdb, 9)
+    cek(stream.jumlah_event == n, "stop() menutup listener")
+
+    # Restart listener: put awal menerbitkan ulang bacaan terakhir, tapi tidak disimpan ulang
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PenyimpanBacaan(os.path.join(tmp, 'stream.db'), batch_size=1)
+        rtdb = RTDBLokal()
+        for s in range(3): kirim_esp32(rtdb, s)
+        stream = StreamSensor(rtdb.reference('/Monitoring'), penyimpan=store).start()
+        kirim_esp32(rtdb, 3)
+        stream.stop(); stream.start()
+        cek(store.jumlah() == 2 and len(stream.snapshot().riwayat) == 2 and stream.snapshot().data['tds'] == 31,
+            "restart listener: put awal diterbitkan tanpa disimpan ulang")
+        stream.stop()
+        stream = StreamSensor(rtdb.reference('/Monitoring'), penyimpan=store).start()
+        cek(store.jumlah() == 2 and len(stream.snapshot().riwayat) == 2 and stream.snapshot().data['tds'] == 31,
+            "restart proses: riwayat dimuat dari penyimpan, put awal tidak disimpan ulang")
+        kirim_esp32(rtdb, 4)
+        cek(store.jumlah() == 3 and len(stream.snapshot().riwayat) == 3, "bacaan baru setelah restart tetap disimpan")
+        cek(store.duplikat == 0, "tidak ada tulisan duplikat ke penyimpan")
+        stream.stop(); store.close()
+
+    # Beban baca: polling membaca seluruh node tiap interval, stream nol
+    rtdb = RTDBLokal(); kirim_esp32(rtdb, 0)
+    poller = PollerSensor(RefBaca(rtdb), interval=60)
+    for s in range(1, 31):
+        kirim_esp32(rtdb, s); poller.poll_sekali()
+    stream = StreamSensor(rtdb.reference('/Monitoring')).start()
+    baca_awal = rtdb.jumlah_baca
+    for s in range(31, 61): kirim_esp32(rtdb, s)
+    print(f"      poll: {baca_awal} get() untuk 30 siklus; stream: {rtdb.jumlah_baca - baca_awal} get() "
+          f"dan {stream.jumlah_event} event untuk 30 siklus")
+    cek(rtdb.jumlah_baca == baca_awal, "stream tidak memanggil get()")
+
+    return 1 if gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
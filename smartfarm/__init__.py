@@ -0,0 +1,42 @@
+"""Inti SmartFarm Expert System (fuzzy Mamdani, diagnosa CF, label master data).
+
+Paket ini bisa dipakai tanpa Streamlit: impor submodul inti hanya menarik
+NumPy. Nama di bawah tersedia langsung dari ``smartfarm`` dan submodulnya
+baru diimpor saat nama itu pertama kali diakses (PEP 562). matplotlib dan
+firebase_admin hanya diimpor di dalam fungsi yang memakainya
+(smartfarm.grafik, smartfarm.koneksi, SumberFirebase).
+"""
+import importlib
+
+_EKSPOR = {
+    'fuzzifikasi_input': 'fuzzy', 'inferensi_mamdani_baru': 'fuzzy', 'inferensi_batch': 'fuzzy',
+    'inferensi_frame': 'fuzzy', 'defuzzifikasi_centroid': 'fuzzy',
+    'SistemFuzzy': 'aturan', 'muat_aturan': 'aturan',
+    'hitung_diagnosa_cf': 'diagnosis', 'diagnosa_top_k': 'diagnosis', 'diagnosa_batch': 'diagnosis',
+    'kompilasi_rule': 'diagnosis',
+    'IndeksMaster': 'labels',
+    'muat_knowledge_base': 'config', 'muat_master_data': 'config',
+    'muat_model': 'models', 'prediksi_status': 'models', 'KELAS_AI': 'models',
+    'PollerSensor': 'sources', 'SumberFirebase': 'sources', 'SumberHTTP': 'sources', 'SumberPalsu': 'sources',
+    'PollerArmada': 'armada',
+    'StreamSensor': 'stream',
+    'ESP32Simulasi': 'simulator', 'ArmadaSimulasi': 'simulator',
+    'Metrik': 'metrik', 'METRIK': 'metrik',
+    'RingBuffer': 'history',
+    'PenyimpanBacaan': 'store',
+    'init_firebase': 'koneksi',
+    'plot_fuzzy': 'grafik',
+}
+
+__all__ = sorted(_EKSPOR)
+
+def __getattr__(nama):
+    modul = _EKSPOR.get(nama)
+    if modul is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nama!r}")
+    nilai = getattr(importlib.import_module(f"{__name__}.{modul}"), nama)
+    globals()[nama] = nilai
+    return nilai
+
+def __dir__():
+    return sorted(set(globals()) | set(_EKSPOR))
@@ -0,0 +1,168 @@
+import math
+from collections import deque, namedtuple
+
+from smartfarm.history import KOLOM_SENSOR
+
+# ==================== ANALITIK STREAMING PER BACAAN ====================
+# State bergulir per sensor per perangkat, diperbarui O(1) setiap bacaan tanpa
+# membaca ulang riwayat:
+# - rata-rata dan varians EWMA (rumus inkremental West);
+# - min/max jendela JENDELA bacaan terakhir (deque monoton, O(1) teramortisasi);
+# - lama sejak nilai kanal terakhir berubah.
+# Dari state itu setiap kanal mendapat flag: DIAM (nilai beku lebih lama dari
+# batas kanal), LUAR_RENTANG (di luar rentang ukur sensor), dan LONJAKAN (|z|
+# terhadap EWMA sebelum bacaan ini melewati Z_LONJAKAN). Satu probe yang beku
+# hanya menandai kanalnya; perangkat yang beku (semua kanal tidak berubah lebih
+# dari BATAS_BEKU_PERANGKAT, padahal stempel waktu tulisnya terus maju) ditandai
+# semua_diam. Perangkat yang berhenti menulis bukan beku, melainkan OFFLINE.
+#
+# Flag semua kanal dipadatkan menjadi satu bilangan bulat (3 bit per kanal,
+# urut KOLOM_SENSOR; 21 bit, tepat di float32) yang ikut dicatat di riwayat
+# dan penyimpanan sebagai kolom 'anomali'.
+
+FLAG_DIAM, FLAG_LUAR_RENTANG, FLAG_LONJAKAN = 1, 2, 4
+NAMA_FLAG = {FLAG_DIAM: 'diam', FLAG_LUAR_RENTANG: 'luar rentang', FLAG_LONJAKAN: 'lonjakan'}
+BIT_PER_KANAL = 3
+
+EWMA_SPAN = 30            # bacaan; alpha = 2 / (span + 1)
+JENDELA = 60              # bacaan untuk min/max bergulir
+MIN_SAMPEL = 10           # bacaan sebelum flag lonjakan aktif (pemanasan EWMA)
+Z_LONJAKAN = 4.0
+
+# Rentang ukur sensor (ADS1115 pH/TDS, kapasitif tanah, DS18B20, DHT); di luar ini = flag
+BATAS_UKUR = {
+    'ph': (0.0, 14.0), 'tds': (0.0, 5000.0), 'soil_moisture': (0.0, 100.0), 'water_temp': (0.0, 60.0),
+    'air_temp': (-10.0, 60.0), 'air_humidity': (0.0, 100.0), 'rainfall': (0.0, 100.0),
+}
+# Detik tanpa perubahan sebelum kanal dianggap diam; None = tidak diperiksa (hujan biner)
+BATAS_DIAM = {
+    'ph': 120, 'tds': 120, 'soil_moisture': 1800, 'water_temp': 600,
+    'air_temp': 600, 'air_humidity': 600, 'rainfall': None,
+}
+# Perangkat dianggap beku bila SEMUA kanal yang diperiksa tidak berubah selama ini (detik),
+# sementara perangkat masih mengirim bacaan baru dalam rentang yang sama
+BATAS_BEKU_PERANGKAT = 120
+# Simpangan baku minimum (resolusi sensor) untuk skor z; None = lonjakan tidak diperiksa
+STD_MIN = {
+    'ph': 0.02, 'tds': 5.0, 'soil_moisture': 1.0, 'water_temp': 0.1,
+    'air_temp': 0.1, 'air_humidity': 1.0, 'rainfall': None,
+}
+
+StatusKanal = namedtuple('StatusKanal', 'nilai rata std minimum maksimum diam z flag')
+HasilAnalitik = namedtuple('HasilAnalitik', 'kanal anomali semua_diam')
+
+def gabung_flag(flag):
+    """dict kanal -> flag menjadi satu bilangan bulat (kolom 'anomali')."""
+    hasil = 0
+    for i, k in enumerate(KOLOM_SENSOR):
+        hasil |= (flag.get(k, 0) & 7) << (BIT_PER_KANAL * i)
+    return hasil
+
+def urai_flag(anomali):
+    """Kebalikan gabung_flag: dict kanal -> flag untuk kanal yang ber-flag (NaN/None = kosong)."""
+    if anomali is None or anomali != anomali: return {}
+    anomali = int(anomali)
+    hasil = {}
+    for i, k in enumerate(KOLOM_SENSOR):
+        f = (anomali >> (BIT_PER_KANAL * i)) & 7
+        if f: hasil[k] = f
+    return hasil
+
+def nama_flag(flag):
+    return [nama for bit, nama in NAMA_FLAG.items() if flag & bit]
+
+class StatistikKanal:
+    """State bergulir satu sensor: EWMA, min/max jendela, dan waktu perubahan terakhir."""
+
+    __slots__ = ('batas', 'batas_diam', 'std_min', 'alpha', 'jendela', 'n', 'rata', 'var',
+                 '_min', '_maks', 'nilai', 'berubah', 'z')
+
+    def __init__(self, batas=None, batas_diam=None, std_min=None, span=EWMA_SPAN, jendela=JENDELA):
+        self.batas = batas
+        self.batas_diam = batas_diam
+        self.std_min = std_min
+        self.alpha = 2.0 / (span + 1)
+        self.jendela = jendela
+        self.n = 0
+        self.rata = self.var = 0.0
+        self._min = deque()       # (urutan, nilai), nilai naik
+        self._maks = deque()      # (urutan, nilai), nilai turun
+        self.nilai = None
+        self.berubah = None
+        self.z = 0.0
+
+    def perbarui(self, ts, x):
+        """Masukkan satu bacaan baru; mengembalikan flag LUAR_RENTANG | LONJAKAN untuk x."""
+        flag = 0
+        if self.batas is not None and not self.batas[0] <= x <= self.batas[1]: flag |= FLAG_LUAR_RENTANG
+        # Skor z terhadap state SEBELUM bacaan ini, supaya lonjakan tidak meredam dirinya sendiri
+        self.z = 0.0
+        if self.std_min is not None and self.n >= MIN_SAMPEL:
+            self.z = (x - self.rata) / max(math.sqrt(self.var), self.std_min)
+            if abs(self.z) > Z_LONJAKAN: flag |= FLAG_LONJAKAN
+        if self.n == 0:
+            self.rata, self.var = x, 0.0
+        else:
+            selisih = x - self.rata
+            naik = self.alpha * selisih
+            self.rata += naik
+            self.var = (1.0 - self.alpha) * (self.var + selisih * naik)
+        i = self.n; self.n += 1
+        while self._min and self._min[-1][1] >= x: self._min.pop()
+        self._min.append((i, x))
+        while self._maks and self._maks[-1][1] <= x: self._maks.pop()
+        self._maks.append((i, x))
+        if self._min[0][0] <= i - self.jendela: self._min.popleft()
+        if self._maks[0][0] <= i - self.jendela: self._maks.popleft()
+        if x != self.nilai: self.berubah = ts
+        self.nilai = x
+        return flag
+
+    def diam(self, ts):
+        """Detik sejak nilai terakhir berubah (0 sebelum ada bacaan)."""
+        return 0.0 if self.berubah is None else max(0.0, ts - self.berubah)
+
+    def flag_diam(self, ts):
+        return FLAG_DIAM if self.batas_diam is not None and self.diam(ts) > self.batas_diam else 0
+
+    def status(self, ts, flag):
+        mn = self._min[0][1] if self._min else None
+        mx = self._maks[0][1] if self._maks else None
+        return StatusKanal(self.nilai, self.rata, math.sqrt(self.var), mn, mx, self.diam(ts), self.z,
+                           flag | self.flag_diam(ts))
+
+class AnalitikSensor:
+    """Analitik streaming semua sensor satu perangkat.
+
+    perbarui(ts, nilai, stempel) dipanggil sekali per bacaan (ts detik epoch,
+    nilai dict sensor, stempel waktu tulis perangkat bila ada) dan mengembalikan
+    HasilAnalitik. Bacaan dianggap baru bila stempelnya berubah, atau tanpa
+    stempel bila isinya berubah. Poll ulang node yang belum ditulis perangkat
+    tidak masuk statistik dan tidak melaporkan ulang flag lonjakan/luar rentang;
+    hanya lama diam yang bertambah. semua_diam hanya berlaku selama perangkat
+    masih mengirim bacaan baru: perangkat mati/terputus bukan sensor beku.
+    """
+
+    def __init__(self, kanal=KOLOM_SENSOR, batas=None, batas_diam=None, span=EWMA_SPAN, jendela=JENDELA):
+        batas = {**BATAS_UKUR, **(batas or {})}
+        batas_diam = {**BATAS_DIAM, **(batas_diam or {})}
+        self.kanal = {k: StatistikKanal(batas.get(k), batas_diam.get(k), STD_MIN.get(k), span, jendela)
+                      for k in kanal}
+        self._terakhir = None
+        self._stempel = None
+        self._waktu_baru = None   # ts bacaan baru terakhir
+        self.jumlah = 0
+
+    def perbarui(self, ts, nilai, stempel=None):
+        isi = tuple(nilai.get(k) for k in self.kanal)
+        flag = {}
+        if (isi != self._terakhir) if stempel is None else (stempel != self._stempel):
+            self._terakhir, self._stempel, self._waktu_baru = isi, stempel, ts
+            self.jumlah += 1
+            flag = {k: st.perbarui(ts, float(v)) for (k, st), v in zip(self.kanal.items(), isi)
+                    if v is not None and v == v}
+        status = {k: st.status(ts, flag.get(k, 0)) for k, st in self.kanal.items() if st.n}
+        diam = [s.diam for k, s in status.items() if self.kanal[k].batas_diam is not None]
+        hidup = self._waktu_baru is not None and ts - self._waktu_baru <= BATAS_BEKU_PERANGKAT
+        return HasilAnalitik(status, gabung_flag({k: s.flag for k, s in status.items()}),
+                             hidup and bool(diam) and min(diam) > BATAS_BEKU_PERANGKAT)
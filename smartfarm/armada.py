@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import namedtuple
+
+from smartfarm.analitik import nama_flag, urai_flag
+from smartfarm.history import KOLOM_ANOMALI
+from smartfarm.metrik import METRIK
+from smartfarm.sources import STATUS_TIMEOUT, PollerSensor, data_dummy
+
+# ==================== ARMADA PERANGKAT (BANYAK LAHAN) ====================
+# Setiap lahan punya ESP32 sendiri dengan skema /Monitoring yang sama. Satu
+# thread siklus memicu poll semua perangkat sekaligus lewat pool worker
+# berbatas, jadi lama satu siklus ~ latensi satu perangkat x ceil(N / worker),
+# bukan jumlah latensi semua perangkat. State, riwayat, dan status ONLINE/
+# OFFLINE tetap per perangkat (satu PollerSensor tanpa thread per lahan).
+
+MAKS_WORKER = 128
+# Riwayat realtime per perangkat; rentang panjang dibaca dari penyimpanan
+KAPASITAS_PERANGKAT = 4800
+
+StatistikSiklus = namedtuple('StatistikSiklus', 'siklus durasi durasi_maks perangkat workers cpu')
+
+def urai_perangkat(teks):
+    """Daftar perangkat dari teks 'id=path, ...' (urutan dipertahankan).
+
+    Tanpa 'id=' nama perangkat diambil dari segmen path sebelum /Monitoring,
+    mis. '/devices/sawah1/Monitoring' -> 'sawah1'.
+    """
+    perangkat = {}
+    for bagian in (teks or '').replace('\n', ',').split(','):
+        bagian = bagian.strip()
+        if not bagian: continue
+        if '=' in bagian:
+            nama, path = (s.strip() for s in bagian.split('=', 1))
+        else:
+            segmen = [s for s in bagian.split('/') if s]
+            if segmen and segmen[-1] == 'Monitoring' and len(segmen) > 1: segmen = segmen[:-1]
+            nama, path = (segmen[-1] if segmen else bagian), bagian
+        if nama in perangkat: raise ValueError(f"nama perangkat ganda: {nama}")
+        perangkat[nama] = path
+    return perangkat
+
+def _poll_satu(poller):
+    # PollerSensor.poll_sekali sudah menangani sumber yang gagal (data cadangan)
+    mulai = time.thread_time()
+    poller.poll_sekali()
+    return time.thread_time() - mulai
+
+def baris_ringkasan(nama, snap):
+    """Baris tabel ikhtisar lahan dari satu Snapshot (poller atau stream)."""
+    d = snap.data
+    return {'Lahan': nama, 'Status': snap.status, 'pH': d['ph'], 'TDS': d['tds'],
+            'Kelembaban': d['soil_moisture'], 'Suhu Udara': d['air_temp'],
+            'Hujan': d['rainfall'], 'Update': d['timestamp'], 'Sumber': snap.sumber,
+            'Anomali': ', '.join(f"{k}: {'/'.join(nama_flag(f))}" for k, f in urai_flag(d.get(KOLOM_ANOMALI)).items()) or '-'}
+
+class PollerArmada:
+    """Poll banyak perangkat per siklus dengan pool thread berbatas.
+
+    sumber: dict nama perangkat -> sumber (objek dengan ambil(), lihat
+    smartfarm.sources). Pembaca memakai snapshot(nama) yang tidak pernah
+    memblokir, sama seperti PollerSensor.
+    """
+
+    def __init__(self, sumber, interval=3.0, workers=None, kapasitas=KAPASITAS_PERANGKAT,
+                 timeout=STATUS_TIMEOUT, cadangan=data_dummy, penyimpan=None):
+        if not sumber: raise ValueError("daftar perangkat kosong")
+        self.interval = float(interval)
+        self.workers = max(1, min(workers or MAKS_WORKER, len(sumber)))
+        self._poller = {
+            nama: PollerSensor(s, interval, kapasitas, timeout, cadangan, penyimpan,
+                               device=nama, poll_awal=False)
+            for nama, s in sumber.items()}
+        from concurrent.futures import ThreadPoolExecutor     # ~7 ms impor, hanya bila armada dipakai
+        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='smartfarm-armada')
+        self._stop = threading.Event()
+        self._thread = None
+        self.siklus = 0
+        self.durasi_siklus = self.durasi_maks = 0.0
+        self.cpu = 0.0                  # detik CPU semua poll (thread worker)
+        self.gagal = 0                  # siklus yang dihentikan exception
+        self.poll_sekali()
+
+    @property
+    def perangkat(self):
+        return list(self._poller)
+
+    # ---------- sisi penulis (thread siklus) ----------
+    def poll_sekali(self):
+        """Poll semua perangkat secara paralel; kembali setelah semuanya selesai."""
+        mulai = time.perf_counter()
+        self.cpu += sum(self._pool.map(_poll_satu, self._poller.values()))
+        self.durasi_siklus = time.perf_counter() - mulai
+        self.durasi_maks = max(self.durasi_maks, self.durasi_siklus)
+        self.siklus += 1
+        return self.durasi_siklus
+
+    def _jalan(self):
+        # Laju tetap: jeda dikurangi lama siklus sebelumnya
+        while not self._stop.wait(max(0.0, self.interval - self.durasi_siklus)):
+            try:
+                self.poll_sekali()
+            except Exception as e:
+                # Pool sudah ditutup (stop() atau interpreter keluar) di tengah penantian
+                if self._stop.is_set() or isinstance(e, RuntimeError) and 'shutdown' in str(e): break
+                # Kegagalan lain (mis. analitik/penyimpan) hanya menggagalkan siklus ini
+                self.gagal += 1
+                METRIK.tambah('armada_gagal', alasan=type(e).__name__)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._jalan, name='smartfarm-armada', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None: self._thread.join(timeout)
+        self._pool.shutdown(wait=False)
+
+    @property
+    def berjalan(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    # ---------- sisi pembaca (sesi Streamlit) ----------
+    def snapshot(self, nama):
+        return self._poller[nama].snapshot()
+
+    def ringkasan(self):
+        """Satu baris per perangkat untuk tabel ikhtisar (status, nilai utama, waktu update)."""
+        return [baris_ringkasan(nama, poller.snapshot()) for nama, poller in self._poller.items()]
+
+    def statistik(self):
+        return StatistikSiklus(self.siklus, self.durasi_siklus, self.durasi_maks,
+                               len(self._poller), self.workers, self.cpu)
@@ -0,0 +1,286 @@
+"""Spesifikasi Mamdani deklaratif (fuzzy_rules.json) yang dikompilasi ke bentuk matriks.
+
+Format spesifikasi:
+
+- ``input``: variabel -> term -> bentuk. Bentuk trapesium ``[a, b, c, d]``
+  (segitiga ``[a, b, c]``); ``null`` di kiri/kanan berarti bahu terbuka
+  (derajat 1 sampai ujung semesta). Bentuk crisp ``{"ambang": v, "sisi":
+  "bawah"}`` bernilai 1 bila x < v, sisi ``"atas"`` kebalikannya.
+- ``output``: nama -> ``semesta`` [lo, hi, jumlah titik] dan ``himpunan``
+  (nama -> titik trimf/trapmf), urutan himpunan dipertahankan.
+- ``rules``: list ``{"id", "jika": {variabel: term}, "maka": {output: himpunan}}``.
+  Antesenden digabung dengan AND (min); term berupa list berarti OR dalam satu
+  variabel dan dipecah menjadi beberapa rule AND (setara di bawah max-min).
+  Satu rule boleh punya konsekuen di beberapa output.
+
+Hasil kompilasi: matriks indeks rule x antesenden (R x K) yang barisnya sudah
+dikelompokkan per himpunan output (H kelompok selebar G). Kekuatan semua rule
+= K gather + K - 1 ``fmin``, bobot semua himpunan = satu ``fmax.reduce`` atas
+array H x G x N; jumlah operasi NumPy per potongan bacaan tetap berapa pun
+banyaknya rule (K = antesenden terbanyak, paling banyak jumlah variabel).
+Satu bacaan dengan rule sedikit (<= BATAS_RULE_SKALAR) memakai min/max Python
+atas kelompok yang sama, karena lebih murah dari overhead operasi NumPy.
+"""
+import hashlib
+import itertools
+import json
+
+import numpy as np
+
+# Batas elemen buffer kekuatan rule (baris antesenden x bacaan) per potongan:
+# 2**15 float64 = 256 KB supaya tetap di cache; minimal MIN_BACAAN bacaan per
+# potongan supaya overhead per potongan tidak mendominasi saat rule sangat banyak.
+MAKS_ELEMEN = 2 ** 15
+MIN_BACAAN = 64
+# Satu bacaan dengan rule sebanyak ini atau kurang dievaluasi dengan min/max Python:
+# overhead beberapa operasi NumPy (~20 us) lebih mahal daripada perulangannya.
+BATAS_RULE_SKALAR = 256
+SISI_CRISP = ('bawah', 'atas')
+INF = float('inf')
+
+
+def _angka(v, konteks):
+    if isinstance(v, bool) or not isinstance(v, (int, float)):
+        raise ValueError(f"{konteks}: titik harus angka, bukan {v!r}")
+    return v
+
+
+def _bentuk_input(var, term, spek):
+    konteks = f"input {var}.{term}"
+    if isinstance(spek, dict):
+        if spek.get('sisi') not in SISI_CRISP:
+            raise ValueError(f"{konteks}: sisi crisp harus salah satu dari {SISI_CRISP}")
+        return ('crisp', _angka(spek.get('ambang'), konteks), spek['sisi'] == 'atas')
+    if not isinstance(spek, list) or len(spek) not in (3, 4):
+        raise ValueError(f"{konteks}: bentuk harus [a, b, c], [a, b, c, d] atau objek crisp")
+    a, b, c, d = spek if len(spek) == 4 else (spek[0], spek[1], spek[1], spek[2])
+    if (a is None) != (b is None) or (c is None) != (d is None):
+        raise ValueError(f"{konteks}: bahu terbuka harus null berpasangan ([null, null, c, d] / [a, b, null, null])")
+    titik = [_angka(t, konteks) for t in (a, b, c, d) if t is not None]
+    if any(p > q for p, q in zip(titik, titik[1:])):
+        raise ValueError(f"{konteks}: titik harus tidak menurun")
+    if (a is not None and not a < b) or (c is not None and not c < d):
+        raise ValueError(f"{konteks}: sisi miring harus punya lebar > 0 (pakai null untuk bahu)")
+    return ('trap', a, b, c, d)
+
+
+def _derajat_batch(x, bentuk):
+    if bentuk[0] == 'crisp':
+        _, ambang, atas = bentuk
+        bawah = (x < ambang).astype(float)
+        return 1.0 - bawah if atas else bawah
+    _, a, b, c, d = bentuk
+    naik = (x - a) / (b - a) if a is not None else None
+    turun = (d - x) / (d - c) if d is not None else None
+    if naik is None and turun is None: return np.ones_like(x)
+    y = turun if naik is None else naik if turun is None else np.minimum(naik, turun)
+    return np.clip(y, 0.0, 1.0)
+
+
+def _titik_skalar(bentuk):
+    # (a, b, c, d) dengan bahu terbuka = -inf/inf, atau (ambang, atas, None, None) untuk crisp
+    if bentuk[0] == 'crisp': return bentuk[1], bentuk[2], None, None
+    _, a, b, c, d = bentuk
+    return ((-INF, -INF) if a is None else (a, b)) + ((INF, INF) if d is None else (c, d))
+
+
+class SistemFuzzy:
+    """Spesifikasi Mamdani yang sudah dikompilasi (lihat docstring modul).
+
+    ``kunci`` = urutan baris matriks derajat ('var_term', sama dengan kunci
+    hasil fuzzifikasi); ``antesenden[g * lebar_kelompok + i, j]`` = baris term
+    ke-j rule ke-i kelompok g, baris ``len(kunci)`` (derajat 1) untuk antesenden
+    yang kosong, dan ``len(kunci) + 1`` (derajat 0) untuk slot kelompok kosong.
+    ``rules`` menyimpan rule setelah OR dipecah (id, baris antesenden, konsekuen).
+    Spesifikasi yang tidak valid menimbulkan ValueError dengan pesan yang
+    menyebut bagian yang salah.
+    """
+
+    def __init__(self, spek, kunci_wajib=(), output_wajib=()):
+        if not isinstance(spek, dict):
+            raise ValueError("spesifikasi fuzzy harus objek JSON")
+        self.spek = spek
+        self.sidik = hashlib.sha1(json.dumps(spek, sort_keys=True).encode('utf-8')).hexdigest()
+        self._kompilasi_input(spek.get('input'))
+        self._kompilasi_output(spek.get('output'))
+        self._kompilasi_rule(spek.get('rules'))
+        hilang = [k for k in kunci_wajib if k not in self.indeks]
+        if hilang: raise ValueError(f"term input wajib tidak ada di spesifikasi: {hilang}")
+        hilang = [k for k in output_wajib if k not in self.himpunan_output]
+        if hilang: raise ValueError(f"output wajib tidak ada di spesifikasi: {hilang}")
+
+    # ---------- kompilasi ----------
+    def _kompilasi_input(self, spek):
+        if not isinstance(spek, dict) or not spek:
+            raise ValueError("'input' harus objek variabel -> term")
+        self.term = {}
+        for var, terms in spek.items():
+            if not isinstance(terms, dict) or not terms:
+                raise ValueError(f"input {var}: harus objek term -> bentuk")
+            self.term[var] = [(t, _bentuk_input(var, t, b)) for t, b in terms.items()]
+        self.kunci = tuple(f"{var}_{t}" for var, terms in self.term.items() for t, _ in terms)
+        self._skalar = [(f"{var}_{t}", var) + _titik_skalar(bentuk) for var, terms in self.term.items()
+                        for t, bentuk in terms]
+        self.indeks = {k: i for i, k in enumerate(self.kunci)}
+
+    def _kompilasi_output(self, spek):
+        if not isinstance(spek, dict) or not spek:
+            raise ValueError("'output' harus objek nama -> {semesta, himpunan}")
+        self.himpunan_output, self.semesta = {}, {}
+        for nama, isi in spek.items():
+            try:
+                lo, hi, n = isi['semesta']
+                sets = isi['himpunan'].items()
+            except (TypeError, KeyError, ValueError, AttributeError):
+                raise ValueError(f"output {nama}: butuh 'semesta' [lo, hi, n] dan objek 'himpunan'") from None
+            if not sets or not isinstance(n, int) or n < 2 or not _angka(lo, nama) < _angka(hi, nama):
+                raise ValueError(f"output {nama}: semesta/himpunan tidak valid")
+            for s, titik in sets:
+                if not isinstance(titik, list) or len(titik) not in (3, 4):
+                    raise ValueError(f"output {nama}.{s}: titik harus [a, b, c] atau [a, b, c, d]")
+                for t in titik: _angka(t, f"output {nama}.{s}")
+                if any(p > q for p, q in zip(titik, titik[1:])):
+                    raise ValueError(f"output {nama}.{s}: titik harus tidak menurun")
+            self.himpunan_output[nama] = tuple(sets)
+            self.semesta[nama] = np.linspace(lo, hi, n)
+
+    def _kompilasi_rule(self, spek):
+        if not isinstance(spek, list) or not spek:
+            raise ValueError("'rules' harus list rule yang tidak kosong")
+        self.rules = []
+        for i, rule in enumerate(spek):
+            rid = rule.get('id', f"#{i}") if isinstance(rule, dict) else f"#{i}"
+            jika, maka = (rule.get('jika'), rule.get('maka')) if isinstance(rule, dict) else (None, None)
+            if not isinstance(jika, dict) or not jika or not isinstance(maka, dict) or not maka:
+                raise ValueError(f"rule {rid}: butuh objek 'jika' dan 'maka' yang tidak kosong")
+            pilihan = []
+            for var, term in jika.items():
+                if var not in self.term: raise ValueError(f"rule {rid}: variabel input tidak dikenal: {var}")
+                terms = term if isinstance(term, list) else [term]
+                kenal = {t for t, _ in self.term[var]}
+                salah = [t for t in terms if t not in kenal]
+                if salah or not terms: raise ValueError(f"rule {rid}: term {var} tidak dikenal: {salah or term}")
+                pilihan.append([self.indeks[f"{var}_{t}"] for t in terms])
+            konsekuen = []
+            for nama, s in maka.items():
+                if nama not in self.himpunan_output: raise ValueError(f"rule {rid}: output tidak dikenal: {nama}")
+                if s not in dict(self.himpunan_output[nama]):
+                    raise ValueError(f"rule {rid}: himpunan {nama} tidak dikenal: {s}")
+                konsekuen.append((nama, s))
+            for kolom in itertools.product(*pilihan):
+                self.rules.append((rid, kolom, tuple(konsekuen)))
+
+        # Baris antesenden disusun per kelompok konsekuen (urut output lalu himpunan), jadi
+        # rule dengan beberapa konsekuen muncul di beberapa kelompok. Setiap kelompok dipad
+        # ke lebar yang sama dengan baris berderajat 0 (tidak mengubah max), dan antesenden
+        # yang lebih pendek dipad dengan baris berderajat 1 (tidak mengubah min).
+        satu, nol = len(self.kunci), len(self.kunci) + 1
+        k = max(len(kolom) for _, kolom, _ in self.rules)
+        kelompok, self.irisan = [], {}
+        for nama, sets in self.himpunan_output.items():
+            self.irisan[nama] = slice(len(kelompok), len(kelompok) + len(sets))
+            for s, _ in sets:
+                kelompok.append([kolom for _, kolom, kons in self.rules if (nama, s) in kons])
+        self.lebar_kelompok = max(1, max(len(g) for g in kelompok))
+        self.antesenden = np.full((len(kelompok) * self.lebar_kelompok, k), satu, dtype=np.intp)
+        self.antesenden[:, 0] = nol
+        for g, isi in enumerate(kelompok):
+            for r, kolom in enumerate(isi): self.antesenden[g * self.lebar_kelompok + r, :len(kolom)] = kolom
+        self.n_himpunan = len(kelompok)
+        self._kelompok = kelompok
+        self.bacaan_per_potong = max(MIN_BACAAN, MAKS_ELEMEN // self.antesenden.shape[0])
+
+    # ---------- fuzzifikasi ----------
+    def fuzzifikasi(self, nilai):
+        """Derajat semua term untuk satu bacaan (nilai: variabel -> float) -> dict 'var_term' -> float."""
+        # Percabangan per wilayah (bahu/puncak/sisi miring), hasil sama dengan rumus
+        # clip(min(naik, turun)) di fuzzifikasi_batch tanpa overhead NumPy.
+        # NaN diperlakukan seperti +inf, sama dengan rantai if/elif/else fuzzifikasi lama
+        # (semua perbandingan gagal -> cabang else): bahu kiri/tengah 0, bahu kanan 1.
+        mu = {}
+        for kunci, var, a, b, c, d in self._skalar:
+            x = nilai[var]
+            if x != x: x = INF
+            if c is None: mu[kunci] = (0.0 if x < a else 1.0) if b else (1.0 if x < a else 0.0)
+            elif b <= x <= c: mu[kunci] = 1.0
+            elif x <= a or x >= d: mu[kunci] = 0.0
+            elif x < b: mu[kunci] = (x - a) / (b - a)
+            else: mu[kunci] = (d - x) / (d - c)
+        return mu
+
+    def fuzzifikasi_batch(self, nilai):
+        """Versi vektor fuzzifikasi (nilai: variabel -> array float) -> dict 'var_term' -> array."""
+        nilai = {var: np.where(np.isnan(x), INF, x) if np.isnan(x).any() else x
+                 for var, x in ((var, np.asarray(nilai[var], dtype=float)) for var in self.term)}
+        return {f"{var}_{t}": _derajat_batch(nilai[var], bentuk)
+                for var, terms in self.term.items() for t, bentuk in terms}
+
+    def titik_transisi(self, var):
+        """Interval (awal, akhir) tempat derajat term `var` berubah; di luarnya derajat konstan."""
+        interval = set()
+        for _, bentuk in self.term[var]:
+            if bentuk[0] == 'crisp': raise ValueError(f"input {var} crisp, tidak punya interval transisi")
+            _, a, b, c, d = bentuk
+            if a is not None: interval.add((a, b))
+            if c is not None: interval.add((c, d))
+        return tuple(sorted(interval))
+
+    def ambang(self, var):
+        """Ambang tunggal input crisp `var` (semua term harus crisp dengan ambang yang sama)."""
+        ambang = {bentuk[1] if bentuk[0] == 'crisp' else None for _, bentuk in self.term[var]}
+        if len(ambang) != 1 or None in ambang:
+            raise ValueError(f"input {var} harus crisp dengan satu ambang")
+        return ambang.pop()
+
+    # ---------- inferensi ----------
+    def matriks(self, mu):
+        """Matriks derajat (K + 2) x N dari dict mu; dua baris terakhir konstan 1 dan 0."""
+        baris = [mu[k] for k in self.kunci]
+        m = np.empty((len(baris) + 2, np.shape(baris[0])[0] if np.ndim(baris[0]) else 1))
+        for j, v in enumerate(baris): m[j] = v
+        m[-2] = 1.0; m[-1] = 0.0
+        return m
+
+    def bobot(self, mu):
+        """Kekuatan tiap himpunan output = max kekuatan rule berkonsekuen himpunan itu.
+
+        Dict output -> array N x jumlah himpunan (urut sesuai himpunan_output);
+        untuk mu skalar (hasil fuzzifikasi) -> tuple float.
+        """
+        skalar = not np.ndim(mu[self.kunci[0]])
+        if skalar and len(self.rules) <= BATAS_RULE_SKALAR: return self._bobot_skalar(mu)
+        m = self.matriks(mu)
+        n, ante = m.shape[1], self.antesenden
+        lebar = max(1, min(n, self.bacaan_per_potong))
+        w = np.empty((self.n_himpunan, n))
+        kuat, sementara = np.empty((ante.shape[0], lebar)), np.empty((ante.shape[0], lebar))
+        for start in range(0, n, lebar):
+            mc = m[:, start:start + lebar]
+            k, t = kuat[:, :mc.shape[1]], sementara[:, :mc.shape[1]]
+            # Kekuatan rule = min antesenden (K - 1 fmin), lalu max dalam tiap kelompok konsekuen.
+            # Buffer dipakai ulang antar potongan (alokasi besar baru = page fault tiap panggilan).
+            np.take(mc, ante[:, 0], axis=0, out=k, mode='clip')
+            for j in range(1, ante.shape[1]):
+                np.take(mc, ante[:, j], axis=0, out=t, mode='clip')
+                np.fmin(k, t, out=k)
+            np.fmax.reduce(k.reshape(self.n_himpunan, self.lebar_kelompok, -1), axis=1, out=w[:, start:start + lebar])
+        if skalar: return {nama: tuple(w[sl, 0].tolist()) for nama, sl in self.irisan.items()}
+        return {nama: w[sl].T for nama, sl in self.irisan.items()}
+
+    def _bobot_skalar(self, mu):
+        d = [mu[k] for k in self.kunci]
+        w = []
+        for isi in self._kelompok:
+            terkuat = 0.0
+            for kolom in isi:
+                kuat = d[kolom[0]]
+                for j in kolom[1:]: kuat = min(kuat, d[j])
+                terkuat = max(terkuat, kuat)
+            w.append(terkuat)
+        return {nama: tuple(w[sl]) for nama, sl in self.irisan.items()}
+
+
+def muat_aturan(path, kunci_wajib=(), output_wajib=()):
+    """SistemFuzzy dari file JSON; ValueError bila spesifikasi tidak valid."""
+    with open(path, 'rb') as f:
+        return SistemFuzzy(json.loads(f.read()), kunci_wajib, output_wajib)
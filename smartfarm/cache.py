@@ -0,0 +1,80 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# ==================== CACHE HASIL PER BACAAN ====================
+# Kunci = hash isi bacaan (content-addressed), jadi bacaan yang sama persis dari
+# tick berikutnya, sesi lain, atau perangkat lain memakai hasil yang sama.
+
+MAKS_ENTRI = 1024
+TTL_DETIK = 600.0
+
+def kunci_konten(*bagian):
+    """SHA-1 dari representasi JSON kanonik; float memakai repr sehingga presisi penuh."""
+    teks = json.dumps(bagian, sort_keys=True, separators=(',', ':'), default=repr)
+    return hashlib.sha1(teks.encode('utf-8')).hexdigest()
+
+class CacheHasil:
+    """Cache LRU berbatas ukuran dan umur (TTL), aman dipakai banyak thread/sesi.
+
+    Penghitung: `hit`, `miss`, `kedaluwarsa` (entri ditemukan tapi sudah lewat
+    TTL, dihitung juga sebagai miss), dan `dibuang` (entri tertua dikeluarkan
+    karena cache penuh).
+    """
+
+    def __init__(self, maks_entri=MAKS_ENTRI, ttl=TTL_DETIK, jam=time.monotonic):
+        self.maks_entri = maks_entri
+        self.ttl = ttl
+        self._jam = jam
+        self._data = OrderedDict()      # kunci -> (waktu simpan, nilai)
+        self._lock = threading.Lock()
+        self.hit = self.miss = self.kedaluwarsa = self.dibuang = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def ambil(self, kunci, default=None):
+        with self._lock:
+            entri = self._data.get(kunci)
+            if entri is not None:
+                if self.ttl is None or self._jam() - entri[0] <= self.ttl:
+                    self._data.move_to_end(kunci)
+                    self.hit += 1
+                    return entri[1]
+                del self._data[kunci]
+                self.kedaluwarsa += 1
+            self.miss += 1
+            return default
+
+    def simpan(self, kunci, nilai):
+        with self._lock:
+            self._data[kunci] = (self._jam(), nilai)
+            self._data.move_to_end(kunci)
+            while len(self._data) > self.maks_entri:
+                self._data.popitem(last=False)
+                self.dibuang += 1
+
+    def ambil_atau_hitung(self, kunci, hitung, layak=None):
+        """Nilai tersimpan untuk kunci, atau hitung() lalu simpan. hitung() dijalankan di luar lock.
+
+        layak(nilai) -> bool opsional: hasil yang tidak layak (mis. prediksi gagal)
+        dikembalikan tanpa disimpan, jadi tick berikutnya menghitung ulang.
+        """
+        _kosong = object()
+        nilai = self.ambil(kunci, _kosong)
+        if nilai is _kosong:
+            nilai = hitung()
+            if layak is None or layak(nilai): self.simpan(kunci, nilai)
+        return nilai
+
+    def bersihkan(self):
+        with self._lock:
+            self._data.clear()
+
+    def statistik(self):
+        total = self.hit + self.miss
+        return {'entri': len(self._data), 'hit': self.hit, 'miss': self.miss,
+                'kedaluwarsa': self.kedaluwarsa, 'dibuang': self.dibuang,
+                'rasio_hit': self.hit / total if total else 0.0}
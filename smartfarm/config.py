@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import namedtuple
+
+# ==================== FILE KONFIGURASI ====================
+# knowledge_base.json, master_data.json, fuzzy_rules.json, dan style.css berada di root repo (sebelah app.py).
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KB_FILE = os.path.join(BASE_DIR, "knowledge_base.json")
+MASTER_FILE = os.path.join(BASE_DIR, "master_data.json")
+FUZZY_FILE = os.path.join(BASE_DIR, "fuzzy_rules.json")
+CSS_FILE = os.path.join(BASE_DIR, "style.css")
+
+def _parse_kb(isi):
+    kb = json.loads(isi)
+    return kb if isinstance(kb, list) else []
+
+def _parse_master(isi):
+    return json.loads(isi).get('definitions', {})
+
+def muat_knowledge_base(path=KB_FILE):
+    """List rule dari knowledge_base.json; list kosong bila file tidak ada/rusak."""
+    try:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                return _parse_kb(f.read())
+    except (OSError, ValueError):
+        pass
+    return []
+
+def muat_master_data(path=MASTER_FILE):
+    """Dict 'definitions' dari master_data.json; dict kosong bila file tidak ada/rusak."""
+    try:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                return _parse_master(f.read())
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+def ringkas_css(css):
+    """Buang komentar dan spasi berlebih; hasilnya siap dibungkus <style>."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{};:,>])\s*', r'\1', css).strip()
+
+# ==================== KONFIGURASI TERKOMPILASI ====================
+# Snapshot immutable: dibangun sekali per proses dan dipakai bersama semua sesi
+# dan rerun. versi naik setiap kali ada file yang isinya berubah.
+Konfigurasi = namedtuple('Konfigurasi', 'versi kb kb_index master master_index css sidik')
+
+class _Berkas:
+    """Satu file yang dipantau: (mtime_ns, ukuran) sebagai cek cepat, hash isi sebagai penentu."""
+
+    def __init__(self, path):
+        self.path = path
+        self.kunci = False         # belum pernah dibaca
+        self.sidik = None          # hash isi terakhir yang dibaca
+        self.valid = None          # hash isi terakhir yang berhasil dipakai
+
+    def berubah(self):
+        """Isi file (bytes, b'' bila tidak ada) jika isinya berubah sejak cek terakhir, selain itu None."""
+        try:
+            st = os.stat(self.path)
+            kunci = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            kunci = None
+        if kunci == self.kunci: return None
+        self.kunci = kunci
+        try:
+            with open(self.path, 'rb') as f: isi = f.read()
+        except OSError:
+            isi = b''
+        sidik = hashlib.sha1(isi).hexdigest()
+        if sidik == self.sidik: return None      # di-touch / disimpan ulang tanpa perubahan isi
+        self.sidik = sidik
+        return isi
+
+class KonfigurasiLive:
+    """Knowledge base, master data, dan CSS terkompilasi dengan hot reload.
+
+    ambil() hanya melakukan os.stat pada ketiga file; file dibaca ulang bila
+    mtime/ukurannya berubah, dan dikompilasi ulang (IndeksRule, IndeksMaster,
+    CSS ringkas) hanya bila hash isinya berubah. File yang gagal di-parse
+    (mis. sedang disunting) tidak menggantikan versi terakhir yang valid;
+    kegagalan dihitung di `gagal` dan pesannya di `galat`.
+    """
+
+    def __init__(self, kb_path=KB_FILE, master_path=MASTER_FILE, css_path=CSS_FILE):
+        self._kb = _Berkas(kb_path)
+        self._master = _Berkas(master_path)
+        self._css = _Berkas(css_path)
+        self._lock = threading.Lock()
+        self._konfigurasi = None
+        self.gagal = 0
+        self.galat = None
+        self.ambil()
+
+    def ambil(self):
+        with self._lock:
+            lama = self._konfigurasi
+            isi_kb, isi_master, isi_css = self._kb.berubah(), self._master.berubah(), self._css.berubah()
+            if lama is not None and isi_kb is None and isi_master is None and isi_css is None:
+                return lama
+            kb, kb_index = (lama.kb, lama.kb_index) if lama else ([], None)
+            master, master_index = (lama.master, lama.master_index) if lama else ({}, None)
+            css = lama.css if lama else ''
+            baru = lama is None
+            if isi_kb is not None:
+                try:
+                    kb, kb_index = (_parse_kb(isi_kb) if isi_kb else []), None
+                    self._kb.valid = self._kb.sidik; baru = True
+                except ValueError as e:
+                    self._gagal(self._kb, e)
+            if isi_master is not None:
+                try:
+                    master, master_index = (_parse_master(isi_master) if isi_master else {}), None
+                    self._master.valid = self._master.sidik; baru = True
+                except (ValueError, AttributeError) as e:
+                    self._gagal(self._master, e)
+            if isi_css is not None:
+                css = f"<style>{ringkas_css(isi_css.decode('utf-8', 'replace'))}</style>" if isi_css else ''
+                self._css.valid = self._css.sidik; baru = True
+            if not baru: return lama
+            if kb_index is None:
+                from smartfarm.diagnosis import kompilasi_rule
+                kb_index = kompilasi_rule(kb)
+            if master_index is None:
+                from smartfarm.labels import IndeksMaster
+                master_index = IndeksMaster(master)
+            sidik = hashlib.sha1(f"{self._kb.valid}{self._master.valid}{self._css.valid}".encode()).hexdigest()
+            self._konfigurasi = Konfigurasi((lama.versi + 1) if lama else 1, kb, kb_index,
+                                            master, master_index, css, sidik)
+            return self._konfigurasi
+
+    def _gagal(self, berkas, e):
+        # Lupakan hash isi yang rusak: bila file dikembalikan ke isi yang valid, isi itu dibaca ulang
+        berkas.sidik = None
+        self.gagal += 1
+        self.galat = f"{os.path.basename(berkas.path)}: {e}"
@@ -0,0 +1,134 @@
+import numpy as np
+
+# ==================== DIAGNOSA CERTAINTY FACTOR ====================
+MAPPING_KONDISI = {
+    "ph": {"masam": "ph_masam", "netral": "ph_netral", "basa": "ph_basa"},
+    "tds": {"kurang": "tds_kurang", "ideal": "tds_ideal", "berlebih": "tds_lebih"},
+    "kelembaban": {"kering": "hum_kering", "lembab": "hum_opt", "basah": "hum_basah"},
+    "curah_hujan": {"cerah": "hujan_cerah", "hujan": "hujan_turun"}
+}
+
+RULE_ERROR = {"id": "ERR", "description": "Error", "results": {"status_t": "Error", "air_r": "-", "pupuk_q": "-", "pestisida_s": "-", "action_steps": [], "cf": 0}}
+
+# Urutan baris matriks derajat keanggotaan (sama dengan kunci fuzzifikasi_input).
+# Baris tambahan terakhir selalu 0, dipakai untuk term yang tidak dikenal di mapping.
+KUNCI_MU = ('tds_kurang', 'tds_ideal', 'tds_lebih', 'ph_masam', 'ph_netral', 'ph_basa',
+            'hum_kering', 'hum_opt', 'hum_basah', 'hujan_cerah', 'hujan_turun')
+VARIABEL_KONDISI = ("ph", "tds", "kelembaban", "curah_hujan")
+CHUNK_RULE = 1024
+
+class IndeksRule:
+    """Knowledge base yang dikompilasi: matriks kondisi integer (R x 4) + vektor CF.
+
+    kondisi[r, v] = baris KUNCI_MU untuk term variabel v pada rule r, sehingga
+    kekuatan semua rule = gather baris matriks derajat + min, lalu x CF dan argmax.
+    Rule yang tidak valid (kunci kondisi hilang / cf bukan angka) dilewati, sama
+    seperti blok try/except pada perulangan lama.
+    """
+
+    def __init__(self, rules_db):
+        self.rules_db = rules_db
+        baris_mu = {k: i for i, k in enumerate(KUNCI_MU)}; nol = len(KUNCI_MU)
+        kondisi, cf, posisi = [], [], []
+        for i, rule in enumerate(rules_db):
+            try:
+                conds = rule['conditions']
+                baris = [baris_mu.get(MAPPING_KONDISI[var].get(conds[var]), nol) for var in VARIABEL_KONDISI]
+                nilai_cf = 1.0 * rule.get('results', {}).get('cf', 0.0)
+            except Exception: continue
+            kondisi.append(baris); cf.append(nilai_cf); posisi.append(i)
+        self.kondisi = np.array(kondisi, dtype=np.intp).reshape(-1, len(VARIABEL_KONDISI))
+        self.cf = np.array(cf, dtype=float)
+        self.posisi = np.array(posisi, dtype=np.int64)
+
+    def __len__(self):
+        return self.cf.size
+
+    @staticmethod
+    def matriks_mu(mu):
+        """Dict derajat (skalar atau array N) -> matriks (len(KUNCI_MU) + 1) x N, baris terakhir 0."""
+        baris = [np.asarray(mu.get(k, 0.0), dtype=float) for k in KUNCI_MU]
+        m = np.zeros((len(KUNCI_MU) + 1, max(b.size for b in baris)))
+        for i, b in enumerate(baris): m[i] = b
+        return m
+
+    def skor(self, m):
+        """Kekuatan rule x CF dari matriks derajat m: R x N (gather + min)."""
+        kuat = m[self.kondisi[:, 0]]
+        for j in range(1, self.kondisi.shape[1]):
+            np.minimum(kuat, m[self.kondisi[:, j]], out=kuat)
+        kuat *= self.cf[:, None]
+        return kuat
+
+    def terbaik_satu(self, mu):
+        """Jalur cepat satu bacaan (mu berisi skalar): (indeks rule, keyakinan %)."""
+        if not len(self): return (0 if self.rules_db else -1), -100.0
+        v = np.fromiter((mu.get(k, 0.0) for k in KUNCI_MU), dtype=float, count=len(KUNCI_MU))
+        skor = np.append(v, 0.0)[self.kondisi].min(axis=1) * self.cf
+        j = int(skor.argmax())
+        if not skor[j] > -1.0: return 0, -100.0
+        return int(self.posisi[j]), float(skor[j]) * 100
+
+    def terbaik(self, mu):
+        """(indeks rule di rules_db, keyakinan %) per bacaan; -1 jika rules_db kosong."""
+        m = self.matriks_mu(mu); n = m.shape[1]
+        idx = np.full(n, 0 if self.rules_db else -1, dtype=np.int64)
+        belief = np.full(n, -1.0)
+        if len(self):
+            for start in range(0, n, CHUNK_RULE):
+                sl = slice(start, start + CHUNK_RULE)
+                skor = self.skor(m[:, sl]); j = skor.argmax(axis=0)
+                top = skor[j, np.arange(j.size)]
+                ok = top > -1.0
+                idx[sl] = np.where(ok, self.posisi[j], idx[sl]); belief[sl] = np.where(ok, top, -1.0)
+        return idx, belief * 100
+
+    def top_k(self, mu, k=3):
+        """k diagnosa teratas per bacaan: (indeks N x k, keyakinan % N x k), urut menurun.
+
+        Skor sama diurutkan sesuai urutan rule di knowledge base. Jika k melebihi
+        jumlah rule valid, kolom sisa berisi indeks -1 dan keyakinan NaN.
+        """
+        m = self.matriks_mu(mu); n = m.shape[1]; kk = min(k, len(self))
+        idx = np.full((n, k), -1, dtype=np.int64); belief = np.full((n, k), np.nan)
+        if kk:
+            for start in range(0, n, CHUNK_RULE):
+                sl = slice(start, start + CHUNK_RULE)
+                skor = self.skor(m[:, sl])
+                urut = np.argsort(-skor, axis=0, kind='stable')[:kk]
+                idx[sl, :kk] = self.posisi[urut].T
+                belief[sl, :kk] = np.take_along_axis(skor, urut, axis=0).T * 100
+        return idx, belief
+
+_INDEKS_TERAKHIR = [None]
+
+def kompilasi_rule(rules_db):
+    """IndeksRule untuk rules_db; hasil terakhir dipakai ulang selama objek list-nya sama.
+
+    rules_db yang sudah berupa IndeksRule (mis. Konfigurasi.kb_index) dipakai apa adanya.
+    """
+    if isinstance(rules_db, IndeksRule): return rules_db
+    cache = _INDEKS_TERAKHIR[0]
+    if cache is None or cache.rules_db is not rules_db:
+        cache = _INDEKS_TERAKHIR[0] = IndeksRule(rules_db)
+    return cache
+
+def hitung_diagnosa_cf(mu, rules_db):
+    indeks = kompilasi_rule(rules_db)
+    i, belief = indeks.terbaik_satu(mu)
+    best_rule = indeks.rules_db[i] if i >= 0 else RULE_ERROR
+    return best_rule, belief
+
+def diagnosa_top_k(mu, rules_db, k=3):
+    """k diagnosa teratas untuk satu bacaan: list (rule, keyakinan %)."""
+    indeks = kompilasi_rule(rules_db)
+    idx, belief = indeks.top_k(mu, k)
+    return [(indeks.rules_db[i], float(b)) for i, b in zip(idx[0], belief[0]) if i >= 0]
+
+def diagnosa_batch(mu, rules_db):
+    """Versi vektor hitung_diagnosa_cf untuk mu hasil fuzzifikasi_batch.
+
+    Mengembalikan (indeks rule terbaik di rules_db, keyakinan dalam persen).
+    Indeks -1 berarti rules_db kosong (setara RULE_ERROR).
+    """
+    return kompilasi_rule(rules_db).terbaik(mu)
@@ -0,0 +1,79 @@
+import numpy as np
+
+# ==================== DOWNSAMPLING GRAFIK (LTTB) ====================
+# Largest-Triangle-Three-Buckets (Steinarsson, 2013): titik pertama dan terakhir
+# selalu dipertahankan, sisanya dibagi ke n - 2 ember; dari tiap ember dipilih
+# titik yang membentuk segitiga terbesar dengan titik terpilih sebelumnya dan
+# rata-rata ember berikutnya. Puncak dan lembah tetap terlihat, berbeda dengan
+# mengambil setiap titik ke-k.
+
+MAKS_TITIK = 1000     # titik per grafik yang dikirim ke browser
+
+def lttb_indeks(x, y, n):
+    """Indeks (urut naik) dari n titik terpilih. x harus urut naik, tanpa NaN.
+
+    y boleh 2D (m, S) untuk S seri yang berbagi x: hasilnya (n, S), satu
+    kolom indeks per seri, dihitung bersama dalam satu loop ember.
+    """
+    x = np.asarray(x, dtype=float); y = np.asarray(y, dtype=float)
+    m = x.size
+    dua_d = y.ndim == 2
+    Y = y if dua_d else y[:, None]
+    S = Y.shape[1]
+    if n >= m or m <= 2: hasil = np.repeat(np.arange(m)[:, None], S, axis=1)
+    elif n < 3: hasil = np.repeat(np.array([0, m - 1], dtype=np.intp)[:max(n, 0), None], S, axis=1)
+    else:
+        x = x - x[0]     # luas segitiga tidak berubah oleh translasi; cumsum epoch tetap presisi
+        # Batas ember untuk titik 1..m-2 (ember 0 dan n-1 berisi titik pertama/terakhir)
+        batas = np.floor(np.linspace(1, m - 1, n - 1)).astype(np.intp)
+        lo, hi = batas[:-1], batas[1:]
+        # Rata-rata tiap ember dihitung sekali lewat cumsum
+        cx = np.concatenate(([0.0], np.cumsum(x)))
+        cy = np.concatenate((np.zeros((1, S)), np.cumsum(Y, axis=0)))
+        lebar = (hi - lo).astype(float)
+        rata_x = np.append((cx[hi] - cx[lo]) / lebar, x[-1])
+        rata_y = np.vstack(((cy[hi] - cy[lo]) / lebar[:, None], Y[-1:]))
+        hasil = np.empty((n, S), dtype=np.intp)
+        hasil[0] = 0
+        a = np.zeros(S, dtype=np.intp)
+        kol = np.arange(S)
+        for i in range(n - 2):
+            s, e = lo[i], hi[i]
+            ax, ay = x[a], Y[a, kol]
+            bx, by = rata_x[i + 1], rata_y[i + 1]
+            # |(ax - bx)(y - ay) - (ax - x)(by - ay)| untuk semua titik ember, semua seri
+            luas = np.abs((ax - bx) * (Y[s:e] - ay) - (ax - x[s:e, None]) * (by - ay))
+            a = s + np.argmax(luas, axis=0)
+            hasil[i + 1] = a
+        hasil[-1] = m - 1
+    return hasil if dua_d else hasil[:, 0]
+
+def lttb(x, y, n=MAKS_TITIK):
+    """(x, y) hasil downsampling LTTB. NaN di y dibuang lebih dulu."""
+    x = np.asarray(x, dtype=float); y = np.asarray(y, dtype=float)
+    ada = ~np.isnan(y)
+    x, y = x[ada], y[ada]
+    i = lttb_indeks(x, y, n)
+    return x[i], y[i]
+
+def lttb_gabungan(x, kolom, n=MAKS_TITIK):
+    """Downsampling beberapa seri yang berbagi sumbu x (satu DataFrame grafik).
+
+    Setiap seri mendapat jatah n // jumlah seri titik; indeks terpilih semua
+    seri digabung, jadi hasilnya paling banyak n titik dan bentuk setiap seri
+    tetap terjaga.
+    """
+    x = np.asarray(x, dtype=float)
+    if x.size <= n or not kolom: return x, dict(kolom)
+    jatah = max(n // len(kolom), 3)
+    Y = np.column_stack([np.asarray(v, dtype=float) for v in kolom.values()])
+    nan = np.isnan(Y)
+    if not nan.any():
+        i = np.unique(lttb_indeks(x, Y, jatah))
+    else:
+        pilih = []
+        for c in range(Y.shape[1]):
+            ada = np.flatnonzero(~nan[:, c])
+            pilih.append(ada[lttb_indeks(x[ada], Y[ada, c], jatah)])
+        i = np.unique(np.concatenate(pilih))
+    return x[i], {k: np.asarray(v)[i] for k, v in kolom.items()}
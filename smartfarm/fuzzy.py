@@ -0,0 +1,255 @@
+import numpy as np
+
+from smartfarm.aturan import muat_aturan
+from smartfarm.config import FUZZY_FILE
+from smartfarm.diagnosis import KUNCI_MU
+
+# ==================== FUNGSI KEANGGOTAAN ====================
+def trimf(x, abc):
+    a, b, c = abc; y = np.zeros_like(x)
+    mask_left = (x > a) & (x <= b); mask_right = (x > b) & (x < c)
+    if b != a: y[mask_left] = (x[mask_left] - a) / (b - a)
+    if c != b: y[mask_right] = (c - x[mask_right]) / (c - b)
+    y[x == b] = 1.0
+    return y
+
+def trapmf(x, abcd):
+    a, b, c, d = abcd; y = np.zeros_like(x)
+    mask_left = (x > a) & (x < b); mask_right = (x > c) & (x < d)
+    if b != a: y[mask_left] = (x[mask_left] - a) / (b - a)
+    y[(x >= b) & (x <= c)] = 1.0
+    if d != c: y[mask_right] = (d - x[mask_right]) / (d - c)
+    return y
+
+def keanggotaan(x, titik):
+    """trimf untuk 3 titik, trapmf untuk 4 titik."""
+    return trimf(x, titik) if len(titik) == 3 else trapmf(x, titik)
+
+def defuzzifikasi_centroid(x, mfx):
+    num = np.sum(x * mfx); den = np.sum(mfx)
+    return num / den if den != 0 else 0
+
+# ==================== SPESIFIKASI RULE ====================
+# Term input, himpunan output, dan rule Mamdani dibaca dari fuzzy_rules.json dan
+# dikompilasi sekali saat modul diimpor (smartfarm.aturan); perubahan file baru
+# berlaku setelah proses di-restart. Kunci derajat wajib mencakup KUNCI_MU
+# (dipakai diagnosa CF).
+VARIABEL_INPUT = ('tds', 'ph', 'hum', 'hujan')
+OUTPUT = ('irigasi', 'pupuk', 'pestisida')
+
+SISTEM = muat_aturan(FUZZY_FILE, kunci_wajib=KUNCI_MU, output_wajib=OUTPUT)
+
+# Urutan himpunan di sini dipakai juga oleh jalur batch (kolom bobot).
+HIMPUNAN_OUTPUT = SISTEM.himpunan_output
+SEMESTA_OUTPUT = SISTEM.semesta
+x_irigasi, x_pupuk, x_pestisida = (SEMESTA_OUTPUT[nama] for nama in OUTPUT)
+
+# ==================== TITIK PATAH INPUT ====================
+# Interval transisi fungsi keanggotaan input. Nilai di luar interval ini
+# menghasilkan derajat konstan (dipakai tabel inferensi).
+TITIK_INPUT = {var: SISTEM.titik_transisi(var) for var in ('tds', 'ph', 'hum')}
+AMBANG_HUJAN = SISTEM.ambang('hujan')
+
+# ==================== FUZZIFIKASI & INFERENSI (SATU BACAAN) ====================
+def fuzzifikasi_input(tds, ph, hum, hujan):
+    return SISTEM.fuzzifikasi({'tds': tds, 'ph': ph, 'hum': hum, 'hujan': hujan})
+
+def inferensi_mamdani_baru(mu):
+    """Agregat max-min (irigasi, pupuk, pestisida) di atas semesta masing-masing."""
+    bobot = bobot_himpunan(mu)
+    hasil = []
+    for nama in OUTPUT:
+        agg = np.zeros_like(SEMESTA_OUTPUT[nama])
+        for w, s in zip(bobot[nama], _HIMPUNAN_ARR[nama]): np.fmax(agg, np.fmin(w, s), out=agg)
+        hasil.append(agg)
+    return tuple(hasil)
+
+# ==================== JALUR BATCH (BANYAK BACAAN) ====================
+# Jumlah bacaan per potongan. Buffer agregasi terbesar = CHUNK_SIZE x 1000 float64 (~8 MB).
+CHUNK_SIZE = 1024
+
+# Kolom default untuk inferensi_frame (tds, ph, kelembaban, hujan)
+KOLOM_BATCH = ('tds', 'ph', 'humidity', 'rain')
+
+_HIMPUNAN_ARR = {
+    nama: np.stack([keanggotaan(SEMESTA_OUTPUT[nama], titik) for _, titik in sets])
+    for nama, sets in HIMPUNAN_OUTPUT.items()
+}
+
+def fuzzifikasi_batch(tds, ph, hum, hujan):
+    """Versi vektor dari fuzzifikasi_input; setiap derajat berupa array sepanjang N."""
+    nilai = (np.asarray(v, dtype=float) for v in (tds, ph, hum, hujan))
+    return SISTEM.fuzzifikasi_batch(dict(zip(VARIABEL_INPUT, nilai)))
+
+def bobot_himpunan(mu):
+    """Kekuatan tiap himpunan output (N x jumlah himpunan), urut sesuai HIMPUNAN_OUTPUT.
+
+    Rule dengan konsekuen sama digabung dulu dengan max, karena
+    max(min(a, S), min(b, S)) == min(max(a, b), S). Untuk mu skalar
+    (hasil fuzzifikasi_input) hasilnya tuple float.
+    """
+    return SISTEM.bobot(mu)
+
+def _centroid_sampled(nama, w):
+    # Agregasi max-min untuk satu potongan, lalu centroid per baris.
+    x = SEMESTA_OUTPUT[nama]; sets = _HIMPUNAN_ARR[nama]
+    agg = np.fmin(w[:, 0, None], sets[0])
+    for k in range(1, sets.shape[0]):
+        np.fmax(agg, np.fmin(w[:, k, None], sets[k]), out=agg)
+    den = agg.sum(axis=1)
+    num = (agg * x).sum(axis=1)
+    return np.divide(num, den, out=np.zeros_like(num), where=den != 0)
+
+# ==================== CENTROID EKSAK (ANALITIK) ====================
+# Agregat output = max_k min(w_k, S_k(x)) selalu linear sepotong-sepotong. Titik
+# patahnya: titik sudut tiap himpunan, perpotongan antar sisi miring himpunan
+# (tetap), dan perpotongan sisi miring dengan level w_k (bergantung bacaan).
+# Centroid dihitung tepat dari titik-titik itu tanpa array semesta yang rapat.
+def _sisi_miring(titik):
+    ys = (0.0, 1.0, 0.0) if len(titik) == 3 else (0.0, 1.0, 1.0, 0.0)
+    return [(titik[i], ys[i], titik[i + 1], ys[i + 1]) for i in range(len(titik) - 1)
+            if titik[i + 1] != titik[i] and ys[i + 1] != ys[i]]
+
+def _silang(sisi_a, sisi_b):
+    # Absis perpotongan dua kumpulan sisi miring
+    hasil = []
+    for ax0, ay0, ax1, ay1 in sisi_a:
+        ma = (ay1 - ay0) / (ax1 - ax0)
+        for bx0, by0, bx1, by1 in sisi_b:
+            mb = (by1 - by0) / (bx1 - bx0)
+            if ma == mb: continue
+            xc = (by0 - ay0 + ma * ax0 - mb * bx0) / (ma - mb)
+            if max(ax0, bx0) <= xc <= min(ax1, bx1): hasil.append(xc)
+    return hasil
+
+def _siapkan_eksak(nama):
+    x = SEMESTA_OUTPUT[nama]; lo, hi = float(x[0]), float(x[-1])
+    sets = [titik for _, titik in HIMPUNAN_OUTPUT[nama]]
+    sisi_set = [_sisi_miring(titik) for titik in sets]
+    silang = {(j, k): _silang(sisi_set[j], sisi_set[k])
+              for j in range(len(sets)) for k in range(j + 1, len(sets))}
+    tetap = {lo, hi} | {float(t) for titik in sets for t in titik}
+    for xs in silang.values(): tetap.update(xs)
+    tetap = sorted(t for t in tetap if lo <= t <= hi)
+    sisi = [s for ss in sisi_set for s in ss]
+    return lo, hi, sets, tetap, sisi, sisi_set, silang
+
+_EKSAK = {nama: _siapkan_eksak(nama) for nama in HIMPUNAN_OUTPUT}
+
+def _mf_skalar(x, titik):
+    # Sama dengan trimf/trapmf, untuk satu nilai float (tanpa overhead NumPy)
+    if len(titik) == 3:
+        a, b, c = titik
+        if x == b: return 1.0
+        if a < x < b: return (x - a) / (b - a)
+        if b < x < c: return (c - x) / (c - b)
+        return 0.0
+    a, b, c, d = titik
+    if b <= x <= c: return 1.0
+    if a < x < b: return (x - a) / (b - a)
+    if c < x < d: return (d - x) / (d - c)
+    return 0.0
+
+_BENTUK_AKTIF = {}
+
+def _bentuk_aktif(nama, aktif):
+    # Bagian yang hanya bergantung pada himpunan mana yang aktif (paling banyak
+    # 2**S kombinasi per output), disimpan sekali: titik tetap (ujung semesta,
+    # sudut himpunan, perpotongan antar sisi miring) beserta derajat tiap
+    # himpunan aktif di titik itu, dan sisi miring himpunan aktif.
+    bentuk = _BENTUK_AKTIF.get((nama, aktif))
+    if bentuk is None:
+        lo, hi, sets, _, _, sisi_set, silang = _EKSAK[nama]
+        titik = {lo, hi}
+        for k in aktif: titik.update(float(t) for t in sets[k])
+        for j in aktif:
+            for k in aktif:
+                if j < k: titik.update(silang[(j, k)])
+        titik = sorted(titik)
+        derajat = [[_mf_skalar(x, sets[k]) for k in aktif] for x in titik]
+        miring = [(i, x0, y0, (x1 - x0) / (y1 - y0), min(y0, y1), max(y0, y1))
+                  for i, k in enumerate(aktif) for x0, y0, x1, y1 in sisi_set[k]]
+        _BENTUK_AKTIF[(nama, aktif)] = bentuk = (titik, derajat, miring)
+    return bentuk
+
+def _centroid_eksak_skalar(nama, w):
+    # Hanya himpunan dengan bobot > 0 yang ikut membentuk agregat
+    sets = _EKSAK[nama][2]
+    aktif = tuple(k for k in range(len(sets)) if w[k] > 0)
+    if not aktif: return 0.0
+    titik, derajat, miring = _bentuk_aktif(nama, aktif)
+    wa = [w[k] for k in aktif]
+    f = [max(map(min, wa, d)) for d in derajat]
+    # Sisi miring himpunan i memotong level w_j < w_i (j == i: sudut potongnya sendiri);
+    # level di atas w_i tidak tercapai oleh himpunan i yang sudah dipotong. Di titik
+    # potong itu derajat himpunan i = w_j, jadi hanya himpunan lain yang dihitung.
+    tingkat = set(wa)
+    tambahan = []
+    for i, x0, y0, kemiringan, ylo, yhi in miring:
+        for wj in tingkat:
+            if ylo < wj < yhi and wj <= wa[i]:
+                x = x0 + (wj - y0) * kemiringan
+                fx = wj
+                for j, k in enumerate(aktif):
+                    if j != i: fx = max(fx, min(wa[j], _mf_skalar(x, sets[k])))
+                tambahan.append((x, fx))
+    if tambahan:
+        titik, f = zip(*sorted([*zip(titik, f), *tambahan]))
+    luas = momen = 0.0
+    for xa, xb, fa, fb in zip(titik, titik[1:], f, f[1:]):
+        dx = xb - xa
+        luas += dx * (fa + fb)
+        momen += dx * (xa * (2 * fa + fb) + xb * (fa + 2 * fb))
+    return momen / luas / 3.0 if luas > 0 else 0.0
+
+def centroid_eksak(nama, w):
+    """Centroid analitik untuk output `nama` dari bobot himpunan w (N x 3 atau 3)."""
+    if isinstance(w, tuple): return _centroid_eksak_skalar(nama, w)
+    w = np.asarray(w, dtype=float)
+    if w.ndim == 1: return _centroid_eksak_skalar(nama, w.tolist())
+    n = w.shape[0]
+    lo, hi, sets, tetap, sisi = _EKSAK[nama][:5]
+    tetap = np.asarray(tetap); x0, y0, x1, y1 = np.asarray(sisi, dtype=float).T
+    # Titik potong tiap sisi miring dengan setiap level w_k: N x (sisi * himpunan)
+    xs = x0[None, :, None] + (w[:, None, :] - y0[None, :, None]) * ((x1 - x0) / (y1 - y0))[None, :, None]
+    xs = np.clip(xs, x0[None, :, None], x1[None, :, None]).reshape(n, -1)
+    titik = np.sort(np.concatenate([np.broadcast_to(tetap, (n, tetap.size)), xs], axis=1), axis=1)
+    np.clip(titik, lo, hi, out=titik)
+    f = np.fmin(w[:, 0, None], keanggotaan(titik, sets[0]))
+    for k in range(1, len(sets)):
+        np.fmax(f, np.fmin(w[:, k, None], keanggotaan(titik, sets[k])), out=f)
+    dx = np.diff(titik, axis=1); fa, fb = f[:, :-1], f[:, 1:]; xa, xb = titik[:, :-1], titik[:, 1:]
+    luas = (dx * (fa + fb)).sum(axis=1) / 2.0
+    momen = (dx * (xa * (2 * fa + fb) + xb * (fa + 2 * fb))).sum(axis=1) / 6.0
+    return np.divide(momen, luas, out=np.zeros_like(luas), where=luas > 0)
+
+# Metode defuzzifikasi jalur batch: 'sampled' (sama dengan jalur skalar) atau 'exact'
+METODE_DEFUZZ = ('sampled', 'exact')
+
+def inferensi_batch(tds, ph, hum, hujan, chunk_size=CHUNK_SIZE, metode='sampled'):
+    """Fuzzifikasi + Mamdani + centroid untuk N bacaan sekaligus.
+
+    Mengembalikan dict berisi array 'val_ir', 'val_pp', 'val_pt' dan derajat
+    keanggotaan (kunci sama dengan fuzzifikasi_input). Hasil sama dengan jalur
+    skalar; pemakaian memori dibatasi oleh chunk_size. metode='exact' memakai
+    centroid analitik (centroid_eksak) sebagai ganti sampling semesta output.
+    """
+    if metode not in METODE_DEFUZZ: raise ValueError(f"metode tidak dikenal: {metode}")
+    centroid = _centroid_sampled if metode == 'sampled' else centroid_eksak
+    mu = fuzzifikasi_batch(tds, ph, hum, hujan)
+    n = mu['tds_kurang'].shape[0] if mu['tds_kurang'].ndim else 1
+    mu = {k: np.broadcast_to(v, (n,)) for k, v in mu.items()}
+    bobot = bobot_himpunan(mu)
+    hasil = {'val_ir': np.empty(n), 'val_pp': np.empty(n), 'val_pt': np.empty(n)}
+    for start in range(0, n, chunk_size):
+        sl = slice(start, start + chunk_size)
+        hasil['val_ir'][sl] = centroid('irigasi', bobot['irigasi'][sl])
+        hasil['val_pp'][sl] = centroid('pupuk', bobot['pupuk'][sl])
+        hasil['val_pt'][sl] = centroid('pestisida', bobot['pestisida'][sl])
+    hasil.update(mu)
+    return hasil
+
+def inferensi_frame(df, kolom=KOLOM_BATCH, chunk_size=CHUNK_SIZE, metode='sampled'):
+    """inferensi_batch untuk DataFrame; kolom = nama kolom (tds, ph, kelembaban, hujan)."""
+    hasil = inferensi_batch(*(df[k].to_numpy() for k in kolom), chunk_size=chunk_size, metode=metode)
+    return type(df)(hasil, index=df.index)
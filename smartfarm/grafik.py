@@ -0,0 +1,102 @@
+import io
+import threading
+
+import numpy as np
+
+from smartfarm.fuzzy import HIMPUNAN_OUTPUT, SEMESTA_OUTPUT, keanggotaan
+
+# ==================== GRAFIK FUZZY ====================
+# matplotlib (~0.3 s) baru diimpor saat grafik pertama digambar. Figure dibuat
+# lewat matplotlib.figure.Figure (bukan pyplot), jadi tidak tertahan di registry
+# pyplot dan dibebaskan GC begitu tidak dipakai.
+
+# (variabel output, kunci hasil agregasi, kunci nilai crisp, warna area, judul)
+PANEL_FUZZY = (
+    ('irigasi', 'agg_ir', 'val_ir', '#3b82f6', "Volume Irigasi"),
+    ('pupuk', 'agg_pp', 'val_pp', '#10b981', "Dosis Pupuk"),
+    ('pestisida', 'agg_pt', 'val_pt', '#ef4444', "Dosis Pestisida"),
+)
+GAYA_HIMPUNAN = ('r--', 'g--', 'b--')
+UKURAN_FIGURE = (15, 4)
+DPI_PNG = 120
+
+def _figure(dpi=100):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=UKURAN_FIGURE, dpi=dpi, layout='constrained')
+    FigureCanvasAgg(fig)
+    return fig
+
+def _latar(fig):
+    """Gambar ketiga panel himpunan output (bagian statis grafik); kembalikan axes-nya."""
+    ax = fig.subplots(1, 3)
+    for a, (nama, _, _, _, judul) in zip(ax, PANEL_FUZZY):
+        x = SEMESTA_OUTPUT[nama]
+        for (_, titik), gaya in zip(HIMPUNAN_OUTPUT[nama], GAYA_HIMPUNAN):
+            a.plot(x, keanggotaan(x, titik), gaya, alpha=0.7)
+        a.set_title(judul)
+    return ax
+
+def _overlay(a, x, agg, val, warna, animated=False):
+    return (a.fill_between(x, agg, color=warna, alpha=0.3, animated=animated),
+            a.axvline(val, color='k', linewidth=2, animated=animated))
+
+def plot_fuzzy(res_data):
+    """Figure 3 panel: himpunan output, area agregasi Mamdani, dan garis centroid."""
+    fig = _figure()
+    for a, (nama, agg, val, warna, _) in zip(_latar(fig), PANEL_FUZZY):
+        _overlay(a, SEMESTA_OUTPUT[nama], res_data[agg], res_data[val], warna)
+    return fig
+
+class PelukisFuzzy:
+    """Render PNG grafik fuzzy dengan latar statis yang digambar sekali.
+
+    Himpunan output (sembilan kurva, judul, sumbu) dirender satu kali ke
+    figure persisten dan piksel latarnya disimpan. Setiap hasil hanya
+    menggambar area agregasi dan garis centroid di atas salinan latar
+    (blitting), lalu artist tersebut dilepas lagi, jadi jumlah artist dan
+    memori tetap konstan berapa pun jumlah render.
+    """
+
+    def __init__(self, dpi=DPI_PNG):
+        self.dpi = dpi
+        self._lock = threading.Lock()
+        self._fig = None
+        self.jumlah_render = 0
+
+    def _siapkan(self):
+        self._fig = fig = _figure(self.dpi)
+        self._ax = _latar(fig)
+        for a in self._ax:
+            # Bekukan batas sumbu hasil autoscale latar: overlay tidak boleh menggesernya
+            a.set_xlim(a.get_xlim()); a.set_ylim(a.get_ylim())
+        fig.canvas.draw()
+        fig.set_layout_engine('none')      # tata letak dibekukan setelah latar digambar
+        self._latar = fig.canvas.copy_from_bbox(fig.bbox)
+
+    def rgba(self, res_data):
+        """Array (tinggi, lebar, 4) uint8 hasil render."""
+        with self._lock:
+            if self._fig is None: self._siapkan()
+            canvas = self._fig.canvas
+            canvas.restore_region(self._latar)
+            artis = []
+            for a, (nama, agg, val, warna, _) in zip(self._ax, PANEL_FUZZY):
+                for art in _overlay(a, SEMESTA_OUTPUT[nama], res_data[agg], res_data[val], warna, animated=True):
+                    a.draw_artist(art)
+                    artis.append(art)
+            gambar = np.array(canvas.buffer_rgba())     # salin sebelum buffer dipakai render berikutnya
+            for art in artis: art.remove()
+            self.jumlah_render += 1
+            return gambar
+
+    def png(self, res_data):
+        """Bytes PNG hasil render (siap untuk st.image)."""
+        from PIL import Image
+        buf = io.BytesIO()
+        Image.fromarray(self.rgba(res_data), 'RGBA').save(buf, format='PNG', compress_level=1)
+        return buf.getvalue()
+
+    def tutup(self):
+        with self._lock:
+            self._fig = None
@@ -0,0 +1,101 @@
+import numpy as np
+
+# ==================== RING BUFFER RIWAYAT SENSOR ====================
+# Satu array per sensor + satu array waktu, dialokasikan sekali. Setiap nilai
+# ditulis dua kali (posisi p dan p + ruang), sehingga N data terakhir selalu
+# berada di satu potongan bersambung: jendela() mengembalikan view tanpa salin.
+# Ruang = kapasitas + 1: slot yang ditulis append berikutnya tidak pernah berada
+# di jendela, bahkan jendela penuh (n = kapasitas) saat poller menulis bersamaan.
+#
+# Memori = 2 x (kapasitas + 1) x (8 byte waktu + itemsize x jumlah kolom).
+# Dengan 7 sensor + kolom anomali float32: 80 byte per titik, mis. 86.400 titik
+# (1 hari @1 Hz) = 6,9 MB dan 500.000 titik = 40 MB. Buffer dimiliki poller/listener dan
+# dipakai bersama oleh semua sesi, jadi biaya ini per proses, bukan per sesi.
+
+KOLOM_SENSOR = ('ph', 'tds', 'soil_moisture', 'water_temp', 'air_temp', 'air_humidity', 'rainfall')
+# Flag anomali per bacaan (smartfarm.analitik), dicatat di samping nilai sensor
+KOLOM_ANOMALI = 'anomali'
+KOLOM_RIWAYAT = KOLOM_SENSOR + (KOLOM_ANOMALI,)
+KAPASITAS_DEFAULT = 86400
+
+def perkiraan_nbytes(kapasitas, n_kolom=len(KOLOM_RIWAYAT), dtype=np.float32):
+    """Byte yang dialokasikan RingBuffer dengan kapasitas dan jumlah kolom tersebut."""
+    return 2 * (int(kapasitas) + 1) * (np.dtype(np.float64).itemsize + n_kolom * np.dtype(dtype).itemsize)
+
+class RingBuffer:
+    """Buffer kolom berkapasitas tetap: append O(1) dan jendela berupa view read-only.
+
+    Satu penulis (thread poller) dan banyak pembaca. Indeks kepala baru
+    dinaikkan setelah semua kolom ditulis, jadi pembaca selalu melihat baris
+    yang lengkap. View jendela n titik tetap valid untuk kapasitas + 1 - n append
+    berikutnya (minimal satu, juga untuk jendela penuh); salin bila perlu disimpan lebih lama.
+    """
+
+    def __init__(self, kapasitas=KAPASITAS_DEFAULT, kolom=KOLOM_RIWAYAT, dtype=np.float32):
+        kapasitas = int(kapasitas)
+        if kapasitas < 1: raise ValueError("kapasitas minimal 1")
+        self.kapasitas = kapasitas
+        self.kolom = tuple(kolom)
+        self._ruang = kapasitas + 1
+        self._waktu = np.zeros(2 * self._ruang, dtype=np.float64)
+        self._data = {k: np.full(2 * self._ruang, np.nan, dtype=dtype) for k in self.kolom}
+        self._kepala = 0      # jumlah total append (posisi tulis = kepala % ruang)
+
+    @property
+    def nbytes(self):
+        return self._waktu.nbytes + sum(a.nbytes for a in self._data.values())
+
+    def __len__(self):
+        return min(self._kepala, self.kapasitas)
+
+    @property
+    def total(self):
+        """Jumlah append sejak dibuat (termasuk yang sudah tertimpa)."""
+        return self._kepala
+
+    def append(self, waktu, nilai):
+        """Tambah satu baris. nilai: dict kolom -> angka (kolom yang tidak ada menjadi NaN)."""
+        p = self._kepala % self._ruang
+        q = p + self._ruang
+        self._waktu[p] = self._waktu[q] = waktu
+        for k, arr in self._data.items():
+            v = nilai.get(k)
+            arr[p] = arr[q] = np.nan if v is None else v
+        self._kepala += 1
+
+    def isi(self, waktu, kolom):
+        """Tambah banyak baris sekaligus (mis. memuat riwayat dari penyimpanan saat start)."""
+        waktu = np.asarray(waktu, dtype=np.float64)[-self.kapasitas:]
+        n = waktu.size
+        if not n: return
+        p = (self._kepala + np.arange(n)) % self._ruang
+        self._waktu[p] = self._waktu[p + self._ruang] = waktu
+        for k, arr in self._data.items():
+            v = np.asarray(kolom[k], dtype=arr.dtype)[-n:] if k in kolom else np.nan
+            arr[p] = arr[p + self._ruang] = v
+        self._kepala += n
+
+    def _irisan(self, n):
+        kepala = self._kepala
+        ada = min(kepala, self.kapasitas)
+        n = ada if n is None else max(0, min(int(n), ada))
+        akhir = kepala % self._ruang + self._ruang
+        return slice(akhir - n, akhir)
+
+    def jendela(self, n=None):
+        """(waktu, {kolom: nilai}) untuk n titik terakhir (default semua), tanpa salin."""
+        sl = self._irisan(n)
+        waktu = self._waktu[sl]; waktu.flags.writeable = False
+        kolom = {}
+        for k, arr in self._data.items():
+            v = arr[sl]; v.flags.writeable = False
+            kolom[k] = v
+        return waktu, kolom
+
+    def terakhir(self):
+        """Baris terbaru sebagai dict, atau None bila masih kosong."""
+        if not self._kepala: return None
+        p = (self._kepala - 1) % self._ruang
+        baris = {k: float(arr[p]) for k, arr in self._data.items()}
+        baris['waktu'] = float(self._waktu[p])
+        return baris
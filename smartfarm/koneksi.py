@@ -0,0 +1,38 @@
+import os
+
+from smartfarm.config import BASE_DIR
+from smartfarm.metrik import METRIK
+
+# ==================== FIREBASE CONNECTION ====================
+# firebase_admin baru diimpor saat koneksi pertama kali dibuka, jadi modul ini
+# (dan sources/stream yang memakainya) tetap ringan untuk skrip dan worker.
+
+CRED_FILE = "firebase_credentials.json"
+DATABASE_URL = 'https://matkul-9f44d-default-rtdb.asia-southeast1.firebasedatabase.app/'
+
+def init_firebase(cred_file=CRED_FILE, database_url=DATABASE_URL):
+    """Inisialisasi app Firebase sekali per proses; False bila kredensial/paket tidak ada.
+
+    Kredensial dicari di direktori kerja lalu di root repo.
+    """
+    try:
+        import firebase_admin
+        from firebase_admin import credentials
+    except ImportError:
+        return False
+    if firebase_admin._apps: return True
+    try:
+        cred_path = cred_file
+        if not os.path.exists(cred_path):
+            cred_path = os.path.join(BASE_DIR, cred_file)
+        if not os.path.exists(cred_path): return False
+        firebase_admin.initialize_app(credentials.Certificate(cred_path), {'databaseURL': database_url})
+        return True
+    except Exception as e:
+        METRIK.tambah('firebase_init_gagal', alasan=type(e).__name__)
+        return False
+
+def referensi(path='/Monitoring'):
+    """db.reference(path) dari firebase_admin (init_firebase harus sudah berhasil)."""
+    from firebase_admin import db
+    return db.reference(path)
@@ -0,0 +1,114 @@
+import bisect
+
+import numpy as np
+
+# ==================== LABEL MASTER DATA ====================
+def label_linear(defs, value):
+    """Pencarian label asli: cek definisi satu per satu, definisi pertama yang cocok menang."""
+    if not defs: return None
+    for d in defs:
+        op = d.get('operator')
+        if op == '<' and value < d.get('value'): return d.get('label')
+        elif op == '>' and value > d.get('value'): return d.get('label')
+        elif op == 'range' and d.get('min') <= value <= d.get('max'): return d.get('label')
+        elif 'value' in d and value == d.get('value'): return d.get('label')
+    return None
+
+def kelas_status(label):
+    """Kelas CSS kartu sensor (good/warn/bad) untuk sebuah label."""
+    if not label: return ""
+    label = label.lower()
+    if "aman" in label or "ideal" in label or "optimal" in label: return "good"
+    elif "tinggi" in label or "berlebih" in label or "basah" in label: return "warn"
+    else: return "bad"
+
+def _batas(defs):
+    titik = set()
+    for d in defs:
+        for k in ('value', 'min', 'max'):
+            v = d.get(k)
+            if isinstance(v, (int, float)) and not isinstance(v, bool): titik.add(float(v))
+    return sorted(titik)
+
+class IndeksMaster:
+    """master_data.json yang dikompilasi menjadi array titik batas terurut per sensor.
+
+    Garis bilangan dipecah menjadi titik batas b0 < b1 < ... dan interval terbuka
+    di antaranya; label tiap titik dan tiap interval dihitung sekali dengan
+    label_linear, jadi hasilnya sama persis dengan aturan "definisi pertama yang
+    cocok". Lookup cukup bisect (satu nilai) atau np.searchsorted (array).
+    """
+
+    def __init__(self, definitions):
+        self.definitions = definitions
+        self.labels = {}       # sensor -> list label unik (indeks 0 = None)
+        self._titik = {}       # sensor -> (list titik, array titik)
+        self._kode_titik = {}  # sensor -> array kode label di tiap titik batas
+        self._kode_int = {}    # sensor -> array kode label di tiap interval (len(titik) + 1)
+        for sensor, defs in (definitions or {}).items():
+            if not defs: continue
+            titik = _batas(defs)
+            if titik:
+                tengah = [titik[0] - 1.0] + [(a + b) / 2.0 for a, b in zip(titik, titik[1:])] + [titik[-1] + 1.0]
+            else:
+                tengah = [0.0]
+            label = [None]
+            def kode(v):
+                try:
+                    lb = label_linear(defs, v)
+                except TypeError:
+                    lb = None
+                if lb not in label: label.append(lb)
+                return label.index(lb)
+            self._kode_titik[sensor] = np.array([kode(v) for v in titik], dtype=np.intp)
+            self._kode_int[sensor] = np.array([kode(v) for v in tengah], dtype=np.intp)
+            self._titik[sensor] = (titik, np.array(titik, dtype=float))
+            self.labels[sensor] = label
+        # Kelas status dihitung sekali per label
+        self.kelas = {sensor: [kelas_status(lb) for lb in label] for sensor, label in self.labels.items()}
+
+    def _kode(self, sensor, value):
+        titik = self._titik[sensor][0]
+        if value != value: return 0   # NaN tidak cocok dengan definisi mana pun
+        i = bisect.bisect_left(titik, value)
+        if i < len(titik) and titik[i] == value: return self._kode_titik[sensor][i]
+        return self._kode_int[sensor][i]
+
+    def get_label(self, sensor, value):
+        if sensor not in self._titik: return None
+        return self.labels[sensor][self._kode(sensor, value)]
+
+    def status_class(self, sensor, value):
+        if sensor not in self._titik: return ""
+        return self.kelas[sensor][self._kode(sensor, value)]
+
+    def _kode_array(self, sensor, values):
+        titik = self._titik[sensor][1]
+        v = np.asarray(values, dtype=float)
+        if not titik.size: return np.full(v.shape, self._kode_int[sensor][0])
+        i = np.searchsorted(titik, v, side='left')
+        j = np.minimum(i, titik.size - 1)
+        kode = np.where((i < titik.size) & (titik[j] == v), self._kode_titik[sensor][j], self._kode_int[sensor][i])
+        kode[np.isnan(v)] = 0
+        return kode
+
+    def _bungkus(self, values, hasil):
+        # Series masuk -> Series keluar (indeks dipertahankan), selain itu array object
+        if hasattr(values, 'index') and hasattr(values, 'to_numpy'):
+            return type(values)(hasil, index=values.index, name=getattr(values, 'name', None))
+        return hasil
+
+    def label_array(self, sensor, values):
+        """Label untuk seluruh array/Series sekaligus (None bila tidak ada yang cocok)."""
+        v = values.to_numpy() if hasattr(values, 'to_numpy') else values
+        if sensor not in self._titik:
+            return self._bungkus(values, np.full(np.shape(v), None, dtype=object))
+        tabel = np.array(self.labels[sensor], dtype=object)
+        return self._bungkus(values, tabel[self._kode_array(sensor, v)])
+
+    def status_class_array(self, sensor, values):
+        v = values.to_numpy() if hasattr(values, 'to_numpy') else values
+        if sensor not in self._titik:
+            return self._bungkus(values, np.full(np.shape(v), "", dtype=object))
+        tabel = np.array(self.kelas[sensor], dtype=object)
+        return self._bungkus(values, tabel[self._kode_array(sensor, v)])
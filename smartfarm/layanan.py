@@ -0,0 +1,321 @@
+"""Layanan inferensi HTTP headless: status tanah, dosis fuzzy, dan diagnosa CF.
+
+Mesin yang sama dengan dashboard dan replay (PenilaiNB, inferensi_batch,
+diagnosa_batch, IndeksMaster), tanpa Streamlit. Endpoint (POST, body JSON):
+    /status     status tanah Naive Bayes + probabilitas per kelas
+    /dosis      dosis fuzzy val_ir (L), val_pp (kg), val_pt (ml/m2)
+    /diagnosa   diagnosa CF terbaik (rule_id, deskripsi, status_tanaman, keyakinan %)
+    /analisis   semuanya, plus label master data
+Body boleh satu bacaan (objek -> objek), list bacaan (array -> array), atau
+NDJSON (Content-Type application/x-ndjson atau ?format=ndjson; satu bacaan
+per baris -> satu hasil per baris, urutan sama). Nama field dashboard (ph,
+tds, soil_moisture, air_temp, rainfall) atau ESP32 (pH, TDS, ...); field
+'id' disalin ke hasil. GET /sehat untuk health check, GET /metrics untuk
+metrik Prometheus.
+
+Permintaan dikerjakan pool proses; knowledge base, master data, dan model
+dimuat sekali per worker. Thread HTTP hanya meneruskan body mentah, jadi
+parsing JSON ikut terbagi ke worker.
+
+Contoh (dari root repo):
+    python -m smartfarm.layanan --port 8700 --workers 4
+    curl -s localhost:8700/dosis -d '{"tds": 900, "ph": 6.5, "soil_moisture": 60, "rainfall": 0}'
+"""
+import argparse
+import json
+import math
+import os
+import signal
+import socket
+import sys
+
+import numpy as np
+
+from smartfarm.config import KB_FILE, MASTER_FILE, muat_knowledge_base, muat_master_data
+from smartfarm.diagnosis import diagnosa_batch
+from smartfarm.fuzzy import CHUNK_SIZE, METODE_DEFUZZ, inferensi_batch
+from smartfarm.labels import IndeksMaster
+from smartfarm.metrik import METRIK
+from smartfarm.models import FITUR_AI, MODEL_FILE, SCALER_FILE, muat_penilai
+
+PORT_DEFAULT = 8700
+MAKS_BODY = 64 * 1024 * 1024         # byte per permintaan
+BARIS_PER_TUGAS = 5000               # batch NDJSON besar dipecah ke beberapa worker
+
+# Nama field Firebase (ESP32) -> nama kolom internal (lihat normalisasi_data)
+ALIAS_KOLOM = {
+    'pH': 'ph', 'TDS': 'tds', 'SoilMoisture': 'soil_moisture', 'WaterTemp': 'water_temp',
+    'AirTemp': 'air_temp', 'Humidity': 'humidity', 'Rainfall': 'rainfall',
+}
+KOLOM_WAJIB = ('ph', 'tds', 'soil_moisture', 'rainfall', 'air_temp')
+# Kolom master data -> kolom bacaan
+SENSOR_LABEL = {'ph': 'ph', 'tds': 'tds', 'kelembaban': 'soil_moisture', 'curah_hujan': 'rainfall'}
+
+BAGIAN = ('status', 'dosis', 'diagnosa', 'label')
+ENDPOINT = {'/status': ('status',), '/dosis': ('dosis',), '/diagnosa': ('diagnosa',), '/analisis': BAGIAN}
+
+# ==================== MESIN ====================
+def muat_konteks(kb_path=KB_FILE, master_path=MASTER_FILE, model_path=MODEL_FILE, scaler_path=SCALER_FILE,
+                 metode='sampled'):
+    """KB, indeks master data, dan penilai Naive Bayes (None bila model tidak ada)."""
+    if metode not in METODE_DEFUZZ: raise ValueError(f"metode tidak dikenal: {metode}")
+    return {'kb': muat_knowledge_base(kb_path), 'master': IndeksMaster(muat_master_data(master_path)),
+            'penilai': muat_penilai(model_path, scaler_path), 'metode': metode}
+
+def skor_kolom(kol, konteks, bagian=BAGIAN, rinci=False):
+    """Hasil inferensi untuk N bacaan sekaligus.
+
+    kol: dict KOLOM_WAJIB -> array float (N,), NaN = tidak ada. Mengembalikan
+    dict nama kolom hasil -> array (N,): ai_status, val_ir/val_pp/val_pt,
+    rule_id, status_tanaman, keyakinan, label_<sensor> (sesuai `bagian`).
+    rinci=True menambah proba_<kelas> dan deskripsi rule.
+    """
+    n = len(kol['ph'])
+    hasil = {}
+    # Status tanah Naive Bayes (None bila model tidak ada atau fitur tidak lengkap)
+    if 'status' in bagian:
+        penilai = konteks['penilai']
+        if penilai is not None:
+            fitur = np.column_stack([kol[k] for k in FITUR_AI])
+            hasil['ai_status'] = penilai.status(fitur)
+            if rinci:
+                for label, p in penilai.probabilitas(fitur).items(): hasil['proba_' + label] = p
+        else:
+            hasil['ai_status'] = np.full(n, None, dtype=object)
+
+    # Dosis Mamdani + diagnosa CF untuk baris dengan input fuzzy lengkap
+    if 'dosis' in bagian or 'diagnosa' in bagian:
+        valid = ~(np.isnan(kol['tds']) | np.isnan(kol['ph']) | np.isnan(kol['soil_moisture']))
+        dosis = {k: np.full(n, np.nan) for k in ('val_ir', 'val_pp', 'val_pt')}
+        rule_id = np.full(n, None, dtype=object)
+        status_t = np.full(n, None, dtype=object)
+        deskripsi = np.full(n, None, dtype=object)
+        keyakinan = np.full(n, np.nan)
+        if valid.any():
+            hujan = (np.nan_to_num(kol['rainfall'][valid]) > 0).astype(float)
+            inf = inferensi_batch(kol['tds'][valid], kol['ph'][valid], kol['soil_moisture'][valid],
+                                  hujan, chunk_size=CHUNK_SIZE, metode=konteks['metode'])
+            for k in dosis: dosis[k][valid] = inf[k]
+            if 'diagnosa' in bagian:
+                kb = konteks['kb']
+                idx, belief = diagnosa_batch(inf, kb)
+                # idx -1 -> elemen terakhir (RULE_ERROR)
+                rule_id[valid] = np.array([r.get('id') for r in kb] + ['ERR'], dtype=object)[idx]
+                status_t[valid] = np.array([r.get('results', {}).get('status_t') for r in kb] + ['Error'],
+                                           dtype=object)[idx]
+                if rinci:
+                    deskripsi[valid] = np.array([r.get('description') for r in kb] + ['Error'], dtype=object)[idx]
+                keyakinan[valid] = belief
+        if 'dosis' in bagian: hasil.update(dosis)
+        if 'diagnosa' in bagian:
+            hasil.update(rule_id=rule_id, status_tanaman=status_t, keyakinan=keyakinan)
+            if rinci: hasil['deskripsi'] = deskripsi
+
+    # Label master data, dengan default yang sama seperti kartu sensor dashboard
+    if 'label' in bagian:
+        master = konteks['master']
+        for sensor, k in SENSOR_LABEL.items():
+            label = master.label_array(sensor, kol[k])
+            kosong = np.array([v is None for v in label], dtype=bool)
+            if sensor == 'curah_hujan':
+                label[kosong] = np.where(kol[k][kosong] > 0, 'Hujan', 'Cerah')
+            else:
+                label[kosong] = 'Normal'
+            label[np.isnan(kol[k])] = None
+            hasil['label_' + sensor] = label
+    return hasil
+
+def _angka(v):
+    if v is None: return math.nan
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return math.nan
+
+def kolom_bacaan(bacaan):
+    """List dict bacaan (nama field dashboard atau ESP32) -> dict KOLOM_WAJIB -> array float."""
+    alias = {v: k for k, v in ALIAS_KOLOM.items()}
+    return {k: np.array([_angka(r[k] if k in r else r.get(alias.get(k))) for r in bacaan], dtype=float)
+            for k in KOLOM_WAJIB}
+
+def _nilai_json(arr):
+    if arr.dtype == object: return arr.tolist()
+    return [None if x != x else x for x in arr.tolist()]
+
+def skor_bacaan(bacaan, konteks, bagian=BAGIAN):
+    """List dict bacaan -> list dict hasil (NaN menjadi None, field 'id' disalin)."""
+    if not bacaan: return []
+    hasil = skor_kolom(kolom_bacaan(bacaan), konteks, bagian, rinci=True)
+    kunci = list(hasil)
+    baris = [dict(zip(kunci, nilai)) for nilai in zip(*(_nilai_json(hasil[k]) for k in kunci))]
+    for r, h in zip(bacaan, baris):
+        if 'id' in r: h['id'] = r['id']
+    return baris
+
+# ==================== WORKER ====================
+# Diisi sekali per proses oleh inisialisasi_worker (KB, master data, model AI)
+_KONTEKS = {}
+
+def inisialisasi_worker(kb_path=KB_FILE, master_path=MASTER_FILE,
+                        model_path=MODEL_FILE, scaler_path=SCALER_FILE, metode='sampled'):
+    _KONTEKS.update(muat_konteks(kb_path, master_path, model_path, scaler_path, metode))
+
+def _inisialisasi_pool(*konfigurasi):
+    # Ctrl+C ditangani proses utama, yang menutup pool dengan rapi
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    inisialisasi_worker(*konfigurasi)
+
+def _siap(_):
+    if not _KONTEKS: inisialisasi_worker()
+    return os.getpid()
+
+def _json(isi):
+    return json.dumps(isi, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def proses(path, body, ndjson=False):
+    """Satu permintaan (atau potongan NDJSON) di worker: body mentah -> (kode HTTP, bytes respons)."""
+    if not _KONTEKS: inisialisasi_worker()
+    try:
+        if ndjson:
+            bacaan, tunggal = [json.loads(b) for b in body.splitlines() if b.strip()], False
+        else:
+            data = json.loads(body)
+            tunggal = isinstance(data, dict)
+            bacaan = [data] if tunggal else data
+        if not isinstance(bacaan, list) or not all(isinstance(r, dict) for r in bacaan):
+            raise ValueError("body harus objek bacaan, array objek, atau NDJSON")
+    except ValueError as e:
+        return 400, _json({'error': str(e)})
+    hasil = skor_bacaan(bacaan, _KONTEKS, ENDPOINT[path])
+    if ndjson: return 200, b''.join(_json(r) + b'\n' for r in hasil)
+    return 200, _json(hasil[0] if tunggal else hasil)
+
+# ==================== SERVER HTTP ====================
+def buat_layanan(host='127.0.0.1', port=PORT_DEFAULT, workers=None, kb_path=KB_FILE, master_path=MASTER_FILE,
+                 model_path=MODEL_FILE, scaler_path=SCALER_FILE, metode='sampled'):
+    """Server inferensi (belum berjalan): serve_forever() untuk melayani, tutup() untuk berhenti.
+
+    workers=0 mengerjakan permintaan di thread HTTP proses ini (tanpa pool).
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    konfigurasi = (kb_path, master_path, model_path, scaler_path, metode)
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    pool = None
+    if workers > 0:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(workers, initializer=_inisialisasi_pool, initargs=konfigurasi)
+        # Semua worker memuat model sebelum permintaan pertama datang
+        list(pool.map(_siap, range(workers)))
+    else:
+        inisialisasi_worker(*konfigurasi)
+
+    def jalankan(path, body, ndjson):
+        if pool is None: return proses(path, body, ndjson)
+        baris = body.split(b'\n') if ndjson else ()
+        if len(baris) <= BARIS_PER_TUGAS: return pool.submit(proses, path, body, ndjson).result()
+        # NDJSON besar: potongan baris dikerjakan paralel, hasil digabung berurutan
+        tugas = [pool.submit(proses, path, b'\n'.join(baris[i:i + BARIS_PER_TUGAS]), True)
+                 for i in range(0, len(baris), BARIS_PER_TUGAS)]
+        hasil = [t.result() for t in tugas]
+        gagal = next((h for h in hasil if h[0] != 200), None)
+        return gagal or (200, b''.join(isi for _, isi in hasil))
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'      # keep-alive: klien memakai ulang koneksi
+
+        def setup(self):
+            super().setup()
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def _kirim(self, kode, isi, jenis='application/json'):
+            self.send_response(kode)
+            self.send_header('Content-Type', jenis)
+            self.send_header('Content-Length', str(len(isi)))
+            self.end_headers()
+            self.wfile.write(isi)
+
+        def do_GET(self):
+            path = self.path.split('?')[0]
+            if path == '/sehat':
+                self._kirim(200, _json({'status': 'ok', 'workers': workers, 'metode': metode}))
+            elif path == '/metrics':
+                self._kirim(200, METRIK.teks_prometheus().encode(), 'text/plain; version=0.0.4')
+            elif path in ENDPOINT:
+                self._kirim(405, _json({'error': 'gunakan POST'}))
+            else:
+                self._kirim(404, _json({'error': f'tidak ada endpoint {path}'}))
+
+        def do_POST(self):
+            path, _, query = self.path.partition('?')
+            panjang = self.headers.get('Content-Length', '')
+            if not panjang.isdigit():
+                self.close_connection = True
+                self._kirim(411, _json({'error': 'Content-Length wajib'}))
+                return
+            if int(panjang) > MAKS_BODY:
+                self.close_connection = True
+                self._kirim(413, _json({'error': f'body melebihi {MAKS_BODY} byte'}))
+                return
+            body = self.rfile.read(int(panjang))
+            # Body selalu dibaca dulu supaya koneksi keep-alive tetap sinkron
+            if path not in ENDPOINT:
+                self._kirim(404, _json({'error': f'tidak ada endpoint {path}'}))
+                return
+            ndjson = 'ndjson' in (self.headers.get('Content-Type') or '') or 'format=ndjson' in query
+            with METRIK.waktu('layanan', endpoint=path[1:]):
+                try:
+                    kode, isi = jalankan(path, body, ndjson)
+                except Exception as e:
+                    METRIK.tambah('layanan_gagal', endpoint=path[1:], alasan=type(e).__name__)
+                    kode, isi = 500, _json({'error': type(e).__name__})
+            if kode != 200: METRIK.tambah('layanan_ditolak', endpoint=path[1:], kode=kode)
+            self._kirim(kode, isi, 'application/x-ndjson' if ndjson and kode == 200 else 'application/json')
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 128
+
+        def tutup(self):
+            self.shutdown()
+            self.server_close()
+            if pool is not None: pool.shutdown(wait=True, cancel_futures=True)
+
+    server = Server((host, port), Handler)
+    server.workers = workers
+    return server
+
+def _berhenti(*_):
+    raise KeyboardInterrupt
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m smartfarm.layanan', description=__doc__.splitlines()[0])
+    ap.add_argument('--host', default='127.0.0.1', help="alamat dengar (0.0.0.0 untuk jaringan)")
+    ap.add_argument('--port', type=int, default=PORT_DEFAULT, help="port (0 = pilih otomatis)")
+    ap.add_argument('-w', '--workers', type=int, default=None,
+                    help="jumlah proses worker (default: jumlah core; 0 = di proses ini)")
+    ap.add_argument('--metode', choices=METODE_DEFUZZ, default='sampled', help="metode defuzzifikasi")
+    ap.add_argument('--kb', default=KB_FILE, help="knowledge_base.json")
+    ap.add_argument('--master', default=MASTER_FILE, help="master_data.json")
+    ap.add_argument('--model', default=MODEL_FILE, help="model Naive Bayes (pickle)")
+    ap.add_argument('--scaler', default=SCALER_FILE, help="scaler (pickle)")
+    args = ap.parse_args(argv)
+    server = buat_layanan(args.host, args.port, args.workers, args.kb, args.master, args.model, args.scaler,
+                          args.metode)
+    # SIGTERM (systemd, docker stop) diperlakukan seperti Ctrl+C: worker ikut ditutup
+    signal.signal(signal.SIGTERM, _berhenti)
+    host, port = server.server_address[:2]
+    print(f"melayani di http://{host}:{port} ({server.workers} worker)", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.tutup()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+import functools
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from smartfarm import fuzzy
+from smartfarm.metrik import METRIK
+
+# ==================== TABEL INFERENSI PRAKOMPUTASI ====================
+# Dosis Mamdani adalah fungsi murni dari (tds, ph, kelembaban, hujan). Tabel ini
+# menyimpan hasilnya pada grid tak seragam: rapat di interval transisi
+# TITIK_INPUT, dan hanya titik ujung di daerah yang derajatnya konstan.
+# Hujan hanya punya dua nilai, jadi menjadi indeks irisan (cerah/hujan).
+# Diagnosa CF tidak disimpan: rule terbaik bersifat kategorikal dan bisa berbeda
+# antar sudut sel grid, sedangkan diagnosa eksak dari mu sudah murah (IndeksRule).
+
+# Rentang input (sama dengan batas widget form). Di luar rentang, nilai dijepit
+# karena derajat keanggotaan sudah konstan.
+RENTANG_INPUT = {'tds': (0.0, 5000.0), 'ph': (0.0, 14.0), 'hum': (0.0, 100.0)}
+RESOLUSI = 21          # titik per interval transisi
+LRU_SIZE = 4096        # jumlah input persis yang diingat oleh cari()
+VERSI_TABEL = 2
+
+def sumbu_grid(var, resolusi=RESOLUSI):
+    lo, hi = RENTANG_INPUT[var]
+    titik = [np.array([lo, hi])] + [np.linspace(a, b, resolusi) for a, b in fuzzy.TITIK_INPUT[var]]
+    return np.unique(np.concatenate(titik))
+
+def sidik_jari(resolusi=RESOLUSI, metode='sampled'):
+    """Hash semua hal yang memengaruhi isi tabel (titik patah, himpunan output, rule fuzzy, grid)."""
+    h = hashlib.sha1()
+    meta = {
+        'versi': VERSI_TABEL, 'resolusi': resolusi, 'metode': metode, 'rentang': RENTANG_INPUT,
+        'titik_input': fuzzy.TITIK_INPUT, 'ambang_hujan': fuzzy.AMBANG_HUJAN,
+        'himpunan_output': fuzzy.HIMPUNAN_OUTPUT, 'aturan_fuzzy': fuzzy.SISTEM.sidik,
+        'semesta': {k: [float(v[0]), float(v[-1]), int(v.size)] for k, v in fuzzy.SEMESTA_OUTPUT.items()},
+    }
+    h.update(json.dumps(meta, sort_keys=True, default=str).encode('utf-8'))
+    # Probe perilaku fuzzifikasi, supaya perubahan rumus yang lupa dicatat di TITIK_INPUT tetap terdeteksi
+    probe = np.linspace(-1, 1, 257)
+    mu = fuzzy.fuzzifikasi_batch(probe * 3000 + 2000, probe * 7 + 7, probe * 60 + 50, (probe > 0).astype(float))
+    for k in sorted(mu): h.update(np.ascontiguousarray(mu[k]).tobytes())
+    return h.hexdigest()
+
+class TabelInferensi:
+    """Tabel dosis fuzzy Mamdani di atas grid tds x pH x kelembaban x hujan."""
+
+    def __init__(self, sumbu, dosis, sidik, lru_size=LRU_SIZE):
+        self.sumbu = sumbu            # (tds, ph, hum) -> array titik grid
+        self.dosis = dosis            # float32 [2, nT, nP, nH, 3] (irigasi, pupuk, pestisida)
+        self.sidik = sidik
+        self.cari = functools.lru_cache(maxsize=lru_size)(self._cari)
+
+    @classmethod
+    def bangun(cls, resolusi=RESOLUSI, metode='sampled', chunk_size=fuzzy.CHUNK_SIZE * 16):
+        sumbu = tuple(sumbu_grid(v, resolusi) for v in ('tds', 'ph', 'hum'))
+        bentuk = (2,) + tuple(s.size for s in sumbu)
+        hujan, tds, ph, hum = (g.ravel() for g in np.meshgrid(np.array([0.0, 1.0]), *sumbu, indexing='ij'))
+        n = hujan.size
+        dosis = np.empty((n, 3), dtype=np.float32)
+        for start in range(0, n, chunk_size):
+            sl = slice(start, start + chunk_size)
+            hasil = fuzzy.inferensi_batch(tds[sl], ph[sl], hum[sl], hujan[sl], metode=metode)
+            dosis[sl] = np.stack([hasil['val_ir'], hasil['val_pp'], hasil['val_pt']], axis=-1)
+            # Agregat kosong (semua bobot 0) ditandai NaN: centroid melompat ke 0 di sana,
+            # jadi titik itu tidak boleh ikut diinterpolasi dengan tetangganya.
+            bobot = fuzzy.bobot_himpunan(hasil)
+            for o, nama in enumerate(('irigasi', 'pupuk', 'pestisida')):
+                dosis[sl, o][~(bobot[nama] > 0).any(axis=-1)] = np.nan
+        return cls(sumbu, dosis.reshape(bentuk + (3,)), sidik_jari(resolusi, metode))
+
+    def simpan(self, path):
+        tmp = path + '.tmp.npz'
+        np.savez_compressed(tmp, sumbu_tds=self.sumbu[0], sumbu_ph=self.sumbu[1], sumbu_hum=self.sumbu[2],
+                            dosis=self.dosis, sidik=np.array(self.sidik))
+        os.replace(tmp, path)
+
+    @classmethod
+    def muat(cls, path):
+        with np.load(path) as f:
+            sumbu = (f['sumbu_tds'], f['sumbu_ph'], f['sumbu_hum'])
+            return cls(sumbu, f['dosis'], str(f['sidik']))
+
+    # ---------- query ----------
+    def batch(self, tds, ph, hum, hujan, mode='interp'):
+        """Jawab N query sekaligus. mode='interp' (multilinear) atau 'nearest' (titik grid terdekat).
+
+        Mengembalikan dict 'val_ir', 'val_pp', 'val_pt'.
+        """
+        r = (np.atleast_1d(np.asarray(hujan, dtype=float)) >= fuzzy.AMBANG_HUJAN).astype(np.intp)
+        idx, frac = [], []
+        for s, v in zip(self.sumbu, (tds, ph, hum)):
+            v = np.clip(np.atleast_1d(np.asarray(v, dtype=float)), s[0], s[-1])
+            i = np.clip(np.searchsorted(s, v, side='right') - 1, 0, s.size - 2)
+            idx.append(i); frac.append((v - s[i]) / (s[i + 1] - s[i]))
+        (i, j, k), (a, b, c) = idx, frac
+        if mode == 'nearest':
+            dosis = self.dosis[r, i + (a > 0.5), j + (b > 0.5), k + (c > 0.5)].astype(float)
+        elif mode == 'interp':
+            # Bobot sudut yang nilainya NaN (agregat kosong) dibuang lalu dinormalkan ulang
+            dosis = np.zeros((r.size, 3)); total = np.zeros((r.size, 3))
+            for di, wi in ((0, 1 - a), (1, a)):
+                for dj, wj in ((0, 1 - b), (1, b)):
+                    for dk, wk in ((0, 1 - c), (1, c)):
+                        w = wi * wj * wk
+                        nilai = self.dosis[r, i + di, j + dj, k + dk]; ada = ~np.isnan(nilai)
+                        dosis += np.where(ada, w[:, None] * nilai, 0.0)
+                        total += np.where(ada, w[:, None], 0.0)
+            dosis = np.divide(dosis, total, out=np.zeros_like(dosis), where=total > 1e-12)
+        else:
+            raise ValueError(f"mode tidak dikenal: {mode}")
+        dosis = np.nan_to_num(dosis, nan=0.0)
+        return {'val_ir': dosis[:, 0], 'val_pp': dosis[:, 1], 'val_pt': dosis[:, 2]}
+
+    def _cari(self, tds, ph, hum, hujan):
+        h = self.batch(tds, ph, hum, hujan)
+        return float(h['val_ir'][0]), float(h['val_pp'][0]), float(h['val_pt'][0])
+
+def muat_atau_bangun(path, resolusi=RESOLUSI, metode='sampled'):
+    """Muat tabel dari .npz; bangun ulang dan simpan jika belum ada atau sidik jarinya berubah."""
+    sidik = sidik_jari(resolusi, metode)
+    if os.path.exists(path):
+        try:
+            tabel = TabelInferensi.muat(path)
+            if tabel.sidik == sidik: return tabel
+        except Exception as e:
+            METRIK.tambah('lut_muat_gagal', alasan=type(e).__name__)
+    tabel = TabelInferensi.bangun(resolusi, metode)
+    try:
+        tabel.simpan(path)
+    except OSError:
+        METRIK.tambah('lut_simpan_gagal')
+    return tabel
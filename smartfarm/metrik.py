@@ -0,0 +1,241 @@
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+
+# ==================== METRIK TAHAP & PENGHITUNG ====================
+# Satu registry per proses (METRIK) yang dipakai poller, listener, dan dashboard:
+# - penghitung: tambah('poll_gagal', sumber='http') -> smartfarm_poll_gagal_total{sumber="http"}
+# - durasi tahap: with waktu('mamdani'): ... -> smartfarm_mamdani_detik (summary p50/p95/p99)
+# - pengumpul: fungsi yang dibaca saat ekspor (mis. penghitung hit/miss CacheHasil),
+#   jadi tidak ada biaya di jalur panas.
+# Durasi disimpan sebagai jumlah, cacah, dan SAMPEL durasi terakhir per tahap;
+# persentil dihitung dari sampel itu saat dibaca. Biaya satu pengukuran ~1 µs.
+# SMARTFARM_METRICS=0 mematikan semuanya (semua pencatatan menjadi no-op).
+
+SAMPEL = 1024
+KUANTIL = (0.5, 0.95, 0.99)
+AWALAN = 'smartfarm_'
+
+def _kunci(nama, label):
+    return (nama, tuple(sorted(label.items()))) if label else (nama, ())
+
+def _nilai_label(v):
+    # Format teks Prometheus: \\, \" dan \n di-escape di dalam nilai label
+    return str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _label_prom(label, tambahan=()):
+    isi = [f'{k}="{_nilai_label(v)}"' for k, v in tuple(label) + tuple(tambahan)]
+    return '{' + ','.join(isi) + '}' if isi else ''
+
+def persentil(urut, q):
+    """Persentil q (0..1) dari list terurut (interpolasi linear); NaN bila kosong."""
+    if not urut: return float('nan')
+    pos = q * (len(urut) - 1)
+    i = int(pos)
+    if i + 1 >= len(urut): return urut[-1]
+    return urut[i] + (urut[i + 1] - urut[i]) * (pos - i)
+
+class _Pengukur:
+    __slots__ = ('metrik', 'kunci', 'mulai')
+
+    def __init__(self, metrik, kunci):
+        self.metrik, self.kunci = metrik, kunci
+
+    def __enter__(self):
+        self.mulai = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrik._catat(self.kunci, time.perf_counter() - self.mulai)
+        return False
+
+class _TanpaUkur:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_TANPA_UKUR = _TanpaUkur()
+
+class Metrik:
+    """Registry penghitung dan durasi tahap, aman dipakai banyak thread."""
+
+    def __init__(self, sampel=SAMPEL, aktif=True):
+        self.sampel = sampel
+        self.aktif = aktif
+        self._lock = threading.Lock()
+        self._penghitung = {}     # (nama, label) -> int
+        self._durasi = {}         # (nama, label) -> [cacah, jumlah, deque sampel]
+        self._pengumpul = []      # callable -> iterable (nama, dict label, nilai)
+
+    # ---------- pencatatan (jalur panas) ----------
+    def tambah(self, nama, n=1, **label):
+        if not self.aktif: return
+        k = _kunci(nama, label)
+        with self._lock:
+            self._penghitung[k] = self._penghitung.get(k, 0) + n
+
+    def waktu(self, nama, **label):
+        """Context manager yang mencatat lama blok sebagai durasi tahap `nama`."""
+        if not self.aktif: return _TANPA_UKUR
+        return _Pengukur(self, _kunci(nama, label))
+
+    def catat(self, nama, detik, **label):
+        if self.aktif: self._catat(_kunci(nama, label), detik)
+
+    def _catat(self, k, detik):
+        with self._lock:
+            d = self._durasi.get(k)
+            if d is None: d = self._durasi[k] = [0, 0.0, deque(maxlen=self.sampel)]
+            d[0] += 1; d[1] += detik; d[2].append(detik)
+
+    def daftar_pengumpul(self, fungsi):
+        """fungsi() -> iterable (nama, dict label, nilai) yang dibaca saat ekspor sebagai gauge."""
+        with self._lock:
+            if fungsi not in self._pengumpul: self._pengumpul.append(fungsi)
+
+    def reset(self):
+        with self._lock:
+            self._penghitung.clear(); self._durasi.clear()
+
+    # ---------- pembacaan ----------
+    def penghitung(self, nama, **label):
+        return self._penghitung.get(_kunci(nama, label), 0)
+
+    def semua_penghitung(self):
+        """dict nama (dengan label) -> nilai penghitung."""
+        with self._lock:
+            return {nama + _label_prom(label): n for (nama, label), n in self._penghitung.items()}
+
+    def tahap(self):
+        """dict nama (dengan label) -> {'n', 'total', 'p50', 'p95', 'p99'} dalam detik."""
+        with self._lock:
+            salinan = {k: (d[0], d[1], sorted(d[2])) for k, d in self._durasi.items()}
+        hasil = {}
+        for (nama, label), (n, total, urut) in salinan.items():
+            kunci = nama + _label_prom(label)
+            hasil[kunci] = {'n': n, 'total': total,
+                            **{f'p{int(q * 100)}': persentil(urut, q) for q in KUANTIL}}
+        return hasil
+
+    def _gauge(self):
+        hasil = []
+        for fungsi in list(self._pengumpul):
+            try:
+                hasil.extend((nama, tuple(sorted(label.items())), nilai) for nama, label, nilai in fungsi())
+            except Exception:
+                self.tambah('pengumpul_gagal')
+        return hasil
+
+    def ringkasan(self):
+        """Semua metrik sebagai dict siap-JSON (untuk log berkala)."""
+        gauge = {nama + _label_prom(label): nilai for nama, label, nilai in self._gauge()}
+        return {'waktu': time.time(), 'penghitung': self.semua_penghitung(), 'tahap': self.tahap(), 'gauge': gauge}
+
+    def teks_prometheus(self):
+        """Format eksposisi teks Prometheus 0.0.4."""
+        baris = []
+        with self._lock:
+            penghitung = sorted(self._penghitung.items())
+            durasi = sorted((k, (d[0], d[1], sorted(d[2]))) for k, d in self._durasi.items())
+        jenis = set()
+        for (nama, label), n in penghitung:
+            m = f'{AWALAN}{nama}_total'
+            if m not in jenis: baris.append(f'# TYPE {m} counter'); jenis.add(m)
+            baris.append(f'{m}{_label_prom(label)} {n}')
+        for (nama, label), (n, total, urut) in durasi:
+            m = f'{AWALAN}{nama}_detik'
+            if m not in jenis: baris.append(f'# TYPE {m} summary'); jenis.add(m)
+            for q in KUANTIL:
+                baris.append(f'{m}{_label_prom(label, (("quantile", q),))} {persentil(urut, q):.6g}')
+            baris.append(f'{m}_sum{_label_prom(label)} {total:.6g}')
+            baris.append(f'{m}_count{_label_prom(label)} {n}')
+        for nama, label, nilai in sorted(self._gauge()):
+            m = f'{AWALAN}{nama}'
+            if m not in jenis: baris.append(f'# TYPE {m} gauge'); jenis.add(m)
+            baris.append(f'{m}{_label_prom(label)} {nilai:.6g}')
+        return '\n'.join(baris) + '\n'
+
+METRIK = Metrik(aktif=os.environ.get('SMARTFARM_METRICS', '1') != '0')
+
+def tambah(nama, n=1, **label):
+    METRIK.tambah(nama, n, **label)
+
+def waktu(nama, **label):
+    return METRIK.waktu(nama, **label)
+
+# ==================== EKSPOR ====================
+def layani_metrik(metrik=METRIK, host='127.0.0.1', port=9108):
+    """Endpoint teks Prometheus (GET /metrics) dan JSON (GET /metrics.json) di thread latar.
+
+    Mengembalikan server (shutdown() untuk berhenti).
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def setup(self):
+            super().setup()
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            path = self.path.split('?')[0]
+            if path in ('/', '/metrics'):
+                body, jenis = metrik.teks_prometheus().encode(), 'text/plain; version=0.0.4'
+            elif path == '/metrics.json':
+                body, jenis = json.dumps(metrik.ringkasan()).encode(), 'application/json'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', jenis)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+    server = Server((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='smartfarm-metrik', daemon=True).start()
+    return server
+
+class PencatatMetrik:
+    """Menambahkan satu baris JSON ringkasan metrik ke file setiap `interval` detik."""
+
+    def __init__(self, path, metrik=METRIK, interval=60.0):
+        self.path = path
+        self.metrik = metrik
+        self.interval = float(interval)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def tulis(self):
+        baris = json.dumps(self.metrik.ringkasan(), separators=(',', ':'))
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f: f.write(baris + '\n')
+        except OSError:
+            self.metrik.tambah('log_metrik_gagal')
+
+    def _jalan(self):
+        while not self._stop.wait(self.interval):
+            self.tulis()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._jalan, name='smartfarm-log-metrik', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None: self._thread.join(timeout)
@@ -0,0 +1,137 @@
+import os
+import pickle
+
+import numpy as np
+
+from smartfarm.config import BASE_DIR
+
+# ==================== MODEL AI (NAIVE BAYES & SCALER) ====================
+MODEL_FILE = os.path.join(BASE_DIR, "model_naivebayes.pkl")
+SCALER_FILE = os.path.join(BASE_DIR, "scaler.pkl")
+
+# Urutan fitur saat model dilatih: [pH, Temp Udara, Kelembaban Tanah, TDS]
+FITUR_AI = ('ph', 'air_temp', 'soil_moisture', 'tds')
+
+# Mapping Hasil Prediksi
+KELAS_AI = {
+    0: "Sehat",
+    1: "Kurang Hara",
+    2: "Tanah Masam",
+    3: "Kering"
+}
+
+def muat_model(model_path=MODEL_FILE, scaler_path=SCALER_FILE):
+    """(model, scaler) dari file pickle; None untuk file yang tidak ada."""
+    model = scaler = None
+    if os.path.exists(model_path):
+        with open(model_path, 'rb') as f:
+            model = pickle.load(f)
+    if os.path.exists(scaler_path):
+        with open(scaler_path, 'rb') as f:
+            scaler = pickle.load(f)
+    return model, scaler
+
+def label_kelas(prediksi):
+    return KELAS_AI.get(prediksi, f"Unknown ({prediksi})")
+
+def prediksi_status(model, scaler, fitur):
+    """Label status tanah untuk matriks fitur (N, 4) berurutan FITUR_AI.
+
+    Baris yang berisi NaN tidak diprediksi dan berlabel None.
+    """
+    X = np.asarray(fitur, dtype=float).reshape(-1, len(FITUR_AI))
+    hasil = np.full(X.shape[0], None, dtype=object)
+    valid = ~np.isnan(X).any(axis=1)
+    if valid.any():
+        pred = model.predict(scaler.transform(X[valid]))
+        hasil[valid] = [label_kelas(p) for p in pred.tolist()]
+    return hasil
+
+def probabilitas_status(model, scaler, fitur):
+    """Probabilitas tiap kelas untuk matriks fitur (N, 4): dict label -> array (N,).
+
+    Baris yang berisi NaN bernilai NaN.
+    """
+    X = np.asarray(fitur, dtype=float).reshape(-1, len(FITUR_AI))
+    valid = ~np.isnan(X).any(axis=1)
+    proba = np.full((X.shape[0], len(model.classes_)), np.nan)
+    if valid.any():
+        proba[valid] = model.predict_proba(scaler.transform(X[valid]))
+    return {label_kelas(k): proba[:, j] for j, k in enumerate(model.classes_.tolist())}
+
+# ==================== SKOR NAIVE BAYES TERFUSI ====================
+# StandardScaler + GaussianNB dilipat menjadi satu matriks bobot saat dimuat.
+# Dengan z = a*x + b (a = 1/scale, b = -mean/scale), log-likelihood gabungan
+# kelas c adalah
+#   log P(c) - 0.5 * sum_j [log(2*pi*var_cj) + (z_j - theta_cj)^2 / var_cj]
+# yang diuraikan menjadi konstanta_c + x^2 @ W2 + x @ W1. Satu batch cukup
+# dengan satu perkalian matriks [x^2, x] @ W, lalu logsumexp per baris.
+
+class PenilaiNB:
+    """Penilai status tanah untuk batch fitur (N, 4) berurutan FITUR_AI.
+
+    Model selain GaussianNB (tanpa theta_/var_) tetap dilayani lewat jalur
+    sklearn transform + predict_proba, dengan antarmuka yang sama.
+    """
+
+    def __init__(self, model, scaler):
+        self.model, self.scaler = model, scaler
+        self.kelas = np.asarray(model.classes_)
+        self.label = [label_kelas(k) for k in self.kelas.tolist()]
+        self.terfusi = hasattr(model, 'theta_') and hasattr(model, 'var_')
+        if not self.terfusi: return
+        n = len(FITUR_AI)
+        mean = getattr(scaler, 'mean_', None); scale = getattr(scaler, 'scale_', None)
+        mean = np.zeros(n) if mean is None else np.asarray(mean, dtype=float)
+        scale = np.ones(n) if scale is None else np.asarray(scale, dtype=float)
+        a, b = 1.0 / scale, -mean / scale                     # (F,)
+        theta = np.asarray(model.theta_, dtype=float)         # (K, F)
+        var = np.asarray(model.var_, dtype=float)             # (K, F), sudah termasuk var_smoothing
+        selisih = b - theta
+        w2 = (-0.5 * a * a / var).T                           # (F, K)
+        w1 = (-a * selisih / var).T                           # (F, K)
+        self.bobot = np.ascontiguousarray(np.vstack([w2, w1]))   # (2F, K)
+        self.konstanta = (np.log(model.class_prior_) - 0.5 * np.sum(np.log(2 * np.pi * var), axis=1)
+                          - 0.5 * np.sum(selisih * selisih / var, axis=1))
+
+    def log_posterior(self, fitur):
+        """Matriks (N, K) log P(kelas | x); baris yang berisi NaN bernilai NaN."""
+        X = np.asarray(fitur, dtype=float).reshape(-1, len(FITUR_AI))
+        if not self.terfusi:
+            hasil = np.full((X.shape[0], self.kelas.size), np.nan)
+            valid = ~np.isnan(X).any(axis=1)
+            if valid.any():
+                hasil[valid] = self.model.predict_log_proba(self.scaler.transform(X[valid]))
+            return hasil
+        jll = np.hstack([X * X, X]) @ self.bobot + self.konstanta
+        maks = jll.max(axis=1, keepdims=True)
+        return jll - (maks + np.log(np.exp(jll - maks).sum(axis=1, keepdims=True)))
+
+    def predict_proba(self, fitur):
+        return np.exp(self.log_posterior(fitur))
+
+    def predict(self, fitur):
+        """Kode kelas (seperti model.predict); -1 untuk baris yang berisi NaN."""
+        lp = self.log_posterior(fitur)
+        valid = ~np.isnan(lp).any(axis=1)
+        hasil = np.full(lp.shape[0], -1, dtype=np.int64)
+        if valid.any(): hasil[valid] = self.kelas[np.argmax(lp[valid], axis=1)]
+        return hasil
+
+    def status(self, fitur):
+        """Label status per baris (None untuk baris yang berisi NaN), seperti prediksi_status."""
+        lp = self.log_posterior(fitur)
+        valid = ~np.isnan(lp).any(axis=1)
+        hasil = np.full(lp.shape[0], None, dtype=object)
+        if valid.any(): hasil[valid] = np.array(self.label, dtype=object)[np.argmax(lp[valid], axis=1)]
+        return hasil
+
+    def probabilitas(self, fitur):
+        """dict label -> array (N,) probabilitas, seperti probabilitas_status."""
+        proba = self.predict_proba(fitur)
+        return {label: proba[:, j] for j, label in enumerate(self.label)}
+
+def muat_penilai(model_path=MODEL_FILE, scaler_path=SCALER_FILE):
+    """PenilaiNB dari file pickle; None bila model atau scaler tidak ada."""
+    model, scaler = muat_model(model_path, scaler_path)
+    return PenilaiNB(model, scaler) if model is not None and scaler is not None else None
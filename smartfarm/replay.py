@@ -0,0 +1,165 @@
+"""Replay / backfill headless: skor ulang bacaan sensor yang terekam.
+
+Membaca satu atau lebih file CSV, JSONL, atau Parquet per potongan (chunk),
+lalu menghitung untuk setiap baris: status tanah Naive Bayes, dosis Mamdani
+(irigasi, pupuk, pestisida), diagnosa CF terbaik, dan label master data.
+Potongan dikerjakan paralel oleh process pool, dan hasilnya ditulis berurutan
+secara inkremental. Seluruh file tidak pernah dimuat ke memori. Streamlit dan
+firebase_admin tidak diimpor.
+
+Contoh (dari root repo):
+    python -m smartfarm.replay riwayat.csv -o hasil.parquet --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from smartfarm.config import KB_FILE, MASTER_FILE
+from smartfarm.fuzzy import METODE_DEFUZZ
+# Mesin skor (kolom, alias field ESP32) dan konteks worker sama dengan layanan HTTP
+from smartfarm.layanan import _KONTEKS, ALIAS_KOLOM, KOLOM_WAJIB, inisialisasi_worker, skor_kolom
+from smartfarm.models import MODEL_FILE, SCALER_FILE
+
+BARIS_PER_CHUNK = 50_000
+
+# ==================== FORMAT FILE ====================
+def format_file(path):
+    p = path.lower()
+    for akhiran in ('.gz', '.bz2', '.xz', '.zst'):
+        if p.endswith(akhiran): p = p[:-len(akhiran)]
+    if p.endswith(('.parquet', '.pq')): return 'parquet'
+    if p.endswith(('.jsonl', '.ndjson', '.json')): return 'jsonl'
+    return 'csv'
+
+def baca_chunk(path, ukuran=BARIS_PER_CHUNK):
+    """Generator DataFrame berisi paling banyak `ukuran` baris dari sebuah file."""
+    fmt = format_file(path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=ukuran):
+            yield batch.to_pandas()
+    elif fmt == 'jsonl':
+        with pd.read_json(path, lines=True, chunksize=ukuran) as it:
+            yield from it
+    else:
+        with pd.read_csv(path, chunksize=ukuran) as it:
+            yield from it
+
+def siapkan_kolom(df):
+    """Samakan nama kolom dengan dashboard; kolom wajib yang tidak ada diisi NaN."""
+    df = df.rename(columns={k: v for k, v in ALIAS_KOLOM.items() if k in df.columns})
+    for k in KOLOM_WAJIB:
+        df[k] = pd.to_numeric(df[k], errors='coerce') if k in df.columns else np.nan
+    return df
+
+# ==================== WORKER ====================
+# _KONTEKS diisi sekali per proses oleh layanan.inisialisasi_worker (KB, master data, model AI)
+def skor_chunk(df):
+    """Tambahkan kolom hasil (status AI, dosis, diagnosa, label) ke satu potongan."""
+    if not _KONTEKS: inisialisasi_worker()
+    df = siapkan_kolom(df)
+    kol = {k: df[k].to_numpy(dtype=float) for k in KOLOM_WAJIB}
+    return df.assign(**skor_kolom(kol, _KONTEKS))
+
+# ==================== PENULIS HASIL ====================
+class PenulisHasil:
+    """Tulis potongan hasil secara inkremental ke Parquet, CSV, atau JSONL."""
+
+    def __init__(self, path):
+        self.path = path
+        self.fmt = format_file(path)
+        self._parquet = None
+        self._skema = None
+        self._pertama = True
+
+    def tulis(self, df):
+        if self.fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self._parquet is None:
+                # Kolom object (label, status) selalu string: potongan pertama bisa saja semua None
+                self._skema = pa.schema([
+                    pa.field(k, pa.string() if df[k].dtype == object else pa.from_numpy_dtype(df[k].dtype))
+                    for k in df.columns])
+                self._parquet = pq.ParquetWriter(self.path, self._skema)
+            self._parquet.write_table(pa.Table.from_pandas(df, schema=self._skema, preserve_index=False))
+        elif self.fmt == 'jsonl':
+            with open(self.path, 'w' if self._pertama else 'a', encoding='utf-8') as f:
+                df.to_json(f, orient='records', lines=True)
+        else:
+            df.to_csv(self.path, mode='w' if self._pertama else 'a', header=self._pertama, index=False)
+        self._pertama = False
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+
+# ==================== REPLAY ====================
+def jalankan(inputs, output, workers=None, ukuran_chunk=BARIS_PER_CHUNK, metode='sampled',
+             kb_path=KB_FILE, master_path=MASTER_FILE, model_path=MODEL_FILE, scaler_path=SCALER_FILE):
+    """Skor semua baris dari `inputs` ke `output`. Mengembalikan ringkasan (baris, detik, baris/s).
+
+    workers=1 mengerjakan semuanya di proses ini; selain itu paling banyak
+    2 x workers potongan berada di antrean sehingga memori tetap terbatas.
+    """
+    if metode not in METODE_DEFUZZ: raise ValueError(f"metode tidak dikenal: {metode}")
+    workers = workers or os.cpu_count() or 1
+    konfigurasi = (kb_path, master_path, model_path, scaler_path, metode)
+    potongan = (df for path in inputs for df in baca_chunk(path, ukuran_chunk))
+    penulis = PenulisHasil(output)
+    baris = 0
+    mulai = time.perf_counter()
+    try:
+        if workers == 1:
+            inisialisasi_worker(*konfigurasi)
+            for df in potongan:
+                hasil = skor_chunk(df)
+                penulis.tulis(hasil)
+                baris += len(hasil)
+        else:
+            with ProcessPoolExecutor(workers, initializer=inisialisasi_worker, initargs=konfigurasi) as pool:
+                antre = deque()
+                for df in potongan:
+                    antre.append(pool.submit(skor_chunk, df))
+                    if len(antre) >= 2 * workers:
+                        hasil = antre.popleft().result()
+                        penulis.tulis(hasil)
+                        baris += len(hasil)
+                while antre:
+                    hasil = antre.popleft().result()
+                    penulis.tulis(hasil)
+                    baris += len(hasil)
+    finally:
+        penulis.close()
+    detik = time.perf_counter() - mulai
+    return {'baris': baris, 'detik': detik, 'baris_per_detik': baris / detik if detik > 0 else 0.0,
+            'workers': workers}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m smartfarm.replay', description=__doc__.splitlines()[0])
+    ap.add_argument('inputs', nargs='+', help="file CSV / JSONL / Parquet berisi bacaan sensor")
+    ap.add_argument('-o', '--output', required=True, help="file hasil (.parquet, .csv, atau .jsonl)")
+    ap.add_argument('-w', '--workers', type=int, default=None, help="jumlah proses (default: jumlah core)")
+    ap.add_argument('--chunk-size', type=int, default=BARIS_PER_CHUNK, help="baris per potongan")
+    ap.add_argument('--metode', choices=METODE_DEFUZZ, default='sampled', help="metode defuzzifikasi")
+    ap.add_argument('--kb', default=KB_FILE, help="knowledge_base.json")
+    ap.add_argument('--master', default=MASTER_FILE, help="master_data.json")
+    ap.add_argument('--model', default=MODEL_FILE, help="model Naive Bayes (pickle)")
+    ap.add_argument('--scaler', default=SCALER_FILE, help="scaler (pickle)")
+    args = ap.parse_args(argv)
+    ringkas = jalankan(args.inputs, args.output, args.workers, args.chunk_size, args.metode,
+                       args.kb, args.master, args.model, args.scaler)
+    print(f"{ringkas['baris']} baris dalam {ringkas['detik']:.2f} s "
+          f"({ringkas['baris_per_detik']:,.0f} baris/s, {ringkas['workers']} worker) -> {args.output}",
+          file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+import copy
+import threading
+from collections import namedtuple
+
+# ==================== RTDB LOKAL (PALSU) ====================
+# Pengganti firebase_admin.db di dalam proses untuk pengujian. Bentuk event
+# listen() sama dengan db.Event: event_type ('put'/'patch'), path relatif
+# terhadap referensi yang di-listen, dan data. Listener pertama kali menerima
+# put '/' berisi seluruh isi node, persis seperti Firebase.
+
+EventLokal = namedtuple('EventLokal', 'event_type path data')
+
+def _pecah(path):
+    return tuple(p for p in str(path).split('/') if p)
+
+def _gabung(bagian):
+    return '/' + '/'.join(bagian)
+
+def _bertumpang(a, b):
+    n = min(len(a), len(b))
+    return a[:n] == b[:n]
+
+class RegistrasiLokal:
+    """Setara db.ListenerRegistration: close() menghentikan pengiriman event."""
+
+    def __init__(self, rtdb, entri):
+        self._rtdb = rtdb
+        self._entri = entri
+
+    def close(self):
+        self._rtdb._lepas(self._entri)
+
+class ReferensiLokal:
+    """Setara db.Reference untuk get/set/update/delete/child/listen."""
+
+    def __init__(self, rtdb, bagian):
+        self._rtdb = rtdb
+        self._bagian = bagian
+
+    @property
+    def path(self):
+        return _gabung(self._bagian)
+
+    @property
+    def key(self):
+        return self._bagian[-1] if self._bagian else None
+
+    def child(self, path):
+        return ReferensiLokal(self._rtdb, self._bagian + _pecah(path))
+
+    def get(self):
+        return self._rtdb._ambil(self._bagian)
+
+    def set(self, value):
+        self._rtdb._tulis(self._bagian, value)
+
+    def update(self, value):
+        self._rtdb._perbarui(self._bagian, value)
+
+    def delete(self):
+        self._rtdb._tulis(self._bagian, None)
+
+    def listen(self, callback):
+        return self._rtdb._dengar(self._bagian, callback)
+
+class RTDBLokal:
+    """Pohon JSON di memori dengan semantik tulis/event ala Realtime Database.
+
+    Callback dipanggil di thread penulis, di luar lock, urut sesuai penulisan.
+    Listener diindeks per path, jadi satu tulisan hanya memeriksa listener di
+    path itu dan leluhurnya (bukan semua listener; penting untuk simulasi
+    ratusan perangkat yang masing-masing di-listen).
+    """
+
+    def __init__(self, data=None):
+        self._root = copy.deepcopy(data) if data else {}
+        self._lock = threading.RLock()
+        self._listener = {}          # bagian -> list (bagian, callback)
+        self._kedalaman = {}         # panjang bagian listener -> jumlah listener
+        self.jumlah_tulis = 0
+        self.jumlah_baca = 0
+
+    def reference(self, path='/'):
+        return ReferensiLokal(self, _pecah(path))
+
+    # ---------- pohon ----------
+    def _node(self, bagian):
+        node = self._root
+        for b in bagian:
+            if not isinstance(node, dict) or b not in node: return None
+            node = node[b]
+        return node
+
+    def _ambil(self, bagian):
+        with self._lock:
+            self.jumlah_baca += 1
+            return copy.deepcopy(self._node(bagian))
+
+    def _pasang(self, bagian, value):
+        if not bagian:
+            self._root = value if isinstance(value, dict) else {}
+            return
+        node = self._root
+        for b in bagian[:-1]:
+            if not isinstance(node.get(b), dict):
+                if value is None: return
+                node[b] = {}
+            node = node[b]
+        if value is None: node.pop(bagian[-1], None)
+        else: node[bagian[-1]] = value
+
+    def _tulis(self, bagian, value):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self.jumlah_tulis += 1
+            self._pasang(bagian, value)
+            kirim = self._event(bagian, 'put', value)
+        for cb, ev in kirim: cb(ev)
+
+    def _perbarui(self, bagian, value):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self.jumlah_tulis += 1
+            for k, v in value.items(): self._pasang(bagian + _pecah(k), v)
+            kirim = self._event(bagian, 'patch', value)
+        for cb, ev in kirim: cb(ev)
+
+    # ---------- listener ----------
+    def _event(self, bagian, jenis, data):
+        kirim = []
+        # Tulisan di dalam (atau tepat di) node yang di-listen: path relatif terhadap listener
+        for k in range(len(bagian) + 1):
+            for lb, cb in self._listener.get(bagian[:k], ()):
+                kirim.append((cb, EventLokal(jenis, _gabung(bagian[k:]), copy.deepcopy(data))))
+        # Tulisan di atas node yang di-listen: kirim ulang seluruh isi node
+        if any(d > len(bagian) for d in self._kedalaman):
+            for lb, daftar in self._listener.items():
+                if len(lb) <= len(bagian) or lb[:len(bagian)] != bagian: continue
+                if jenis == 'patch' and not any(_bertumpang(bagian + _pecah(k), lb) for k in data): continue
+                for _, cb in daftar:
+                    kirim.append((cb, EventLokal('put', '/', copy.deepcopy(self._node(lb)))))
+        return kirim
+
+    def _lepas(self, entri):
+        with self._lock:
+            daftar = self._listener.get(entri[0], [])
+            if entri not in daftar: return
+            daftar.remove(entri)
+            if not daftar: del self._listener[entri[0]]
+            n = len(entri[0])
+            self._kedalaman[n] -= 1
+            if not self._kedalaman[n]: del self._kedalaman[n]
+
+    def _dengar(self, bagian, callback):
+        entri = (bagian, callback)
+        with self._lock:
+            self._listener.setdefault(bagian, []).append(entri)
+            self._kedalaman[len(bagian)] = self._kedalaman.get(len(bagian), 0) + 1
+            awal = EventLokal('put', '/', copy.deepcopy(self._node(bagian)))
+        callback(awal)
+        return RegistrasiLokal(self, entri)
@@ -0,0 +1,323 @@
+"""Simulator armada ESP32: N perangkat menulis node /Monitoring ke RTDB lokal.
+
+Setiap perangkat meniru sendDataToFirebase() di ESP32_Firebase.ino: tujuh
+nilai sensor, masing-masing diikuti <field>_Time, lalu 'timestamp' global,
+satu set() per field. Nilai mengikuti model fisik sederhana: suhu harian,
+kejadian hujan, penguapan dan irigasi, serapan nutrisi dan pemupukan. Ada
+juga gangguan yang umum di lapangan: sensor macet (nilai beku), tulisan
+field yang gagal, dan perangkat mati sementara.
+
+Jam perangkat adalah waktu simulasi. Setiap siklus memajukannya satu
+PERIODE_KIRIM (2 detik, seperti firmware). Laju (siklus per detik nyata)
+diatur terpisah, jadi satu hari lahan bisa diputar dalam hitungan menit.
+
+Contoh (dari root repo), RTDB lokal dilayani lewat REST untuk dashboard:
+    python -m smartfarm.simulator -n 20 --laju 1 --port 8765
+    SMARTFARM_DEVICE_URL=http://127.0.0.1:8765 \\
+    SMARTFARM_DEVICES="$(python -m smartfarm.simulator -n 20 --daftar)" streamlit run app.py
+"""
+import argparse
+import heapq
+import json
+import math
+import random
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from smartfarm.stream import FIELD_SENSOR, FORMAT_WAKTU_ESP32
+
+PERIODE_KIRIM = 2.0                  # detik, `interval` di ESP32_Firebase.ino
+WAKTU_MULAI = datetime(2026, 1, 1, 6, 0, 0)
+
+# Kejadian acak; peluang per jam waktu simulasi, lama rata-rata dalam detik
+PELUANG_HUJAN, LAMA_HUJAN = 0.05, 2700.0
+PELUANG_IRIGASI = 2.0                # saat tanah di bawah AMBANG_IRIGASI
+PELUANG_PUPUK = 0.5                  # saat TDS di bawah AMBANG_PUPUK
+AMBANG_IRIGASI, AMBANG_PUPUK = 35.0, 600.0
+PELUANG_MACET, LAMA_MACET = 0.002, 7200.0      # per sensor
+PELUANG_MATI, LAMA_MATI = 0.005, 600.0
+PELUANG_GAGAL_TULIS = 0.002                    # per field per siklus
+
+class ESP32Simulasi:
+    """Satu ESP32 + sensor di satu lahan. langkah() memajukan waktu satu periode."""
+
+    def __init__(self, path='/Monitoring', seed=None, mulai=WAKTU_MULAI, periode=PERIODE_KIRIM, gangguan=True,
+                 nama=None):
+        self.path = '/' + path.strip('/')
+        self.nama = nama or self.path
+        self.rng = r = random.Random(seed)
+        self.periode = float(periode)
+        self.waktu = mulai
+        self.gangguan = gangguan
+        self.ph = r.uniform(6.0, 7.2)
+        self.tds = r.uniform(700, 1600)
+        self.tanah = r.uniform(45, 80)
+        self.suhu_air = 25.0
+        self.kelembaban = 80.0
+        self.hujan = 0.0             # bacaan sensor hujan analog 0..100
+        self._suhu_udara = 26.0
+        self._derau_suhu = 0.0
+        self._dingin = 0.0           # pendinginan karena hujan (°C)
+        self._sisa_hujan = 0.0
+        self._intensitas = 0.0
+        self.macet = {}              # field -> [nilai beku, detik sisa]
+        self.sisa_mati = 0.0
+        self.siklus = self.gagal_tulis = self.siklus_mati = 0
+
+    def _terjadi(self, per_jam):
+        return self.rng.random() < per_jam * self.periode / 3600.0
+
+    def _fisika(self, dt):
+        r = self.rng
+        jam = self.waktu.hour + self.waktu.minute / 60 + self.waktu.second / 3600
+        # Hujan: kejadian acak, lama eksponensial; sensor basah cepat, kering ~20 menit
+        if self._sisa_hujan > 0:
+            self._sisa_hujan -= dt
+        elif self._terjadi(PELUANG_HUJAN):
+            self._sisa_hujan = r.expovariate(1 / LAMA_HUJAN)
+            self._intensitas = r.uniform(40, 100)
+        hujan = self._sisa_hujan > 0
+        tau = 60.0 if hujan else 1200.0
+        self.hujan += ((self._intensitas if hujan else 0.0) - self.hujan) * min(1.0, dt / tau)
+        basah = self.hujan / 100
+
+        # Suhu udara: siklus harian (puncak 15:00) + derau AR(1), turun saat hujan
+        self._dingin += ((3.0 if hujan else 0.0) - self._dingin) * min(1.0, dt / 900)
+        self._derau_suhu = self._derau_suhu * math.exp(-dt / 1800) + r.gauss(0, 0.03 * math.sqrt(dt))
+        self._suhu_udara = 27 + 5 * math.sin(2 * math.pi * (jam - 9) / 24) - self._dingin + self._derau_suhu
+        target = 98.0 if hujan else min(95.0, max(40.0, 90 - 2.5 * (self._suhu_udara - 24)))
+        self.kelembaban += (target - self.kelembaban) * min(1.0, dt / 600)
+        self.suhu_air += (self._suhu_udara - 1.5 - self.suhu_air) * min(1.0, dt / 3600)
+
+        # Tanah: penguapan naik dengan suhu, hujan membasahi, petani mengairi saat kering
+        self.tanah += (-0.8 * (1 + max(0.0, self._suhu_udara - 25) / 10) + 10 * basah) * dt / 3600
+        if self.tanah < AMBANG_IRIGASI and self._terjadi(PELUANG_IRIGASI): self.tanah += r.uniform(25, 40)
+        self.tanah = min(100.0, max(0.0, self.tanah))
+
+        # Nutrisi: diserap tanaman, diencerkan hujan, naik saat dipupuk (pH sedikit turun)
+        self.tds -= (3.0 + 0.05 * self.tds * basah) * dt / 3600
+        if self.tds < AMBANG_PUPUK and self._terjadi(PELUANG_PUPUK):
+            self.tds += r.uniform(500, 900)
+            self.ph -= 0.15
+        self.tds = max(0.0, self.tds)
+        # pH: kembali perlahan ke 6.6 (~12 jam), hujan menariknya ke 6.2
+        self.ph += (6.6 - self.ph) * dt / 43200 + (6.2 - self.ph) * basah * dt / 7200
+        self.ph += r.gauss(0, 0.002 * math.sqrt(dt))
+
+    def _baca_sensor(self):
+        """Nilai seperti dikirim firmware (tipe dan pembulatan setFloat/setInt), dengan derau ukur."""
+        g = self.rng.gauss
+        return {
+            'pH': round(min(14.0, max(0.0, self.ph + g(0, 0.02))), 2),
+            'TDS': round(max(0.0, self.tds + g(0, 5)), 1),
+            'WaterTemp': round(self.suhu_air + g(0, 0.05), 1),
+            'AirTemp': round(self._suhu_udara + g(0, 0.1), 1),
+            'Humidity': round(min(100.0, max(0.0, self.kelembaban + g(0, 0.5))), 1),
+            'SoilMoisture': int(round(min(100.0, max(0.0, self.tanah + g(0, 0.5))))),
+            'Rainfall': int(round(min(100.0, max(0.0, self.hujan + (g(0, 1) if self.hujan > 1 else 0))))),
+        }
+
+    def langkah(self):
+        """Majukan satu periode. (ts, nilai per field, field yang gagal ditulis), atau None saat perangkat mati."""
+        dt = self.periode
+        self.waktu += timedelta(seconds=dt)
+        self._fisika(dt)                 # lahan tetap berubah walau perangkat mati
+        nilai = self._baca_sensor()
+        gagal = set()
+        if self.gangguan:
+            if self.sisa_mati > 0 or self._terjadi(PELUANG_MATI):
+                if self.sisa_mati <= 0: self.sisa_mati = self.rng.expovariate(1 / LAMA_MATI)
+                self.sisa_mati -= dt
+                self.siklus_mati += 1
+                return None
+            for f in FIELD_SENSOR:
+                beku = self.macet.get(f)
+                if beku is not None:
+                    beku[1] -= dt
+                    if beku[1] <= 0: del self.macet[f]
+                    else: nilai[f] = beku[0]
+                elif self._terjadi(PELUANG_MACET):
+                    self.macet[f] = [nilai[f], self.rng.expovariate(1 / LAMA_MACET)]
+                if self.rng.random() < PELUANG_GAGAL_TULIS: gagal.add(f)
+        self.siklus += 1
+        self.gagal_tulis += len(gagal)
+        return self.waktu.strftime(FORMAT_WAKTU_ESP32), nilai, gagal
+
+    def kirim(self, db, sebelum_tutup=None):
+        """Satu siklus sendDataToFirebase(): set() per field, lalu 'timestamp'. Mengembalikan ts atau None.
+
+        sebelum_tutup(perangkat, ts) dipanggil tepat sebelum 'timestamp' ditulis
+        (mis. untuk mencatat waktu kirim saat mengukur latensi).
+        """
+        hasil = self.langkah()
+        if hasil is None: return None
+        ts, nilai, gagal = hasil
+        for f in FIELD_SENSOR:
+            if f in gagal: continue
+            db.reference(f'{self.path}/{f}').set(nilai[f])
+            db.reference(f'{self.path}/{f}_Time').set(ts)
+        if sebelum_tutup is not None: sebelum_tutup(self, ts)
+        db.reference(f'{self.path}/timestamp').set(ts)
+        return ts
+
+class ArmadaSimulasi:
+    """N ESP32Simulasi yang mengirim ke `db` dengan laju tetap (siklus per detik nyata per perangkat).
+
+    Pengiriman dijadwalkan dengan heap per thread penulis dan fase awal
+    disebar, jadi perangkat tidak mengirim serentak. Bila penulis tertinggal
+    lebih dari satu periode, jadwal perangkat itu diatur ulang (dihitung di
+    `terlewat`) sehingga antrean tidak menumpuk.
+    """
+
+    def __init__(self, db, n, laju=1.0, awalan='/devices', seed=0, thread=None, gangguan=True,
+                 sebelum_tutup=None):
+        self.db = db
+        self.laju = float(laju)
+        self.sebelum_tutup = sebelum_tutup
+        self.perangkat = {f'sawah{i}': ESP32Simulasi(f'{awalan}/sawah{i}/Monitoring', seed=seed * 100_003 + i,
+                                                     gangguan=gangguan, nama=f'sawah{i}')
+                          for i in range(n)}
+        self.thread = max(1, min(thread or 4, n))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self.terkirim = self.terlewat = 0
+        self.telat_total = self.telat_maks = 0.0
+        self.cpu = 0.0               # detik CPU thread penulis (termasuk callback listener db)
+
+    def daftar(self):
+        """Teks untuk SMARTFARM_DEVICES."""
+        return ','.join(f'{nama}={p.path}' for nama, p in self.perangkat.items())
+
+    def siklus_sekali(self):
+        """Semua perangkat mengirim sekali, berurutan (untuk pengujian deterministik)."""
+        for p in self.perangkat.values(): p.kirim(self.db, self.sebelum_tutup)
+
+    def _jalan(self, bagian, mulai):
+        # bagian: list (urutan global, perangkat); fase perangkat ke-i = i/N periode
+        jarak = 1.0 / self.laju
+        n = len(self.perangkat)
+        antre = [(mulai + jarak * urutan / n, i) for i, (urutan, _) in enumerate(bagian)]
+        bagian = [p for _, p in bagian]
+        heapq.heapify(antre)
+        while antre:
+            jadwal, i = antre[0]
+            if self._stop.wait(max(0.0, jadwal - time.perf_counter())): break
+            cpu = time.thread_time()
+            bagian[i].kirim(self.db, self.sebelum_tutup)
+            cpu = time.thread_time() - cpu
+            sekarang = time.perf_counter()
+            telat = sekarang - jadwal
+            with self._lock:
+                self.cpu += cpu
+                self.terkirim += 1
+                self.telat_total += telat
+                self.telat_maks = max(self.telat_maks, telat)
+                if telat > jarak: self.terlewat += 1
+            heapq.heapreplace(antre, (sekarang if telat > jarak else jadwal + jarak, i))
+
+    def start(self):
+        if not self._threads:
+            self._stop.clear()
+            semua = list(enumerate(self.perangkat.values()))
+            mulai = time.perf_counter()
+            for k in range(self.thread):
+                t = threading.Thread(target=self._jalan, args=(semua[k::self.thread], mulai),
+                                     name=f'smartfarm-sim-{k}', daemon=True)
+                t.start()
+                self._threads.append(t)
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        for t in self._threads: t.join(timeout)
+        self._threads = []
+
+    def statistik(self):
+        with self._lock:
+            return {'perangkat': len(self.perangkat), 'terkirim': self.terkirim, 'terlewat': self.terlewat, 'cpu': self.cpu,
+                    'telat_rata': self.telat_total / self.terkirim if self.terkirim else 0.0,
+                    'telat_maks': self.telat_maks,
+                    'gagal_tulis': sum(p.gagal_tulis for p in self.perangkat.values()),
+                    'siklus_mati': sum(p.siklus_mati for p in self.perangkat.values()),
+                    'sensor_macet': sum(len(p.macet) for p in self.perangkat.values())}
+
+# ==================== REST LOKAL ====================
+def layani_rest(db, host='127.0.0.1', port=8765):
+    """Layani GET <path>.json dari db (seperti REST Realtime Database) di thread latar.
+
+    Dashboard bisa membacanya dengan SMARTFARM_DEVICE_URL. Mengembalikan server (shutdown() untuk berhenti).
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            path = self.path.split('?')[0]
+            if path.endswith('.json'): path = path[:-len('.json')]
+            body = json.dumps(db.reference(path or '/').get()).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 1024
+
+    server = Server((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='smartfarm-sim-rest', daemon=True).start()
+    return server
+
+def main(argv=None):
+    from smartfarm.rtdb_lokal import RTDBLokal
+    ap = argparse.ArgumentParser(prog='python -m smartfarm.simulator', description=__doc__.splitlines()[0])
+    ap.add_argument('-n', '--perangkat', type=int, default=10, help="jumlah ESP32")
+    ap.add_argument('--laju', type=float, default=1.0, help="siklus kirim per detik per perangkat")
+    ap.add_argument('--awalan', default='/devices', help="path induk node perangkat")
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--tanpa-gangguan', action='store_true', help="tanpa sensor macet / gagal tulis / mati")
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765, help="port REST lokal")
+    ap.add_argument('--durasi', type=float, default=0, help="detik (0 = sampai dihentikan)")
+    ap.add_argument('--daftar', action='store_true', help="cetak teks SMARTFARM_DEVICES lalu keluar")
+    args = ap.parse_args(argv)
+    rtdb = RTDBLokal()
+    armada = ArmadaSimulasi(rtdb, args.perangkat, args.laju, args.awalan, args.seed,
+                            gangguan=not args.tanpa_gangguan)
+    if args.daftar:
+        print(armada.daftar())
+        return 0
+    armada.siklus_sekali()
+    server = layani_rest(rtdb, args.host, args.port)
+    armada.start()
+    print(f"{args.perangkat} ESP32 x {args.laju} siklus/s -> http://{args.host}:{args.port}{args.awalan}/<id>/Monitoring.json",
+          file=sys.stderr)
+    mulai = time.monotonic()
+    try:
+        while not args.durasi or time.monotonic() - mulai < args.durasi:
+            time.sleep(min(10.0, args.durasi or 10.0))
+            s = armada.statistik()
+            print(f"terkirim {s['terkirim']}, telat rata {s['telat_rata'] * 1000:.1f} ms, terlewat {s['terlewat']}, "
+                  f"gagal tulis {s['gagal_tulis']}, sensor macet {s['sensor_macet']}", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        armada.stop()
+        server.shutdown()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,243 @@
+import json
+import random
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from smartfarm.analitik import AnalitikSensor
+from smartfarm.history import KAPASITAS_DEFAULT, KOLOM_ANOMALI, RingBuffer
+from smartfarm.metrik import METRIK
+from smartfarm.store import DEVICE_DEFAULT
+
+# ==================== SUMBER DATA SENSOR ====================
+# Sumber data cukup punya method ambil() yang mengembalikan dict data mentah
+# berformat node /Monitoring (pH, TDS, SoilMoisture, ...) atau None bila gagal.
+# Dengan begitu Firebase bisa diganti sumber palsu saat pengujian.
+
+SENSOR_KEYS = ('ph', 'tds', 'soil_moisture', 'water_temp', 'air_temp', 'air_humidity', 'rainfall')
+STATUS_TIMEOUT = 20       # detik tanpa perubahan nilai/stempel sebelum perangkat dianggap OFFLINE
+
+def normalisasi_data(data, waktu=None):
+    """Ubah data mentah /Monitoring menjadi dict sensor yang dipakai dashboard."""
+    waktu = waktu or datetime.now()
+    return {
+        'ph': float(data.get('pH') or data.get('ph') or 7.0),
+        'tds': int(data.get('TDS') or data.get('tds') or 0),
+        'soil_moisture': int(data.get('SoilMoisture') or data.get('soil_moisture') or data.get('soil') or 0),
+        'water_temp': float(data.get('WaterTemp') or data.get('suhu_air') or 0),
+        'air_temp': float(data.get('AirTemp') or data.get('suhu_udara') or 0),
+        'air_humidity': int(data.get('Humidity') or data.get('humidity') or data.get('kelembaban_udara') or 0),
+        'rainfall': int(data.get('Rainfall') or data.get('rainfall') or data.get('curah_hujan') or 0),
+        'timestamp': waktu.strftime("%H:%M:%S"),
+        'date': waktu.strftime("%d-%m-%Y")
+    }
+
+def data_dummy(waktu=None):
+    """Data acak untuk mode offline (tanpa Firebase)."""
+    waktu = waktu or datetime.now()
+    return {
+        'ph': round(random.uniform(5.5, 8.5), 2),
+        'tds': int(random.uniform(300, 2500)),
+        'soil_moisture': int(random.uniform(10, 100)),
+        'water_temp': round(random.uniform(22, 35), 1),
+        'air_temp': round(random.uniform(24, 38), 1),
+        'air_humidity': int(random.uniform(40, 95)),
+        'rainfall': int(random.choice([0, 100])),
+        'timestamp': waktu.strftime("%H:%M:%S"),
+        'date': waktu.strftime("%d-%m-%Y")
+    }
+
+class SumberFirebase:
+    """Membaca node RTDB (default /Monitoring) lewat firebase_admin.db.
+
+    db: objek dengan reference(path), default modul firebase_admin.db;
+    RTDBLokal (smartfarm.rtdb_lokal) untuk simulasi dan pengujian.
+    """
+
+    def __init__(self, init, path='/Monitoring', db=None):
+        self.init = init          # callable -> bool, mis. init_firebase di app.py
+        self.path = path
+        self.db = db
+        self.gagal = 0
+
+    def ambil(self):
+        if not self.init():
+            METRIK.tambah('sumber_gagal', sumber='firebase', alasan='init')
+            return None
+        try:
+            db = self.db
+            if db is None: from firebase_admin import db
+            with METRIK.waktu('sumber_ambil', sumber='firebase'):
+                return db.reference(self.path).get() or None
+        except Exception as e:
+            self.gagal += 1
+            METRIK.tambah('sumber_gagal', sumber='firebase', alasan=type(e).__name__)
+            return None
+
+class SumberHTTP:
+    """Membaca node lewat REST (GET url, respons JSON), mis. `<databaseURL>/Monitoring.json`.
+
+    sesi adalah pool koneksi urllib3 yang dipakai bersama semua perangkat (lihat
+    sesi_http), jadi koneksi keep-alive dipakai ulang, bukan dibuka per poll.
+    """
+
+    def __init__(self, url, sesi=None, timeout=5.0):
+        self.url = url
+        self.sesi = sesi
+        self.timeout = timeout
+        self.gagal = 0
+
+    def ambil(self):
+        if self.sesi is None: self.sesi = sesi_http()
+        try:
+            with METRIK.waktu('sumber_ambil', sumber='http'):
+                r = self.sesi.request('GET', self.url, timeout=self.timeout, retries=False)
+            if r.status != 200:
+                self.gagal += 1
+                METRIK.tambah('sumber_gagal', sumber='http', alasan=f'http_{r.status}')
+                return None
+            return json.loads(r.data) or None
+        except Exception as e:
+            self.gagal += 1
+            METRIK.tambah('sumber_gagal', sumber='http', alasan=type(e).__name__)
+            return None
+
+def sesi_http(ukuran_pool=10):
+    """Pool koneksi urllib3 seukuran jumlah worker yang memakainya.
+
+    urllib3 langsung (bukan requests.Session): requests memindai variabel
+    lingkungan proxy di setiap permintaan, ~4x biaya CPU per poll. Proxy dari
+    HTTP(S)_PROXY dibaca sekali di sini.
+    """
+    import urllib.request
+    import urllib3
+    proxy = urllib.request.getproxies().get('https') or urllib.request.getproxies().get('http')
+    if proxy: return urllib3.ProxyManager(proxy, maxsize=ukuran_pool)
+    return urllib3.PoolManager(maxsize=ukuran_pool)
+
+class SumberPalsu:
+    """Sumber lokal untuk pengujian: memutar daftar data mentah secara berulang.
+
+    bacaan boleh berupa list dict (format /Monitoring) atau callable tanpa
+    argumen. Elemen None mensimulasikan pembacaan yang gagal.
+    """
+
+    def __init__(self, bacaan):
+        self.bacaan = bacaan
+        self.dipanggil = 0
+
+    def ambil(self):
+        i = self.dipanggil
+        self.dipanggil += 1
+        if callable(self.bacaan): return self.bacaan()
+        if not self.bacaan: return None
+        return self.bacaan[i % len(self.bacaan)]
+
+# Snapshot yang dibaca semua sesi. Objeknya tidak pernah diubah setelah dibuat;
+# poller memasang snapshot baru (satu assignment atribut), jadi pembaca tidak perlu lock.
+# riwayat adalah RingBuffer bersama milik poller (lihat smartfarm.history).
+# analitik: HasilAnalitik bacaan ini (smartfarm.analitik), None untuk data cadangan.
+Snapshot = namedtuple('Snapshot', 'seq data riwayat status terakhir_berubah sumber analitik', defaults=(None,))
+
+class PollerSensor:
+    """Satu thread latar per proses yang mengambil data sensor dengan laju tetap.
+
+    Bila sumber gagal (None/error), data_dummy dipakai seperti mode offline
+    sebelumnya. Status perangkat ONLINE selama nilai sensor atau stempel
+    'timestamp' node masih berubah dalam STATUS_TIMEOUT detik terakhir.
+    """
+
+    def __init__(self, sumber, interval=3.0, kapasitas=KAPASITAS_DEFAULT,
+                 timeout=STATUS_TIMEOUT, cadangan=data_dummy, penyimpan=None,
+                 device=DEVICE_DEFAULT, poll_awal=True):
+        self.sumber = sumber
+        self.penyimpan = penyimpan    # PenyimpanBacaan opsional (smartfarm.store)
+        self.device = device
+        self.interval = float(interval)
+        self.timeout = timeout
+        self.cadangan = cadangan
+        self._riwayat = RingBuffer(kapasitas)
+        if penyimpan is not None: self._riwayat.isi(*penyimpan.terakhir(device=device, batas=kapasitas))
+        self._nilai_terakhir = None
+        self.analitik = AnalitikSensor()
+        self._waktu_berubah = time.time()
+        self._status = 'OFFLINE'      # mulai OFFLINE sampai ada perubahan nilai
+        self._stop = threading.Event()
+        self._thread = None
+        self._snapshot = None
+        # poll_awal=False: pemanggil (mis. PollerArmada) yang menjalankan poll pertama
+        if poll_awal: self.poll_sekali()
+
+    # ---------- sisi penulis (thread poller) ----------
+    def poll_sekali(self):
+        """Ambil satu data dan terbitkan snapshot baru. Dipanggil thread poller (atau langsung di tes)."""
+        mulai = time.perf_counter()
+        mentah = None
+        try:
+            mentah = self.sumber.ambil()
+        except Exception as e:
+            mentah = None
+            METRIK.tambah('poll_gagal', alasan=type(e).__name__)
+        if mentah:
+            try:
+                d, asal = normalisasi_data(mentah), 'sumber'
+            except (TypeError, ValueError, AttributeError):
+                d, asal = self.cadangan(), 'cadangan'
+                METRIK.tambah('cadangan', alasan='format')
+        else:
+            d, asal = self.cadangan(), 'cadangan'
+            METRIK.tambah('cadangan', alasan='kosong')
+
+        sekarang = time.time()
+        nilai = {k: d[k] for k in SENSOR_KEYS}
+        # Stempel 'timestamp' global ESP32 maju tiap siklus tulis, walau nilainya tidak berubah
+        stempel = mentah.get('timestamp') if asal == 'sumber' else None
+        if self._nilai_terakhir is not None and (nilai, stempel) != self._nilai_terakhir:
+            self._status = 'ONLINE'
+            self._waktu_berubah = sekarang
+        elif sekarang - self._waktu_berubah > self.timeout:
+            self._status = 'OFFLINE'
+        self._nilai_terakhir = (nilai, stempel)
+
+        # Statistik bergulir & flag anomali hanya dari data asli; flag ikut dicatat di riwayat
+        hasil = None
+        if asal == 'sumber':
+            hasil = self.analitik.perbarui(sekarang, nilai, stempel)
+            d[KOLOM_ANOMALI] = hasil.anomali
+        self._riwayat.append(sekarang, d)
+        # Hanya data asli yang disimpan permanen, bukan data cadangan/dummy
+        if self.penyimpan is not None and asal == 'sumber': self.penyimpan.tambah(sekarang, d, device=self.device)
+        seq = self._snapshot.seq + 1 if self._snapshot else 1
+        self._snapshot = Snapshot(seq, d, self._riwayat, self._status,
+                                  self._waktu_berubah, asal, hasil)
+        METRIK.catat('poll', time.perf_counter() - mulai)
+        return self._snapshot
+
+    def _jalan(self):
+        while not self._stop.wait(self.interval):
+            self.poll_sekali()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._jalan, name='smartfarm-poller', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None: self._thread.join(timeout)
+
+    @property
+    def berjalan(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    # ---------- sisi pembaca (sesi Streamlit) ----------
+    def snapshot(self):
+        """Snapshot terbaru (seq, data, riwayat, status, ...). Tidak pernah memblokir."""
+        snap = self._snapshot
+        # Status OFFLINE juga harus muncul saat poller berhenti mengambil data
+        if snap.status == 'ONLINE' and time.time() - snap.terakhir_berubah > self.timeout:
+            snap = snap._replace(status='OFFLINE')
+        return snap
@@ -0,0 +1,354 @@
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from smartfarm.history import KOLOM_ANOMALI, KOLOM_RIWAYAT, KOLOM_SENSOR
+
+# ==================== PENYIMPANAN BACAAN (SQLITE WAL) ====================
+# Tabel WITHOUT ROWID dengan primary key (device, ts): baris tersusun fisik
+# menurut perangkat lalu waktu, jadi query rentang waktu cukup satu pencarian
+# B-tree + pembacaan berurutan, O(log n + k), tidak tumbuh linear dengan isi
+# database. ts disimpan sebagai milidetik epoch (INTEGER).
+#
+# Tulis dikumpulkan di memori dan di-commit per batch dalam satu transaksi.
+# Mode WAL membuat pembaca (sesi dashboard) tidak memblokir penulis (poller).
+
+DEVICE_DEFAULT = 'default'
+BATCH_SIZE = 256          # baris per commit
+FLUSH_INTERVAL = 5.0      # detik maksimum data menunggu di memori
+RETENSI_INTERVAL = 3600   # detik antar penghapusan data kedaluwarsa
+
+SKEMA = """
+CREATE TABLE IF NOT EXISTS bacaan (
+    device TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    {kolom},
+    PRIMARY KEY (device, ts)
+) WITHOUT ROWID
+""".format(kolom=',\n    '.join(f'{k} REAL' for k in KOLOM_RIWAYAT))
+
+# ---------- rollup multi-resolusi ----------
+# min/max/jumlah/cacah per ember menit, jam dan hari untuk sensor yang digrafikkan.
+# Diperbarui di transaksi yang sama dengan data mentah (UPSERT), jadi grafik
+# rentang minggu/bulan cukup membaca ribuan baris rollup, bukan jutaan baris mentah.
+# Setiap (device, ts) disimpan sekali: tulisan ulang (mis. bacaan terakhir yang
+# diterbitkan lagi saat listener restart) diabaikan, dan hanya baris yang benar-benar
+# baru yang masuk ke rollup. bangun_ulang_rollup() menghitung ulang persis dari data
+# mentah bila perlu. Retensi data mentah tidak menyentuh rollup, jadi grafik rentang
+# panjang tetap ada setelah data mentahnya dihapus; rollup punya retensi sendiri.
+KOLOM_ROLLUP = ('ph', 'tds', 'soil_moisture', 'water_temp')
+RESOLUSI_ROLLUP = (60, 3600, 86400)   # detik; ember sejajar epoch (UTC)
+MENTAH_MAKS_DETIK = 6 * 3600          # rentang sampai 6 jam dibaca dari data mentah
+EMBER_MAKS = 20000                    # rollup terkasar dipilih agar jumlah ember <= ini
+
+SKEMA_ROLLUP = """
+CREATE TABLE IF NOT EXISTS rollup (
+    device TEXT NOT NULL,
+    resolusi INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    {kolom},
+    PRIMARY KEY (device, resolusi, bucket)
+) WITHOUT ROWID
+""".format(kolom=',\n    '.join(f'{k}_min REAL, {k}_max REAL, {k}_sum REAL NOT NULL, {k}_n INTEGER NOT NULL'
+                                  for k in KOLOM_ROLLUP))
+
+SQL_UPSERT_ROLLUP = ("INSERT INTO rollup VALUES ({isi}) ON CONFLICT (device, resolusi, bucket) DO UPDATE SET {set}"
+                     .format(isi=', '.join('?' * (3 + 4 * len(KOLOM_ROLLUP))), set=', '.join(
+                         f"{k}_min = CASE WHEN {k}_min IS NULL OR excluded.{k}_min < {k}_min "
+                         f"THEN excluded.{k}_min ELSE {k}_min END, "
+                         f"{k}_max = CASE WHEN {k}_max IS NULL OR excluded.{k}_max > {k}_max "
+                         f"THEN excluded.{k}_max ELSE {k}_max END, "
+                         f"{k}_sum = {k}_sum + excluded.{k}_sum, {k}_n = {k}_n + excluded.{k}_n"
+                         for k in KOLOM_ROLLUP)))
+
+_AGREGAT_ROLLUP = ', '.join(f"MIN({k}), MAX({k}), TOTAL({k}), COUNT({k})" for k in KOLOM_ROLLUP)
+
+# Antrean batch di tabel temp koneksi penulis (primary key sama dengan bacaan), hanya
+# dipakai bila batch berisi (device, ts) yang sudah tersimpan atau ganda
+SKEMA_ANTRE = SKEMA.replace("CREATE TABLE IF NOT EXISTS bacaan", "CREATE TEMP TABLE IF NOT EXISTS antre")
+_KOLOM_BACAAN = ', '.join(('device', 'ts') + KOLOM_RIWAYAT)
+_ISI_BACAAN = ', '.join('?' * (2 + len(KOLOM_RIWAYAT)))
+
+def _ms(t):
+    return int(round(float(t) * 1000))
+
+def _nan_none(v):
+    return None if v != v else float(v)
+
+def baris_rollup(antre):
+    """Agregat per (device, resolusi, ember) dari baris mentah (device, ts_ms, sensor...)."""
+    posisi = [1 + KOLOM_SENSOR.index(k) for k in KOLOM_ROLLUP]
+    per_device = {}
+    for r in antre: per_device.setdefault(r[0], []).append(r[1:])
+    hasil = []
+    for device, isi in per_device.items():
+        arr = np.array(isi, dtype=float)           # kolom 0 = ts_ms, None -> NaN
+        ts = arr[:, 0].astype(np.int64)
+        nilai = arr[:, posisi]
+        for res in RESOLUSI_ROLLUP:
+            ember = ts // (res * 1000) * (res * 1000)
+            urut = np.argsort(ember, kind='stable')
+            e = ember[urut]; v = nilai[urut]
+            awal = np.concatenate(([0], np.flatnonzero(np.diff(e)) + 1))
+            ada = ~np.isnan(v)
+            mn = np.fmin.reduceat(v, awal); mx = np.fmax.reduceat(v, awal)
+            jml = np.add.reduceat(np.where(ada, v, 0.0), awal); n = np.add.reduceat(ada, awal)
+            for j, b in enumerate(e[awal].tolist()):
+                baris = [device, res, b]
+                for c in range(len(KOLOM_ROLLUP)):
+                    baris += [_nan_none(mn[j, c]), _nan_none(mx[j, c]), float(jml[j, c]), int(n[j, c])]
+                hasil.append(tuple(baris))
+    return hasil
+
+def pilih_resolusi(durasi):
+    """0 (data mentah) atau resolusi rollup terhalus yang jumlah embernya <= EMBER_MAKS."""
+    if durasi <= MENTAH_MAKS_DETIK: return 0
+    for res in RESOLUSI_ROLLUP:
+        if durasi / res <= EMBER_MAKS: return res
+    return RESOLUSI_ROLLUP[-1]
+
+class PenyimpanBacaan:
+    """Penyimpanan time-series bacaan sensor di satu file SQLite.
+
+    retensi_detik: umur maksimum data mentah (None = simpan selamanya).
+    retensi_rollup_detik: umur maksimum ember rollup (None = simpan selamanya),
+    biasanya lebih panjang agar grafik rentang panjang melewati umur data mentah.
+    Penghapusan dijalankan otomatis saat flush, paling sering sekali per RETENSI_INTERVAL.
+    """
+
+    def __init__(self, path, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, retensi_detik=None,
+                 retensi_rollup_detik=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retensi_detik = retensi_detik
+        self.retensi_rollup_detik = retensi_rollup_detik
+        self._antre = []
+        self._lock = threading.Lock()
+        self._lokal = threading.local()
+        self._flush_terakhir = time.monotonic()
+        self._retensi_terakhir = 0.0
+        self.ditulis = 0
+        self.gagal = 0
+        self.duplikat = 0         # bacaan yang (device, ts)-nya sudah tersimpan
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        self._tulis = self._buka(baru=True)
+        self._tulis.execute(SKEMA)
+        # Database lama tanpa kolom anomali: ditambahkan di akhir, urutan tetap sama dengan KOLOM_RIWAYAT
+        if KOLOM_ANOMALI not in [r[1] for r in self._tulis.execute("PRAGMA table_info(bacaan)")]:
+            self._tulis.execute(f"ALTER TABLE bacaan ADD COLUMN {KOLOM_ANOMALI} REAL")
+        self._tulis.execute(SKEMA_ROLLUP)
+        self._tulis.execute("PRAGMA temp_store=MEMORY")
+        self._tulis.execute(SKEMA_ANTRE)
+        self._tulis.commit()
+        # Database lama (tanpa rollup) yang sudah berisi data: hitung rollup sekali
+        if (self._tulis.execute("SELECT 1 FROM rollup LIMIT 1").fetchone() is None
+                and self._tulis.execute("SELECT 1 FROM bacaan LIMIT 1").fetchone() is not None):
+            self.bangun_ulang_rollup()
+
+    def _buka(self, baru=False):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        # auto_vacuum hanya bisa diset sebelum header file ditulis (sebelum journal_mode=WAL)
+        if baru: conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _baca(self):
+        # Satu koneksi baca per thread (sesi Streamlit berjalan di thread berbeda)
+        conn = getattr(self._lokal, 'conn', None)
+        if conn is None:
+            conn = self._lokal.conn = self._buka()
+        return conn
+
+    # ---------- tulis ----------
+    def tambah(self, ts, nilai, device=DEVICE_DEFAULT):
+        """Antrekan satu bacaan (ts detik epoch, nilai dict sensor). Di-commit per batch."""
+        baris = (device, _ms(ts)) + tuple(
+            None if nilai.get(k) is None else float(nilai[k]) for k in KOLOM_RIWAYAT)
+        with self._lock:
+            self._antre.append(baris)
+            perlu = (len(self._antre) >= self.batch_size
+                     or time.monotonic() - self._flush_terakhir >= self.flush_interval)
+        if perlu: self.flush()
+
+    def tambah_banyak(self, ts, kolom, device=DEVICE_DEFAULT):
+        """Tulis banyak bacaan sekaligus: ts array detik, kolom dict sensor -> array."""
+        ts = np.asarray(ts, dtype=float)
+        n = ts.size
+        isi = [np.asarray(kolom[k], dtype=float) if k in kolom else np.full(n, np.nan) for k in KOLOM_RIWAYAT]
+        ms = np.rint(ts * 1000).astype(np.int64).tolist()
+        data = [[None if v != v else v for v in arr.tolist()] for arr in isi]
+        baris = [(device, ms[i]) + tuple(c[i] for c in data) for i in range(n)]
+        with self._lock:
+            self._antre.extend(baris)
+        self.flush()
+
+    def _tulis_baru(self, antre):
+        # Kasus umum: tidak ada (device, ts) ganda di batch dan rentang ts batch tiap perangkat masih
+        # kosong di database (satu pencarian primary key), jadi antre ditulis dan di-rollup apa adanya.
+        # Selain itu batch disaring SQLite lewat temp.antre dan hanya baris yang benar-benar masuk
+        # dikembalikan untuk rollup.
+        rentang = {}
+        for r in antre:
+            lo, hi = rentang.get(r[0], (r[1], r[1]))
+            rentang[r[0]] = (min(lo, r[1]), max(hi, r[1]))
+        if len({r[:2] for r in antre}) == len(antre) and not any(
+                self._tulis.execute("SELECT 1 FROM bacaan WHERE device = ? AND ts BETWEEN ? AND ? LIMIT 1",
+                                    (device, lo, hi)).fetchone()
+                for device, (lo, hi) in rentang.items()):
+            self._tulis.executemany(f"INSERT INTO bacaan ({_KOLOM_BACAAN}) VALUES ({_ISI_BACAAN})", antre)
+            return antre
+        self._tulis.execute("DELETE FROM temp.antre")
+        self._tulis.executemany(f"INSERT OR IGNORE INTO temp.antre ({_KOLOM_BACAAN}) VALUES ({_ISI_BACAAN})", antre)
+        self._tulis.execute("DELETE FROM temp.antre WHERE EXISTS "
+                            "(SELECT 1 FROM bacaan b WHERE b.device = antre.device AND b.ts = antre.ts)")
+        self._tulis.execute(f"INSERT INTO bacaan ({_KOLOM_BACAAN}) SELECT {_KOLOM_BACAAN} FROM temp.antre")
+        baru = self._tulis.execute(f"SELECT {_KOLOM_BACAAN} FROM temp.antre").fetchall()
+        self._tulis.execute("DELETE FROM temp.antre")
+        return baru
+
+    def flush(self):
+        with self._lock:
+            antre, self._antre = self._antre, []
+            self._flush_terakhir = time.monotonic()
+            if antre:
+                try:
+                    with self._tulis:
+                        baru = self._tulis_baru(antre)
+                        self._tulis.executemany(SQL_UPSERT_ROLLUP, baris_rollup(baru))
+                    self.ditulis += len(baru)
+                    self.duplikat += len(antre) - len(baru)
+                except sqlite3.Error:
+                    # Disk penuh/terkunci: batch dibuang dan dihitung, poller tetap berjalan
+                    self.gagal += len(antre)
+            retensi = ((self.retensi_detik is not None or self.retensi_rollup_detik is not None)
+                       and time.monotonic() - self._retensi_terakhir >= RETENSI_INTERVAL)
+        if retensi: self.terapkan_retensi()
+
+    # ---------- baca ----------
+    def rentang(self, mulai=None, akhir=None, device=DEVICE_DEFAULT, kolom=KOLOM_RIWAYAT, batas=None):
+        """Bacaan dalam [mulai, akhir] (detik epoch) sebagai (ts, {kolom: array}).
+
+        batas membatasi jumlah baris dan mengambil yang TERBARU.
+        """
+        kolom = tuple(kolom)
+        for k in kolom:
+            if k not in KOLOM_RIWAYAT: raise ValueError(f"kolom tidak dikenal: {k}")
+        lo = _ms(mulai) if mulai is not None else -2 ** 62
+        hi = _ms(akhir) if akhir is not None else 2 ** 62
+        sql = f"SELECT ts{''.join(', ' + k for k in kolom)} FROM bacaan WHERE device = ? AND ts BETWEEN ? AND ?"
+        if batas is not None:
+            sql = f"SELECT * FROM ({sql} ORDER BY ts DESC LIMIT {int(batas)}) ORDER BY ts"
+        else:
+            sql += " ORDER BY ts"
+        rows = self._baca().execute(sql, (device, lo, hi)).fetchall()
+        arr = np.array(rows, dtype=float).reshape(len(rows), 1 + len(kolom))
+        return arr[:, 0] / 1000.0, {k: arr[:, i + 1] for i, k in enumerate(kolom)}
+
+    def terakhir(self, durasi=None, device=DEVICE_DEFAULT, batas=None):
+        """Bacaan `durasi` detik terakhir (relatif terhadap bacaan terbaru perangkat)."""
+        row = self._baca().execute("SELECT MAX(ts) FROM bacaan WHERE device = ?", (device,)).fetchone()
+        if row[0] is None: return self.rentang(0, -1, device)
+        akhir = row[0] / 1000.0
+        return self.rentang(None if durasi is None else akhir - durasi, akhir, device, batas=batas)
+
+    def rollup(self, mulai=None, akhir=None, resolusi=60, device=DEVICE_DEFAULT, kolom=KOLOM_ROLLUP):
+        """Rollup dalam [mulai, akhir] sebagai (ts awal ember, {'<k>_min'/'<k>_max'/'<k>_mean': array})."""
+        kolom = tuple(kolom)
+        for k in kolom:
+            if k not in KOLOM_ROLLUP: raise ValueError(f"kolom tanpa rollup: {k}")
+        if resolusi not in RESOLUSI_ROLLUP: raise ValueError(f"resolusi rollup tidak dikenal: {resolusi}")
+        lo = _ms(mulai) // (resolusi * 1000) * (resolusi * 1000) if mulai is not None else -2 ** 62
+        hi = _ms(akhir) if akhir is not None else 2 ** 62
+        pilih = ''.join(f", {k}_min, {k}_max, {k}_sum / NULLIF({k}_n, 0)" for k in kolom)
+        rows = self._baca().execute(
+            f"SELECT bucket{pilih} FROM rollup WHERE device = ? AND resolusi = ? AND bucket BETWEEN ? AND ? "
+            f"ORDER BY bucket", (device, resolusi, lo, hi)).fetchall()
+        arr = np.array(rows, dtype=float).reshape(len(rows), 1 + 3 * len(kolom))
+        hasil = {}
+        for i, k in enumerate(kolom):
+            hasil[f'{k}_min'], hasil[f'{k}_max'], hasil[f'{k}_mean'] = arr[:, 1 + 3 * i], arr[:, 2 + 3 * i], arr[:, 3 + 3 * i]
+        return arr[:, 0] / 1000.0, hasil
+
+    def seri(self, mulai, akhir, device=DEVICE_DEFAULT, kolom=KOLOM_ROLLUP):
+        """Seri grafik untuk rentang sembarang: data mentah bila pendek, rollup (rata-rata) bila panjang.
+
+        Mengembalikan (ts, {kolom: array}, resolusi); resolusi 0 berarti data mentah.
+        """
+        res = pilih_resolusi(akhir - mulai)
+        if res == 0:
+            ts, isi = self.rentang(mulai, akhir, device, kolom)
+            return ts, isi, 0
+        ts, isi = self.rollup(mulai, akhir, res, device, kolom)
+        return ts, {k: isi[f'{k}_mean'] for k in kolom}, res
+
+    def bangun_ulang_rollup(self):
+        """Hitung ulang seluruh tabel rollup dari data mentah."""
+        with self._lock, self._tulis:
+            self._tulis.execute("DELETE FROM rollup")
+            for res in RESOLUSI_ROLLUP:
+                ms = res * 1000
+                self._tulis.execute(
+                    f"INSERT INTO rollup SELECT device, {res}, ts / {ms} * {ms}, {_AGREGAT_ROLLUP} "
+                    f"FROM bacaan GROUP BY device, ts / {ms}")
+
+    def devices(self):
+        return [r[0] for r in self._baca().execute("SELECT DISTINCT device FROM bacaan ORDER BY device")]
+
+    def jumlah(self, device=None):
+        if device is None: return self._baca().execute("SELECT COUNT(*) FROM bacaan").fetchone()[0]
+        return self._baca().execute("SELECT COUNT(*) FROM bacaan WHERE device = ?", (device,)).fetchone()[0]
+
+    # ---------- retensi & kompaksi ----------
+    def hapus_sebelum(self, ts):
+        """Hapus semua bacaan mentah dengan waktu < ts (detik epoch). Rollup tidak disentuh. Mengembalikan jumlah baris."""
+        # Per perangkat, supaya DELETE memakai rentang primary key, bukan scan seluruh tabel
+        dihapus = 0
+        with self._lock, self._tulis:
+            for (device,) in self._tulis.execute("SELECT DISTINCT device FROM bacaan").fetchall():
+                cur = self._tulis.execute("DELETE FROM bacaan WHERE device = ? AND ts < ?", (device, _ms(ts)))
+                dihapus += cur.rowcount
+        return dihapus
+
+    def hapus_rollup_sebelum(self, ts):
+        """Hapus ember rollup yang seluruhnya sebelum ts (detik epoch). Mengembalikan jumlah ember."""
+        dihapus = 0
+        with self._lock, self._tulis:
+            for (device,) in self._tulis.execute("SELECT DISTINCT device FROM rollup").fetchall():
+                for res in RESOLUSI_ROLLUP:
+                    cur = self._tulis.execute(
+                        "DELETE FROM rollup WHERE device = ? AND resolusi = ? AND bucket <= ?",
+                        (device, res, _ms(ts) - res * 1000))
+                    dihapus += cur.rowcount
+        return dihapus
+
+    def terapkan_retensi(self, sekarang=None):
+        self._retensi_terakhir = time.monotonic()
+        sekarang = time.time() if sekarang is None else sekarang
+        dihapus = 0
+        if self.retensi_detik is not None: dihapus += self.hapus_sebelum(sekarang - self.retensi_detik)
+        if self.retensi_rollup_detik is not None:
+            dihapus += self.hapus_rollup_sebelum(sekarang - self.retensi_rollup_detik)
+        if dihapus: self.kompaksi()
+        return dihapus
+
+    def kompaksi(self):
+        """Kembalikan halaman kosong ke sistem berkas dan potong file WAL."""
+        with self._lock:
+            # executescript menjalankan pragma sampai selesai; execute() hanya membebaskan satu halaman
+            self._tulis.executescript("PRAGMA incremental_vacuum;")
+            self._tulis.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._tulis.close()
+        conn = getattr(self._lokal, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._lokal.conn = None
@@ -0,0 +1,150 @@
+import threading
+import time
+from datetime import datetime
+
+from smartfarm.analitik import AnalitikSensor
+from smartfarm.history import KAPASITAS_DEFAULT, KOLOM_ANOMALI, RingBuffer
+from smartfarm.sources import SENSOR_KEYS, STATUS_TIMEOUT, Snapshot, data_dummy, normalisasi_data
+
+# ==================== INGEST STREAMING (LISTENER RTDB) ====================
+# ESP32 menulis /Monitoring satu field per request: nilai lalu <field>_Time,
+# untuk tujuh sensor, dan terakhir 'timestamp' global. Listener menerima
+# setiap tulisan itu sebagai event put/patch. Event digabung ke salinan lokal
+# node, dan satu bacaan baru diterbitkan hanya di batas siklus, sehingga
+# dashboard tidak pernah menampilkan campuran nilai dua siklus.
+
+FIELD_SENSOR = ('pH', 'TDS', 'WaterTemp', 'AirTemp', 'Humidity', 'SoilMoisture', 'Rainfall')
+FORMAT_WAKTU_ESP32 = "%Y-%m-%d %H:%M:%S"
+
+def terapkan_event(node, event_type, path, data):
+    """Terapkan satu event put/patch (path relatif) ke dict node. Mengembalikan node baru."""
+    bagian = [p for p in path.split('/') if p]
+    if not bagian:
+        if event_type == 'put': return dict(data) if isinstance(data, dict) else {}
+        node = dict(node)
+        for k, v in (data or {}).items():
+            if v is None: node.pop(k, None)
+            else: node[k] = v
+        return node
+    node = dict(node)
+    if len(bagian) > 1:
+        # Node /Monitoring datar; anak bersarang cukup diganti utuh di level pertama
+        anak = node.get(bagian[0])
+        node[bagian[0]] = terapkan_event(anak if isinstance(anak, dict) else {}, event_type,
+                                         '/' + '/'.join(bagian[1:]), data)
+        return node
+    if event_type == 'patch':
+        anak = node.get(bagian[0])
+        node[bagian[0]] = terapkan_event(anak if isinstance(anak, dict) else {}, 'patch', '/', data)
+    elif data is None:
+        node.pop(bagian[0], None)
+    else:
+        node[bagian[0]] = data
+    return node
+
+def batas_siklus(node):
+    """Stempel waktu siklus bila node berisi bacaan lengkap, atau None.
+
+    Siklus selesai saat 'timestamp' global ditulis; untuk firmware yang tidak
+    menulisnya, siklus dianggap selesai bila semua <field>_Time sudah sama.
+    """
+    ts = node.get('timestamp')
+    if ts: return ts
+    waktu = {node.get(f + '_Time') for f in FIELD_SENSOR}
+    if len(waktu) == 1 and None not in waktu: return waktu.pop()
+    return None
+
+def _parse_waktu(ts):
+    try:
+        return datetime.strptime(str(ts), FORMAT_WAKTU_ESP32)
+    except ValueError:
+        return None
+
+class StreamSensor:
+    """Ingest berbasis push: referensi.listen() mengganti polling /Monitoring.
+
+    referensi cukup punya listen(callback) yang mengembalikan objek dengan
+    close(), misalnya db.reference('/Monitoring') atau RTDBLokal.reference().
+    Status perangkat dihitung dari waktu kedatangan event: ONLINE selama ada
+    event dalam `timeout` detik terakhir. Event put awal (isi node yang sudah
+    tersimpan) tidak dihitung sebagai aktivitas perangkat, dan bacaan yang tidak
+    lebih baru dari bacaan terakhir di riwayat/penyimpan (put awal setelah
+    restart) tetap diterbitkan tetapi tidak ditambahkan ulang.
+    """
+
+    def __init__(self, referensi, kapasitas=KAPASITAS_DEFAULT, timeout=STATUS_TIMEOUT, cadangan=data_dummy,
+                 penyimpan=None):
+        self.referensi = referensi
+        self.penyimpan = penyimpan    # PenyimpanBacaan opsional (smartfarm.store)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._node = {}
+        self._riwayat = RingBuffer(kapasitas)
+        self.analitik = AnalitikSensor()
+        self._t_tersimpan = None   # detik epoch bacaan terbaru di riwayat/penyimpan
+        if penyimpan is not None:
+            waktu, kolom = penyimpan.terakhir(batas=kapasitas)
+            self._riwayat.isi(waktu, kolom)
+            if len(waktu): self._t_tersimpan = float(waktu[-1])
+        self._ts_terbit = None
+        self._event_terakhir = None
+        self._awal = True
+        self._registrasi = None
+        self.jumlah_event = 0
+        self.field_basi = ()       # field yang <field>_Time-nya tidak ikut siklus terakhir
+        self._snapshot = Snapshot(0, cadangan(), self._riwayat, 'OFFLINE', 0.0, 'cadangan')
+
+    def start(self):
+        if self._registrasi is None:
+            self._awal = True
+            self._registrasi = self.referensi.listen(self._on_event)
+        return self
+
+    def stop(self, timeout=None):
+        if self._registrasi is not None:
+            self._registrasi.close()
+            self._registrasi = None
+
+    @property
+    def berjalan(self):
+        return self._registrasi is not None
+
+    def _on_event(self, event):
+        tiba = time.time()
+        with self._lock:
+            self.jumlah_event += 1
+            if self._awal:
+                self._awal = False
+            else:
+                self._event_terakhir = tiba
+            self._node = terapkan_event(self._node, event.event_type, event.path, event.data)
+            ts = batas_siklus(self._node)
+            if ts is None or ts == self._ts_terbit: return
+            self._terbitkan(ts, tiba)
+
+    def _terbitkan(self, ts, tiba):
+        self._ts_terbit = ts
+        self.field_basi = tuple(f for f in FIELD_SENSOR
+                                if f in self._node and self._node.get(f + '_Time', ts) != ts)
+        waktu = _parse_waktu(ts)
+        try:
+            d = normalisasi_data(self._node, waktu)
+        except (TypeError, ValueError, AttributeError):
+            return
+        t = waktu.timestamp() if waktu else tiba
+        hasil = self.analitik.perbarui(t, {k: d[k] for k in SENSOR_KEYS}, ts)
+        d[KOLOM_ANOMALI] = hasil.anomali
+        # Put awal setelah restart menerbitkan ulang bacaan yang sudah tersimpan: tampilkan, jangan simpan lagi
+        if self._t_tersimpan is None or round(t * 1000) > round(self._t_tersimpan * 1000):
+            self._t_tersimpan = t
+            self._riwayat.append(t, d)
+            if self.penyimpan is not None: self.penyimpan.tambah(t, d)
+        self._snapshot = Snapshot(self._snapshot.seq + 1, d, self._riwayat,
+                                  'ONLINE', self._event_terakhir or 0.0, 'stream', hasil)
+
+    def snapshot(self):
+        """Snapshot terbaru; status dihitung dari waktu event terakhir. Tidak pernah memblokir."""
+        snap = self._snapshot
+        terakhir = self._event_terakhir
+        online = terakhir is not None and time.time() - terakhir <= self.timeout
+        return snap._replace(status='ONLINE' if online else 'OFFLINE', terakhir_berubah=terakhir or 0.0)